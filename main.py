@@ -8,6 +8,7 @@
 import os
 import sys
 import argparse
+from contextlib import contextmanager
 from pathlib import Path
 
 # 添加项目根目录到 Python 路径
@@ -32,29 +33,56 @@ def install_dependencies():
         return False
     return True
 
+# 启动时必须可用的依赖（只检查是否安装，不执行导入）
+REQUIRED_MODULES = ["PyQt5", "moviepy", "cv2", "numpy"]
+
 def check_dependencies():
-    """检查必要的依赖是否已安装"""
-    try:
-        from PyQt5.QtWidgets import QApplication
-        from moviepy.editor import VideoFileClip
-        import cv2
-        import numpy
-        return True
-    except ImportError:
-        return False
+    """检查必要的依赖是否已安装（只查找模块元数据，不导入模块，避免拖慢启动）"""
+    import importlib.util
+    for module_name in REQUIRED_MODULES:
+        try:
+            if importlib.util.find_spec(module_name) is None:
+                return False
+        except (ImportError, ValueError):
+            return False
+    return True
 
 def parse_arguments():
     """解析命令行参数"""
     parser = argparse.ArgumentParser(description='视频混剪工具')
     parser.add_argument('--batch-mode', action='store_true', help='启动批量处理模式')
+    parser.add_argument('--profile-startup', nargs='?', const='', default=None, metavar='JSON',
+                        help='分析启动耗时：窗口显示后输出各模块导入和初始化耗时并退出，可指定JSON报告路径')
     return parser.parse_args()
 
+@contextmanager
+def _null_stage(name):
+    """未开启启动分析时的空阶段记录"""
+    yield
+
+def _finish_startup_profile(profiler, report_path, app):
+    """输出启动耗时报告并退出程序"""
+    profiler.uninstall()
+    print(profiler.format_report())
+    if report_path:
+        profiler.save(report_path)
+        print(f"启动耗时报告已保存: {report_path}")
+    app.quit()
+
 def main():
     """程序主入口"""
     try:
         # 解析命令行参数
         args = parse_arguments()
         
+        # 启动耗时分析（需在导入其他模块之前开始记录）
+        profiler = None
+        if args.profile_startup is not None:
+            from src.utils.startup_profiler import StartupProfiler
+            profiler = StartupProfiler()
+            profiler.install()
+        stage = profiler.stage if profiler else _null_stage
+        
         # 检查并安装依赖
         if not check_dependencies():
             if not install_dependencies():
@@ -66,23 +94,40 @@ def main():
                 print("依赖安装可能未成功，但将尝试继续运行...")
         
         # 导入必要的组件
-        from PyQt5.QtWidgets import QApplication
+        with stage("导入PyQt5"):
+            from PyQt5.QtWidgets import QApplication
         
         # 创建应用程序
-        app = QApplication(sys.argv)
-        app.setApplicationName("视频混剪工具")
-        app.setOrganizationName("VideoMixTool")
+        with stage("创建QApplication"):
+            app = QApplication(sys.argv)
+            app.setApplicationName("视频混剪工具")
+            app.setOrganizationName("VideoMixTool")
         
         # 根据参数启动不同的窗口
         if args.batch_mode:
-            from src.ui.batch_window import BatchWindow
+            with stage("导入批量处理窗口"):
+                from src.ui.batch_window import BatchWindow
             print("正在启动批量处理模式...")
-            window = BatchWindow()
+            with stage("创建批量处理窗口"):
+                window = BatchWindow()
         else:
-            from src.ui.main_window import MainWindow
-            window = MainWindow()
+            with stage("导入主窗口"):
+                from src.ui.main_window import MainWindow
+            with stage("创建主窗口"):
+                window = MainWindow()
+        
+        with stage("显示窗口"):
+            window.show()
+        
+        # 运行指标端点（本机HTTP和JSON快照），渲染工作进程的指标也汇总到这里
+        with stage("启动指标端点"):
+            from src.utils.metrics import start_metrics_exporter
+            start_metrics_exporter()
         
-        window.show()
+        if profiler:
+            # 事件循环处理完首批事件（首次绘制）后输出报告并退出
+            from PyQt5.QtCore import QTimer
+            QTimer.singleShot(0, lambda: _finish_startup_profile(profiler, args.profile_startup, app))
         
         # 运行应用程序
         return app.exec_()
@@ -92,4 +137,7 @@ def main():
         return 1
 
 if __name__ == "__main__":
+    # 打包后的程序启动渲染工作进程时需要
+    import multiprocessing
+    multiprocessing.freeze_support()
     sys.exit(main()) 
\ No newline at end of file
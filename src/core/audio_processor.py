@@ -13,16 +13,16 @@ import numpy as np
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional, Union
 
-try:
-    import librosa
-    import soundfile as sf
-    from pydub import AudioSegment
-    from moviepy.editor import AudioFileClip, CompositeAudioClip
-except ImportError as e:
-    raise ImportError(f"请安装必要的依赖: {e}")
-
 from src.utils.logger import get_logger
 from src.utils.cache_config import CacheConfig
+from src.utils.lazy_import import LazyImport
+
+# 重量级依赖延迟到首次使用时导入
+librosa = LazyImport("librosa")
+sf = LazyImport("soundfile")
+AudioSegment = LazyImport("pydub", "AudioSegment")
+AudioFileClip = LazyImport("moviepy.editor", "AudioFileClip")
+CompositeAudioClip = LazyImport("moviepy.editor", "CompositeAudioClip")
 
 logger = get_logger()
 
@@ -49,7 +49,9 @@ class AudioProcessor:
             "bgm_volume": 0.5,           # 背景音乐音量
             "fade_in": 0.5,              # 淡入时长(秒)
             "fade_out": 1.0,             # 淡出时长(秒)
-            "temp_dir": cache_dir       # 使用配置的缓存目录
+            "temp_dir": cache_dir,      # 使用配置的缓存目录
+            "streaming": True,           # FFmpeg可用时使用流式引擎（内存占用恒定）
+            "block_seconds": 1.0         # 流式处理的PCM块时长(秒)
         }
         
         # 更新设置
@@ -59,6 +61,26 @@ class AudioProcessor:
         
         # 确保临时目录存在
         os.makedirs(self.settings["temp_dir"], exist_ok=True)
+        
+        self._engine = None
+    
+    def _stream_engine(self):
+        """
+        获取流式音频引擎，未开启或FFmpeg不可用时返回None（回退到pydub）
+        """
+        if not self.settings.get("streaming", True):
+            return None
+        if self._engine is None:
+            from src.utils.ffmpeg_registry import get_ffmpeg_registry
+            if not get_ffmpeg_registry().available():
+                return None
+            from src.core.audio_stream import AudioStreamEngine
+            self._engine = AudioStreamEngine(
+                sample_rate=self.settings["sample_rate"],
+                channels=self.settings["channels"],
+                block_seconds=self.settings.get("block_seconds", 1.0),
+            )
+        return self._engine
     
     def extract_audio_from_video(self, video_path: str, output_path: str = None) -> str:
         """
@@ -111,6 +133,14 @@ class AudioProcessor:
         try:
             logger.info(f"调整音频音量: {audio_path}, 音量倍数: {volume}")
             
+            engine = self._stream_engine()
+            if engine is not None:
+                if volume <= 0:
+                    logger.warning(f"音量倍数为0或负值: {volume}，返回静音音频")
+                engine.adjust_volume(audio_path, volume, output_path)
+                logger.info(f"音量调整完成: {output_path}")
+                return output_path
+            
             # 使用pydub调整音量
             audio = AudioSegment.from_file(audio_path)
             
@@ -163,6 +193,12 @@ class AudioProcessor:
         try:
             logger.info(f"混合音频文件: {audio_paths}")
             
+            engine = self._stream_engine()
+            if engine is not None:
+                engine.mix(audio_paths, volumes, output_path)
+                logger.info(f"音频混合完成: {output_path}")
+                return output_path
+            
             # 加载第一个音频作为基础
             mixed_audio = AudioSegment.from_file(audio_paths[0])
             
@@ -226,6 +262,13 @@ class AudioProcessor:
         try:
             logger.info(f"为配音添加背景音乐: {audio_path}, BGM: {bgm_path}")
             
+            engine = self._stream_engine()
+            if engine is not None:
+                engine.add_bgm(audio_path, bgm_path, voice_volume, bgm_volume,
+                               self.settings["fade_in"], self.settings["fade_out"], output_path)
+                logger.info(f"添加背景音乐完成: {output_path}")
+                return output_path
+            
             # 加载配音和背景音乐
             voice = AudioSegment.from_file(audio_path)
             bgm = AudioSegment.from_file(bgm_path)
@@ -281,6 +324,13 @@ class AudioProcessor:
         try:
             logger.info(f"检测音频静音部分: {audio_path}")
             
+            engine = self._stream_engine()
+            if engine is not None:
+                silence_millis, _ = engine.detect_silence(audio_path, min_silence_len, silence_thresh)
+                silence_secs = [(start / 1000.0, end / 1000.0) for start, end in silence_millis]
+                logger.info(f"检测到 {len(silence_secs)} 个静音片段")
+                return silence_secs
+            
             # 加载音频
             audio = AudioSegment.from_file(audio_path)
             
@@ -318,11 +368,18 @@ class AudioProcessor:
             # 确保输出目录存在
             os.makedirs(output_dir, exist_ok=True)
             
-            # 加载音频
+            engine = self._stream_engine()
+            if engine is not None:
+                return self._auto_split_streaming(engine, audio_path, output_dir, min_silence_len,
+                                                  silence_thresh, min_segment_len)
+            
+            # 加载音频（只解码一次，静音检测直接使用已解码的音频）
             audio = AudioSegment.from_file(audio_path)
             
             # 检测静音片段
-            silence_ranges = self.detect_silence(audio_path, min_silence_len, silence_thresh)
+            from pydub.silence import detect_silence
+            silence_ranges = [(start / 1000.0, end / 1000.0) for start, end in
+                              detect_silence(audio, min_silence_len=min_silence_len, silence_thresh=silence_thresh)]
             
             if not silence_ranges:
                 logger.warning(f"未检测到静音片段，无法切分音频")
@@ -365,6 +422,26 @@ class AudioProcessor:
             logger.error(f"自动切分音频失败: {str(e)}")
             raise
     
+    def _auto_split_streaming(self, engine, audio_path: str, output_dir: str, min_silence_len: int,
+                              silence_thresh: float, min_segment_len: float) -> List[str]:
+        """
+        流式引擎的自动切分：单次解码计算静音区间，再由FFmpeg并发切出各片段
+        """
+        from src.core.audio_stream import segments_between_silences
+        
+        silence_ranges, total_ms = engine.detect_silence(audio_path, min_silence_len, silence_thresh)
+        if not silence_ranges:
+            logger.warning(f"未检测到静音片段，无法切分音频")
+            return [audio_path]
+        
+        segments = segments_between_silences(silence_ranges, total_ms, min_segment_len)
+        output_paths = [os.path.join(output_dir, f"segment_{i + 1}.{self.settings['format']}")
+                        for i in range(len(segments))]
+        engine.cut_segments(audio_path, segments, output_paths)
+        
+        logger.info(f"音频切分完成，共 {len(output_paths)} 个片段")
+        return output_paths
+    
     def change_pitch(self, audio_path: str, semitones: float, output_path: str = None) -> str:
         """
         改变音频音调
@@ -452,6 +529,12 @@ class AudioProcessor:
         try:
             logger.info(f"规范化音频音量: {audio_path}, 目标分贝值: {target_db}")
             
+            engine = self._stream_engine()
+            if engine is not None:
+                _, db_change = engine.normalize(audio_path, target_db, output_path)
+                logger.info(f"音频规范化完成: {output_path}, 调整了 {db_change:.2f} dB")
+                return output_path
+            
             # 加载音频
             audio = AudioSegment.from_file(audio_path)
             
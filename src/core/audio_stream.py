@@ -0,0 +1,502 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+流式音频处理模块
+以固定大小的PCM块（NumPy float32，形状为[帧数, 声道数]）或FFmpeg滤镜图处理音频，
+内存占用与输入时长无关，供AudioProcessor在FFmpeg可用时使用
+"""
+
+import os
+import sys
+import math
+import threading
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Iterator, Tuple
+
+import numpy as np
+
+from src.utils.logger import get_logger
+from src.utils.ffmpeg_registry import get_ffmpeg_registry
+
+logger = get_logger()
+
+# float32每个采样的字节数
+_SAMPLE_BYTES = 4
+
+# 解码失败时错误信息中保留的FFmpeg错误输出行数
+_STDERR_TAIL_LINES = 10
+
+
+def _popen_kwargs() -> dict:
+    if sys.platform == "win32":
+        return {"creationflags": getattr(subprocess, "CREATE_NO_WINDOW", 0)}
+    return {}
+
+
+def _output_codec_args(output_path: str) -> List[str]:
+    """根据输出扩展名选择编码参数（wav输出16位PCM，与pydub默认导出一致）"""
+    ext = os.path.splitext(output_path)[1].lower()
+    if ext == ".wav":
+        return ["-c:a", "pcm_s16le"]
+    if ext == ".mp3":
+        return ["-c:a", "libmp3lame", "-b:a", "192k"]
+    if ext in (".m4a", ".aac"):
+        return ["-c:a", "aac", "-b:a", "192k"]
+    return []
+
+
+def find_silence_ranges(cumulative: np.ndarray, boundaries: np.ndarray, min_silence_len: int,
+                        silence_thresh: float, seek_step: int = 1) -> List[Tuple[int, int]]:
+    """
+    根据累计能量计算静音区间，结果与pydub.silence.detect_silence一致
+
+    与pydub相同，窗口起点为0、seek_step、2*seek_step……，最后一个窗口起点不在步长上时补上末尾窗口；
+    窗口能量由累计和相减得到，所有窗口一次性向量化比较，不逐窗口循环
+
+    Args:
+        cumulative: 每毫秒边界处的累计能量（逐帧各声道平方均值之和），长度为总毫秒数+1
+        boundaries: 每毫秒边界对应的帧序号，长度与cumulative相同
+        min_silence_len: 最小静音长度(毫秒)
+        silence_thresh: 静音阈值(dBFS)
+        seek_step: 检测窗口的步长(毫秒)
+
+    Returns:
+        List[Tuple[int, int]]: 静音区间列表，单位为毫秒
+    """
+    total_ms = len(cumulative) - 1
+    window = max(1, int(min_silence_len))
+    if total_ms < window:
+        return []
+    last_start = total_ms - window
+    starts = np.arange(0, last_start + 1, seek_step)
+    if last_start % seek_step:
+        starts = np.append(starts, last_start)
+    energy = cumulative[starts + window] - cumulative[starts]
+    frames = np.maximum(boundaries[starts + window] - boundaries[starts], 1)
+    threshold = math.pow(10.0, silence_thresh / 20.0) ** 2
+    starts = starts[energy / frames <= threshold]
+    if len(starts) == 0:
+        return []
+    # 相邻静音窗口不连续且间隔超过最小静音长度时开始新区间（重叠或相接的窗口合并）
+    gaps = np.diff(starts)
+    breaks = np.flatnonzero((gaps != seek_step) & (gaps > min_silence_len))
+    range_starts = np.concatenate([starts[:1], starts[breaks + 1]])
+    range_ends = np.concatenate([starts[breaks], starts[-1:]]) + min_silence_len
+    return [(int(a), int(b)) for a, b in zip(range_starts, range_ends)]
+
+
+def segments_between_silences(silence_ranges: List[Tuple[int, int]], total_ms: int,
+                              min_segment_len: float) -> List[Tuple[int, int]]:
+    """
+    由静音区间得到有声片段（毫秒），丢弃短于min_segment_len(秒)的片段
+    """
+    segments = []
+    position = 0
+    for silence_start, silence_end in list(silence_ranges) + [(total_ms, total_ms)]:
+        if silence_start > position and (silence_start - position) / 1000 >= min_segment_len:
+            segments.append((position, silence_start))
+        position = max(position, silence_end)
+    return segments
+
+
+class PCMWriter:
+    """
+    把float32 PCM块写入FFmpeg标准输入进行编码
+
+    用法:
+        with engine.open_writer(output_path) as writer:
+            writer.write(block)
+    """
+
+    def __init__(self, ffmpeg_cmd: str, output_path: str, sample_rate: int, channels: int):
+        self.output_path = output_path
+        self.frames_written = 0
+        cmd = [
+            ffmpeg_cmd, "-y", "-v", "error",
+            "-f", "f32le", "-ar", str(sample_rate), "-ac", str(channels), "-i", "pipe:0",
+            *_output_codec_args(output_path), output_path
+        ]
+        self._process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE,
+                                         **_popen_kwargs())
+
+    def write(self, block: np.ndarray):
+        """写入一个PCM块（超出[-1, 1]的采样会被削波）"""
+        np.clip(block, -1.0, 1.0, out=block)
+        self._process.stdin.write(np.ascontiguousarray(block, dtype=np.float32).tobytes())
+        self.frames_written += len(block)
+
+    def close(self):
+        """结束写入并等待编码完成"""
+        if self._process.stdin and not self._process.stdin.closed:
+            self._process.stdin.close()
+        stderr = self._process.stderr.read() if self._process.stderr else b""
+        returncode = self._process.wait()
+        if returncode != 0:
+            raise RuntimeError(f"FFmpeg编码失败({returncode}): {stderr.decode('utf-8', errors='ignore')}")
+
+    def abort(self):
+        """放弃写入并结束FFmpeg进程"""
+        try:
+            self._process.kill()
+            self._process.wait()
+        except Exception:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+class AudioStreamEngine:
+    """流式音频引擎"""
+
+    def __init__(self, sample_rate: int = 44100, channels: int = 2, block_seconds: float = 1.0,
+                 ffmpeg_cmd: Optional[str] = None):
+        """
+        初始化流式音频引擎
+
+        Args:
+            sample_rate: 处理和输出的采样率
+            channels: 处理和输出的声道数
+            block_seconds: 每个PCM块的时长(秒)，决定内存占用上限
+            ffmpeg_cmd: FFmpeg命令路径，为None时使用FFmpeg注册表
+        """
+        registry = get_ffmpeg_registry()
+        self.ffmpeg_cmd = ffmpeg_cmd or registry.ffmpeg_path()
+        self.ffprobe_cmd = registry.ffprobe_path()
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.block_frames = max(1024, int(sample_rate * block_seconds))
+
+    # ------------------------------------------------------------------
+    # 基础读写
+    # ------------------------------------------------------------------
+
+    def decode_blocks(self, path: str, start: float = None, duration: float = None) -> Iterator[np.ndarray]:
+        """
+        逐块解码音频
+
+        Args:
+            path: 音频或视频文件路径
+            start: 开始时间(秒)
+            duration: 解码时长(秒)
+
+        Yields:
+            np.ndarray: float32 PCM块，形状为[帧数, 声道数]，最后一块可能较短
+        """
+        cmd = [self.ffmpeg_cmd, "-v", "error"]
+        if start:
+            cmd += ["-ss", f"{start:.3f}"]
+        cmd += ["-i", path]
+        if duration:
+            cmd += ["-t", f"{duration:.3f}"]
+        cmd += ["-vn", "-f", "f32le", "-acodec", "pcm_f32le",
+                "-ar", str(self.sample_rate), "-ac", str(self.channels), "pipe:1"]
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   **_popen_kwargs())
+        # 错误输出在单独的线程中读取，只保留最后几行，避免管道写满阻塞FFmpeg
+        stderr_tail = deque(maxlen=_STDERR_TAIL_LINES)
+
+        def _drain_stderr():
+            for line in process.stderr:
+                stderr_tail.append(line.decode("utf-8", errors="ignore").rstrip())
+
+        stderr_thread = threading.Thread(target=_drain_stderr, daemon=True)
+        stderr_thread.start()
+        frame_bytes = _SAMPLE_BYTES * self.channels
+        block_bytes = self.block_frames * frame_bytes
+        try:
+            pending = b""
+            while True:
+                data = process.stdout.read(block_bytes - len(pending))
+                if not data:
+                    break
+                pending += data
+                if len(pending) < block_bytes:
+                    continue
+                yield np.frombuffer(pending, dtype=np.float32).reshape(-1, self.channels).copy()
+                pending = b""
+            usable = len(pending) - len(pending) % frame_bytes
+            if usable:
+                yield np.frombuffer(pending[:usable], dtype=np.float32).reshape(-1, self.channels).copy()
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.stdout.close()
+            process.wait()
+            stderr_thread.join()
+            process.stderr.close()
+        if process.returncode > 0:
+            detail = "\n".join(line for line in stderr_tail if line)
+            raise RuntimeError(f"FFmpeg解码失败({process.returncode}): {path}" + (f"\n{detail}" if detail else ""))
+
+    def open_writer(self, output_path: str) -> PCMWriter:
+        """打开PCM编码写入器"""
+        return PCMWriter(self.ffmpeg_cmd, output_path, self.sample_rate, self.channels)
+
+    def run_filter(self, input_paths: List[str], filter_graph: str, output_path: str,
+                   input_args: List[List[str]] = None, complex_graph: bool = False):
+        """
+        用单个FFmpeg滤镜图处理音频（解码、滤镜、编码都在FFmpeg内流式完成）
+
+        Args:
+            input_paths: 输入文件列表
+            filter_graph: 滤镜描述
+            output_path: 输出文件路径
+            input_args: 每个输入之前的附加参数
+            complex_graph: 是否使用-filter_complex（多输入时需要）
+        """
+        cmd = [self.ffmpeg_cmd, "-y", "-v", "error"]
+        for i, path in enumerate(input_paths):
+            if input_args and i < len(input_args) and input_args[i]:
+                cmd += input_args[i]
+            cmd += ["-i", path]
+        cmd += ["-filter_complex" if complex_graph else "-af", filter_graph, "-vn",
+                "-ar", str(self.sample_rate), "-ac", str(self.channels),
+                *_output_codec_args(output_path), output_path]
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                **_popen_kwargs())
+        if result.returncode != 0:
+            raise RuntimeError(f"FFmpeg处理失败({result.returncode}): "
+                               f"{result.stderr.decode('utf-8', errors='ignore')}")
+        return output_path
+
+    def probe_duration(self, path: str) -> float:
+        """获取文件时长(秒)，失败时返回0"""
+        try:
+            result = subprocess.run(
+                [self.ffprobe_cmd, "-v", "error", "-show_entries", "format=duration",
+                 "-of", "default=noprint_wrappers=1:nokey=1", path],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=10,
+                **_popen_kwargs())
+            return float(result.stdout.strip())
+        except Exception:
+            return 0.0
+
+    # ------------------------------------------------------------------
+    # AudioProcessor对应的操作
+    # ------------------------------------------------------------------
+
+    def adjust_volume(self, audio_path: str, volume: float, output_path: str) -> str:
+        """调整音量（音量<=0时输出等长静音）"""
+        return self.run_filter([audio_path], f"volume={max(volume, 0.0):.6f}", output_path)
+
+    def mix(self, audio_paths: List[str], volumes: List[float], output_path: str) -> str:
+        """
+        混合多个音频（逐块相加，长度取最长的输入，与pydub叠加结果一致）
+
+        Args:
+            audio_paths: 音频文件路径列表
+            volumes: 各音频的音量倍数
+            output_path: 输出路径
+        """
+        streams = [self.decode_blocks(path) for path in audio_paths]
+        # 各输入的未消费数据，块边界可能不对齐
+        buffers: List[Optional[np.ndarray]] = [np.zeros((0, self.channels), np.float32) for _ in streams]
+        try:
+            with self.open_writer(output_path) as writer:
+                while True:
+                    mixed = np.zeros((self.block_frames, self.channels), dtype=np.float32)
+                    produced = 0
+                    for i, stream in enumerate(streams):
+                        if buffers[i] is None:
+                            continue
+                        while len(buffers[i]) < self.block_frames:
+                            block = next(stream, None)
+                            if block is None:
+                                break
+                            buffers[i] = np.concatenate([buffers[i], block])
+                        take = buffers[i][:self.block_frames]
+                        if len(take):
+                            mixed[:len(take)] += take * volumes[i]
+                            produced = max(produced, len(take))
+                        buffers[i] = buffers[i][self.block_frames:]
+                        if len(take) < self.block_frames:
+                            buffers[i] = None  # 该输入已结束
+                    if produced == 0:
+                        break
+                    writer.write(mixed[:produced])
+        finally:
+            for stream in streams:
+                stream.close()
+        return output_path
+
+    def add_bgm(self, audio_path: str, bgm_path: str, voice_volume: float, bgm_volume: float,
+                fade_in: float, fade_out: float, output_path: str) -> str:
+        """
+        为配音添加循环背景音乐，每次循环都带淡入淡出（与pydub实现一致），输出长度等于配音长度
+
+        Args:
+            audio_path: 配音文件路径
+            bgm_path: 背景音乐文件路径
+            voice_volume: 配音音量倍数
+            bgm_volume: 背景音乐音量倍数
+            fade_in: 背景音乐淡入时长(秒)
+            fade_out: 背景音乐淡出时长(秒)
+            output_path: 输出路径
+        """
+        bgm_frames = int(self.probe_duration(bgm_path) * self.sample_rate)
+        fade_in_frames = int(fade_in * self.sample_rate) if bgm_frames > fade_in * self.sample_rate else 0
+        fade_out_frames = int(fade_out * self.sample_rate) if bgm_frames > fade_out * self.sample_rate else 0
+
+        def bgm_blocks():
+            """无限循环的背景音乐块，附带每帧在当前循环内的位置"""
+            while True:
+                position = 0
+                for block in self.decode_blocks(bgm_path):
+                    yield block, position
+                    position += len(block)
+                if position == 0:
+                    return
+
+        def fade_gain(positions: np.ndarray) -> np.ndarray:
+            gain = np.ones(len(positions), dtype=np.float32)
+            if fade_in_frames:
+                gain = np.minimum(gain, positions / fade_in_frames)
+            if fade_out_frames and bgm_frames:
+                gain = np.minimum(gain, (bgm_frames - positions) / fade_out_frames)
+            return np.clip(gain, 0.0, 1.0)[:, None]
+
+        voice_stream = self.decode_blocks(audio_path)
+        bgm_stream = bgm_blocks()
+        pending = np.zeros((0, self.channels), np.float32)
+        pending_pos = np.zeros(0, np.float32)
+        try:
+            with self.open_writer(output_path) as writer:
+                for voice in voice_stream:
+                    need = len(voice)
+                    while len(pending) < need:
+                        item = next(bgm_stream, None)
+                        if item is None:
+                            break
+                        block, position = item
+                        pending = np.concatenate([pending, block])
+                        pending_pos = np.concatenate(
+                            [pending_pos, np.arange(position, position + len(block), dtype=np.float32)])
+                    bgm = pending[:need]
+                    out = voice * voice_volume
+                    if len(bgm):
+                        out[:len(bgm)] += bgm * fade_gain(pending_pos[:need]) * bgm_volume
+                    pending = pending[need:]
+                    pending_pos = pending_pos[need:]
+                    writer.write(out)
+        finally:
+            voice_stream.close()
+            bgm_stream.close()
+        return output_path
+
+    def energy_profile(self, audio_path: str, step_ms: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        流式解码一次，计算每个时间步边界处的累计能量
+
+        Args:
+            audio_path: 音频文件路径
+            step_ms: 时间步长(毫秒)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (累计能量, 边界帧序号)，长度均为完整时间步数+1
+        """
+        frames_per_step = self.sample_rate * step_ms / 1000.0
+        cumulative_parts = [np.zeros(1, dtype=np.float64)]
+        total_energy = 0.0
+        total_frames = 0
+        next_step = 1
+        for block in self.decode_blocks(audio_path):
+            energy = np.cumsum(np.square(block, dtype=np.float64).mean(axis=1)) + total_energy
+            end_frame = total_frames + len(block)
+            # 落在本块内的时间步边界
+            last_step = int(end_frame / frames_per_step)
+            if last_step >= next_step:
+                steps = np.arange(next_step, last_step + 1)
+                indices = np.floor(steps * frames_per_step).astype(np.int64) - total_frames - 1
+                cumulative_parts.append(energy[np.clip(indices, 0, len(block) - 1)])
+                next_step = last_step + 1
+            total_energy = float(energy[-1]) if len(energy) else total_energy
+            total_frames = end_frame
+        cumulative = np.concatenate(cumulative_parts)
+        boundaries = np.floor(np.arange(len(cumulative)) * frames_per_step).astype(np.int64)
+        return cumulative, boundaries
+
+    def detect_silence(self, audio_path: str, min_silence_len: int = 500, silence_thresh: float = -40,
+                       seek_step: int = 1) -> Tuple[List[Tuple[int, int]], int]:
+        """
+        检测静音区间（单次流式解码 + 累计和向量化）
+
+        Returns:
+            Tuple[List[Tuple[int, int]], int]: (静音区间列表(毫秒), 音频总时长(毫秒))
+        """
+        cumulative, boundaries = self.energy_profile(audio_path)
+        total_ms = len(cumulative) - 1
+        return find_silence_ranges(cumulative, boundaries, min_silence_len, silence_thresh, seek_step), total_ms
+
+    def cut_segments(self, audio_path: str, segments: List[Tuple[int, int]], output_paths: List[str],
+                     workers: int = None) -> List[str]:
+        """
+        并发切出多个片段；输出格式与源文件相同时直接复制音频流，否则由FFmpeg重新编码
+
+        Args:
+            audio_path: 源音频文件路径
+            segments: 片段列表(开始毫秒, 结束毫秒)
+            output_paths: 与segments对应的输出路径
+            workers: 并发数，默认为CPU核心数
+
+        Returns:
+            List[str]: 输出路径列表
+        """
+        source_ext = os.path.splitext(audio_path)[1].lower()
+
+        def _cut(segment, output_path):
+            start_ms, end_ms = segment
+            cmd = [self.ffmpeg_cmd, "-y", "-v", "error",
+                   "-ss", f"{start_ms / 1000:.3f}", "-to", f"{end_ms / 1000:.3f}",
+                   "-i", audio_path, "-vn"]
+            if os.path.splitext(output_path)[1].lower() == source_ext:
+                cmd += ["-c", "copy"]
+            else:
+                cmd += ["-ar", str(self.sample_rate), "-ac", str(self.channels),
+                        *_output_codec_args(output_path)]
+            cmd.append(output_path)
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                    **_popen_kwargs())
+            if result.returncode != 0:
+                raise RuntimeError(f"切分片段失败({result.returncode}): "
+                                   f"{result.stderr.decode('utf-8', errors='ignore')}")
+            return output_path
+
+        if not segments:
+            return []
+        workers = max(1, min(len(segments), workers or os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_cut, segments, output_paths))
+
+    def measure_dbfs(self, audio_path: str) -> float:
+        """流式计算整个文件的RMS电平(dBFS)，与pydub的AudioSegment.dBFS定义一致"""
+        total = 0.0
+        count = 0
+        for block in self.decode_blocks(audio_path):
+            total += float(np.dot(block.ravel().astype(np.float64), block.ravel().astype(np.float64)))
+            count += block.size
+        if count == 0 or total == 0:
+            return -math.inf
+        return 20 * math.log10(math.sqrt(total / count))
+
+    def normalize(self, audio_path: str, target_db: float, output_path: str) -> Tuple[str, float]:
+        """
+        规范化到目标dBFS（第一遍流式测量，第二遍由FFmpeg应用增益）
+
+        Returns:
+            Tuple[str, float]: (输出路径, 调整的分贝值)
+        """
+        current_db = self.measure_dbfs(audio_path)
+        db_change = 0.0 if math.isinf(current_db) else target_db - current_db
+        self.run_filter([audio_path], f"volume={db_change:.4f}dB", output_path)
+        return output_path, db_change
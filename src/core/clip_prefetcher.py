@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+片段预读模块
+批量合成时，当前输出在渲染的同时，后台线程把下一个输出已选定的片段预先读入系统页缓存，
+FFmpeg打开这些片段时不必再等待本地磁盘或网络共享的冷读取；
+每轮预读有字节预算，超出预算的片段跳过，命中情况计入批量处理汇总
+"""
+
+import os
+import threading
+from collections import deque
+from typing import Dict, Any, Iterable, Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# 默认每轮预读的字节预算（MB）
+DEFAULT_BUDGET_MB = 1024
+
+# 顺序读取时每次读取的块大小
+READ_CHUNK_SIZE = 1024 * 1024
+
+# 片段的预读状态
+_QUEUED = "queued"
+_WARMED = "warmed"
+_SKIPPED = "skipped"
+_FAILED = "failed"
+
+
+def _fadvise_available() -> bool:
+    return hasattr(os, "posix_fadvise") and hasattr(os, "POSIX_FADV_WILLNEED")
+
+
+class ClipPrefetcher:
+    """
+    片段预读器
+
+    prefetch提交一轮要预读的文件（新一轮提交时，上一轮尚未开始预读的文件被放弃），
+    后台线程依次处理：支持posix_fadvise的系统上通知内核预读（WILLNEED），
+    否则顺序读取文件内容；合成实际使用片段时调用note_use统计命中
+
+    用法:
+        prefetcher = ClipPrefetcher(budget_mb=1024)
+        prefetcher.prefetch([clip["path"] for clip in next_clips])
+        ...
+        prefetcher.note_use(clip["path"])
+        summary["prefetch"] = prefetcher.stats()
+        prefetcher.close()
+    """
+
+    def __init__(self, budget_mb: float = DEFAULT_BUDGET_MB, use_fadvise: bool = None):
+        """
+        初始化预读器
+
+        Args:
+            budget_mb: 每轮预读的字节预算（MB）
+            use_fadvise: 是否使用posix_fadvise，为None时在系统支持时使用
+        """
+        self.byte_budget = int(max(0, float(budget_mb)) * 1024 * 1024)
+        self.use_fadvise = _fadvise_available() if use_fadvise is None else (use_fadvise and _fadvise_available())
+        self._condition = threading.Condition()
+        self._queue = deque()
+        self._generation = 0
+        self._remaining = 0
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._states: Dict[str, str] = {}
+        self._stats = {"rounds": 0, "requested": 0, "warmed": 0, "skipped": 0, "failed": 0,
+                       "bytes": 0, "hits": 0, "misses": 0}
+
+    def prefetch(self, paths: Iterable[str]):
+        """
+        提交一轮预读（不阻塞）
+
+        Args:
+            paths: 按使用顺序排列的文件路径，重复的路径只预读一次
+        """
+        with self._condition:
+            if self._closed:
+                return
+            # 上一轮尚未处理的文件已不再需要
+            for _, path in self._queue:
+                if self._states.get(path) == _QUEUED:
+                    del self._states[path]
+            self._queue.clear()
+            self._generation += 1
+            self._remaining = self.byte_budget
+            self._stats["rounds"] += 1
+            for path in dict.fromkeys(path for path in paths if path):
+                if self._states.get(path) == _WARMED:
+                    continue
+                self._states[path] = _QUEUED
+                self._queue.append((self._generation, path))
+                self._stats["requested"] += 1
+            if self._queue and self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="clip-prefetch", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def note_use(self, path: str) -> bool:
+        """
+        记录合成使用了一个片段
+
+        Returns:
+            bool: 片段是否已预读完成（命中）
+        """
+        with self._condition:
+            hit = self._states.get(path) == _WARMED
+            self._stats["hits" if hit else "misses"] += 1
+        return hit
+
+    def stats(self) -> Dict[str, Any]:
+        """预读统计：轮数、提交/完成/超出预算/失败的文件数、预读字节数、命中数和命中率"""
+        with self._condition:
+            stats = dict(self._stats)
+        used = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / used, 3) if used else None
+        stats["mode"] = "fadvise" if self.use_fadvise else "read"
+        return stats
+
+    def close(self):
+        """停止预读，放弃尚未处理的文件"""
+        with self._condition:
+            self._closed = True
+            self._queue.clear()
+            self._condition.notify()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=5)
+
+    def _is_current(self, generation: int) -> bool:
+        return not self._closed and generation == self._generation
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                generation, path = self._queue.popleft()
+                if self._states.get(path) != _QUEUED:
+                    continue
+
+            try:
+                size = os.path.getsize(path)
+            except OSError as e:
+                self._finish(path, _FAILED)
+                logger.debug(f"预读片段失败: {path}, {str(e)}")
+                continue
+
+            # 超出本轮预算的文件跳过，继续尝试后面较小的文件
+            with self._condition:
+                if not self._is_current(generation):
+                    continue
+                if size > self._remaining:
+                    self._states[path] = _SKIPPED
+                    self._stats["skipped"] += 1
+                    continue
+                self._remaining -= size
+
+            try:
+                warmed = self._warm(path, size, generation)
+            except OSError as e:
+                self._finish(path, _FAILED)
+                logger.debug(f"预读片段失败: {path}, {str(e)}")
+                continue
+            if warmed is None:
+                # 读取过程中有了新一轮预读，放弃该文件
+                with self._condition:
+                    if self._states.get(path) == _QUEUED:
+                        del self._states[path]
+                continue
+            self._finish(path, _WARMED, warmed)
+
+    def _finish(self, path: str, state: str, size: int = 0):
+        with self._condition:
+            self._states[path] = state
+            self._stats[state] += 1
+            self._stats["bytes"] += size
+
+    def _warm(self, path: str, size: int, generation: int) -> Optional[int]:
+        """把文件读入页缓存，返回预读的字节数；读取中途被新一轮取代时返回None"""
+        with open(path, "rb", buffering=0) as f:
+            if self.use_fadvise:
+                # 内核在后台异步读取，不占用本线程
+                os.posix_fadvise(f.fileno(), 0, size, os.POSIX_FADV_WILLNEED)
+                return size
+            read = 0
+            while read < size:
+                if not self._is_current(generation):
+                    return None
+                chunk = f.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                read += len(chunk)
+            return read
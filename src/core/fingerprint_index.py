@@ -0,0 +1,343 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+视频感知指纹索引模块
+为每个视频片段均匀抽取几帧，每帧计算64位dHash，结果以NumPy数组保存在扫描缓存目录中；
+选片时用向量化的异或+位计数比较候选片段与本次输出已选片段的汉明距离，
+排除重新导出、轻微裁剪等近似重复的镜头
+"""
+
+import os
+import time
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from src.utils.logger import get_logger
+from src.utils.ffmpeg_registry import get_ffmpeg_registry
+
+logger = get_logger()
+
+# 每个片段的采样帧数
+SAMPLES = 4
+
+# dHash缩放尺寸（宽9高8，相邻像素比较得到64位）
+HASH_WIDTH = 9
+HASH_HEIGHT = 8
+
+# 查询时文件状态（修改时间、大小）检查结果的有效期（秒），避免每次选片都读取所有候选文件的状态
+STAT_TTL = 30.0
+
+# 每字节的置位数，用于没有np.bitwise_count的NumPy版本
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount64(values: np.ndarray) -> np.ndarray:
+    """逐元素计算uint64数组的置位数"""
+    values = np.ascontiguousarray(values, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values).astype(np.uint8)
+    as_bytes = values.view(np.uint8).reshape(values.shape + (8,))
+    return _POPCOUNT_TABLE[as_bytes].sum(axis=-1, dtype=np.uint8)
+
+
+def dhash(pixels: np.ndarray) -> int:
+    """
+    计算一帧的dHash
+
+    Args:
+        pixels: 8行9列的灰度图
+
+    Returns:
+        int: 64位哈希
+    """
+    bits = pixels[:, 1:] > pixels[:, :-1]
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+def clip_distances(candidates: np.ndarray, chosen: np.ndarray) -> np.ndarray:
+    """
+    计算每个候选片段到已选片段的最小距离
+
+    片段距离为对应采样帧汉明距离的平均值（0~64）
+
+    Args:
+        candidates: 形状为[候选数, SAMPLES]的uint64数组
+        chosen: 形状为[已选数, SAMPLES]的uint64数组
+
+    Returns:
+        np.ndarray: 形状为[候选数]的最小距离，没有已选片段时为64
+    """
+    if len(chosen) == 0 or len(candidates) == 0:
+        return np.full(len(candidates), 64.0)
+    xor = candidates[:, None, :] ^ chosen[None, :, :]
+    return popcount64(xor).mean(axis=2).min(axis=1)
+
+
+class FingerprintIndex:
+    """
+    片段指纹索引（以 路径 -> [SAMPLES]个dHash 的形式保存在npz文件中）
+
+    无法解码的片段同样按修改时间和大小记录，文件变化之前不再重复计算
+
+    用法:
+        index = FingerprintIndex(os.path.join(temp_dir, "media_cache", "fingerprints.npz"))
+        index.build_async(videos, run=supervisor.run)  # 后台计算缺失的指纹
+        hashes, valid = index.lookup(paths)           # 选片时查询
+        index.stop()                                  # 停止处理时结束后台计算
+    """
+
+    def __init__(self, cache_file: str):
+        """
+        初始化索引并加载已保存的指纹
+
+        Args:
+            cache_file: npz文件路径
+        """
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        self._rows: Dict[str, Tuple[int, int, np.ndarray]] = {}  # 路径 -> (修改时间, 大小, 指纹)
+        self._checked: Dict[str, float] = {}  # 路径 -> 最近一次确认文件未变化的时间
+        self._failed: Dict[str, Tuple[int, int]] = {}  # 计算失败的片段：路径 -> (修改时间, 大小)
+        self._build_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._load()
+
+    def _load(self):
+        try:
+            if not os.path.exists(self.cache_file):
+                return
+            with np.load(self.cache_file, allow_pickle=False) as data:
+                if data["hashes"].shape[1:] != (SAMPLES,):
+                    return
+                for path, mtime, size, hashes in zip(data["paths"], data["mtimes"], data["sizes"], data["hashes"]):
+                    self._rows[str(path)] = (int(mtime), int(size), hashes.astype(np.uint64))
+                # 较早版本保存的文件中没有失败记录
+                if "failed_paths" in data.files:
+                    for path, mtime, size in zip(data["failed_paths"], data["failed_mtimes"], data["failed_sizes"]):
+                        self._failed[str(path)] = (int(mtime), int(size))
+            logger.info(f"已加载 {len(self._rows)} 个片段指纹（{len(self._failed)} 个无法计算）: {self.cache_file}")
+        except Exception as e:
+            logger.warning(f"加载片段指纹失败: {str(e)}")
+            self._rows = {}
+            self._failed = {}
+
+    def save(self):
+        """保存索引（先写临时文件再替换）"""
+        with self._lock:
+            items = list(self._rows.items())
+            failed = list(self._failed.items())
+        if not items and not failed:
+            return
+        try:
+            directory = os.path.dirname(self.cache_file)
+            os.makedirs(directory, exist_ok=True)
+            # 临时文件名唯一，同一进程中多个索引同时保存也不会互相覆盖
+            fd, temp_path = tempfile.mkstemp(suffix=".tmp.npz", dir=directory)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.savez(f,
+                             paths=np.array([path for path, _ in items], dtype=str),
+                             mtimes=np.array([row[0] for _, row in items], dtype=np.int64),
+                             sizes=np.array([row[1] for _, row in items], dtype=np.int64),
+                             hashes=np.array([row[2] for _, row in items], dtype=np.uint64).reshape(-1, SAMPLES),
+                             failed_paths=np.array([path for path, _ in failed], dtype=str),
+                             failed_mtimes=np.array([key[0] for _, key in failed], dtype=np.int64),
+                             failed_sizes=np.array([key[1] for _, key in failed], dtype=np.int64))
+                os.replace(temp_path, self.cache_file)
+            except BaseException:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                raise
+        except Exception as e:
+            logger.warning(f"保存片段指纹失败: {str(e)}")
+
+    def __len__(self):
+        return len(self._rows)
+
+    def lookup(self, paths: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        查询多个片段的指纹
+
+        文件的修改时间或大小与计算指纹时不同（片段已被替换）时视为没有指纹；
+        文件状态的检查结果在STAT_TTL秒内复用
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (形状为[len(paths), SAMPLES]的指纹, 是否有指纹的布尔数组)
+        """
+        hashes = np.zeros((len(paths), SAMPLES), dtype=np.uint64)
+        valid = np.zeros(len(paths), dtype=bool)
+        now = time.time()
+        with self._lock:
+            rows = [self._rows.get(path) for path in paths]
+            unchecked = [i for i, (path, row) in enumerate(zip(paths, rows))
+                         if row is not None and now - self._checked.get(path, 0) > STAT_TTL]
+        for i in unchecked:
+            if not self._is_current(paths[i], rows[i]):
+                rows[i] = None
+        unchecked = set(unchecked)
+        with self._lock:
+            for i, (path, row) in enumerate(zip(paths, rows)):
+                if row is None:
+                    continue
+                if i in unchecked:
+                    self._checked[path] = now
+                hashes[i] = row[2]
+                valid[i] = True
+        return hashes, valid
+
+    def _is_current(self, path: str, row) -> bool:
+        """指纹对应的文件是否未变化，已变化时移除该指纹"""
+        try:
+            stat = os.stat(path)
+            if row[0] == int(stat.st_mtime) and row[1] == stat.st_size:
+                return True
+        except OSError:
+            pass
+        with self._lock:
+            if self._rows.get(path) is row:
+                del self._rows[path]
+            self._checked.pop(path, None)
+        return False
+
+    def compute(self, path: str, duration: float,
+                run: Callable[..., subprocess.CompletedProcess] = subprocess.run) -> Optional[np.ndarray]:
+        """
+        计算一个片段的指纹（均匀抽取SAMPLES帧，每帧一次快速定位解码）
+
+        Args:
+            path: 片段路径
+            duration: 片段时长
+            run: 执行FFmpeg命令的函数（与subprocess.run参数相同），合成时传入处理器监管器的run
+
+        Returns:
+            np.ndarray: SAMPLES个uint64，任一帧解码失败时返回None
+        """
+        ffmpeg_cmd = get_ffmpeg_registry().ffmpeg_path()
+        frame_size = HASH_WIDTH * HASH_HEIGHT
+        hashes = np.zeros(SAMPLES, dtype=np.uint64)
+        for i in range(SAMPLES):
+            if self._stop_event.is_set():
+                return None
+            timestamp = max(0.0, duration) * (i + 0.5) / SAMPLES
+            cmd = [ffmpeg_cmd, "-v", "error", "-ss", f"{timestamp:.3f}", "-i", path,
+                   "-frames:v", "1", "-an",
+                   "-vf", f"scale={HASH_WIDTH}:{HASH_HEIGHT}:flags=area,format=gray",
+                   "-f", "rawvideo", "pipe:1"]
+            result = run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=60)
+            if len(result.stdout) < frame_size:
+                return None
+            pixels = np.frombuffer(result.stdout[:frame_size], dtype=np.uint8).reshape(HASH_HEIGHT, HASH_WIDTH)
+            hashes[i] = dhash(pixels)
+        return hashes
+
+    def missing(self, videos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """找出没有指纹或文件已变化的片段（文件未变化的计算失败片段不计入）"""
+        result = []
+        with self._lock:
+            for video in videos:
+                try:
+                    stat = os.stat(video["path"])
+                except OSError:
+                    continue
+                key = (int(stat.st_mtime), stat.st_size)
+                if self._failed.get(video["path"]) == key:
+                    continue
+                row = self._rows.get(video["path"])
+                if row is None or (row[0], row[1]) != key:
+                    result.append(video)
+        return result
+
+    def build(self, videos: List[Dict[str, Any]], workers: int = 2, save_every: int = 50,
+              run: Callable[..., subprocess.CompletedProcess] = subprocess.run) -> int:
+        """
+        计算缺失的指纹
+
+        Args:
+            videos: 视频信息列表（需要path和duration）
+            workers: 并发的FFmpeg进程数
+            save_every: 每计算多少个片段保存一次
+            run: 执行FFmpeg命令的函数，见compute
+
+        Returns:
+            int: 新计算的片段数
+        """
+        pending = self.missing(videos)
+        if not pending:
+            return 0
+        logger.info(f"开始计算 {len(pending)} 个片段的感知指纹")
+
+        def _compute(video):
+            """返回(视频, 指纹, 是否计算失败)，因停止而未完成的不算失败"""
+            if self._stop_event.is_set():
+                return video, None, False
+            try:
+                hashes = self.compute(video["path"], float(video.get("duration") or 0), run)
+            except InterruptedError:
+                return video, None, False
+            except Exception as e:
+                logger.debug(f"计算片段指纹失败: {video['path']}, 错误: {str(e)}")
+                hashes = None
+            return video, hashes, hashes is None and not self._stop_event.is_set()
+
+        computed = 0
+        failed = 0
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for video, hashes, is_failure in executor.map(_compute, pending):
+                if hashes is None and not is_failure:
+                    continue
+                try:
+                    stat = os.stat(video["path"])
+                except OSError:
+                    continue
+                with self._lock:
+                    if hashes is None:
+                        # 记录失败时的文件状态，文件被替换后重新计算
+                        self._failed[video["path"]] = (int(stat.st_mtime), stat.st_size)
+                    else:
+                        self._failed.pop(video["path"], None)
+                        self._rows[video["path"]] = (int(stat.st_mtime), stat.st_size, hashes)
+                        self._checked[video["path"]] = time.time()
+                if hashes is None:
+                    failed += 1
+                    continue
+                computed += 1
+                if computed % save_every == 0:
+                    self.save()
+        self.save()
+        logger.info(f"片段感知指纹计算完成，新增 {computed} 个，{failed} 个无法计算，共 {len(self._rows)} 个")
+        return computed
+
+    def build_async(self, videos: List[Dict[str, Any]], workers: int = 2,
+                    run: Callable[..., subprocess.CompletedProcess] = subprocess.run) -> bool:
+        """
+        在后台线程中计算缺失的指纹，已有后台任务时不重复启动
+
+        Args:
+            videos: 视频信息列表
+            workers: 并发的FFmpeg进程数
+            run: 执行FFmpeg命令的函数，见compute
+
+        Returns:
+            bool: 是否启动了后台任务
+        """
+        if self._build_thread is not None and self._build_thread.is_alive():
+            return False
+        if not self.missing(videos):
+            return False
+        self._stop_event.clear()
+        self._build_thread = threading.Thread(target=self.build, args=(list(videos), workers),
+                                              kwargs={"run": run}, daemon=True)
+        self._build_thread.start()
+        return True
+
+    def stop(self):
+        """请求后台任务尽快结束（已完成的结果会保存）"""
+        self._stop_event.set()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+响度分析模块
+用FFmpeg的ebur128滤镜测量EBU R128综合响度(LUFS)、真峰值(dBTP)和响度范围(LRA)，
+结果按文件路径+修改时间+大小缓存在扫描缓存目录中，每个配音/背景音乐只测量一次，
+合成时根据测量结果计算增益，作为单个volume滤镜加入已有的配音合成步骤
+"""
+
+import os
+import re
+import json
+import math
+import threading
+from typing import Dict, Any, List, Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# 缓存格式版本
+CACHE_VERSION = 1
+
+# 默认响度目标
+DEFAULT_TARGET_LUFS = -16.0
+DEFAULT_MAX_TRUE_PEAK = -1.0
+DEFAULT_MAX_GAIN_DB = 20.0
+
+_NUMBER = r"(-?inf|-?\d+(?:\.\d+)?)"
+
+
+class _NotMeasured:
+    """表示尚未测量的标记（与测量失败的None区分）"""
+
+    __slots__ = ()
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return "NOT_MEASURED"
+
+
+NOT_MEASURED = _NotMeasured()
+
+# 缓存文件中测量失败的条目
+_FAILED_ENTRY = {"failed": True}
+
+
+def build_ebur128_command(ffmpeg_cmd: str, path: str) -> List[str]:
+    """
+    构造测量响度的FFmpeg命令（只解码音频，结果摘要输出到stderr）
+
+    Args:
+        ffmpeg_cmd: FFmpeg命令路径
+        path: 音频或视频文件路径
+    """
+    return [
+        ffmpeg_cmd, "-hide_banner", "-nostats", "-v", "info",
+        "-i", path, "-vn",
+        "-af", "ebur128=peak=true",
+        "-f", "null", "-"
+    ]
+
+
+def _to_float(value: str) -> Optional[float]:
+    if value is None:
+        return None
+    if value.endswith("inf"):
+        return None
+    return float(value)
+
+
+def parse_ebur128_summary(output: str) -> Optional[Dict[str, Any]]:
+    """
+    解析ebur128滤镜在结束时输出的摘要
+
+    Args:
+        output: FFmpeg的stderr输出
+
+    Returns:
+        Dict: integrated(LUFS)、true_peak(dBTP)、lra(LU)，静音文件的integrated为None；
+              找不到摘要时返回None
+    """
+    index = output.rfind("Summary:")
+    if index < 0:
+        return None
+    summary = output[index:]
+    integrated = re.search(r"I:\s+" + _NUMBER + r" LUFS", summary)
+    lra = re.search(r"LRA:\s+" + _NUMBER + r" LU", summary)
+    peak = re.search(r"Peak:\s+" + _NUMBER + r" dBFS", summary)
+    if not integrated:
+        return None
+    return {
+        "integrated": _to_float(integrated.group(1)),
+        "true_peak": _to_float(peak.group(1)) if peak else None,
+        "lra": _to_float(lra.group(1)) if lra else None,
+    }
+
+
+def compute_gain(loudness: Optional[Dict[str, Any]], target_lufs: float = DEFAULT_TARGET_LUFS,
+                 max_true_peak: float = DEFAULT_MAX_TRUE_PEAK,
+                 max_gain_db: float = DEFAULT_MAX_GAIN_DB) -> float:
+    """
+    计算把音频调整到目标响度的线性增益
+
+    增益受两方面限制：调整后的真峰值不超过max_true_peak，增益绝对值不超过max_gain_db
+    （避免把几乎静音的文件放大成噪声）
+
+    Args:
+        loudness: parse_ebur128_summary的结果，为None或无法测量时返回1.0
+        target_lufs: 目标综合响度(LUFS)
+        max_true_peak: 允许的最大真峰值(dBTP)
+        max_gain_db: 允许的最大增益(dB)
+
+    Returns:
+        float: 线性增益倍数
+    """
+    if not loudness or loudness.get("integrated") is None:
+        return 1.0
+    gain_db = target_lufs - loudness["integrated"]
+    true_peak = loudness.get("true_peak")
+    if true_peak is not None:
+        gain_db = min(gain_db, max_true_peak - true_peak)
+    gain_db = max(-max_gain_db, min(max_gain_db, gain_db))
+    return math.pow(10.0, gain_db / 20.0)
+
+
+class LoudnessCache:
+    """
+    响度测量结果缓存（JSON文件，以路径+修改时间+大小为键，文件变化后自动失效）
+
+    测量失败也会记录，文件不变时不再重复测量；get对未测量的文件返回NOT_MEASURED，
+    对测量失败的文件返回None
+
+    用法:
+        cache = LoudnessCache(os.path.join(temp_dir, "media_cache", "loudness.json"))
+        result = cache.get(path)
+        if result is NOT_MEASURED:
+            cache.put(path, measured)   # measured为None表示测量失败
+            cache.save()
+    """
+
+    def __init__(self, cache_file: str):
+        """
+        初始化缓存并加载已有结果
+
+        Args:
+            cache_file: 缓存文件路径
+        """
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == CACHE_VERSION:
+                    self._entries = data.get("entries", {})
+        except Exception as e:
+            logger.warning(f"加载响度缓存失败: {str(e)}")
+            self._entries = {}
+
+    @staticmethod
+    def _key(path: str) -> Optional[str]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return f"{os.path.abspath(path)}|{int(stat.st_mtime)}|{stat.st_size}"
+
+    def get(self, path: str):
+        """获取缓存的测量结果：未测量或文件已变化时返回NOT_MEASURED，测量失败时返回None"""
+        key = self._key(path)
+        if key is None:
+            return NOT_MEASURED
+        with self._lock:
+            entry = self._entries.get(key, NOT_MEASURED)
+        if entry is NOT_MEASURED:
+            return NOT_MEASURED
+        if entry == _FAILED_ENTRY:
+            return None
+        return entry
+
+    def put(self, path: str, loudness: Optional[Dict[str, Any]]):
+        """记录测量结果，loudness为None时记录为测量失败"""
+        key = self._key(path)
+        if key is None:
+            return
+        with self._lock:
+            self._entries[key] = dict(_FAILED_ENTRY) if loudness is None else loudness
+            self._dirty = True
+
+    def save(self):
+        """有新结果时写入缓存文件（先写临时文件再替换）"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": CACHE_VERSION, "entries": dict(self._entries)}
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            temp_path = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.cache_file)
+        except Exception as e:
+            logger.warning(f"保存响度缓存失败: {str(e)}")
@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+素材目录模块
+进程内所有模板（批量窗口的各个标签页）共享的只读素材目录：每个素材文件夹只扫描一次，
+片段以列存形式保存（驻留的路径字符串、float32时长数组、__slots__记录），
+各模板拿到的是按需生成片段信息的轻量视图，多个模板指向同一素材库时只占用一份数据
+"""
+
+import os
+import sys
+import math
+import time
+import threading
+from array import array
+from collections.abc import Sequence
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# 片段信息中由列存字段表示的键，其余键原样保存在extras中
+_COLUMN_KEYS = ("path", "filename", "duration", "loudness")
+
+# 响度状态：未测量（信息中没有loudness键）、测量失败（loudness为None）、已测量
+_LOUDNESS_MISSING = 0
+_LOUDNESS_NONE = 1
+_LOUDNESS_MEASURED = 2
+
+
+def _column_value(value: Optional[float]) -> float:
+    return float("nan") if value is None else float(value)
+
+
+def _optional(value: float) -> Optional[float]:
+    # 以float32保存的值还原时保留3位小数（FFprobe输出的精度）
+    return None if math.isnan(value) else round(value, 3)
+
+
+class ClipColumns:
+    """一组片段（视频或配音）的列存数据"""
+
+    __slots__ = ("paths", "durations", "loudness_state", "integrated", "true_peak", "lra", "extras")
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        """
+        从扫描得到的片段信息列表构建列存数据
+
+        Args:
+            records: 片段信息列表（path、duration、可选的loudness及其他键）
+        """
+        self.paths = tuple(sys.intern(str(record["path"])) for record in records)
+        self.durations = array("f", (float(record.get("duration") or 0) for record in records))
+        self.loudness_state = bytearray(len(records))
+        self.integrated = array("f", bytes(4 * len(records)))
+        self.true_peak = array("f", bytes(4 * len(records)))
+        self.lra = array("f", bytes(4 * len(records)))
+        self.extras: Dict[int, Dict[str, Any]] = {}
+        for i, record in enumerate(records):
+            if "loudness" in record:
+                loudness = record["loudness"]
+                if loudness is None:
+                    self.loudness_state[i] = _LOUDNESS_NONE
+                else:
+                    self.loudness_state[i] = _LOUDNESS_MEASURED
+                    self.integrated[i] = _column_value(loudness.get("integrated"))
+                    self.true_peak[i] = _column_value(loudness.get("true_peak"))
+                    self.lra[i] = _column_value(loudness.get("lra"))
+            extra = {key: value for key, value in record.items() if key not in _COLUMN_KEYS}
+            if extra:
+                self.extras[i] = extra
+
+    def __len__(self):
+        return len(self.paths)
+
+    def record(self, index: int) -> Dict[str, Any]:
+        """生成第index个片段的信息字典（与扫描结果格式相同）"""
+        path = self.paths[index]
+        record = {"path": path, "filename": os.path.basename(path), "duration": round(self.durations[index], 3)}
+        state = self.loudness_state[index]
+        if state == _LOUDNESS_NONE:
+            record["loudness"] = None
+        elif state == _LOUDNESS_MEASURED:
+            record["loudness"] = {
+                "integrated": _optional(self.integrated[index]),
+                "true_peak": _optional(self.true_peak[index]),
+                "lra": _optional(self.lra[index]),
+            }
+        extra = self.extras.get(index)
+        if extra:
+            record.update(extra)
+        return record
+
+    def has_unmeasured_loudness(self) -> bool:
+        """是否有尚未测量响度的片段"""
+        return _LOUDNESS_MISSING in self.loudness_state
+
+    def nbytes(self) -> int:
+        """列存数据的大致内存占用（不含共享的路径字符串）"""
+        return (sys.getsizeof(self.paths) + self.durations.itemsize * len(self.durations) * 4
+                + len(self.loudness_state))
+
+
+class ClipView(Sequence):
+    """片段列表的只读视图，按下标访问时生成片段信息字典，可直接替代扫描结果中的列表"""
+
+    __slots__ = ("_columns",)
+
+    def __init__(self, columns: ClipColumns):
+        self._columns = columns
+
+    def __len__(self):
+        return len(self._columns)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._columns.record(i) for i in range(*index.indices(len(self._columns)))]
+        if index < 0:
+            index += len(self._columns)
+        if not 0 <= index < len(self._columns):
+            raise IndexError("片段下标超出范围")
+        return self._columns.record(index)
+
+    def __repr__(self):
+        return f"ClipView({len(self._columns)} 个片段)"
+
+
+class FolderEntry:
+    """一个素材文件夹的目录条目"""
+
+    __slots__ = ("folder_path", "signature", "videos", "audios", "created")
+
+    def __init__(self, folder_path: str, signature: Tuple, videos: List[Dict[str, Any]],
+                 audios: List[Dict[str, Any]]):
+        self.folder_path = folder_path
+        self.signature = signature
+        self.videos = ClipColumns(videos)
+        self.audios = ClipColumns(audios)
+        self.created = time.time()
+
+    def material(self, segment_index: int) -> Dict[str, Any]:
+        """生成一个模板使用的文件夹素材数据（字典本身属于调用方，片段列表为共享视图）"""
+        return {
+            "folder_path": self.folder_path,
+            "videos": ClipView(self.videos),
+            "audios": ClipView(self.audios),
+            "segment_index": segment_index,
+        }
+
+
+class MediaCatalogue:
+    """
+    进程内共享的素材目录
+
+    条目以素材文件夹路径为键，以扫描缓存文件的修改时间和大小为签名；
+    缓存文件被重写或删除（如配音预处理、重新扫描）后签名变化，条目自动失效
+
+    用法:
+        catalogue = get_media_catalogue()
+        signature = MediaCatalogue.signature(videos_cache_path, audios_cache_path)
+        entry = catalogue.get(folder_path, signature)
+        if entry is None:
+            entry = catalogue.put(folder_path, signature, videos, audios)
+        folder_data = entry.material(segment_index)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._folders: Dict[str, FolderEntry] = {}
+
+    @staticmethod
+    def signature(*cache_files: str) -> Optional[Tuple]:
+        """扫描缓存文件的签名，任一文件不存在时返回None"""
+        parts = []
+        for path in cache_files:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return None
+            parts.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(parts)
+
+    @staticmethod
+    def _key(folder_path: str) -> str:
+        return os.path.normcase(os.path.abspath(folder_path))
+
+    def get(self, folder_path: str, signature: Optional[Tuple]) -> Optional[FolderEntry]:
+        """获取签名一致的条目，没有或已失效时返回None"""
+        if signature is None:
+            return None
+        with self._lock:
+            entry = self._folders.get(self._key(folder_path))
+        if entry is None or entry.signature != signature:
+            return None
+        return entry
+
+    def put(self, folder_path: str, signature: Optional[Tuple], videos: List[Dict[str, Any]],
+            audios: List[Dict[str, Any]]) -> FolderEntry:
+        """
+        登记扫描结果
+
+        签名为None（缓存文件未能写入）时只返回条目而不登记，下次仍重新扫描
+        """
+        entry = FolderEntry(folder_path, signature, videos, audios)
+        if signature is not None:
+            with self._lock:
+                self._folders[self._key(folder_path)] = entry
+        return entry
+
+    def export(self, since: float = 0) -> List[Dict[str, Any]]:
+        """
+        导出条目为可序列化的记录（用于把工作进程中的扫描结果交给界面进程登记）
+
+        Args:
+            since: 只导出此时间（time.time()）之后登记的条目
+        """
+        with self._lock:
+            entries = [entry for entry in self._folders.values() if entry.created >= since]
+        return [{
+            "folder_path": entry.folder_path,
+            "signature": entry.signature,
+            "videos": [entry.videos.record(i) for i in range(len(entry.videos))],
+            "audios": [entry.audios.record(i) for i in range(len(entry.audios))],
+        } for entry in entries]
+
+    def merge(self, records: List[Dict[str, Any]]):
+        """登记export导出的记录，签名与当前缓存文件不一致的条目在get时自然失效"""
+        for record in records:
+            self.put(record["folder_path"], record["signature"], record["videos"], record["audios"])
+
+    def invalidate(self, folder_path: str = None):
+        """移除一个文件夹的条目，folder_path为None时清空目录"""
+        with self._lock:
+            if folder_path is None:
+                self._folders.clear()
+            else:
+                self._folders.pop(self._key(folder_path), None)
+
+    def stats(self) -> Dict[str, int]:
+        """目录统计：文件夹数、视频数、配音数和大致内存占用"""
+        with self._lock:
+            entries = list(self._folders.values())
+        return {
+            "folders": len(entries),
+            "videos": sum(len(entry.videos) for entry in entries),
+            "audios": sum(len(entry.audios) for entry in entries),
+            "bytes": sum(entry.videos.nbytes() + entry.audios.nbytes() for entry in entries),
+        }
+
+
+# 进程内共享的素材目录
+_catalogue_instance: Optional[MediaCatalogue] = None
+_catalogue_lock = threading.Lock()
+
+
+def get_media_catalogue() -> MediaCatalogue:
+    """获取进程内共享的素材目录"""
+    global _catalogue_instance
+    if _catalogue_instance is None:
+        with _catalogue_lock:
+            if _catalogue_instance is None:
+                _catalogue_instance = MediaCatalogue()
+    return _catalogue_instance
@@ -0,0 +1,333 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+本地镜像缓存模块
+素材库位于NAS等网络位置时，把合成用到的片段复制到本地磁盘（首次使用时或按批量的选片方案提前复制），
+之后的输出直接读取本地副本；副本按源文件的大小和修改时间判断是否仍然有效，
+缓存总大小超过上限时按最近使用时间淘汰
+
+每个副本旁边有一个同名的.json元数据文件（源路径、大小、修改时间），元数据文件的修改时间即最近使用时间；
+不使用集中的索引文件，多个渲染工作进程可以同时使用同一个缓存目录
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+from collections import deque
+from typing import Dict, Any, Iterable, List, Optional
+
+from src.utils.logger import get_logger
+from src.utils.path_utils import get_config_dir
+from src.utils.cache_config import CacheConfig
+
+logger = get_logger()
+
+# 镜像缓存配置文件
+CONFIG_FILE = get_config_dir() / "mirror_cache_settings.json"
+
+# 默认配置
+DEFAULT_MAX_SIZE_MB = 20 * 1024
+
+# 视为网络位置的文件系统类型（Linux）
+_NETWORK_FS_TYPES = {"nfs", "nfs4", "cifs", "smbfs", "smb3", "afpfs", "9p", "fuse.sshfs", "fuse.rclone"}
+
+_mounts_cache: Optional[List] = None
+
+
+def _network_mounts() -> List[str]:
+    """Linux上网络文件系统的挂载点（按长度降序），读取失败时为空"""
+    global _mounts_cache
+    if _mounts_cache is None:
+        mounts = []
+        try:
+            with open("/proc/mounts", "r", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) >= 3 and parts[2] in _NETWORK_FS_TYPES:
+                        mounts.append(parts[1].replace("\\040", " "))
+        except OSError:
+            pass
+        _mounts_cache = sorted(mounts, key=len, reverse=True)
+    return _mounts_cache
+
+
+def is_network_path(path: str) -> bool:
+    """判断路径是否位于网络位置（UNC路径、映射的网络驱动器或网络文件系统挂载点）"""
+    path = os.path.abspath(path)
+    if path.startswith("\\\\") or path.startswith("//"):
+        return True
+    if os.name == "nt":
+        drive = os.path.splitdrive(path)[0]
+        if not drive:
+            return False
+        try:
+            import ctypes
+            # DRIVE_REMOTE = 4
+            return ctypes.windll.kernel32.GetDriveTypeW(drive + "\\") == 4
+        except Exception:
+            return False
+    for mount in _network_mounts():
+        if path == mount or path.startswith(mount.rstrip("/") + "/"):
+            return True
+    return False
+
+
+class MirrorCache:
+    """
+    本地镜像缓存
+
+    用法:
+        cache = get_mirror_cache()
+        cache.mirror_async(planned_paths)      # 提前复制下一批要用的片段
+        local = cache.fetch(clip_path)         # 首次使用时复制，返回可用的路径
+        local = cache.lookup(clip_path)        # 只查找有效副本，没有时返回None
+    """
+
+    def __init__(self, cache_dir: str = None, max_size_mb: float = None, network_only: bool = None):
+        """
+        初始化镜像缓存
+
+        Args:
+            cache_dir: 缓存目录，为None时从配置文件加载，默认为缓存目录下的mirror
+            max_size_mb: 缓存总大小上限（MB），为None时从配置文件加载
+            network_only: 是否只镜像网络位置的文件，为None时从配置文件加载（默认是）
+        """
+        config = self._load_config()
+        self.cache_dir = cache_dir or config.get("cache_dir") or os.path.join(CacheConfig().get_cache_dir(), "mirror")
+        self.max_size = int(float(max_size_mb or config.get("max_size_mb") or DEFAULT_MAX_SIZE_MB) * 1024 * 1024)
+        self.network_only = config.get("network_only", True) if network_only is None else network_only
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._copying: Dict[str, threading.Event] = {}
+        self._size = self._scan_size()
+        self._queue = deque()
+        self._queue_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"hits": 0, "misses": 0, "copied": 0, "bytes_copied": 0, "evicted": 0, "failed": 0}
+
+    @staticmethod
+    def _load_config() -> dict:
+        try:
+            if os.path.exists(CONFIG_FILE):
+                with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"加载镜像缓存配置失败: {str(e)}")
+        return {}
+
+    def should_mirror(self, source: str) -> bool:
+        """是否需要为源文件建立本地副本"""
+        if not self.network_only:
+            return True
+        return is_network_path(source)
+
+    def _entry_paths(self, source: str):
+        key = os.path.normcase(os.path.abspath(source))
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+        local = os.path.join(self.cache_dir, name + os.path.splitext(source)[1].lower())
+        return key, local, local + ".json"
+
+    def _scan_size(self) -> int:
+        total = 0
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if entry.is_file() and not entry.name.endswith((".json", ".part")):
+                        total += entry.stat().st_size
+        except OSError:
+            pass
+        return total
+
+    def lookup(self, source: str) -> Optional[str]:
+        """
+        查找源文件的有效本地副本（源文件的大小和修改时间与复制时一致）
+
+        Returns:
+            Optional[str]: 本地副本路径，没有或已失效时返回None
+        """
+        key, local, meta_path = self._entry_paths(source)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            stat = os.stat(source)
+        except (OSError, ValueError):
+            return None
+        if (meta.get("source") != key or meta.get("size") != stat.st_size
+                or meta.get("mtime_ns") != stat.st_mtime_ns or not os.path.exists(local)):
+            self._remove(local, meta_path)
+            return None
+        try:
+            # 元数据文件的修改时间作为最近使用时间
+            os.utime(meta_path)
+        except OSError:
+            pass
+        return local
+
+    def fetch(self, source: str) -> str:
+        """
+        获取源文件可用的路径：有有效副本时返回副本，否则复制到本地后返回副本；
+        不需要镜像、文件超过缓存上限或复制失败时返回源路径
+        """
+        if not self.should_mirror(source):
+            return source
+        local = self.lookup(source)
+        if local:
+            with self._lock:
+                self._stats["hits"] += 1
+            return local
+        with self._lock:
+            self._stats["misses"] += 1
+
+        key = self._entry_paths(source)[0]
+        # 同一文件正在被其他线程复制时等待其完成
+        while True:
+            with self._lock:
+                pending = self._copying.get(key)
+                if pending is None:
+                    done = self._copying[key] = threading.Event()
+                    break
+            pending.wait()
+            local = self.lookup(source)
+            if local:
+                return local
+
+        try:
+            return self._copy(source) or source
+        finally:
+            with self._lock:
+                del self._copying[key]
+            done.set()
+
+    def mirror_async(self, sources: Iterable[str]):
+        """在后台按顺序复制（不阻塞），新提交的文件替换尚未开始复制的文件"""
+        sources = [source for source in dict.fromkeys(sources) if source and self.should_mirror(source)]
+        with self._lock:
+            self._queue.clear()
+            self._queue.extend(sources)
+            if self._queue and self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="mirror-cache", daemon=True)
+                self._thread.start()
+        self._queue_event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计（进程内累计）：命中、未命中、复制的文件数和字节数、淘汰数、失败数及当前大小"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = self._size
+        stats["max_size"] = self.max_size
+        return stats
+
+    def _run(self):
+        while True:
+            self._queue_event.wait()
+            with self._lock:
+                if not self._queue:
+                    self._queue_event.clear()
+                    continue
+                source = self._queue.popleft()
+            try:
+                self.fetch(source)
+            except Exception as e:
+                logger.debug(f"提前复制素材失败: {source}, {str(e)}")
+
+    def _copy(self, source: str) -> Optional[str]:
+        key, local, meta_path = self._entry_paths(source)
+        try:
+            stat = os.stat(source)
+            if stat.st_size > self.max_size:
+                return None
+            self._evict(stat.st_size)
+            fd, temp_path = tempfile.mkstemp(suffix=".part", dir=self.cache_dir)
+            try:
+                with os.fdopen(fd, "wb") as dst, open(source, "rb") as src:
+                    shutil.copyfileobj(src, dst, 4 * 1024 * 1024)
+                os.replace(temp_path, local)
+            except BaseException:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                raise
+            meta = {"source": key, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            fd, temp_meta = tempfile.mkstemp(suffix=".part", dir=self.cache_dir)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(temp_meta, meta_path)
+        except OSError as e:
+            with self._lock:
+                self._stats["failed"] += 1
+            logger.warning(f"复制素材到本地镜像缓存失败: {source}, {str(e)}")
+            return None
+
+        with self._lock:
+            self._size += stat.st_size
+            self._stats["copied"] += 1
+            self._stats["bytes_copied"] += stat.st_size
+        logger.info(f"已镜像素材到本地: {os.path.basename(source)} ({stat.st_size / (1024 * 1024):.1f}MB)")
+        return local
+
+    def _evict(self, incoming: int):
+        """为即将复制的文件腾出空间，按最近使用时间淘汰最旧的副本"""
+        with self._lock:
+            if self._size + incoming <= self.max_size:
+                return
+        # 其他进程可能也在使用同一目录，淘汰前重新统计
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.is_file() and entry.name.endswith(".json"):
+                        local = entry.path[:-len(".json")]
+                        try:
+                            size = os.path.getsize(local)
+                        except OSError:
+                            size = 0
+                        entries.append((entry.stat().st_mtime, local, entry.path, size))
+                        total += size
+        except OSError:
+            return
+        entries.sort()
+        for _, local, meta_path, size in entries:
+            if total + incoming <= self.max_size:
+                break
+            if self._remove(local, meta_path):
+                total -= size
+                with self._lock:
+                    self._stats["evicted"] += 1
+        with self._lock:
+            self._size = total
+
+    def _remove(self, local: str, meta_path: str) -> bool:
+        removed = False
+        for path in (meta_path, local):
+            try:
+                size = os.path.getsize(path) if path == local else 0
+                os.remove(path)
+                if path == local:
+                    removed = True
+                    with self._lock:
+                        self._size = max(0, self._size - size)
+            except OSError:
+                pass
+        return removed
+
+
+# 进程内共享的镜像缓存
+_mirror_instance: Optional[MirrorCache] = None
+_mirror_lock = threading.Lock()
+
+
+def get_mirror_cache() -> MirrorCache:
+    """获取进程内共享的本地镜像缓存"""
+    global _mirror_instance
+    if _mirror_instance is None:
+        with _mirror_lock:
+            if _mirror_instance is None:
+                _mirror_instance = MirrorCache()
+    return _mirror_instance
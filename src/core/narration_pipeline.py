@@ -0,0 +1,346 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+配音批量预处理模块
+对整个配音文件夹中的每个文件依次执行声明的AudioProcessor操作链（变速、变调、规范化、切分等），
+多个文件在进程池中并行处理；以源文件内容哈希+操作参数判断输出是否最新，最新的文件直接跳过；
+处理结果的时长和响度直接写入扫描缓存，下次扫描素材时无需再探测
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Callable
+
+from src.utils.logger import get_logger
+from src.utils.file_utils import audio_extensions
+
+logger = get_logger()
+
+# 清单文件名（保存在输出目录中）
+MANIFEST_FILE = ".narration_manifest.json"
+
+# 处理逻辑变化时递增，使所有旧输出失效
+PIPELINE_VERSION = 1
+
+# 支持的操作及其参数
+OPERATIONS = {
+    "change_tempo": ("tempo_factor",),
+    "change_pitch": ("semitones",),
+    "normalize_audio": ("target_db",),
+    "adjust_volume": ("volume",),
+    "auto_split_audio": ("min_silence_len", "silence_thresh", "min_segment_len"),
+}
+
+
+def _file_digest(path: str) -> str:
+    """计算文件内容的SHA1"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _probe_duration(ffprobe_cmd: str, path: str) -> Optional[float]:
+    try:
+        result = subprocess.run(
+            [ffprobe_cmd, "-v", "error", "-show_entries", "format=duration",
+             "-of", "default=noprint_wrappers=1:nokey=1", path],
+            capture_output=True, text=True, timeout=30)
+        return float(result.stdout.strip())
+    except Exception:
+        return None
+
+
+def _measure_loudness(ffmpeg_cmd: str, path: str) -> Optional[Dict[str, Any]]:
+    from src.core.loudness import build_ebur128_command, parse_ebur128_summary
+    try:
+        result = subprocess.run(build_ebur128_command(ffmpeg_cmd, path), capture_output=True,
+                                text=True, encoding="utf-8", errors="ignore")
+        return parse_ebur128_summary(result.stderr or "")
+    except Exception:
+        return None
+
+
+def _output_stems(sources: List[str]) -> Dict[str, str]:
+    """
+    各源文件的输出文件名（不含扩展名）：通常为源文件名，
+    同一文件夹中有同名不同扩展名的源文件（如a.mp3和a.wav）时附加源扩展名（a_mp3、a_wav），避免输出互相覆盖
+    """
+    by_stem: Dict[str, List[str]] = {}
+    for source in sources:
+        by_stem.setdefault(os.path.splitext(os.path.basename(source))[0].lower(), []).append(source)
+    stems = {}
+    for group in by_stem.values():
+        for source in group:
+            stem, ext = os.path.splitext(os.path.basename(source))
+            stems[source] = stem if len(group) == 1 else f"{stem}_{ext.lstrip('.').lower()}"
+    return stems
+
+
+def _process_file(source: str, output_dir: str, steps: List[Dict[str, Any]],
+                  settings: Dict[str, Any], stem: str = None) -> Dict[str, Any]:
+    """
+    在子进程中处理单个配音文件
+
+    Args:
+        stem: 输出文件名（不含扩展名），默认为源文件名
+
+    Returns:
+        Dict: outputs为输出文件信息列表（path/filename/duration/loudness）
+    """
+    from src.core.audio_processor import AudioProcessor
+    from src.utils.ffmpeg_registry import get_ffmpeg_registry
+
+    stem = stem or os.path.splitext(os.path.basename(source))[0]
+    work_dir = os.path.join(settings["temp_dir"], f"narration_{os.getpid()}_{stem}")
+    os.makedirs(work_dir, exist_ok=True)
+    processor = AudioProcessor(dict(settings, temp_dir=work_dir))
+    ext = f".{processor.settings['format']}"
+    try:
+        current = source
+        produced = []
+        for index, step in enumerate(steps):
+            params = {k: v for k, v in step.items() if k != "op"}
+            if step["op"] == "auto_split_audio":
+                split_dir = os.path.join(work_dir, "split")
+                produced = processor.auto_split_audio(current, split_dir, **params)
+                break
+            step_output = os.path.join(work_dir, f"step_{index}{ext}")
+            current = getattr(processor, step["op"])(current, output_path=step_output, **params)
+        else:
+            produced = [current]
+
+        # 移动到输出目录，切分结果按 原文件名_序号 命名
+        registry = get_ffmpeg_registry()
+        outputs = []
+        for number, path in enumerate(produced, 1):
+            name = f"{stem}{ext}" if len(produced) == 1 else f"{stem}_{number:03d}{ext}"
+            target = os.path.join(output_dir, name)
+            if os.path.abspath(path) == os.path.abspath(source):
+                shutil.copy2(path, target)
+            else:
+                shutil.move(path, target)
+            outputs.append({
+                "path": target,
+                "filename": name,
+                "duration": _probe_duration(registry.ffprobe_path(), target),
+                "loudness": _measure_loudness(registry.ffmpeg_path(), target),
+            })
+        return {"source": source, "outputs": outputs}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+class NarrationPipeline:
+    """
+    配音批量预处理流水线
+
+    用法:
+        pipeline = NarrationPipeline([
+            {"op": "change_tempo", "tempo_factor": 1.1},
+            {"op": "normalize_audio", "target_db": -6.0},
+        ])
+        summary = pipeline.run("D:/素材/场景1/配音_原始", "D:/素材/场景1/配音")
+    """
+
+    def __init__(self, steps: List[Dict[str, Any]], settings: Dict[str, Any] = None, workers: int = None):
+        """
+        初始化流水线
+
+        Args:
+            steps: 操作链，每项为{"op": 操作名, 参数名: 参数值}，auto_split_audio只能作为最后一步
+            settings: 传给AudioProcessor的设置；temp_dir默认与VideoProcessor相同，扫描缓存写在其下
+            workers: 进程数，默认为CPU核心数
+
+        Raises:
+            ValueError: 操作或参数无效
+        """
+        for index, step in enumerate(steps):
+            op = step.get("op")
+            if op not in OPERATIONS:
+                raise ValueError(f"不支持的操作: {op}")
+            unknown = set(step) - {"op"} - set(OPERATIONS[op])
+            if unknown:
+                raise ValueError(f"操作 {op} 不支持参数: {', '.join(sorted(unknown))}")
+            if op == "auto_split_audio" and index != len(steps) - 1:
+                raise ValueError("auto_split_audio只能作为最后一步")
+        self.steps = [dict(step) for step in steps]
+        self.settings = dict(settings or {})
+        # 与VideoProcessor相同的默认临时目录，写入的扫描缓存才能被合成时的扫描读取
+        from src.core.video_processor import default_temp_dir
+        self.settings.setdefault("temp_dir", default_temp_dir())
+        self.settings.setdefault("format", "wav")
+        self.workers = workers or os.cpu_count() or 1
+
+    def _params_digest(self) -> str:
+        """操作链和输出相关设置的摘要"""
+        params = {
+            "version": PIPELINE_VERSION,
+            "steps": self.steps,
+            "format": self.settings.get("format"),
+            "sample_rate": self.settings.get("sample_rate"),
+            "channels": self.settings.get("channels"),
+        }
+        return hashlib.sha1(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _load_manifest(output_dir: str) -> Dict[str, Any]:
+        path = os.path.join(output_dir, MANIFEST_FILE)
+        try:
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"加载配音处理清单失败: {str(e)}")
+        return {"files": {}}
+
+    @staticmethod
+    def _save_manifest(output_dir: str, manifest: Dict[str, Any]):
+        path = os.path.join(output_dir, MANIFEST_FILE)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+
+    def _source_digest(self, source: str, previous: Dict[str, Any]) -> str:
+        """源文件内容哈希，修改时间和大小未变时沿用清单中的结果"""
+        stat = os.stat(source)
+        if previous.get("mtime") == int(stat.st_mtime) and previous.get("size") == stat.st_size \
+                and previous.get("content"):
+            return previous["content"]
+        return _file_digest(source)
+
+    def run(self, source_dir: str, output_dir: str,
+            progress_callback: Callable[[str, float], None] = None) -> Dict[str, Any]:
+        """
+        处理源文件夹中的所有配音
+
+        Args:
+            source_dir: 源配音文件夹
+            output_dir: 输出文件夹（建议为场景文件夹下的“配音”，这样结果会直接写入扫描缓存）
+            progress_callback: 进度回调，参数为(状态消息, 进度百分比)
+
+        Returns:
+            Dict: processed/skipped/failed数量、errors和全部outputs
+        """
+        start_time = time.time()
+        os.makedirs(output_dir, exist_ok=True)
+        sources = sorted(
+            os.path.join(source_dir, name) for name in os.listdir(source_dir)
+            if os.path.splitext(name)[1].lower() in audio_extensions
+        )
+        manifest = self._load_manifest(output_dir)
+        params_digest = self._params_digest()
+        stems = _output_stems(sources)
+
+        pending = []
+        for source in sources:
+            name = os.path.basename(source)
+            previous = manifest["files"].get(name, {})
+            content = self._source_digest(source, previous)
+            stat = os.stat(source)
+            entry = {"content": content, "params": params_digest, "stem": stems[source],
+                     "mtime": int(stat.st_mtime), "size": stat.st_size}
+            # 新增了同名源文件时输出文件名会改变，需要重新生成
+            previous_stem = previous.get("stem", os.path.splitext(name)[0])
+            up_to_date = (previous.get("content") == content and previous.get("params") == params_digest
+                          and previous_stem == stems[source]
+                          and previous.get("outputs")
+                          and all(os.path.exists(os.path.join(output_dir, o["filename"]))
+                                  for o in previous["outputs"]))
+            if up_to_date:
+                previous.update(entry)
+            else:
+                pending.append((source, entry))
+
+        summary = {"processed": 0, "skipped": len(sources) - len(pending), "failed": 0, "errors": {}}
+        logger.info(f"配音预处理: 共 {len(sources)} 个文件，{summary['skipped']} 个已是最新，"
+                    f"{len(pending)} 个需要处理")
+
+        if pending:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(pending))) as executor:
+                futures = {executor.submit(_process_file, source, output_dir, self.steps, self.settings,
+                                           entry["stem"]): (source, entry) for source, entry in pending}
+                for done, future in enumerate(as_completed(futures), 1):
+                    source, entry = futures[future]
+                    name = os.path.basename(source)
+                    try:
+                        result = future.result()
+                        self._remove_stale_outputs(output_dir, manifest["files"].get(name), result["outputs"])
+                        entry["outputs"] = result["outputs"]
+                        manifest["files"][name] = entry
+                        summary["processed"] += 1
+                    except Exception as e:
+                        logger.error(f"处理配音失败: {source}, 错误: {str(e)}")
+                        summary["failed"] += 1
+                        summary["errors"][name] = str(e)
+                    if progress_callback:
+                        progress_callback(f"已处理配音 {done}/{len(pending)}: {name}", done / len(pending) * 100)
+
+        # 源文件已删除的条目不再保留
+        source_names = {os.path.basename(source) for source in sources}
+        for name in list(manifest["files"]):
+            if name not in source_names:
+                self._remove_stale_outputs(output_dir, manifest["files"].pop(name), [])
+        self._save_manifest(output_dir, manifest)
+
+        outputs = [output for entry in manifest["files"].values() for output in entry.get("outputs", [])]
+        outputs.sort(key=lambda output: output["filename"])
+        self._write_media_cache(output_dir, outputs)
+
+        summary["outputs"] = outputs
+        summary["elapsed"] = time.time() - start_time
+        logger.info(f"配音预处理完成: 处理 {summary['processed']} 个，跳过 {summary['skipped']} 个，"
+                    f"失败 {summary['failed']} 个，耗时 {summary['elapsed']:.2f} 秒")
+        return summary
+
+    @staticmethod
+    def _remove_stale_outputs(output_dir: str, previous: Optional[Dict[str, Any]], current: List[Dict[str, Any]]):
+        """删除上次处理生成、本次不再生成的输出（如切分片段数减少）"""
+        if not previous:
+            return
+        keep = {output["filename"] for output in current}
+        for output in previous.get("outputs", []):
+            if output["filename"] not in keep:
+                try:
+                    os.remove(os.path.join(output_dir, output["filename"]))
+                except OSError:
+                    pass
+
+    def _write_media_cache(self, output_dir: str, outputs: List[Dict[str, Any]]):
+        """
+        把输出信息写入扫描缓存（输出目录为场景文件夹下的“配音”时），下次扫描直接使用；
+        输出目录中还有流水线以外的音频时删除缓存，交给扫描重新探测
+        """
+        output_dir = os.path.normpath(os.path.abspath(output_dir))
+        if os.path.basename(output_dir) != "配音":
+            logger.info(f"输出目录不是场景的配音文件夹，不写入扫描缓存: {output_dir}")
+            return
+        from src.core.video_processor import media_cache_paths
+
+        # 缓存位置和文件名与扫描使用同一函数生成
+        _, audios_cache_path = media_cache_paths(self.settings["temp_dir"], os.path.dirname(output_dir))
+        known = {output["filename"] for output in outputs}
+        foreign = [name for name in os.listdir(output_dir)
+                   if os.path.splitext(name)[1].lower() in audio_extensions and name not in known]
+        try:
+            if foreign or any(output.get("duration") is None for output in outputs):
+                if os.path.exists(audios_cache_path):
+                    os.remove(audios_cache_path)
+                return
+            os.makedirs(os.path.dirname(audios_cache_path), exist_ok=True)
+            entries = [{"path": output["path"], "duration": output["duration"],
+                        "filename": output["filename"], "loudness": output.get("loudness")}
+                       for output in outputs]
+            with open(audios_cache_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False, indent=2)
+            logger.info(f"已写入 {len(entries)} 个配音的扫描缓存: {audios_cache_path}")
+        except Exception as e:
+            logger.warning(f"写入配音扫描缓存失败: {str(e)}")
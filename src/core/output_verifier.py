@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+输出校验模块
+合成完成后用FFprobe只读取文件头检查每个输出：容器索引是否完整、总时长与计划时长是否一致、
+音视频流时长差是否过大；可选的深度检查在开头、中间、结尾各解码一小段，
+发现截断或花屏等只有播放时才暴露的问题
+"""
+
+import json
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# 深度检查每个采样点解码的秒数
+DEEP_SAMPLE_SECONDS = 1.0
+
+
+def build_probe_command(ffprobe_cmd: str, path: str) -> List[str]:
+    """构造读取容器和流时长的FFprobe命令（只解析文件头，不解码）"""
+    return [
+        ffprobe_cmd, "-v", "error",
+        "-show_entries", "format=duration,format_name:stream=index,codec_type,duration",
+        "-of", "json", path
+    ]
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def evaluate_probe(data: Dict[str, Any], planned_duration: Optional[float] = None,
+                   duration_tolerance: float = 1.0, drift_tolerance: float = 0.5) -> Dict[str, Any]:
+    """
+    根据FFprobe的JSON输出判断输出文件是否正常
+
+    Args:
+        data: FFprobe -of json 的解析结果
+        planned_duration: 计划时长（秒），为None时不比较
+        duration_tolerance: 总时长允许的偏差（秒）
+        drift_tolerance: 音视频流时长允许的差值（秒）
+
+    Returns:
+        Dict: ok、duration、video_duration、audio_duration、drift和problems(问题描述列表)
+    """
+    problems = []
+    duration = _to_float(data.get("format", {}).get("duration"))
+    streams = data.get("streams", [])
+    video_durations = [_to_float(s.get("duration")) for s in streams if s.get("codec_type") == "video"]
+    audio_durations = [_to_float(s.get("duration")) for s in streams if s.get("codec_type") == "audio"]
+    video_duration = next((d for d in video_durations if d is not None), None)
+    audio_duration = next((d for d in audio_durations if d is not None), None)
+
+    if duration is None:
+        problems.append("容器中没有时长信息（索引可能不完整）")
+    if not video_durations:
+        problems.append("没有视频流")
+    if planned_duration and duration is not None and abs(duration - planned_duration) > duration_tolerance:
+        problems.append(f"时长 {duration:.2f}秒 与计划时长 {planned_duration:.2f}秒 不一致")
+
+    drift = None
+    if video_duration is not None and audio_duration is not None:
+        drift = audio_duration - video_duration
+        if abs(drift) > drift_tolerance:
+            problems.append(f"音视频时长相差 {drift:+.2f}秒")
+
+    return {
+        "ok": not problems,
+        "duration": duration,
+        "video_duration": video_duration,
+        "audio_duration": audio_duration,
+        "drift": drift,
+        "problems": problems,
+    }
+
+
+class OutputVerifier:
+    """
+    批量校验合成输出
+
+    用法:
+        verifier = OutputVerifier(ffmpeg_cmd, ffprobe_cmd, runner=processor._run_command)
+        results = verifier.verify_many([(path, planned_duration), ...])
+    """
+
+    def __init__(self, ffmpeg_cmd: str, ffprobe_cmd: str,
+                 runner: Callable[..., subprocess.CompletedProcess] = None,
+                 duration_tolerance: float = 1.0, drift_tolerance: float = 0.5,
+                 deep: bool = False, deep_samples: int = 3, workers: int = 4):
+        """
+        初始化校验器
+
+        Args:
+            ffmpeg_cmd: FFmpeg命令路径（深度检查使用）
+            ffprobe_cmd: FFprobe命令路径
+            runner: 执行命令的函数，参数为(命令, 阶段名称, **subprocess.run参数)，默认直接调用subprocess.run
+            duration_tolerance: 总时长允许的偏差（秒）
+            drift_tolerance: 音视频流时长允许的差值（秒）
+            deep: 是否进行采样解码的深度检查
+            deep_samples: 深度检查的采样点数
+            workers: 并发校验的文件数
+        """
+        self.ffmpeg_cmd = ffmpeg_cmd
+        self.ffprobe_cmd = ffprobe_cmd
+        self.runner = runner or (lambda cmd, label, **kwargs: subprocess.run(cmd, **kwargs))
+        self.duration_tolerance = duration_tolerance
+        self.drift_tolerance = drift_tolerance
+        self.deep = deep
+        self.deep_samples = max(1, deep_samples)
+        self.workers = max(1, workers)
+
+    def verify(self, path: str, planned_duration: Optional[float] = None) -> Dict[str, Any]:
+        """
+        校验单个输出文件
+
+        Returns:
+            Dict: evaluate_probe的结果，另含path
+        """
+        result = self.runner(build_probe_command(self.ffprobe_cmd, path), "verify_probe",
+                             capture_output=True, text=True, encoding="utf-8", errors="ignore", timeout=30)
+        try:
+            data = json.loads(result.stdout or "{}") if result.returncode == 0 else {}
+        except ValueError:
+            data = {}
+        if not data.get("format"):
+            error = (result.stderr or "").strip().splitlines()
+            report = {"ok": False, "duration": None, "video_duration": None, "audio_duration": None,
+                      "drift": None, "problems": [f"无法读取容器索引: {error[-1] if error else '未知错误'}"]}
+        else:
+            report = evaluate_probe(data, planned_duration, self.duration_tolerance, self.drift_tolerance)
+            if self.deep and report["duration"]:
+                report["problems"].extend(self._deep_check(path, report["duration"]))
+                report["ok"] = not report["problems"]
+        report["path"] = path
+        return report
+
+    def _deep_check(self, path: str, duration: float) -> List[str]:
+        """在均匀分布的采样点各解码一小段，FFmpeg报告解码错误时记为问题"""
+        problems = []
+        last_start = max(0.0, duration - DEEP_SAMPLE_SECONDS)
+        if self.deep_samples == 1:
+            starts = [0.0]
+        else:
+            starts = [last_start * i / (self.deep_samples - 1) for i in range(self.deep_samples)]
+        for start in starts:
+            cmd = [self.ffmpeg_cmd, "-v", "error", "-ss", f"{start:.3f}", "-i", path,
+                   "-t", f"{DEEP_SAMPLE_SECONDS}", "-f", "null", "-"]
+            result = self.runner(cmd, "verify_decode", capture_output=True, text=True,
+                                 encoding="utf-8", errors="ignore", timeout=60)
+            errors = (result.stderr or "").strip()
+            if result.returncode != 0 or errors:
+                first = errors.splitlines()[0] if errors else f"返回码 {result.returncode}"
+                problems.append(f"第 {start:.1f} 秒处解码出错: {first}")
+        return problems
+
+    def verify_many(self, items: List[Tuple[str, Optional[float]]]) -> List[Dict[str, Any]]:
+        """
+        并发校验多个输出文件
+
+        Args:
+            items: (输出路径, 计划时长) 列表
+
+        Returns:
+            List[Dict]: 与items顺序一致的校验结果
+        """
+        def _verify(item):
+            path, planned_duration = item
+            try:
+                return self.verify(path, planned_duration)
+            except InterruptedError:
+                raise
+            except Exception as e:
+                return {"path": path, "ok": False, "problems": [f"校验出错: {str(e)}"]}
+
+        if len(items) <= 1:
+            return [_verify(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(items))) as executor:
+            return list(executor.map(_verify, items))
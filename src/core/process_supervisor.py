@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+外部进程监管模块
+统一启动和跟踪FFmpeg/FFprobe子进程：
+- 每个子进程在独立的进程组中运行，记录全部子进程PID
+- 可以在多个线程中同时调用，并发执行互不依赖的命令
+- 收到停止请求后在1秒内结束整个进程组（含FFmpeg派生的子进程），
+  正在等待的调用抛出InterruptedError
+"""
+
+import os
+import sys
+import time
+import signal
+import atexit
+import weakref
+import threading
+import subprocess
+from typing import Dict, List, Any, Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# 所有监管器实例，程序退出时结束残留子进程
+_supervisors = weakref.WeakSet()
+
+
+class ProcessSupervisor:
+    """
+    子进程监管器
+
+    用法:
+        supervisor = ProcessSupervisor()
+        supervisor.run([ffmpeg, "-i", ...], check=True)
+        supervisor.cancel_all()                         # 其他线程中调用，立即结束所有子进程
+    """
+
+    def __init__(self, terminate_grace: float = 0.5):
+        """
+        初始化监管器
+
+        Args:
+            terminate_grace: 发送终止信号后等待进程退出的时间(秒)，超时后强制结束
+        """
+        self.terminate_grace = terminate_grace
+        self._processes: Dict[int, subprocess.Popen] = {}
+        self._lock = threading.Lock()
+        self._cancel_event = threading.Event()
+        self.total_started = 0
+        _supervisors.add(self)
+
+    @property
+    def cancelled(self) -> bool:
+        """是否已请求取消"""
+        return self._cancel_event.is_set()
+
+    def reset(self):
+        """清除取消状态，以便开始新一轮处理"""
+        self._cancel_event.clear()
+
+    def active_pids(self) -> List[int]:
+        """获取正在运行的子进程PID列表"""
+        with self._lock:
+            return [pid for pid, proc in self._processes.items() if proc.poll() is None]
+
+    def _popen_kwargs(self) -> Dict[str, Any]:
+        # 子进程放入独立进程组，结束时可以连同其派生进程一起结束
+        if sys.platform == "win32":
+            return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+        return {"start_new_session": True}
+
+    def run(self, cmd: List[str], check: bool = False, capture_output: bool = False,
+            timeout: Optional[float] = None, input=None, **kwargs) -> subprocess.CompletedProcess:
+        """
+        执行命令并等待结束，参数和返回值与subprocess.run一致
+
+        Args:
+            cmd: 命令参数列表
+            check: 返回码非0时是否抛出CalledProcessError
+            capture_output: 是否捕获stdout和stderr
+            timeout: 超时时间(秒)，超时后结束进程组并抛出TimeoutExpired
+            input: 写入子进程stdin的数据
+            **kwargs: 传递给subprocess.Popen的其他参数（stdout、stderr、text等）
+
+        Returns:
+            subprocess.CompletedProcess: 命令执行结果
+
+        Raises:
+            InterruptedError: 已请求取消，或等待期间被取消
+        """
+        if self._cancel_event.is_set():
+            raise InterruptedError("处理已停止，不再启动新的子进程")
+
+        if capture_output:
+            kwargs["stdout"] = subprocess.PIPE
+            kwargs["stderr"] = subprocess.PIPE
+        if input is not None:
+            kwargs["stdin"] = subprocess.PIPE
+        for key, value in self._popen_kwargs().items():
+            kwargs.setdefault(key, value)
+
+        with self._lock:
+            # 在锁内启动，保证cancel_all不会漏掉刚启动的进程
+            if self._cancel_event.is_set():
+                raise InterruptedError("处理已停止，不再启动新的子进程")
+            process = subprocess.Popen(cmd, **kwargs)
+            self._processes[process.pid] = process
+            self.total_started += 1
+        logger.debug(f"启动子进程 PID={process.pid}: {os.path.basename(str(cmd[0]))}")
+
+        try:
+            try:
+                stdout, stderr = process.communicate(input, timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self._kill_process_group(process)
+                stdout, stderr = process.communicate()
+                raise subprocess.TimeoutExpired(process.args, timeout, output=stdout, stderr=stderr)
+            except BaseException:
+                self._kill_process_group(process)
+                raise
+        finally:
+            with self._lock:
+                self._processes.pop(process.pid, None)
+
+        if self._cancel_event.is_set():
+            raise InterruptedError(f"子进程 PID={process.pid} 已被停止")
+
+        retcode = process.poll()
+        if check and retcode:
+            raise subprocess.CalledProcessError(retcode, process.args, output=stdout, stderr=stderr)
+        return subprocess.CompletedProcess(process.args, retcode, stdout, stderr)
+
+    def cancel_all(self):
+        """
+        取消所有子进程：拒绝启动新进程，并结束正在运行的进程组
+        可以在任意线程中调用，返回时所有子进程都已结束
+        """
+        self._cancel_event.set()
+        with self._lock:
+            processes = list(self._processes.values())
+        if not processes:
+            return
+
+        logger.info(f"正在结束 {len(processes)} 个子进程: {[p.pid for p in processes]}")
+        start = time.time()
+        for process in processes:
+            self._signal_process_group(process, force=False)
+
+        deadline = time.time() + self.terminate_grace
+        for process in processes:
+            remaining = deadline - time.time()
+            try:
+                process.wait(timeout=max(remaining, 0.01))
+            except subprocess.TimeoutExpired:
+                pass
+
+        for process in processes:
+            if process.poll() is None:
+                self._signal_process_group(process, force=True)
+        logger.info(f"子进程已全部结束，用时 {time.time() - start:.2f} 秒")
+
+    def _kill_process_group(self, process: subprocess.Popen):
+        """立即强制结束单个进程及其进程组"""
+        if process.poll() is None:
+            self._signal_process_group(process, force=True)
+        try:
+            process.wait(timeout=self.terminate_grace)
+        except subprocess.TimeoutExpired:
+            logger.warning(f"子进程 PID={process.pid} 未能及时退出")
+
+    def _signal_process_group(self, process: subprocess.Popen, force: bool):
+        """向进程组发送终止信号，force为True时强制结束"""
+        try:
+            if sys.platform == "win32":
+                if force:
+                    # taskkill /T 结束整个进程树
+                    subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                   creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+                else:
+                    process.send_signal(signal.CTRL_BREAK_EVENT)
+            else:
+                os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+        except (ProcessLookupError, PermissionError, OSError):
+            # 进程已经退出
+            pass
+
+
+@atexit.register
+def _cancel_all_supervisors():
+    """程序退出时结束所有残留的子进程，避免产生孤儿FFmpeg进程"""
+    for supervisor in list(_supervisors):
+        try:
+            if supervisor.active_pids():
+                supervisor.cancel_all()
+        except Exception:
+            pass
@@ -0,0 +1,415 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+渲染工作进程模块
+视频合成在独立的工作进程中执行：界面进程把序列化的合成任务（处理参数和素材列表）发给工作进程，
+工作进程通过管道回报进度和结果；工作进程完成一定数量的任务或内存超过上限后自动回收，
+合成过程中的大块缓冲区、未关闭的文件句柄和崩溃都不会留在界面进程中
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+import traceback
+import multiprocessing
+from typing import Dict, Any, List, Optional, Tuple, Callable
+
+from src.utils.logger import get_logger
+from src.utils.path_utils import get_config_dir
+from src.utils.metrics import get_metrics
+from src.core.media_catalogue import get_media_catalogue
+
+logger = get_logger()
+
+# 工作进程池配置文件
+CONFIG_FILE = get_config_dir() / "render_worker_settings.json"
+
+# 默认配置
+DEFAULT_MAX_JOBS_PER_WORKER = 5
+DEFAULT_MEMORY_LIMIT_MB = 2048
+
+# 等待工作进程消息的轮询间隔（秒），同时用于检查停止请求和进程是否意外退出
+POLL_INTERVAL = 0.2
+
+# 工作进程发回运行指标增量的间隔（秒）
+METRICS_INTERVAL = 2.0
+
+
+def _default_max_workers() -> int:
+    return max(1, min(4, (os.cpu_count() or 2) // 2))
+
+
+def _current_rss_mb() -> float:
+    """当前进程的常驻内存（MB），无法获取时返回0"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except Exception:
+        pass
+
+    # 没有psutil时，在Linux上直接读取/proc
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except Exception:
+        pass
+    return 0.0
+
+
+class RenderWorkerError(RuntimeError):
+    """工作进程中的合成出错，detail为工作进程中的错误堆栈"""
+
+    def __init__(self, message: str, detail: str = ""):
+        super().__init__(message)
+        self.detail = detail
+
+
+def _worker_main(conn, stop_event):
+    """
+    工作进程主循环：依次接收 (任务ID, 任务) 执行合成，收到None或管道关闭时退出
+
+    发回的消息：
+        ("progress", 任务ID, 消息, 百分比)
+        ("metrics", 任务ID, 运行指标增量)
+        ("result", 任务ID, {"output_videos", "total_time", "catalogue"}, 内存MB)
+        ("interrupted", 任务ID, None, 内存MB)
+        ("error", 任务ID, {"error", "detail"}, 内存MB)
+    """
+    send_lock = threading.Lock()
+
+    def send(message):
+        # 合成过程中的进度回调可能来自多个线程
+        with send_lock:
+            conn.send(message)
+
+    # 本进程的运行指标以增量形式发回界面进程汇总
+    metrics = get_metrics()
+    metrics.record_deltas = True
+
+    def send_metrics(job_id):
+        delta = metrics.collect_delta()
+        if delta:
+            send(("metrics", job_id, delta))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+
+        job_id, job = message
+        processor = None
+        finished = threading.Event()
+        try:
+            if stop_event.is_set():
+                raise InterruptedError("合成已停止")
+            from src.core.video_processor import VideoProcessor
+
+            processor = VideoProcessor(
+                job["settings"],
+                progress_callback=lambda text, percent: send(("progress", job_id, text, float(percent)))
+            )
+
+            # 界面进程请求停止时，由监视线程调用处理器的停止方法；监视线程同时定期发回运行指标
+            def _watch_stop():
+                last_metrics = time.time()
+                while not finished.is_set():
+                    if stop_event.wait(POLL_INTERVAL):
+                        processor.stop_processing()
+                        return
+                    if time.time() - last_metrics >= METRICS_INTERVAL:
+                        last_metrics = time.time()
+                        try:
+                            send_metrics(job_id)
+                        except (EOFError, OSError):
+                            return
+            threading.Thread(target=_watch_stop, daemon=True).start()
+
+            started = time.time()
+            output_videos, total_time = processor.process_batch(**job["batch"])
+            # 本次任务新扫描的文件夹交给界面进程登记到它的共享素材目录
+            reply = ("result", job_id, {"output_videos": list(output_videos), "total_time": total_time,
+                                        "catalogue": get_media_catalogue().export(since=started)})
+        except InterruptedError:
+            reply = ("interrupted", job_id, None)
+        except Exception as e:
+            reply = ("error", job_id, {"error": str(e), "detail": traceback.format_exc()})
+        finally:
+            finished.set()
+            processor = None
+
+        try:
+            send_metrics(job_id)
+            send(reply + (_current_rss_mb(),))
+        except (EOFError, OSError):
+            break
+
+
+class _Worker:
+    """界面进程中一个工作进程的句柄"""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.stop_event = context.Event()
+        self.process = context.Process(target=_worker_main, args=(child_conn, self.stop_event),
+                                       name="render-worker", daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs_done = 0
+        self.rss_mb = 0.0
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def retire(self, timeout: float = 5.0):
+        """结束工作进程（先请求退出，超时后强制终止）"""
+        try:
+            if self.process.is_alive():
+                self.conn.send(None)
+                self.process.join(timeout)
+        except (EOFError, OSError):
+            pass
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout)
+        self.conn.close()
+
+
+class RenderWorkerPool:
+    """
+    渲染工作进程池
+
+    同时运行的任务数不超过max_workers，每个工作进程完成max_jobs_per_worker个任务
+    或内存超过memory_limit_mb后被回收，下一个任务使用新的进程
+
+    用法:
+        pool = get_render_worker_pool()
+        job = RenderJob(settings, batch_kwargs, progress_callback, pool=pool)
+        output_videos, total_time = job.run()
+    """
+
+    def __init__(self, max_workers: int = None, max_jobs_per_worker: int = None,
+                 memory_limit_mb: float = None):
+        """
+        初始化工作进程池
+
+        Args:
+            max_workers: 最多同时运行的工作进程数，为None时从配置文件加载
+            max_jobs_per_worker: 每个工作进程最多执行的任务数，为None时从配置文件加载
+            memory_limit_mb: 工作进程内存上限（MB），为None时从配置文件加载
+        """
+        config = self._load_config()
+        self.max_workers = max(1, int(max_workers or config.get("max_workers") or _default_max_workers()))
+        self.max_jobs_per_worker = max(1, int(max_jobs_per_worker or config.get("max_jobs_per_worker")
+                                              or DEFAULT_MAX_JOBS_PER_WORKER))
+        self.memory_limit_mb = float(memory_limit_mb or config.get("memory_limit_mb") or DEFAULT_MEMORY_LIMIT_MB)
+        # 使用spawn启动，工作进程不继承界面进程的Qt状态和线程
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._lock = threading.Lock()
+        self._idle: List[_Worker] = []
+        self._stats = {"started": 0, "recycled": 0, "crashed": 0, "jobs": 0}
+
+    @staticmethod
+    def _load_config() -> dict:
+        try:
+            if os.path.exists(CONFIG_FILE):
+                with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"加载渲染进程配置失败: {str(e)}")
+        return {}
+
+    def acquire(self) -> _Worker:
+        """获取一个空闲的工作进程（没有空闲进程时启动新进程，达到上限时等待）"""
+        self._slots.acquire()
+        try:
+            with self._lock:
+                while self._idle:
+                    worker = self._idle.pop()
+                    if worker.is_alive():
+                        return worker
+                    worker.retire()
+            worker = _Worker(self._context)
+            with self._lock:
+                self._stats["started"] += 1
+            logger.info(f"已启动渲染工作进程: PID {worker.process.pid}")
+            return worker
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, worker: _Worker, crashed: bool = False):
+        """归还工作进程，达到任务数或内存上限、或已异常退出时回收"""
+        try:
+            with self._lock:
+                self._stats["jobs"] += 1
+                if crashed:
+                    self._stats["crashed"] += 1
+            worker.jobs_done += 1
+            if crashed or not worker.is_alive():
+                worker.retire(timeout=1.0)
+            elif worker.jobs_done >= self.max_jobs_per_worker or worker.rss_mb > self.memory_limit_mb:
+                logger.info(f"回收渲染工作进程: PID {worker.process.pid}，已完成 {worker.jobs_done} 个任务，"
+                            f"内存 {worker.rss_mb:.0f}MB")
+                with self._lock:
+                    self._stats["recycled"] += 1
+                worker.retire()
+            else:
+                with self._lock:
+                    self._idle.append(worker)
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        """结束所有空闲的工作进程（正在执行任务的进程在任务结束后归还时回收）"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.retire()
+
+    def stats(self) -> Dict[str, int]:
+        """进程池统计：启动、回收、崩溃的进程数，执行的任务数和当前空闲进程数"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["idle"] = len(self._idle)
+        return stats
+
+
+class RenderJob:
+    """
+    在工作进程中执行的一次批量合成
+
+    提供与VideoProcessor相同的stop_processing、get_last_progress方法，
+    界面中原先持有处理器的地方可以直接持有RenderJob；
+    工作进程扫描的素材在任务完成后登记到界面进程的共享素材目录
+    """
+
+    def __init__(self, settings: Dict[str, Any], batch_kwargs: Dict[str, Any],
+                 progress_callback: Callable[[str, float], None] = None,
+                 pool: RenderWorkerPool = None):
+        """
+        初始化合成任务
+
+        Args:
+            settings: VideoProcessor的处理设置
+            batch_kwargs: process_batch的参数（material_folders、output_dir、count、bgm_path）
+            progress_callback: 进度回调，在调用run的线程中调用
+            pool: 工作进程池，为None时使用进程内共享的进程池
+        """
+        self.job_id = uuid.uuid4().hex
+        self.job = {"settings": dict(settings), "batch": dict(batch_kwargs)}
+        self.progress_callback = progress_callback
+        self.pool = pool or get_render_worker_pool()
+        self.stop_requested = False
+        self._last_progress: Optional[Tuple[str, float]] = None
+        self._worker: Optional[_Worker] = None
+
+    def stop_processing(self):
+        """请求停止合成（工作进程会结束正在运行的FFmpeg进程）"""
+        self.stop_requested = True
+        worker = self._worker
+        if worker is not None:
+            worker.stop_event.set()
+        logger.info("已请求停止渲染工作进程中的合成")
+
+    def get_last_progress(self) -> Optional[Tuple[str, float]]:
+        """获取最后一次进度更新的消息和百分比"""
+        return self._last_progress
+
+    def release_resources(self):
+        """合成资源都在工作进程中，界面进程只需确保任务已停止"""
+        if self._worker is not None:
+            self.stop_processing()
+
+    def run(self) -> Tuple[List[str], str]:
+        """
+        执行合成并等待结果（阻塞调用线程）
+
+        Returns:
+            Tuple[List[str], str]: (输出视频列表, 总用时)，与VideoProcessor.process_batch相同
+
+        Raises:
+            InterruptedError: 合成被停止
+            RenderWorkerError: 合成出错或工作进程异常退出
+        """
+        if self.stop_requested:
+            raise InterruptedError("合成已停止")
+
+        worker = self.pool.acquire()
+        crashed = False
+        try:
+            worker.stop_event.clear()
+            self._worker = worker
+            # 发送任务前已请求停止时，工作进程收到任务后直接回报停止
+            if self.stop_requested:
+                worker.stop_event.set()
+            worker.conn.send((self.job_id, self.job))
+
+            while True:
+                try:
+                    has_message = worker.conn.poll(POLL_INTERVAL)
+                    message = worker.conn.recv() if has_message else None
+                except (EOFError, OSError):
+                    message = None
+                    has_message = False
+
+                if not has_message:
+                    if not worker.is_alive():
+                        crashed = True
+                        raise RenderWorkerError(f"渲染工作进程异常退出（退出码 {worker.process.exitcode}）")
+                    continue
+
+                kind, job_id = message[0], message[1]
+                if job_id != self.job_id:
+                    continue
+                if kind == "metrics":
+                    get_metrics().merge(message[2])
+                    continue
+                if kind == "progress":
+                    self._last_progress = (message[2], message[3])
+                    if self.progress_callback:
+                        try:
+                            self.progress_callback(message[2], message[3])
+                        except Exception as e:
+                            logger.error(f"调用进度回调时出错: {str(e)}")
+                    continue
+
+                worker.rss_mb = message[3]
+                if kind == "result":
+                    get_media_catalogue().merge(message[2].get("catalogue", []))
+                    return message[2]["output_videos"], message[2]["total_time"]
+                if kind == "interrupted":
+                    raise InterruptedError("合成已停止")
+                raise RenderWorkerError(message[2]["error"], message[2]["detail"])
+        except InterruptedError:
+            # InterruptedError是OSError的子类，停止不是通信故障，工作进程可以继续使用
+            raise
+        except (EOFError, OSError) as e:
+            crashed = True
+            raise RenderWorkerError(f"与渲染工作进程通信失败: {str(e)}")
+        finally:
+            self._worker = None
+            self.pool.release(worker, crashed=crashed)
+
+
+# 进程内共享的工作进程池
+_pool_instance: Optional[RenderWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_render_worker_pool() -> RenderWorkerPool:
+    """获取进程内共享的渲染工作进程池"""
+    global _pool_instance
+    if _pool_instance is None:
+        with _pool_lock:
+            if _pool_instance is None:
+                _pool_instance = RenderWorkerPool()
+    return _pool_instance
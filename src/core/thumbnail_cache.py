@@ -0,0 +1,319 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+缩略图缓存模块
+为素材片段抽取一张小尺寸封面帧（JPEG），每个素材文件夹的缩略图打包存放在缓存目录下的一个文件中，
+缓存总大小超过上限时按最近使用时间淘汰整个文件夹的缩略图包，片段修改或删除后留下的失效条目
+达到一定数量时重写缩略图包；
+抽取任务由固定数量的低优先级后台线程执行，后提交的请求先处理（界面滚动时优先显示当前可见的行）
+"""
+
+import os
+import sys
+import time
+import shutil
+import zipfile
+import hashlib
+import tempfile
+import threading
+import subprocess
+from collections import deque, OrderedDict
+from typing import Dict, List, Optional, Callable
+
+from src.utils.logger import get_logger
+from src.utils.cache_config import CacheConfig
+from src.utils.ffmpeg_registry import get_ffmpeg_registry
+
+logger = get_logger()
+
+# 缩略图包扩展名
+PACK_SUFFIX = ".thumbs"
+
+# 默认缓存上限(字节)
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+# 内存中保留的缩略图包数量
+MEMORY_PACKS = 8
+
+# 每个缩略图包每追加该数量的条目检查一次失效条目，失效条目过半时重写
+COMPACT_INTERVAL = 16
+
+
+def _low_priority(cmd: List[str]):
+    """
+    以低优先级启动FFmpeg的命令和参数，避免影响界面和合成任务
+
+    Windows上使用BELOW_NORMAL_PRIORITY_CLASS；其他系统通过nice命令降低优先级
+    （不使用preexec_fn，多线程进程中fork后执行Python代码并不安全）
+
+    Returns:
+        Tuple[List[str], dict]: (命令, subprocess参数)
+    """
+    if sys.platform == "win32":
+        return cmd, {"creationflags": getattr(subprocess, "CREATE_NO_WINDOW", 0)
+                     | getattr(subprocess, "BELOW_NORMAL_PRIORITY_CLASS", 0)}
+    nice = shutil.which("nice")
+    if nice:
+        cmd = [nice, "-n", "10"] + list(cmd)
+    return cmd, {"start_new_session": True}
+
+
+class ThumbnailCache:
+    """
+    素材缩略图缓存
+
+    用法:
+        thumbnails = get_thumbnail_cache()
+        data = thumbnails.get(folder, clip_path)            # 已缓存时直接返回JPEG数据
+        thumbnails.request(folder, clip_path, callback)     # 未缓存时后台抽取，完成后回调
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 workers: int = 2, width: int = 160):
+        """
+        初始化缩略图缓存
+
+        Args:
+            cache_dir: 缓存目录，默认为CacheConfig缓存目录下的thumbnails
+            max_bytes: 所有缩略图包的总大小上限
+            workers: 后台抽取线程数
+            width: 缩略图宽度（高度按比例）
+        """
+        if cache_dir is None:
+            cache_dir = os.path.join(CacheConfig().get_cache_dir(), "thumbnails")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.width = width
+        self._lock = threading.Lock()
+        self._pack_locks: Dict[str, threading.Lock] = {}
+        self._appended: Dict[str, int] = {}  # 包路径 -> 上次检查后追加的条目数
+        self._packs: "OrderedDict[str, Dict[str, bytes]]" = OrderedDict()  # 包路径 -> {条目名: JPEG}
+        self._queue = deque()
+        self._pending: Dict[str, List[Callable[[str, Optional[bytes]], None]]] = {}
+        self._wakeup = threading.Condition(self._lock)
+        self._workers = [threading.Thread(target=self._worker, daemon=True, name=f"thumbnail-{i}")
+                         for i in range(max(1, workers))]
+        for worker in self._workers:
+            worker.start()
+
+    # ------------------------------------------------------------------
+    # 缩略图包读写
+    # ------------------------------------------------------------------
+
+    def pack_path(self, folder: str) -> str:
+        """文件夹对应的缩略图包路径"""
+        digest = hashlib.sha1(os.path.abspath(folder).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest + PACK_SUFFIX)
+
+    def _entry_name(self, clip_path: str) -> Optional[str]:
+        """条目名：片段路径+修改时间+大小+宽度的摘要，片段变化后自动失效"""
+        try:
+            stat = os.stat(clip_path)
+        except OSError:
+            return None
+        key = f"{os.path.abspath(clip_path)}|{int(stat.st_mtime)}|{stat.st_size}|{self.width}"
+        return hashlib.sha1(key.encode("utf-8")).hexdigest() + ".jpg"
+
+    def _pack_lock(self, pack: str) -> threading.Lock:
+        with self._lock:
+            return self._pack_locks.setdefault(pack, threading.Lock())
+
+    def _load_pack(self, pack: str) -> Dict[str, bytes]:
+        """加载缩略图包到内存（调用方持有包锁）"""
+        with self._lock:
+            entries = self._packs.get(pack)
+            if entries is not None:
+                self._packs.move_to_end(pack)
+                return entries
+        entries = {}
+        if os.path.exists(pack):
+            try:
+                with zipfile.ZipFile(pack, "r") as archive:
+                    for name in archive.namelist():
+                        entries[name] = archive.read(name)
+                # 以修改时间记录最近使用时间，供淘汰使用
+                os.utime(pack, None)
+            except Exception as e:
+                logger.warning(f"读取缩略图包失败，将重新生成: {pack}, 错误: {str(e)}")
+                entries = {}
+                try:
+                    os.remove(pack)
+                except OSError:
+                    pass
+        with self._lock:
+            self._packs[pack] = entries
+            while len(self._packs) > MEMORY_PACKS:
+                self._packs.popitem(last=False)
+        return entries
+
+    def _store(self, folder: str, clip_path: str, name: str, data: bytes):
+        """追加缩略图到文件夹的缩略图包，条目注释记录片段路径，供判断条目是否失效"""
+        pack = self.pack_path(folder)
+        with self._pack_lock(pack):
+            entries = self._load_pack(pack)
+            entries[name] = data
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with zipfile.ZipFile(pack, "a", compression=zipfile.ZIP_STORED) as archive:
+                    if name not in archive.namelist():
+                        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+                        info.comment = os.path.abspath(clip_path).encode("utf-8")
+                        archive.writestr(info, data)
+                appended = self._appended.get(pack, 0) + 1
+                if appended >= COMPACT_INTERVAL:
+                    appended = 0
+                    self._compact(pack, entries)
+                self._appended[pack] = appended
+            except Exception as e:
+                logger.warning(f"写入缩略图包失败: {pack}, 错误: {str(e)}")
+        self._evict(keep=pack)
+
+    def _compact(self, pack: str, entries: Dict[str, bytes]):
+        """
+        失效条目（片段已修改或删除，或没有记录片段路径）过半时重写缩略图包，只保留有效条目
+        （调用方持有包锁）
+        """
+        with zipfile.ZipFile(pack, "r") as archive:
+            infos = archive.infolist()
+        live = [info for info in infos
+                if info.comment and self._entry_name(info.comment.decode("utf-8", "replace")) == info.filename]
+        if len(infos) - len(live) < len(infos) / 2:
+            return
+        fd, temp_path = tempfile.mkstemp(suffix=".part", dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, "wb") as f, zipfile.ZipFile(f, "w", compression=zipfile.ZIP_STORED) as archive:
+                for info in live:
+                    archive.writestr(info, entries.get(info.filename, b""))
+            os.replace(temp_path, pack)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        names = {info.filename for info in live}
+        for name in [name for name in entries if name not in names]:
+            del entries[name]
+        logger.info(f"已重写缩略图包，移除 {len(infos) - len(live)} 个失效条目: {pack}")
+
+    def _evict(self, keep: str = None):
+        """缓存总大小超过上限时，删除最久未使用的缩略图包"""
+        try:
+            packs = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                     if name.endswith(PACK_SUFFIX)]
+            stats = [(path, os.stat(path)) for path in packs]
+        except OSError:
+            return
+        total = sum(stat.st_size for _, stat in stats)
+        if total <= self.max_bytes:
+            return
+        for path, stat in sorted(stats, key=lambda item: item[1].st_mtime):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            with self._pack_lock(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                with self._lock:
+                    self._packs.pop(path, None)
+            total -= stat.st_size
+            logger.info(f"缩略图缓存超出上限，已淘汰: {path}")
+
+    def get(self, folder: str, clip_path: str) -> Optional[bytes]:
+        """获取已缓存的缩略图，未缓存时返回None"""
+        name = self._entry_name(clip_path)
+        if name is None:
+            return None
+        pack = self.pack_path(folder)
+        with self._pack_lock(pack):
+            return self._load_pack(pack).get(name)
+
+    # ------------------------------------------------------------------
+    # 后台抽取
+    # ------------------------------------------------------------------
+
+    def request(self, folder: str, clip_path: str, callback: Callable[[str, Optional[bytes]], None]):
+        """
+        请求片段缩略图；已缓存时立即在当前线程回调，否则排队后台抽取，完成后在后台线程回调
+
+        Args:
+            folder: 片段所属的素材文件夹（决定缩略图包）
+            clip_path: 片段路径
+            callback: 回调函数，参数为(片段路径, JPEG数据)，抽取失败时数据为None
+        """
+        data = self.get(folder, clip_path)
+        if data is not None:
+            callback(clip_path, data)
+            return
+        with self._lock:
+            if clip_path in self._pending:
+                self._pending[clip_path].append(callback)
+                # 再次请求时提到队首，优先处理
+                try:
+                    self._queue.remove((folder, clip_path))
+                except ValueError:
+                    pass
+            else:
+                self._pending[clip_path] = [callback]
+            self._queue.append((folder, clip_path))
+            self._wakeup.notify()
+
+    def cancel_pending(self):
+        """清空尚未开始的抽取任务（如素材列表被清空时）"""
+        with self._lock:
+            self._queue.clear()
+            self._pending.clear()
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                while not self._queue:
+                    self._wakeup.wait()
+                folder, clip_path = self._queue.pop()
+            data = None
+            try:
+                name = self._entry_name(clip_path)
+                if name is not None:
+                    data = self._extract(clip_path)
+                    if data:
+                        self._store(folder, clip_path, name, data)
+            except Exception as e:
+                logger.debug(f"抽取缩略图失败: {clip_path}, 错误: {str(e)}")
+            with self._lock:
+                callbacks = self._pending.pop(clip_path, [])
+            for callback in callbacks:
+                try:
+                    callback(clip_path, data)
+                except Exception as e:
+                    logger.warning(f"缩略图回调出错: {str(e)}")
+
+    def _extract(self, clip_path: str) -> Optional[bytes]:
+        """抽取封面帧：优先取第1秒（跳过黑场），片段过短时取第一帧"""
+        ffmpeg_cmd = get_ffmpeg_registry().ffmpeg_path()
+        for seek in ("1", "0"):
+            cmd, kwargs = _low_priority([ffmpeg_cmd, "-v", "error", "-ss", seek, "-i", clip_path,
+                                         "-frames:v", "1", "-an", "-vf", f"scale={self.width}:-2",
+                                         "-c:v", "mjpeg", "-q:v", "5", "-f", "image2pipe", "pipe:1"])
+            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=30, **kwargs)
+            if result.stdout:
+                return result.stdout
+        return None
+
+
+# 进程内共享的缩略图缓存
+_thumbnail_instance: Optional[ThumbnailCache] = None
+_thumbnail_lock = threading.Lock()
+
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    """获取进程内共享的缩略图缓存（首次调用时启动后台线程）"""
+    global _thumbnail_instance
+    if _thumbnail_instance is None:
+        with _thumbnail_lock:
+            if _thumbnail_instance is None:
+                _thumbnail_instance = ThumbnailCache()
+    return _thumbnail_instance
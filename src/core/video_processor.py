@@ -11,6 +11,7 @@ import time
 import uuid
 import subprocess
 import threading
+import multiprocessing
 import datetime
 import glob
 import random
@@ -23,6 +24,7 @@ import re
 import sys
 import gc  # 添加gc模块导入
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from typing import Dict, List, Any, Tuple, Callable, Optional, Union, TypeVar, cast
 
@@ -31,29 +33,90 @@ project_root = Path(__file__).resolve().parent.parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
-try:
-    import cv2
-    import numpy as np
-    from moviepy.editor import VideoFileClip, AudioFileClip, CompositeVideoClip, concatenate_videoclips, vfx, CompositeAudioClip
-except ImportError as e:
-    print(f"正在安装必要的依赖...")
-    try:
-        import pip
-        pip.main(["install", "moviepy", "opencv-python", "numpy"])
-        import cv2
-        import numpy as np
-        from moviepy.editor import VideoFileClip, AudioFileClip, CompositeVideoClip, concatenate_videoclips, vfx, CompositeAudioClip
-    except Exception as install_error:
-        print(f"安装依赖失败: {install_error}")
-        print("请手动安装依赖：")
-        print("pip install moviepy opencv-python numpy")
-        sys.exit(1)
+# moviepy和cv2只在FFprobe不可用时作为获取时长的后备方案，在对应函数内按需导入
 
 from src.utils.logger import get_logger
 from src.utils.cache_config import CacheConfig
+from src.utils.perf_trace import PerfTracer
+from src.utils.metrics import get_metrics, start_metrics_exporter
+from src.utils.ffmpeg_registry import get_ffmpeg_registry
+from src.core.process_supervisor import ProcessSupervisor
+from src.utils.media_header import read_duration
+from src.core.media_catalogue import MediaCatalogue, get_media_catalogue
+from src.core.clip_prefetcher import ClipPrefetcher
+from src.core.mirror_cache import get_mirror_cache
+from src.core.loudness import NOT_MEASURED, LoudnessCache, build_ebur128_command, parse_ebur128_summary, compute_gain
 
 logger = get_logger()
 
+
+def default_temp_dir() -> str:
+    """未指定temp_dir时使用的临时目录（配置的缓存目录），扫描缓存位于其下的media_cache"""
+    return CacheConfig().get_cache_dir()
+
+
+def media_cache_paths(temp_dir: str, folder_path: str) -> Tuple[str, str]:
+    """
+    素材文件夹的扫描缓存文件路径（扫描、配音预处理和素材数量统计共用）
+    
+    文件夹路径先转换为规范的绝对路径，同一文件夹的不同写法（相对路径、末尾分隔符等）对应同一缓存
+    
+    Args:
+        temp_dir: 临时目录（缓存位于其下的media_cache）
+        folder_path: 场景文件夹路径
+        
+    Returns:
+        Tuple[str, str]: (视频信息缓存路径, 音频信息缓存路径)
+    """
+    cache_dir = os.path.join(temp_dir, "media_cache")
+    folder_path = os.path.normpath(os.path.abspath(folder_path))
+    folder_cache_key = folder_path.replace("\\", "_").replace("/", "_").replace(":", "_")
+    return (os.path.join(cache_dir, f"videos_{folder_cache_key}.json"),
+            os.path.join(cache_dir, f"audios_{folder_cache_key}.json"))
+
+
+def prune_trace_runs(trace_dir: str, keep: int) -> int:
+    """
+    删除追踪目录中较早运行的文件，只保留最近keep次运行
+
+    同一次运行的追踪文件和汇总文件共用前缀（如batch_20240101_120000），按前缀分组，
+    以组内最新文件的修改时间排序
+
+    Args:
+        trace_dir: 追踪文件目录
+        keep: 保留的运行次数，小于1时不删除
+
+    Returns:
+        int: 删除的文件数
+    """
+    if keep < 1:
+        return 0
+    runs: Dict[str, List[str]] = {}
+    try:
+        names = os.listdir(trace_dir)
+    except OSError:
+        return 0
+    for name in names:
+        for suffix in (".trace.json", ".summary.json"):
+            if name.endswith(suffix):
+                runs.setdefault(name[:-len(suffix)], []).append(os.path.join(trace_dir, name))
+
+    def _latest(paths):
+        try:
+            return max(os.path.getmtime(path) for path in paths)
+        except OSError:
+            return 0
+
+    removed = 0
+    for prefix in sorted(runs, key=lambda prefix: (_latest(runs[prefix]), prefix), reverse=True)[keep:]:
+        for path in runs[prefix]:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError as e:
+                logger.debug(f"删除过期的追踪文件失败: {path}, 错误: {str(e)}")
+    return removed
+
 class VideoProcessor:
     """视频处理核心类"""
     
@@ -92,8 +155,7 @@ class VideoProcessor:
         self._check_ffmpeg()
         
         # 获取缓存配置
-        cache_config = CacheConfig()
-        cache_dir = cache_config.get_cache_dir()
+        cache_dir = default_temp_dir()
         
         # 默认设置
         self.default_settings = {
@@ -106,6 +168,26 @@ class VideoProcessor:
             "transition_duration": 0.5,  # 转场时长(秒)
             "voice_volume": 1.0,        # 配音音量
             "bgm_volume": 0.5,          # 背景音乐音量
+            "loudness_normalize": True,  # 按EBU R128响度统一各场景配音和背景音乐的音量
+            "loudness_target": -16.0,   # 目标综合响度(LUFS)
+            "loudness_true_peak": -1.0,  # 调整后允许的最大真峰值(dBTP)
+            "avoid_similar_clips": False,  # 同一输出中避免选择画面近似的片段（开启后在后台解码素材库计算指纹）
+            "similar_clip_threshold": 10,  # 近似判定阈值：采样帧dHash平均汉明距离(0~64)
+            "preview_height": 360,      # 预览代理视频的高度
+            "preview_fps": 15,          # 预览代理视频的帧率
+            "preview_crf": 32,          # 预览代理视频的质量(CRF，越大越小越快)
+            "verify_outputs": True,     # 合成后读取文件头校验每个输出（容器索引、时长、音视频同步）
+            "verify_deep": False,       # 校验时额外采样解码几段画面（较慢）
+            "verify_duration_tolerance": 1.0,  # 输出时长与计划时长允许的偏差(秒)
+            "verify_drift_tolerance": 0.5,     # 音视频流时长允许的差值(秒)
+            "header_probe": True,       # 扫描时优先只读取文件头获取时长，无法识别时再使用FFprobe
+            "shared_media_catalogue": True,  # 扫描结果登记到进程内共享的素材目录，多个模板共用同一份数据
+            "scene_concurrency": 4,     # 每个输出同时处理的场景数（选片仍按顺序进行）
+            "prefetch_next_output": True,  # 合成当前输出时预先为下一个输出选片，并把选中的片段读入系统缓存
+            "prefetch_budget_mb": 1024,    # 每个输出预读的字节预算(MB)
+            "resource_monitor_enabled": True,  # 合成期间每秒采样CPU、内存、磁盘吞吐和剩余空间，记录在批量汇总中
+            "resource_monitor_interval": 1.0,  # 资源采样间隔(秒)
+            "mirror_cache_enabled": False,  # 把网络位置的素材复制到本地镜像缓存后再合成（配置见mirror_cache_settings.json）
             "output_format": "mp4",     # 输出格式
             "temp_dir": cache_dir,      # 使用配置的缓存目录
             # 添加水印相关默认设置
@@ -115,7 +197,11 @@ class VideoProcessor:
             "watermark_color": "#FFFFFF", # 默认白色
             "watermark_position": "右上角", # 默认位置在右上角
             "watermark_pos_x": 0,        # 默认X轴位置修正
-            "watermark_pos_y": 0         # 默认Y轴位置修正
+            "watermark_pos_y": 0,        # 默认Y轴位置修正
+            # 性能追踪相关默认设置
+            "perf_trace_enabled": True,  # 记录各阶段耗时并导出追踪文件
+            "perf_trace_dir": None,      # 追踪文件和批量处理汇总文件的目录，None表示使用缓存目录下的perf_traces
+            "perf_trace_keep": 20        # 追踪目录中保留最近多少次运行的文件，更早的自动删除
         }
         
         # 更新设置
@@ -136,6 +222,37 @@ class VideoProcessor:
         self.used_videos_by_folder = {}  # 每个文件夹的已使用视频记录
         self.used_audios_by_folder = {}  # 每个文件夹的已使用配音记录
         
+        # 并发处理场景时保护选片状态（已使用记录、片段指纹）的锁
+        self._selection_lock = threading.Lock()
+        
+        # 片段预读器（批量处理期间有效）和当前输出预先规划的选片，键为场景文件夹
+        self._prefetcher = None
+        self._reservations = {}
+        
+        # 本地镜像缓存（批量处理期间启用时有效）
+        self._mirror_cache = None
+        
+        # 性能追踪器，每次批量处理时重新创建
+        self.tracer = PerfTracer("batch", enabled=self.settings.get("perf_trace_enabled", True))
+        self.last_batch_summary = {}  # 最近一次批量处理的汇总信息
+        self.last_preview_plans = []  # 最近一次预览的选片方案，可传给process_batch按预览结果合成
+        
+        # 外部命令监管器，停止处理时结束所有FFmpeg进程组
+        self.supervisor = ProcessSupervisor()
+        
+        # 响度测量结果缓存，首次使用时加载
+        self._loudness_cache = None
+        
+        # 片段感知指纹索引和当前输出已选片段的指纹
+        self._fingerprint_index = None
+        self._output_clip_hashes = []
+        
+        # 最近一个输出的计划时长，供合成后校验使用
+        self._last_planned_duration = None
+        
+        # 当前输出已处理完的场景数，用于报告场景阶段的进度
+        self._scenes_completed = 0
+        
         # 初始化随机数生成器
         random.seed(time.time())
     
@@ -146,112 +263,47 @@ class VideoProcessor:
         Returns:
             bool: 是否可用
         """
-        ffmpeg_cmd = "ffmpeg"
-        ffmpeg_path_file = None
-        
-        # 尝试从ffmpeg_path.txt读取自定义路径
-        try:
-            # 获取项目根目录
-            project_root = Path(__file__).resolve().parent.parent.parent
-            ffmpeg_path_file = project_root / "ffmpeg_path.txt"
-            
-            if ffmpeg_path_file.exists():
-                with open(ffmpeg_path_file, 'r', encoding="utf-8") as f:
-                    custom_path = f.read().strip()
-                    if custom_path and os.path.exists(custom_path):
-                        logger.info(f"使用自定义FFmpeg路径: {custom_path}")
-                        ffmpeg_cmd = custom_path
-                    else:
-                        logger.warning(f"自定义FFmpeg路径无效或不存在: {custom_path}")
-        except Exception as e:
-            logger.error(f"读取自定义FFmpeg路径时出错: {str(e)}")
-        
-        try:
-            # 尝试执行ffmpeg命令
-            logger.info(f"正在检查FFmpeg: {ffmpeg_cmd}")
-            result = subprocess.run(
-                [ffmpeg_cmd, "-version"], 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
-                text=True,
-                timeout=5  # 增加超时时间
-            )
-            
-            if result.returncode == 0:
-                version_info = result.stdout.splitlines()[0] if result.stdout else "未知版本"
-                logger.info(f"FFmpeg可用，版本信息：{version_info}")
-                
-                # 检查编码器支持
-                try:
-                    encoders_result = subprocess.run(
-                        [ffmpeg_cmd, "-encoders"],
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        text=True,
-                        timeout=5
-                    )
-                    
-                    if encoders_result.returncode == 0:
-                        encoders_output = encoders_result.stdout
-                        # 检查硬件加速编码器
-                        hw_encoders = []
-                        for encoder in ["nvenc", "qsv", "amf", "vaapi"]:
-                            if encoder in encoders_output:
-                                hw_encoders.append(encoder)
-                        
-                        if hw_encoders:
-                            logger.info(f"检测到支持的硬件加速编码器: {', '.join(hw_encoders)}")
-                        else:
-                            logger.info("未检测到支持的硬件加速编码器")
-                except Exception as e:
-                    logger.warning(f"检查编码器支持时出错: {str(e)}")
-                
-                return True
+        registry = get_ffmpeg_registry()
+        capabilities = registry.capabilities()
+        
+        if capabilities.get("available"):
+            logger.info(f"FFmpeg可用，版本信息：{capabilities.get('version_line') or '未知版本'}")
+            hw_encoders = [k for k in ["nvenc", "qsv", "amf", "vaapi"]
+                           if any(k in name for name in capabilities.get("encoders", []))]
+            if hw_encoders:
+                logger.info(f"检测到支持的硬件加速编码器: {', '.join(hw_encoders)}")
             else:
-                error_detail = f"返回码: {result.returncode}, 错误: {result.stderr}"
-                logger.error(f"FFmpeg不可用: {error_detail}")
-                return False
-        except FileNotFoundError:
-            if ffmpeg_path_file and ffmpeg_path_file.exists():
-                error_msg = f"自定义FFmpeg路径不正确，请重新配置。路径: {ffmpeg_cmd}"
+                logger.info("未检测到支持的硬件加速编码器")
+            return True
+        
+        error = capabilities.get("error", "")
+        if error == "未找到FFmpeg":
+            if registry.is_custom_path():
+                error_msg = f"自定义FFmpeg路径不正确，请重新配置。路径: {registry.ffmpeg_path()}"
             else:
                 error_msg = "FFmpeg不在系统路径中，请安装FFmpeg并确保可以在命令行中使用，或使用配置路径功能"
             logger.error(error_msg)
-            return False
-        except PermissionError:
-            logger.error(f"没有执行FFmpeg的权限: {ffmpeg_cmd}")
-            return False
-        except subprocess.TimeoutExpired:
-            logger.error(f"检查FFmpeg超时，可能系统资源不足或FFmpeg无响应")
-            return False
-        except Exception as e:
-            logger.error(f"检查FFmpeg时出错: {str(e)}, 类型: {type(e).__name__}")
-            return False
+        else:
+            logger.error(f"FFmpeg不可用: {error}")
+        return False
     
     def _get_ffmpeg_cmd(self):
         """
-        获取FFmpeg命令路径，优先使用自定义路径
+        获取FFmpeg命令路径，优先使用自定义路径（进程内只解析一次）
             
         Returns:
             str: FFmpeg命令路径
         """
-        ffmpeg_cmd = "ffmpeg"
-        
-        # 尝试从ffmpeg_path.txt读取自定义路径
-        try:
-            # 获取项目根目录
-            project_root = Path(__file__).resolve().parent.parent.parent
-            ffmpeg_path_file = project_root / "ffmpeg_path.txt"
-            
-            if ffmpeg_path_file.exists():
-                with open(ffmpeg_path_file, 'r', encoding="utf-8") as f:
-                    custom_path = f.read().strip()
-                    if custom_path and os.path.exists(custom_path):
-                        ffmpeg_cmd = custom_path
-        except Exception as e:
-            logger.error(f"读取自定义FFmpeg路径时出错: {str(e)}")
-        
-        return ffmpeg_cmd
+        return get_ffmpeg_registry().ffmpeg_path()
+    
+    def _get_ffprobe_cmd(self):
+        """
+        获取FFprobe命令路径（与FFmpeg同目录）
+            
+        Returns:
+            str: FFprobe命令路径
+        """
+        return get_ffmpeg_registry().ffprobe_path()
     
     def _prepare_path_for_ffmpeg(self, path):
         """
@@ -287,6 +339,307 @@ class VideoProcessor:
                 
         return path
     
+    def _run_command(self, cmd: List[str], label: str, **kwargs) -> subprocess.CompletedProcess:
+        """
+        执行FFmpeg/FFprobe命令，并记录耗时、CPU时间、读写字节数和子进程数
+        
+        Args:
+            cmd: 命令参数列表
+            label: 性能追踪中的阶段名称，如"concat_clips"、"mux_voice"
+            **kwargs: 传递给subprocess.run的参数
+            
+        Returns:
+            subprocess.CompletedProcess: 命令执行结果
+            
+        Raises:
+            InterruptedError: 已请求停止处理
+        """
+        tool = os.path.splitext(os.path.basename(str(cmd[0])))[0].lower()
+        with self.tracer.span(label, category=tool) as span:
+            span.add_subprocess()
+            result = "error"
+            try:
+                completed = self.supervisor.run(cmd, **kwargs)
+                if completed.returncode == 0:
+                    result = "ok"
+                return completed
+            finally:
+                get_metrics().inc("ffmpeg_invocations_total", tool=tool, result=result)
+                if tool == "ffmpeg":
+                    span.add_io(*self._command_io_bytes(cmd))
+    
+    def _run_commands(self, commands: List[Tuple[List[str], str]], **kwargs) -> List[subprocess.CompletedProcess]:
+        """
+        并发执行多个互不依赖的FFmpeg命令（每个命令经_run_command交由监管器执行，停止处理时一并结束）
+        
+        Args:
+            commands: (命令参数列表, 阶段名称) 列表
+            **kwargs: 所有命令共用的subprocess.run参数
+            
+        Returns:
+            List[subprocess.CompletedProcess]: 与commands顺序一致的执行结果
+        """
+        if len(commands) <= 1:
+            return [self._run_command(cmd, label, **kwargs) for cmd, label in commands]
+        
+        parent = self.tracer.current_span()
+        
+        def _run_in_worker(cmd, label):
+            with self.tracer.adopt(parent):
+                return self._run_command(cmd, label, **kwargs)
+        
+        with ThreadPoolExecutor(max_workers=len(commands)) as executor:
+            futures = [executor.submit(_run_in_worker, cmd, label) for cmd, label in commands]
+            # 等待全部结束后再抛出第一个异常，避免遗留未完成的命令
+            results, first_error = [], None
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append(None)
+                    if first_error is None:
+                        first_error = e
+        if first_error is not None:
+            raise first_error
+        return results
+    
+    def _get_loudness_cache(self) -> LoudnessCache:
+        """获取响度缓存（与扫描缓存放在同一目录）"""
+        if self._loudness_cache is None:
+            cache_file = os.path.join(self.settings["temp_dir"], "media_cache", "loudness.json")
+            self._loudness_cache = LoudnessCache(cache_file)
+        return self._loudness_cache
+    
+    def _measure_loudness(self, paths: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        并发测量多个音频文件的EBU R128响度，已缓存的文件不再测量
+        
+        Args:
+            paths: 音频文件路径列表
+            
+        Returns:
+            Dict: 路径 -> 响度信息(integrated/true_peak/lra)，测量失败时为None
+        """
+        cache = self._get_loudness_cache()
+        results = {}
+        pending = []
+        for path in dict.fromkeys(paths):
+            cached = cache.get(path)
+            if cached is not NOT_MEASURED:
+                results[path] = cached
+            else:
+                pending.append(path)
+        if not pending:
+            return results
+        
+        logger.info(f"测量 {len(pending)} 个音频文件的响度")
+        parent = self.tracer.current_span()
+        ffmpeg_cmd = self._get_ffmpeg_cmd()
+        
+        def _measure(path):
+            with self.tracer.adopt(parent):
+                result = self._run_command(build_ebur128_command(ffmpeg_cmd, path), "measure_loudness",
+                                           capture_output=True, text=True, encoding="utf-8", errors="ignore")
+            return parse_ebur128_summary(result.stderr or "")
+        
+        workers = max(1, min(len(pending), int(self.settings.get("threads", 4)) or 1))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {path: executor.submit(_measure, path) for path in pending}
+            for path, future in futures.items():
+                try:
+                    loudness = future.result()
+                except InterruptedError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"测量响度失败: {path}, 错误: {str(e)}")
+                    loudness = None
+                results[path] = loudness
+                # 测量失败也记录下来，文件不变时不再重复解码
+                cache.put(path, loudness)
+        cache.save()
+        return results
+    
+    def _loudness_gain(self, path: str, loudness=NOT_MEASURED) -> float:
+        """
+        计算把音频调整到目标响度的线性增益，未开启响度统一或测量失败时返回1.0
+        
+        Args:
+            path: 音频文件路径
+            loudness: 扫描时记录的响度信息（None表示测量失败），为NOT_MEASURED时从缓存获取（必要时测量）
+        """
+        if not self.settings.get("loudness_normalize", True) or not path:
+            return 1.0
+        if loudness is NOT_MEASURED:
+            loudness = self._measure_loudness([path]).get(path)
+        return compute_gain(loudness, self.settings.get("loudness_target", -16.0),
+                            self.settings.get("loudness_true_peak", -1.0))
+    
+    def _voice_gain_args(self, audio_info: Optional[Dict[str, Any]]) -> List[str]:
+        """配音合成步骤中的响度增益滤镜参数，增益为1时返回空列表"""
+        if not audio_info:
+            return []
+        gain = self._loudness_gain(audio_info.get("path"), audio_info.get("loudness", NOT_MEASURED))
+        if abs(gain - 1.0) < 1e-3:
+            return []
+        return ["-af", f"volume={gain:.4f}"]
+    
+    def _get_fingerprint_index(self):
+        """获取片段指纹索引（与扫描缓存放在同一目录），未开启或缺少NumPy时返回None"""
+        if not self.settings.get("avoid_similar_clips", False):
+            return None
+        if self._fingerprint_index is None:
+            try:
+                from src.core.fingerprint_index import FingerprintIndex
+            except ImportError as e:
+                logger.warning(f"无法加载片段指纹索引: {str(e)}")
+                self.settings["avoid_similar_clips"] = False
+                return None
+            cache_file = os.path.join(self.settings["temp_dir"], "media_cache", "fingerprints.npz")
+            self._fingerprint_index = FingerprintIndex(cache_file)
+        return self._fingerprint_index
+    
+    def _dissimilar_clips(self, candidates: List[Dict]) -> List[Dict]:
+        """
+        排除与当前输出已选片段画面近似的候选片段
+        
+        没有指纹的候选片段保留；全部候选都近似时返回原列表，保证总能选出片段
+        """
+        index = self._get_fingerprint_index()
+        if index is None or not self._output_clip_hashes or len(candidates) <= 1:
+            return candidates
+        from src.core.fingerprint_index import clip_distances
+        import numpy as np
+        
+        hashes, valid = index.lookup([v.get("path") for v in candidates])
+        distances = clip_distances(hashes, np.stack(self._output_clip_hashes))
+        keep = ~valid | (distances > self.settings.get("similar_clip_threshold", 10))
+        if keep.all():
+            return candidates
+        if not keep.any():
+            logger.info("所有候选片段都与已选片段近似，不做排除")
+            return candidates
+        logger.info(f"排除 {int((~keep).sum())} 个与已选片段近似的候选片段")
+        return [v for v, k in zip(candidates, keep) if k]
+    
+    def _remember_clip(self, video: Dict):
+        """记录当前输出已选片段的指纹"""
+        index = self._get_fingerprint_index()
+        if index is None or not video:
+            return
+        hashes, valid = index.lookup([video.get("path")])
+        if valid[0]:
+            self._output_clip_hashes.append(hashes[0])
+    
+    def _verify_outputs(self, outputs: List[str], planned_durations: Dict[str, Optional[float]]) -> Dict[str, List[str]]:
+        """
+        并发校验合成输出，结果记录在last_batch_summary["verification"]中
+        
+        Args:
+            outputs: 输出文件路径列表
+            planned_durations: 输出路径 -> 计划时长（无法确定时为None）
+            
+        Returns:
+            Dict: 未通过校验的输出路径 -> 问题描述列表
+        """
+        from src.core.output_verifier import OutputVerifier
+        
+        parent = self.tracer.current_span()
+        
+        def _runner(cmd, label, **kwargs):
+            with self.tracer.adopt(parent):
+                return self._run_command(cmd, label, **kwargs)
+        
+        verifier = OutputVerifier(
+            self._get_ffmpeg_cmd(), self._get_ffprobe_cmd(), runner=_runner,
+            duration_tolerance=self.settings.get("verify_duration_tolerance", 1.0),
+            drift_tolerance=self.settings.get("verify_drift_tolerance", 0.5),
+            deep=self.settings.get("verify_deep", False),
+            workers=max(1, int(self.settings.get("threads", 4)) or 1))
+        reports = verifier.verify_many([(path, planned_durations.get(path)) for path in outputs])
+        
+        failed = {report["path"]: report["problems"] for report in reports if not report["ok"]}
+        for path, problems in failed.items():
+            logger.error(f"输出校验未通过: {path}, 问题: {'; '.join(problems)}")
+        logger.info(f"输出校验完成，通过 {len(reports) - len(failed)}/{len(reports)} 个")
+        self.last_batch_summary["verification"] = {
+            "checked": len(reports),
+            "passed": len(reports) - len(failed),
+            "failed": failed,
+            "reports": reports,
+        }
+        return failed
+    
+    def _command_io_bytes(self, cmd: List[str]) -> Tuple[int, int]:
+        """
+        估算FFmpeg命令读取和写入的字节数（输入文件大小之和、输出文件大小）
+        
+        Args:
+            cmd: FFmpeg命令参数列表
+            
+        Returns:
+            Tuple[int, int]: (读取字节数, 写入字节数)
+        """
+        bytes_read = 0
+        bytes_written = 0
+        try:
+            is_concat = False
+            for idx, arg in enumerate(cmd):
+                if arg == "-f" and idx + 1 < len(cmd) and cmd[idx + 1] == "concat":
+                    is_concat = True
+                elif arg == "-i" and idx + 1 < len(cmd):
+                    input_path = str(cmd[idx + 1])
+                    if is_concat:
+                        # concat列表文件，统计其中列出的所有文件
+                        with open(input_path, "r", encoding="utf-8") as f:
+                            for line in f:
+                                line = line.strip()
+                                if line.startswith("file "):
+                                    listed = line[5:].strip().strip("'").replace("\\'", "'")
+                                    if os.path.isfile(listed):
+                                        bytes_read += os.path.getsize(listed)
+                        is_concat = False
+                    elif os.path.isfile(input_path):
+                        bytes_read += os.path.getsize(input_path)
+            output_path = str(cmd[-1])
+            if not output_path.startswith("-") and os.path.isfile(output_path):
+                bytes_written = os.path.getsize(output_path)
+        except Exception as e:
+            logger.debug(f"统计FFmpeg读写字节数失败: {str(e)}")
+        return bytes_read, bytes_written
+    
+    def _export_batch_trace(self, summary: Dict[str, Any] = None):
+        """
+        导出本次批量处理（或预览）的汇总文件，启用性能追踪时同时导出追踪文件
+
+        汇总文件（含资源占用时间序列）不受perf_trace_enabled影响，总是写入
+
+        Args:
+            summary: 写入汇总文件的信息，默认为last_batch_summary，阶段统计和追踪文件路径也记录在其中
+        """
+        if summary is None:
+            summary = self.last_batch_summary
+        try:
+            trace_dir = self.settings.get("perf_trace_dir") or os.path.join(self.settings["temp_dir"], "perf_traces")
+            os.makedirs(trace_dir, exist_ok=True)
+            timestamp = datetime.datetime.fromtimestamp(self.tracer.origin_wall).strftime("%Y%m%d_%H%M%S")
+            
+            if self.tracer.enabled:
+                summary_table = self.tracer.format_summary_table()
+                logger.info("\n" + summary_table)
+                
+                trace_path = os.path.join(trace_dir, f"{self.tracer.name}_{timestamp}.trace.json")
+                self.tracer.export_chrome_trace(trace_path)
+                summary["stages"] = self.tracer.summary()
+                summary["trace_file"] = trace_path
+            
+            summary_path = os.path.join(trace_dir, f"{self.tracer.name}_{timestamp}.summary.json")
+            with open(summary_path, "w", encoding="utf-8") as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+            logger.info(f"已保存批量处理汇总: {summary_path}")
+            prune_trace_runs(trace_dir, int(self.settings.get("perf_trace_keep", 20)))
+        except Exception as e:
+            logger.warning(f"导出批量处理汇总失败: {str(e)}")
+    
     def _format_time(self, seconds):
         """
         将秒数格式化为时:分:秒格式
@@ -415,7 +768,8 @@ class VideoProcessor:
                       material_folders: List[Dict[str, Any]], 
                       output_dir: str, 
                       count: int = 1, 
-                      bgm_path: str = None) -> Tuple[List[str], str]:
+                      bgm_path: str = None,
+                      plans: List[List[Dict[str, Any]]] = None) -> Tuple[List[str], str]:
         """
         批量处理视频
         
@@ -424,6 +778,8 @@ class VideoProcessor:
             output_dir: 输出目录
             count: 生成视频数量
             bgm_path: 背景音乐路径
+            plans: 预先生成的选片方案（如preview_batch保存的last_preview_plans），
+                   第i个输出按plans[i]合成，没有对应方案的输出照常选片
             
         Returns:
             Tuple[List[str], str]: 生成的视频路径列表和总处理时间
@@ -433,6 +789,20 @@ class VideoProcessor:
         self._total_videos = count
         self._completed_videos = 0
         
+        # 每次批量处理使用新的性能追踪器
+        self.tracer = PerfTracer("batch", enabled=self.settings.get("perf_trace_enabled", True))
+        self.last_batch_summary = {"count": count, "output_dir": output_dir}
+        self.stop_requested = False
+        self.supervisor.reset()
+        batch_span = self.tracer.begin("process_batch", count=count)
+        
+        # 运行指标：在主进程中按需启动指标端点（渲染工作进程的指标发回界面进程汇总）
+        metrics = get_metrics()
+        if multiprocessing.parent_process() is None:
+            start_metrics_exporter()
+        queued = count
+        metrics.add("queue_depth", queued)
+        
         # 启动进度定时器
         self._start_progress_timer()
         
@@ -442,15 +812,38 @@ class VideoProcessor:
         # 创建输出目录
         os.makedirs(output_dir, exist_ok=True)
         
+        # 记录合成期间的资源使用情况（CPU、内存、磁盘吞吐、缓存和输出目录剩余空间）
+        resource_monitor = None
+        if self.settings.get("resource_monitor_enabled", True):
+            # 按需导入：src.hardware包初始化时会加载依赖psutil的SystemAnalyzer
+            from src.hardware.resource_monitor import ResourceMonitor
+            resource_monitor = ResourceMonitor([self.settings["temp_dir"], output_dir],
+                                               child_pids=self.supervisor.active_pids,
+                                               interval=self.settings.get("resource_monitor_interval", 1.0))
+            resource_monitor.start()
+        
         # 生成的视频路径列表
         output_videos = []
+        planned_durations = {}
         
         try:
             # 扫描素材文件
             self.report_progress("扫描素材文件", 1)
             
             # 优化：使用轻量级扫描，只获取文件路径，不读取元数据
-            material_data = self._scan_material_folders(material_folders)
+            with self.tracer.span("scan", folders=len(material_folders)):
+                material_data = self._scan_material_folders(material_folders)
+                # 背景音乐的响度也只在扫描阶段测量一次，各输出直接使用缓存结果
+                if bgm_path and os.path.exists(bgm_path) and self.settings.get("loudness_normalize", True):
+                    self._measure_loudness([bgm_path])
+            
+            # 后台计算缺失的片段指纹，计算完成的片段立即参与近似去重
+            fingerprint_index = self._get_fingerprint_index()
+            if fingerprint_index is not None and material_data:
+                fingerprint_index.build_async(
+                    [video for folder_data in material_data.values() for video in folder_data.get("videos", [])],
+                    workers=max(1, (os.cpu_count() or 2) // 4),
+                    run=self.supervisor.run)
             
             if not material_data:
                 error_msg = "没有找到有效的素材"
@@ -463,6 +856,17 @@ class VideoProcessor:
             scan_time = scan_end_time - batch_start_time
             logger.info(f"扫描素材完成，用时: {self._format_time(scan_time)}")
             
+            if self.settings.get("mirror_cache_enabled", False):
+                self._mirror_cache = get_mirror_cache()
+            
+            plans = list(plans or [])
+            
+            # 预读：合成第i个输出前先为第i+1个输出选片，选中的文件在当前输出合成期间读入系统缓存
+            next_plan = None
+            if self.settings.get("prefetch_next_output", True):
+                self._prefetcher = ClipPrefetcher(self.settings.get("prefetch_budget_mb", 1024))
+                next_plan = self._plan_and_prefetch(material_data, plans[0] if plans else None)
+            
             # 处理多个视频
             for i in range(count):
                 if self.stop_requested:
@@ -481,26 +885,63 @@ class VideoProcessor:
                 # 格式统一的进度消息
                 self.report_progress(f"正在生成第 {i+1}/{count} 个目标视频", progress_start)
                 
+                # 先为下一个输出选片再取用当前输出的方案，规划时不会取走当前输出的预留选片
+                current_plan = plans[i] if i < len(plans) else None
+                if self._prefetcher is not None:
+                    current_plan = next_plan
+                    if i + 1 < count:
+                        next_plan = self._plan_and_prefetch(material_data,
+                                                            plans[i + 1] if i + 1 < len(plans) else None)
+                self._reservations = self._reservations_from_plan(current_plan)
+                
+                output_start = time.time()
                 try:
                     # 处理单个视频
-                    processed_video = self._process_single_video(
-                        material_data=material_data,
-                        output_path=output_path,
-                        bgm_path=bgm_path,
-                        progress_start=progress_start,
-                        progress_end=progress_end
-                    )
+                    with self.tracer.span("output", index=i + 1):
+                        processed_video = self._process_single_video(
+                            material_data=material_data,
+                            output_path=output_path,
+                            bgm_path=bgm_path,
+                            progress_start=progress_start,
+                            progress_end=progress_end
+                        )
                     
                     if processed_video and os.path.exists(processed_video):
                         output_videos.append(processed_video)
+                        planned_durations[processed_video] = self._last_planned_duration
                         self._completed_videos += 1
+                        metrics.inc("outputs_total", result="completed")
+                        metrics.observe("output_seconds", time.time() - output_start)
+                        metrics.inc("bytes_written_total", os.path.getsize(processed_video))
                         logger.info(f"成功生成视频 {i+1}/{count}: {processed_video}")
                     else:
                         logger.error(f"处理视频 {i+1}/{count} 失败")
+                        metrics.inc("outputs_total", result="failed")
+                except InterruptedError:
+                    raise
                 except Exception as e:
                     logger.error(f"处理视频 {i+1}/{count} 时出错: {str(e)}")
                     error_detail = traceback.format_exc()
                     logger.error(f"详细错误信息: {error_detail}")
+                    metrics.inc("outputs_total", result="failed")
+                finally:
+                    self._reservations = {}
+                    queued -= 1
+                    metrics.add("queue_depth", -1)
+            
+            # 用户停止时交由调用方按中断处理
+            if self.stop_requested:
+                raise InterruptedError("用户停止了批量处理")
+            
+            # 校验输出文件，未通过的不计入成功数量（文件保留以便排查）
+            if output_videos and self.settings.get("verify_outputs", True):
+                self.report_progress(f"校验 {len(output_videos)} 个输出文件", 99)
+                with self.tracer.span("verify_outputs", count=len(output_videos)):
+                    failed = self._verify_outputs(output_videos, planned_durations)
+                if failed:
+                    metrics.inc("outputs_total", len(failed), result="rejected")
+                    output_videos = [path for path in output_videos if path not in failed]
+                    self._completed_videos = len(output_videos)
             
             # 计算总处理时间
             batch_end_time = time.time()
@@ -514,8 +955,24 @@ class VideoProcessor:
             # 使用统一格式的完成消息
             self.report_progress(f"处理完成，已生成 {len(output_videos)}/{count} 个视频", 100)
             
+            self.last_batch_summary.update({
+                "completed": len(output_videos),
+                "scan_time": scan_time,
+                "total_time": total_time,
+            })
+            
             return output_videos, formatted_time
             
+        except InterruptedError:
+            logger.info(f"批量处理已停止，已完成 {len(output_videos)}/{count} 个视频")
+            self.report_progress("处理已停止", 100)
+            self.last_batch_summary.update({
+                "completed": len(output_videos),
+                "total_time": time.time() - batch_start_time,
+                "interrupted": True,
+            })
+            raise
+            
         except Exception as e:
             logger.error(f"批量处理时出错: {str(e)}")
             error_detail = traceback.format_exc()
@@ -528,13 +985,362 @@ class VideoProcessor:
             
             self.report_progress(f"错误: {str(e)}", 100)
             
+            self.last_batch_summary.update({
+                "completed": len(output_videos),
+                "total_time": used_time,
+                "error": str(e),
+            })
+            
             return output_videos, formatted_time
+        
+        finally:
+            # 未处理的输出（停止或出错）移出队列
+            metrics.add("queue_depth", -queued)
+            resources = resource_monitor.stop() if resource_monitor is not None else None
+            if resources:
+                self.last_batch_summary["resources"] = resources
+                if resources["flags"]:
+                    logger.warning(f"本次批量处理受资源限制: {', '.join(resources['flags'])}，"
+                                   f"峰值: {resources['peak']}")
+            if self._prefetcher is not None:
+                self._prefetcher.close()
+                self.last_batch_summary["prefetch"] = self._prefetcher.stats()
+                logger.info(f"片段预读统计: {self.last_batch_summary['prefetch']}")
+                self._prefetcher = None
+            self._reservations = {}
+            if self._mirror_cache is not None:
+                self.last_batch_summary["mirror_cache"] = self._mirror_cache.stats()
+                self._mirror_cache = None
+            
+            # 导出性能追踪数据
+            self.tracer.end(batch_span)
+            self._export_batch_trace()
     
     def stop_processing(self):
-        """停止处理"""
+        """停止处理，立即结束所有正在运行的FFmpeg进程"""
         self.stop_requested = True
         logger.info("已请求停止视频处理")
-    
+        if self._fingerprint_index is not None:
+            self._fingerprint_index.stop()
+        self.supervisor.cancel_all()
+
+    def _select_multi_clips(self, folder_key: str, videos: List[Dict], duration: float,
+                            scene_name: str = None) -> Tuple[List[Dict], float]:
+        """
+        多视频模式的选片规则，合成和选片方案共用（调用方持有_selection_lock）
+
+        优先取当前输出的预留片段，否则从该文件夹未使用的片段中随机选择（排除与已选片段近似的），
+        直到总时长不小于配音时长；所有片段都用过一轮后清空使用记录重新开始
+
+        Args:
+            folder_key: 场景文件夹
+            videos: 场景的视频列表
+            duration: 需要覆盖的时长（配音时长）
+            scene_name: 日志中显示的场景名称，默认为文件夹名
+
+        Returns:
+            Tuple[List[Dict], float]: (按顺序拼接的片段, 片段总时长)
+        """
+        scene_name = scene_name or folder_key
+        # 重置随机种子以确保随机性
+        random.seed(time.time() + random.random())
+        used_videos = self.used_videos_by_folder.setdefault(folder_key, set())
+        available_videos = list(videos)
+        random.shuffle(available_videos)
+        selected_videos = []
+        total_duration = 0
+        while total_duration < duration and available_videos:
+            # 优先使用预先规划（已预读）的片段
+            selected_video = self._reserved_pick(folder_key, "clip")
+            if selected_video is None:
+                unused_videos = [v for v in available_videos if v.get("path") not in used_videos]
+                if not unused_videos:
+                    logger.info(f"{scene_name} 所有视频已用过一轮，重新开始")
+                    used_videos.clear()
+                    unused_videos = available_videos
+                selected_video = random.choice(self._dissimilar_clips(unused_videos))
+            self._remember_clip(selected_video)
+            selected_videos.append(selected_video)
+            used_videos.add(selected_video.get("path"))
+            available_videos = [v for v in available_videos if v.get("path") != selected_video.get("path")]
+            total_duration += selected_video.get("duration", 0)
+            logger.info(f"为{scene_name}选择视频: {os.path.basename(selected_video.get('path'))}, "
+                        f"累计时长: {total_duration:.2f}/{duration:.2f}秒")
+        return selected_videos, total_duration
+
+    def plan_output(self, material_data: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        生成一个输出的选片方案（只选择素材，不执行FFmpeg），与合成使用相同的选片函数，
+        会更新已使用记录
+
+        Args:
+            material_data: _scan_material_folders返回的素材数据
+
+        Returns:
+            List[Dict]: 每个场景的方案，包含scene(场景名)、audio(配音信息或None)、
+                        duration(场景时长)和clips(按顺序拼接的片段信息)
+        """
+        self._output_clip_hashes = []
+        plan = []
+        for folder_key, folder_data in material_data.items():
+            videos = folder_data.get("videos", [])
+            if not videos:
+                continue
+            audios = folder_data.get("audios", [])
+            selected_audio = self._get_random_audio(folder_key, audios) if audios else None
+            if selected_audio:
+                duration = selected_audio.get("duration", 0)
+            else:
+                duration = self.settings.get("default_audio_duration", 10.0)
+
+            clips = []
+            if folder_data.get("extract_mode", "single_video") != "multi_video":
+                selected_video = self._get_random_video(folder_key, videos, duration + 0.1)
+                if selected_video:
+                    clips = [selected_video]
+            if not clips:
+                clips, _ = self._select_multi_clips(folder_key, videos, duration)
+
+            plan.append({
+                "scene": folder_key,
+                "audio": selected_audio,
+                "duration": min(duration, sum(v.get("duration", 0) for v in clips)) or duration,
+                "clips": clips,
+            })
+        return plan
+
+    def _plan_and_prefetch(self, material_data: Dict[str, Dict[str, Any]],
+                           plan: List[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """为下一个输出选片（已有方案时直接使用），并在后台把选中的配音和片段读入系统缓存"""
+        if plan is None:
+            with self.tracer.span("plan_ahead"):
+                plan = self.plan_output(material_data)
+        paths = []
+        for scene in plan:
+            if scene.get("audio"):
+                paths.append(scene["audio"].get("path"))
+            paths.extend(clip.get("path") for clip in scene.get("clips", []))
+        if self._mirror_cache is not None:
+            # 镜像缓存启用时提前把下一个输出的素材复制到本地
+            self._mirror_cache.mirror_async(paths)
+        self._prefetcher.prefetch(paths)
+        return plan
+
+    def _local_media(self, path: str) -> str:
+        """
+        合成命令中使用的素材路径：镜像缓存启用时替换为本地副本（调用方持有_selection_lock）
+
+        查找或复制副本期间释放选片锁，复制失败或不需要镜像时返回原路径
+        """
+        cache = self._mirror_cache
+        if cache is None or not path or not cache.should_mirror(path):
+            return path
+        self._selection_lock.release()
+        try:
+            return cache.fetch(path)
+        finally:
+            self._selection_lock.acquire()
+
+    @staticmethod
+    def _reservations_from_plan(plan: Optional[List[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+        """把选片方案转换为合成时按顺序取用的预留选片"""
+        return {scene["scene"]: {"audio": scene.get("audio"), "clips": list(scene.get("clips", []))}
+                for scene in plan or []}
+
+    def _reserved_pick(self, folder_key: str, kind: str, min_duration: float = 0) -> Optional[Dict]:
+        """
+        取出当前输出预先规划的配音或片段（调用方持有_selection_lock）
+
+        取出的配音或片段计入已使用记录（方案可能来自预览，规划时的记录已还原）；
+        没有预留或预留不满足条件时返回None，由调用方按原规则随机选择
+
+        Args:
+            folder_key: 场景文件夹
+            kind: "audio"（配音）、"single"（单视频模式的片段）或"clip"（多视频模式的下一个片段）
+            min_duration: 单视频模式要求的最小时长
+        """
+        reservation = self._reservations.get(folder_key)
+        if not reservation:
+            return None
+        if kind == "audio":
+            picked = reservation.pop("audio", None)
+        else:
+            clips = reservation["clips"]
+            if not clips:
+                return None
+            if kind == "single" and (len(clips) != 1 or clips[0].get("duration", 0) < min_duration):
+                return None
+            picked = clips.pop(0)
+        if picked is None:
+            return None
+        used = self.used_audios_by_folder if kind == "audio" else self.used_videos_by_folder
+        used.setdefault(folder_key, set()).add(picked.get("path"))
+        if kind == "single":
+            self._remember_clip(picked)
+        if self._prefetcher is not None:
+            self._prefetcher.note_use(picked.get("path"))
+        return picked
+
+    def render_preview(self, plan: List[Dict[str, Any]], output_path: str, bgm_path: str = None) -> str:
+        """
+        按选片方案用一条FFmpeg命令渲染低分辨率预览代理视频
+
+        画面按方案拼接并缩放到preview_height、降帧到preview_fps，以ultrafast预设编码；
+        各场景配音按场景起点延迟后与背景音乐混合，音量与正式合成一致（含响度增益），
+        用于在批量合成前快速检查节奏
+
+        Args:
+            plan: plan_output返回的选片方案
+            output_path: 预览视频路径
+            bgm_path: 背景音乐路径，可为None
+
+        Returns:
+            str: 预览视频路径
+        """
+        scenes = [scene for scene in plan if scene.get("clips")]
+        if not scenes:
+            raise ValueError("选片方案中没有可用的片段")
+
+        # 拼接列表：每个场景最后一个片段用outpoint截到配音结束
+        concat_file = f"{os.path.splitext(output_path)[0]}.concat.txt"
+        scene_starts = []
+        total_duration = 0.0
+        with open(concat_file, "w", encoding="utf-8") as f:
+            for scene in scenes:
+                scene_starts.append(total_duration)
+                remaining = scene["duration"]
+                for clip in scene["clips"]:
+                    if remaining <= 0:
+                        break
+                    clip_path = str(clip["path"]).replace("'", "\\'")
+                    f.write(f"file '{clip_path}'\n")
+                    clip_duration = clip.get("duration", 0)
+                    if clip_duration <= 0 or clip_duration > remaining:
+                        f.write(f"outpoint {remaining:.3f}\n")
+                        clip_duration = remaining
+                    remaining -= clip_duration
+                total_duration += scene["duration"] - max(0.0, remaining)
+
+        cmd = [self._get_ffmpeg_cmd(), "-y", "-f", "concat", "-safe", "0", "-i", concat_file]
+        voice_volume = self.settings.get("voice_volume", 1.0)
+        filters, mix_inputs = [], []
+        for start, scene in zip(scene_starts, scenes):
+            audio = scene.get("audio")
+            if not audio or not audio.get("path"):
+                continue
+            index = len(mix_inputs) + 1
+            cmd += ["-i", audio["path"]]
+            gain = voice_volume * self._loudness_gain(audio["path"], audio.get("loudness", NOT_MEASURED))
+            delay = int(start * 1000)
+            filters.append(f"[{index}:a]volume={gain:.4f},adelay={delay}|{delay}[a{index}]")
+            mix_inputs.append(f"[a{index}]")
+        if bgm_path and os.path.exists(bgm_path):
+            index = len(mix_inputs) + 1
+            cmd += ["-stream_loop", "-1", "-i", bgm_path]
+            gain = self.settings.get("bgm_volume", 0.5) * self._loudness_gain(bgm_path)
+            filters.append(f"[{index}:a]volume={gain:.4f}[a{index}]")
+            mix_inputs.append(f"[a{index}]")
+
+        height = int(self.settings.get("preview_height", 360))
+        fps = int(self.settings.get("preview_fps", 15))
+        filters.insert(0, f"[0:v]scale=-2:{height},fps={fps},format=yuv420p[v]")
+        if mix_inputs:
+            filters.append(f"{''.join(mix_inputs)}amix=inputs={len(mix_inputs)}:duration=longest:normalize=0[a]")
+
+        cmd += ["-filter_complex", ";".join(filters), "-map", "[v]"]
+        if mix_inputs:
+            cmd += ["-map", "[a]", "-c:a", "aac", "-b:a", "64k"]
+        cmd += [
+            "-c:v", "libx264", "-preset", "ultrafast", "-tune", "fastdecode",
+            "-crf", str(self.settings.get("preview_crf", 32)),
+            "-t", f"{total_duration:.3f}",
+            "-movflags", "+faststart",
+            output_path
+        ]
+        try:
+            self._run_command(cmd, "render_preview", check=True, capture_output=True)
+        finally:
+            try:
+                os.remove(concat_file)
+            except OSError:
+                pass
+        return output_path
+
+    def preview_batch(self,
+                      material_folders: List[Dict[str, Any]],
+                      output_dir: str,
+                      count: int = 1,
+                      bgm_path: str = None) -> List[str]:
+        """
+        生成预览：按与正式合成相同的选片规则生成方案，并渲染低分辨率代理视频
+
+        每个预览视频旁保存同名的.plan.json，记录各场景选用的配音和片段；方案同时保存在
+        last_preview_plans中，可传给process_batch(plans=...)按预览的选片合成。
+        选片在已使用记录的副本上进行，预览结束后还原，不影响之后的正式合成
+
+        Args:
+            material_folders: 素材文件夹列表
+            output_dir: 预览输出目录
+            count: 预览数量
+            bgm_path: 背景音乐路径
+
+        Returns:
+            List[str]: 生成的预览视频路径列表
+        """
+        self.tracer = PerfTracer("preview", enabled=self.settings.get("perf_trace_enabled", True))
+        self.stop_requested = False
+        self.supervisor.reset()
+        os.makedirs(output_dir, exist_ok=True)
+        summary = {"count": count, "output_dir": output_dir}
+        preview_span = self.tracer.begin("preview_batch", count=count)
+
+        # 预览在已使用记录和指纹的副本上选片，结束后还原
+        saved_videos = {key: set(paths) for key, paths in self.used_videos_by_folder.items()}
+        saved_audios = {key: set(paths) for key, paths in self.used_audios_by_folder.items()}
+        saved_hashes = list(self._output_clip_hashes)
+
+        previews = []
+        plans = []
+        try:
+            self.report_progress("扫描素材文件", 1)
+            with self.tracer.span("scan", folders=len(material_folders)):
+                material_data = self._scan_material_folders(material_folders)
+            if not material_data:
+                self.report_progress("错误: 没有找到有效的素材", 100)
+                return []
+
+            for i in range(count):
+                if self.stop_requested:
+                    raise InterruptedError("用户停止了预览")
+                self.report_progress(f"正在生成第 {i+1}/{count} 个预览", 5 + i / count * 95)
+                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+                output_path = os.path.join(output_dir, f"预览_{timestamp}_{i+1}.mp4")
+                try:
+                    with self.tracer.span("preview", index=i + 1):
+                        with self.tracer.span("select_clips"):
+                            plan = self.plan_output(material_data)
+                        self.render_preview(plan, output_path, bgm_path)
+                    with open(f"{os.path.splitext(output_path)[0]}.plan.json", "w", encoding="utf-8") as f:
+                        json.dump(plan, f, ensure_ascii=False, indent=2)
+                    previews.append(output_path)
+                    plans.append(plan)
+                    logger.info(f"已生成预览 {i+1}/{count}: {output_path}")
+                except InterruptedError:
+                    raise
+                except Exception as e:
+                    logger.error(f"生成预览 {i+1}/{count} 失败: {str(e)}")
+
+            self.report_progress(f"预览完成，已生成 {len(previews)}/{count} 个", 100)
+            return previews
+        finally:
+            self.used_videos_by_folder = saved_videos
+            self.used_audios_by_folder = saved_audios
+            self._output_clip_hashes = saved_hashes
+            self.last_preview_plans = plans
+            summary["completed"] = len(previews)
+            self.tracer.end(preview_span)
+            self._export_batch_trace(summary)
+
     def _scan_material_folders(self, material_folders, extract_mode="multi_video"):
         """
         扫描素材文件夹，收集视频和音频信息
@@ -555,6 +1361,11 @@ class VideoProcessor:
         result = {}
         video_cache = {}  # 缓存已经处理过的视频文件
         audio_cache = {}  # 缓存已经处理过的音频文件
+        audio_cache_paths = {}  # 文件夹路径 -> 音频信息缓存文件
+        
+        # 进程内共享的素材目录，其他模板已扫描过的文件夹直接使用共享数据
+        catalogue = get_media_catalogue() if self.settings.get("shared_media_catalogue", True) else None
+        scanned_folders = []  # 本次新扫描的文件夹名称，扫描结束后登记到素材目录
         
         for i, folder_item in enumerate(material_folders):
             # 确定文件夹路径和名称
@@ -574,6 +1385,9 @@ class VideoProcessor:
             if not folder_path or not os.path.exists(folder_path):
                 logger.warning(f"跳过不存在的文件夹: {folder_path}")
                 continue
+            
+            # 记录每个文件夹的扫描耗时（含探测时长的FFprobe调用）
+            folder_span = self.tracer.begin("scan_folder", folder=folder_name)
                 
             # 更新进度
             progress_message = f"正在扫描素材文件夹{i+1}/{len(material_folders)}: {folder_name}"
@@ -584,12 +1398,27 @@ class VideoProcessor:
             logger.info(f"多视频模式 直接处理文件夹: {folder_path}")
             
             # 检查是否有缓存
-            folder_cache_key = folder_path.replace("\\", "_").replace("/", "_").replace(":", "_")
-            videos_cache_path = os.path.join(cache_dir, f"videos_{folder_cache_key}.json")
-            audios_cache_path = os.path.join(cache_dir, f"audios_{folder_cache_key}.json")
+            videos_cache_path, audios_cache_path = media_cache_paths(self.settings["temp_dir"], folder_path)
+            
+            if catalogue is not None:
+                entry = catalogue.get(folder_path, MediaCatalogue.signature(videos_cache_path, audios_cache_path))
+                # 需要统一响度但目录中有未测量响度的配音时重新加载，以便补测
+                if entry is not None and not (self.settings.get("loudness_normalize", True)
+                                              and entry.audios.has_unmeasured_loudness()):
+                    if len(entry.videos) or len(entry.audios):
+                        result[folder_name] = entry.material(i)
+                    logger.info(f"使用共享素材目录中 {folder_path} 的数据: {len(entry.videos)} 个视频, {len(entry.audios)} 个音频")
+                    get_metrics().inc("scan_cache_total", result="hit")
+                    self.tracer.end(folder_span)
+                    self.report_progress(
+                        f"已扫描{i+1}/{len(material_folders)} 个文件夹",
+                        ((i + 1) / len(material_folders)) * 100
+                    )
+                    continue
             
             videos = []
             audios = []
+            cache_hit = True
             
             # 尝试从缓存加载视频信息
             if folder_path in video_cache:
@@ -605,6 +1434,7 @@ class VideoProcessor:
             
             # 如果没有有效的缓存，扫描视频文件
             if not videos:
+                cache_hit = False
                 video_folder = os.path.join(folder_path, "视频")
                 videos = self._scan_media_folder(folder_path, "视频")
                 
@@ -639,6 +1469,7 @@ class VideoProcessor:
             
             # 如果没有有效的缓存，扫描音频文件夹并获取轻量级元数据
             if not audios:
+                cache_hit = False
                 audio_folder = os.path.join(folder_path, "配音")
                 audio_files = self._scan_media_folder(folder_path, "配音")
                 
@@ -666,6 +1497,9 @@ class VideoProcessor:
                 except Exception as e:
                     logger.error(f"保存音频信息缓存失败: {str(e)}")
             
+            audio_cache_paths[folder_path] = audios_cache_path
+            get_metrics().inc("scan_cache_total", result="hit" if cache_hit else "miss")
+            
             # 存储文件夹信息
             if videos or audios:
                 result[folder_name] = {
@@ -674,6 +1508,9 @@ class VideoProcessor:
                     "audios": audios,
                     "segment_index": i,
                 }
+                scanned_folders.append(folder_name)
+            
+            self.tracer.end(folder_span)
             
             # 更新进度
             self.report_progress(
@@ -681,6 +1518,19 @@ class VideoProcessor:
                 ((i + 1) / len(material_folders)) * 100
             )
         
+        # 测量尚未记录响度的配音（所有文件夹的配音一起并发测量），结果写回音频信息缓存
+        if self.settings.get("loudness_normalize", True):
+            self._annotate_loudness(result, audio_cache_paths)
+        
+        # 新扫描的文件夹登记到共享素材目录（签名取缓存文件写入后的状态），结果替换为共享视图
+        if catalogue is not None:
+            for folder_name in scanned_folders:
+                folder_data = result[folder_name]
+                folder_path = folder_data["folder_path"]
+                signature = MediaCatalogue.signature(*media_cache_paths(self.settings["temp_dir"], folder_path))
+                entry = catalogue.put(folder_path, signature, folder_data["videos"], folder_data["audios"])
+                result[folder_name] = entry.material(folder_data["segment_index"])
+        
         # 汇总进度
         self.report_progress(
             f"素材扫描完成，共处理 {len(material_folders)} 个文件夹",
@@ -696,6 +1546,35 @@ class VideoProcessor:
         
         return result
     
+    def _annotate_loudness(self, material_data, audio_cache_paths):
+        """
+        为扫描结果中缺少响度信息的配音测量响度，并更新对应的音频信息缓存文件
+        
+        Args:
+            material_data: _scan_material_folders的扫描结果
+            audio_cache_paths: 文件夹路径 -> 音频信息缓存文件路径
+        """
+        missing = [audio for folder_data in material_data.values()
+                   for audio in folder_data.get("audios", []) if "loudness" not in audio]
+        if not missing:
+            return
+        
+        self.report_progress(f"正在分析 {len(missing)} 个配音的响度", 99)
+        with self.tracer.span("measure_loudness_all", files=len(missing)):
+            measured = self._measure_loudness([audio["path"] for audio in missing])
+        for audio in missing:
+            audio["loudness"] = measured.get(audio["path"])
+        
+        for folder_data in material_data.values():
+            cache_path = audio_cache_paths.get(folder_data.get("folder_path"))
+            if not cache_path or not folder_data.get("audios"):
+                continue
+            try:
+                with open(cache_path, 'w', encoding='utf-8') as f:
+                    json.dump(folder_data["audios"], f, ensure_ascii=False, indent=2)
+            except Exception as e:
+                logger.warning(f"更新音频信息缓存失败: {str(e)}")
+    
     def _get_audio_metadata_lite(self, audio_path):
         """
         获取音频基本元数据（轻量版）, 仅获取必要的信息如路径和时长
@@ -731,32 +1610,34 @@ class VideoProcessor:
                 self.logger.warning(f"无法找到音频文件，尝试的所有扩展名均失效: {audio_path}")
                 return None
             
-            # 使用FFprobe获取音频时长
-            duration = None
-            try:
-                # FFprobe命令
-                ffprobe_cmd = [
-                    self._get_ffmpeg_cmd().replace("ffmpeg", "ffprobe"),
-                    "-v", "error",
-                    "-show_entries", "format=duration",
-                    "-of", "default=noprint_wrappers=1:nokey=1",
-                    audio_path
-                ]
+            # 优先只读取文件头获取时长，无法识别时使用FFprobe
+            duration = self._read_header_duration(audio_path)
+            if duration is None:
+                try:
+                    # FFprobe命令
+                    ffprobe_cmd = [
+                        self._get_ffprobe_cmd(),
+                        "-v", "error",
+                        "-show_entries", "format=duration",
+                        "-of", "default=noprint_wrappers=1:nokey=1",
+                        audio_path
+                    ]
                 
-                result = subprocess.run(
-                    ffprobe_cmd, 
-                    capture_output=True, 
-                    text=True, 
-                    check=True
-                )
+                    result = self._run_command(
+                        ffprobe_cmd, 
+                        "probe_audio_duration",
+                        capture_output=True, 
+                        text=True, 
+                        check=True
+                    )
                 
-                # 解析时长
-                if result.stdout.strip():
-                    duration = float(result.stdout.strip())
-                    self.logger.debug(f"使用FFprobe获取音频时长成功: {audio_path}, 时长: {duration}秒")
-            except Exception as e:
-                self.logger.warning(f"使用FFprobe获取音频时长失败: {audio_path}, 错误: {str(e)}")
-                # 继续尝试其他方法
+                    # 解析时长
+                    if result.stdout.strip():
+                        duration = float(result.stdout.strip())
+                        self.logger.debug(f"使用FFprobe获取音频时长成功: {audio_path}, 时长: {duration}秒")
+                except Exception as e:
+                    self.logger.warning(f"使用FFprobe获取音频时长失败: {audio_path}, 错误: {str(e)}")
+                    # 继续尝试其他方法
             
             # 如果FFprobe失败，尝试使用mutagen
             if duration is None:
@@ -1131,6 +2012,24 @@ class VideoProcessor:
         self.logger.info(f"在文件夹 {folder_path} 中找到{len(media_files)} 个{folder_type}文件")
         return media_files
 
+    def _read_header_duration(self, media_path):
+        """
+        只读取文件头获取媒体时长（MP4/MOV/MKV/MP3/WAV/M4A）
+        
+        Args:
+            media_path: 媒体文件路径
+            
+        Returns:
+            float: 时长（秒），未开启或无法识别时返回None
+        """
+        if not self.settings.get("header_probe", True):
+            return None
+        with self.tracer.span("read_header", category="python"):
+            duration = read_duration(media_path)
+        if duration is not None:
+            logger.debug(f"从文件头获取时长: {media_path}, 时长: {duration:.2f}秒")
+        return duration
+
     def _get_video_duration_fast(self, video_path):
         """
         快速获取视频时长，优先使用FFprobe，其次MoviePy，最后是OpenCV
@@ -1152,13 +2051,18 @@ class VideoProcessor:
         if not os.path.exists(video_path):
             logger.warning(f"视频文件不存在: {video_path}")
             return 0.0
+        
+        # 优先只读取文件头（不启动子进程）
+        duration = self._read_header_duration(video_path)
+        if duration is not None:
+            return duration
             
-        # 尝试使用FFprobe获取时长（最快）
+        # 尝试使用FFprobe获取时长
         try:
             import subprocess
-            ffprobe_cmd = self._get_ffmpeg_cmd().replace("ffmpeg", "ffprobe")
+            ffprobe_cmd = self._get_ffprobe_cmd()
             cmd = [ffprobe_cmd, "-v", "error", "-show_entries", "format=duration", "-of", "default=noprint_wrappers=1:nokey=1", video_path]
-            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=5)
+            result = self._run_command(cmd, "probe_video_duration", stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=5)
             if result.returncode == 0 and result.stdout.strip():
                 duration = float(result.stdout.strip())
                 logger.debug(f"使用FFprobe获取视频时长: {video_path}, 时长: {duration:.2f}秒")
@@ -1230,6 +2134,11 @@ class VideoProcessor:
         # 确保路径是字符串类型
         if not isinstance(video_path, str):
             video_path = str(video_path)
+        
+        # 优先只读取文件头（不启动子进程）
+        duration = self._read_header_duration(video_path)
+        if duration is not None:
+            return duration
             
         # 在Windows系统上使用Shell32.dll直接读取文件属性
         if sys.platform == 'win32':
@@ -1434,11 +2343,11 @@ class VideoProcessor:
         # 尝试使用FFprobe获取时长（最快）
         try:
             import subprocess
-            ffprobe_cmd = self._get_ffmpeg_cmd().replace("ffmpeg", "ffprobe")
+            ffprobe_cmd = self._get_ffprobe_cmd()
             cmd = [ffprobe_cmd, "-v", "error", "-show_entries", 
                    "format=duration : stream=sample_rate,channels", 
                    "-of", "default=noprint_wrappers=1:nokey=1", audio_path]
-            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=5)
+            result = self._run_command(cmd, "probe_audio_metadata", stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=5)
             if result.returncode == 0 and result.stdout.strip():
                 lines = result.stdout.strip().split('\n')
                 if len(lines) >= 3:
@@ -1491,6 +2400,10 @@ class VideoProcessor:
         """
         logger.info(f"开始处理单个视频 {output_path}")
         
+        # 每个输出单独记录已选片段的指纹
+        self._output_clip_hashes = []
+        self._last_planned_duration = None
+        
         # 确保设置开始时间（如果尚未设置）
         if self.start_time == 0:
             self.start_time = time.time()
@@ -1516,7 +2429,6 @@ class VideoProcessor:
             self.report_progress(f"准备场景素材", progress_start + 5)
             
             scenes = []
-            scene_concat_files = []
             
             # 计算每个场景的进度
             progress_range = progress_end - progress_start
@@ -1593,121 +2505,495 @@ class VideoProcessor:
             os.makedirs(concat_dir, exist_ok=True)
             
             # 阶段2: 视频处理阶段 - 创建每个场景的临时输出
-            scene_videos = []
+            # 处理每个场景：选择片段串行进行，各场景的FFmpeg命令最多scene_concurrency个同时执行，
+            # 结果按场景顺序收集，最终拼接顺序与素材顺序一致
+            scene_count = len(scenes)
+            self._scenes_completed = 0
+            scene_workers = max(1, min(scene_count, int(self.settings.get("scene_concurrency", 4)) or 1))
+            scene_args = (scene_count, temp_dir, concat_dir, progress_start, progress_range)
+            if scene_workers == 1:
+                scene_results = [self._process_scene(i, scene, *scene_args) for i, scene in enumerate(scenes)]
+            else:
+                parent = self.tracer.current_span()
+                
+                def _process_in_worker(i, scene):
+                    with self.tracer.adopt(parent):
+                        return self._process_scene(i, scene, *scene_args)
+                
+                with ThreadPoolExecutor(max_workers=scene_workers) as executor:
+                    futures = [executor.submit(_process_in_worker, i, scene) for i, scene in enumerate(scenes)]
+                    # 等待全部结束后再抛出第一个异常，避免遗留未完成的命令
+                    scene_results, first_error = [], None
+                    for future in futures:
+                        try:
+                            scene_results.append(future.result())
+                        except Exception as e:
+                            scene_results.append(None)
+                            if first_error is None:
+                                first_error = e
+                if first_error is not None:
+                    raise first_error
+            
+            if self.stop_requested:
+                raise InterruptedError("用户停止了处理")
+            
+            # 每个场景的计划时长（配音时长），没有配音的场景为None，用于合成后校验
+            scene_videos = [result[0] for result in scene_results if result]
+            planned_durations = [result[1] for result in scene_results if result]
+            
+            # 没有处理好的场景视频，提前返回
+            if not scene_videos:
+                logger.error("没有生成任何场景视频，处理结束")
+                return None
             
-            # 处理每个场景
-            for i, scene in enumerate(scenes):
-                # 计算当前场景的进度范围
-                scene_progress_start = progress_start + (progress_range * i / len(scenes))
-                scene_progress_end = progress_start + (progress_range * (i + 1) / len(scenes))
+            self._last_planned_duration = None if None in planned_durations else sum(planned_durations)
+
+            # 阶段3: 最终合并阶段 - 拼接所有场景视频
+            logger.info(f"开始拼接{len(scene_videos)} 个场景视频...")
+            
+            # 创建最终concat文件
+            concat_file = os.path.join(temp_dir, "final_concat.txt")
+            try:
+                with open(concat_file, "w", encoding="utf-8") as f:
+                    for scene_video in scene_videos:
+                        # 确保路径是字符串
+                        if not isinstance(scene_video, str):
+                            scene_video = str(scene_video)
+                        
+                        # 处理路径中的单引号
+                        scene_video_escaped = scene_video.replace("'", "\\'")
+                        f.write(f"file '{scene_video_escaped}'\n")
+            except Exception as e:
+                logger.error(f"创建concat文件失败: {str(e)}")
+                return None
+            
+            # 拼接所有视频
+            merge_cmd = [
+                self._get_ffmpeg_cmd(),
+                "-y",
+                "-f", "concat",
+                "-safe", "0",
+                "-i", concat_file,
+                "-fps_mode", "cfr",  # 使用恒定帧率模式代替旧的vsync
+                "-r", "30",  # 强制使用30fps的输出帧率
+                "-fflags", "+genpts",  # 生成准确的时间戳
+                "-avoid_negative_ts", "make_zero",  # 避免负时间戳
+                "-max_muxing_queue_size", "1024",  # 增加复用队列大小
+                "-async", "1",  # 音频同步处理
+                "-c:v", "copy",  # 不重新编码视频
+                "-c:a", "aac"  # 音频强制编码为AAC以提高兼容性
+            ]
+            
+            # 添加背景音乐
+            if bgm_path and os.path.exists(bgm_path):
+                # 拼接没有音频的视频版本
+                temp_merge_without_audio = os.path.join(temp_dir, "temp_merged_no_audio.mp4")
+                temp_merge_cmd = merge_cmd.copy()
+                temp_merge_cmd.append("-an")  # 去除音频
+                temp_merge_cmd.append(temp_merge_without_audio)
                 
-                # 报告具体的场景处理
-                self.report_progress(f"处理场景 {i+1}/{len(scenes)}", scene_progress_start)
+                try:
+                    # 修改此部分，直接使用concat合并的视频音频
+                    # 不再单独提取音频，而是使用原始场景视频的音频（含配音和缓冲）
+                    temp_with_original_audio = os.path.join(temp_dir, "temp_with_original_audio.mp4")
+                    
+                    # 先合并所有场景视频（保留原始配音+缓冲）
+                    original_audio_cmd = merge_cmd.copy()
+                    original_audio_cmd.append(temp_with_original_audio)
+                    
+                    # 两次合并互不依赖，并发执行
+                    logger.info(f"创建无音频临时合并视频: {' '.join(temp_merge_cmd)}")
+                    logger.info(f"合并保留原始音频（配音+缓冲）的场景视频: {' '.join(original_audio_cmd)}")
+                    self._run_commands([
+                        (temp_merge_cmd, "merge_scenes_no_audio"),
+                        (original_audio_cmd, "merge_scenes"),
+                    ], check=True)
+                    
+                    # 从合并视频中提取音频（保留了每个配音间的缓冲）
+                    temp_audio = os.path.join(temp_dir, "temp_original_audio.aac")
+                    audio_extract_cmd = [
+                        self._get_ffmpeg_cmd(),
+                        "-y",
+                        "-i", temp_with_original_audio,  # 合并后的含原始音频的视频
+                        "-c:a", "aac",
+                        "-vn",  # 不包含视频
+                        temp_audio
+                    ]
+                    
+                    logger.info(f"提取合并视频的原始音频（保留每个配音间的0.1秒留白）: {' '.join(audio_extract_cmd)}")
+                    self._run_command(audio_extract_cmd, "extract_voice_track", check=True)
+                    
+                    # 配音已在各场景合成时统一响度，背景音乐在此统一到相同响度后再乘以bgm_volume
+                    bgm_volume = self.settings.get('bgm_volume', 0.3) * self._loudness_gain(bgm_path)
+                    
+                    # 添加背景音乐和原始音频
+                    audio_mix_cmd = [
+                        self._get_ffmpeg_cmd(),
+                        "-y",
+                        "-i", temp_merge_without_audio,  # 视频（无音频）
+                        "-i", temp_audio,  # 原始音频（已包含配音间的留白）
+                        "-i", bgm_path,  # 背景音乐
+                        "-filter_complex",
+                        f"[1:a]aformat=sample_fmts=fltp:sample_rates=44100:channel_layouts=stereo,volume={self.settings.get('voice_volume', 1.0)}[voice];" +
+                        f"[2:a]aformat=sample_fmts=fltp:sample_rates=44100:channel_layouts=stereo,volume={bgm_volume:.4f}[bgm];" +
+                        "[voice][bgm]amix=inputs=2:duration=first[aout]",
+                        "-map", "0:v:0",  # 使用第一个输入的视频流
+                        "-map", "[aout]",  # 使用混合后的音频流
+                        "-fps_mode", "cfr",  # 使用恒定帧率模式代替旧的vsync
+                        "-r", "30",  # 强制使用30fps的输出帧率
+                        "-fflags", "+genpts",  # 生成准确的时间戳
+                        "-avoid_negative_ts", "make_zero",  # 避免负时间戳
+                        "-max_muxing_queue_size", "1024",  # 增加复用队列大小
+                        "-async", "1",  # 音频同步处理
+                        "-c:v", "copy",  # 不重新编码视频
+                        "-c:a", "aac",  # 音频使用AAC编码
+                        output_path
+                    ]
+                    
+                    logger.info(f"添加背景音乐: {' '.join(audio_mix_cmd)}")
+                    self._run_command(audio_mix_cmd, "mix_bgm", check=True)
+                    
+                    return output_path
+                except InterruptedError:
+                    raise
+                except Exception as e:
+                    logger.error(f"添加背景音乐失败: {str(e)}")
+                    # 如果背景音乐处理失败，尝试使用原始合并视频
+                    try:
+                        import shutil
+                        logger.warning("尝试使用无背景音乐的版本...")
+                        shutil.copy(temp_merge_without_audio, output_path)
+                        return output_path
+                    except Exception as copy_error:
+                        logger.error(f"复制备份视频失败: {str(copy_error)}")
+                        return None
+            else:
+                # 没有背景音乐，直接输出
+                merge_cmd.append(output_path)
+                
+                try:
+                    logger.info(f"合并所有场景视频: {' '.join(merge_cmd)}")
+                    self._run_command(merge_cmd, "merge_scenes", check=True)
+                    return output_path
+                except InterruptedError:
+                    raise
+                except Exception as e:
+                    logger.error(f"合并视频失败: {str(e)}")
+                    return None
+                
+        except InterruptedError:
+            raise
+        except Exception as e:
+            logger.error(f"处理视频时出错: {str(e)}")
+            import traceback
+            logger.error(traceback.format_exc())
+            return None
+        
+        finally:
+            # 清理临时文件
+            if self.settings.get("clean_temp_files", True):
+                try:
+                    import shutil
+                    logger.info(f"清理临时文件: {temp_dir}")
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+                except Exception as e:
+                    logger.warning(f"清理临时文件失败: {str(e)}")
+            
+            # 释放内存
+            gc.collect()
+
+    def _run_scene_command(self, cmd: List[str], label: str, **kwargs) -> subprocess.CompletedProcess:
+        """
+        在场景处理中执行FFmpeg命令：执行期间释放选片锁，让其他场景可以继续选片和执行命令
+        
+        Args:
+            cmd: 命令参数列表
+            label: 阶段名称
+            **kwargs: subprocess.run的参数
+        """
+        self._selection_lock.release()
+        try:
+            return self._run_command(cmd, label, **kwargs)
+        finally:
+            self._selection_lock.acquire()
+    
+    def _process_scene(self, i: int, scene: Dict[str, Any], scene_count: int, temp_dir: str,
+                       concat_dir: str, progress_start: float, progress_range: float) -> Optional[Tuple[str, Optional[float]]]:
+        """
+        处理一个场景：选择配音和视频片段，拼接并替换配音，生成场景视频
+        
+        选片会修改已使用片段记录和指纹等共享状态，因此整个过程持有选片锁，
+        只在执行FFmpeg命令时释放，多个场景可以同时处理
+        
+        Args:
+            i: 场景序号（从0开始）
+            scene: 场景信息（key、videos、audios、extract_mode）
+            scene_count: 场景总数
+            temp_dir: 本次输出的临时目录
+            concat_dir: 拼接列表文件目录
+            progress_start: 进度起始百分比
+            progress_range: 进度范围
+            
+        Returns:
+            Tuple[str, Optional[float]]: (场景视频路径, 计划时长)，场景被跳过或处理失败时返回None
+        """
+        if self.stop_requested:
+            raise InterruptedError("用户停止了处理")
+        
+        scene_result = None
+        scene_span = self.tracer.begin("scene", index=i + 1, key=scene["key"])
+        self._selection_lock.acquire()
+        try:
+            # 多个场景同时处理，进度按已完成的场景数计算，进度条不会后退
+            scene_progress = progress_start + (progress_range * self._scenes_completed / scene_count)
+            
+            # 报告具体的场景处理
+            self.report_progress(f"处理场景 {i+1}/{scene_count}", scene_progress)
+            
+            # 创建场景临时输出文件
+            scene_output = os.path.join(temp_dir, f"scene_{i+1}.mp4")
+            
+            # 准备场景的视频和音频
+            scene_videos_list = scene["videos"]
+            scene_audios_list = scene["audios"]
+            
+            # 确定场景的音频时长 - 如果有多个音频，随机选择一个或使用默认时长
+            scene_audio_duration = 0
+            scene_audio_file = None
+            selected_audio = None
+            
+            if scene_audios_list:
+                # 使用新方法随机选择一个音频文件
+                with self.tracer.span("select_clips", scene=i + 1):
+                    selected_audio = (self._reserved_pick(scene["key"], "audio")
+                                      or self._get_random_audio(scene["key"], scene_audios_list))
+                scene_audio_duration = selected_audio.get("duration", 0)
+                scene_audio_file = selected_audio.get("path")
+                logger.info(f"场景 {i+1} 选择配音: {os.path.basename(scene_audio_file)}, 时长: {scene_audio_duration:.2f}秒")
                 
-                # 创建场景临时输出文件
-                scene_output = os.path.join(temp_dir, f"scene_{i+1}.mp4")
+                self.report_progress(f"选择配音 {os.path.basename(scene_audio_file)}", scene_progress)
+            else:
+                # 使用默认的音频时长
+                scene_audio_duration = self.settings.get("default_audio_duration", 10.0)
+                logger.info(f"场景 {i+1} 使用默认配音时长: {scene_audio_duration:.2f}秒")
                 
-                # 准备场景的视频和音频
-                scene_videos_list = scene["videos"]
-                scene_audios_list = scene["audios"]
+                self.report_progress(f"使用默认配音设置", scene_progress)
+            
+            # 【工作原理实现】使用用户设置的抽取模式，而不是自动决定
+            use_multi_video = scene.get("extract_mode") == "multi_video"
+            logger.info(f"场景 {i+1} 使用抽取模式: {'多视频混剪' if use_multi_video else '单视频'}")
+            
+            # 根据模式处理视频
+            if use_multi_video:
+                # 多视频模式 - 随机选择多个视频直到总时长超过配音时长
+                logger.info(f"场景 {i+1} 使用多视频混剪模式 配音时长 {scene_audio_duration:.2f}秒")
                 
-                # 确定场景的音频时长 - 如果有多个音频，随机选择一个或使用默认时长
-                scene_audio_duration = 0
-                scene_audio_file = None
+                self.report_progress(f"多视频混剪: 随机选择多个视频片段", scene_progress)
                 
-                if scene_audios_list:
-                    # 使用新方法随机选择一个音频文件
-                    selected_audio = self._get_random_audio(scene["key"], scene_audios_list)
-                    scene_audio_duration = selected_audio.get("duration", 0)
-                    scene_audio_file = selected_audio.get("path")
-                    logger.info(f"场景 {i+1} 选择配音: {os.path.basename(scene_audio_file)}, 时长: {scene_audio_duration:.2f}秒")
+                if scene_videos_list:
+                    with self.tracer.span("select_clips", scene=i + 1):
+                        selected_videos, total_video_duration = self._select_multi_clips(
+                            scene["key"], scene_videos_list, scene_audio_duration, f"场景{i+1}")
+                    used_videos = self.used_videos_by_folder[scene["key"]]
                     
-                    self.report_progress(f"选择配音 {os.path.basename(scene_audio_file)}", scene_progress_start + 5)
-                else:
-                    # 使用默认的音频时长
-                    scene_audio_duration = self.settings.get("default_audio_duration", 10.0)
-                    logger.info(f"场景 {i+1} 使用默认配音时长: {scene_audio_duration:.2f}秒")
+                    if not selected_videos:
+                        logger.warning(f"场景 {i+1} 没有找到足够的视频，跳过")
+                        self.report_progress(f"警告: 场景 {i+1} 没有找到足够的视频", scene_progress)
+                        return None
                     
-                    self.report_progress(f"使用默认配音设置", scene_progress_start + 5)
-                
-                # 【工作原理实现】使用用户设置的抽取模式，而不是自动决定
-                use_multi_video = scene.get("extract_mode") == "multi_video"
-                logger.info(f"场景 {i+1} 使用抽取模式: {'多视频混剪' if use_multi_video else '单视频'}")
-                
-                # 根据模式处理视频
-                if use_multi_video:
-                    # 多视频模式 - 随机选择多个视频直到总时长超过配音时长
-                    logger.info(f"场景 {i+1} 使用多视频混剪模式 配音时长 {scene_audio_duration:.2f}秒")
+                    logger.info(f"为场景{i+1} 选择{len(selected_videos)} 个视频，总时长{total_video_duration:.2f}秒")
                     
-                    self.report_progress(f"多视频混剪: 随机选择多个视频片段", scene_progress_start + 10)
+                    # 创建concat文件
+                    concat_file_path = os.path.join(concat_dir, f"scene_{i+1}_concat.txt")
                     
-                    if scene_videos_list:
-                        # 重置随机种子以确保随机性
-                        random.seed(time.time() + random.random())
-                        
-                        # 初始化文件夹视频使用记录
-                        if scene["key"] not in self.used_videos_by_folder:
-                            self.used_videos_by_folder[scene["key"]] = set()
-                        
-                        # 获取该文件夹已使用的视频
-                        used_videos = self.used_videos_by_folder[scene["key"]]
-                        
-                        # 将视频列表随机打乱
-                        all_videos = list(scene_videos_list)
-                        random.shuffle(all_videos)
-                        
-                        # 创建可供选择的视频列表
-                        available_videos = all_videos.copy()
-                        
-                        # 选择视频直到总时长超过音频时长
-                        selected_videos = []
-                        total_video_duration = 0
+                    with open(concat_file_path, 'w', encoding='utf-8') as concat_file:
+                        # 写入所有选择的视频（不裁剪任何视频，包括最后一个）
+                        for video in selected_videos:
+                            video_file = self._local_media(video["path"])
+                            if not isinstance(video_file, str):
+                                video_file = str(video_file)
+                            video_file_escaped = video_file.replace("'", "\\'")
+                            concat_file.write(f"file '{video_file_escaped}'\n")
+                    
+                    # 执行拼接，生成场景视频
+                    concat_cmd = [
+                        self._get_ffmpeg_cmd(),
+                        "-y",
+                        "-f", "concat",
+                        "-safe", "0",
+                        "-i", concat_file_path,
+                        "-c", "copy"  # 直接复制，不重新编码
+                    ]
+                    
+                    # 如果有音频，替换音频
+                    if scene_audio_file:
+                        # 先拼接视频到临时文件
+                        temp_video = os.path.join(temp_dir, f"temp_scene_{i+1}.mp4")
+                        concat_cmd.append(temp_video)
                         
-                        while total_video_duration < scene_audio_duration and available_videos:
-                            # 找出未使用的视频
-                            unused_videos = [v for v in available_videos if v.get("path") not in used_videos]
-                            
-                            # 如果没有未使用的视频，重置使用记录
-                            if not unused_videos:
-                                logger.info(f"场景 {i+1} 所有视频已用过一轮，重新开始")
-                                used_videos.clear()
-                                unused_videos = available_videos
+                        try:
+                            logger.info(f"拼接视频: {' '.join(concat_cmd)}")
+                            self._run_scene_command(concat_cmd, "concat_clips", check=True)
                             
-                            # 随机选择一个未使用的视频
-                            selected_video = random.choice(unused_videos)
-                            video_duration = selected_video.get("duration", 0)
+                            # 验证拼接后的视频时长是否真的大于配音时长
+                            actual_video_duration = self._get_video_duration_fast(temp_video)
+                            logger.info(f"场景 {i+1} 拼接后视频实际时长: {actual_video_duration:.2f}秒, 配音时长: {scene_audio_duration:.2f}秒")
                             
-                            # 添加到已选择列表和已使用记录
-                            selected_videos.append(selected_video)
-                            used_videos.add(selected_video.get("path"))
+                            # 如果拼接后视频时长小于配音时长，则继续添加更多视频
+                            while actual_video_duration < scene_audio_duration and scene_videos_list:
+                                logger.warning(f"场景 {i+1} 拼接后视频时长({actual_video_duration:.2f}秒)小于配音时长({scene_audio_duration:.2f}秒)，需要添加更多视频")
+                                
+                                # 再选择几个视频
+                                buffer_duration = scene_audio_duration - actual_video_duration + 0.5  # 额外增加0.5秒缓冲
+                                additional_videos = []
+                                additional_duration = 0
+                                
+                                # 将视频列表随机打乱
+                                all_remaining_videos = list(scene_videos_list)
+                                random.shuffle(all_remaining_videos)
+                                
+                                # 创建可供选择的视频列表
+                                available_videos = [v for v in all_remaining_videos if v.get("path") not in used_videos]
+                                if not available_videos:
+                                    # 如果没有未使用的视频，重置使用记录
+                                    logger.info(f"场景 {i+1} 所有视频已用过一轮，重新开始")
+                                    # 保留已选的视频仍然标记为已使用
+                                    temp_used = set()
+                                    for v in selected_videos:
+                                        temp_used.add(v.get("path"))
+                                    used_videos = temp_used
+                                    available_videos = all_remaining_videos
+                                
+                                # 继续选择视频直到时长足够
+                                while additional_duration < buffer_duration and available_videos:
+                                    # 随机选择一个未使用的视频
+                                    additional_video = random.choice(self._dissimilar_clips(available_videos))
+                                    self._remember_clip(additional_video)
+                                    video_duration = additional_video.get("duration", 0)
+                                    
+                                    # 添加到已选择列表和已使用记录
+                                    additional_videos.append(additional_video)
+                                    selected_videos.append(additional_video)
+                                    used_videos.add(additional_video.get("path"))
+                                    
+                                    # 从可用列表中移除已选择的视频
+                                    available_videos = [v for v in available_videos if v.get("path") != additional_video.get("path")]
+                                    
+                                    # 累加时长
+                                    additional_duration += video_duration
+                                    total_video_duration += video_duration
+                                    
+                                    logger.info(f"为场景{i+1}选择额外补充视频: {os.path.basename(additional_video.get('path'))}, "
+                                              f"累计补充时长: {additional_duration:.2f}/{buffer_duration:.2f}秒")
+                                
+                                # 更新已使用视频记录
+                                self.used_videos_by_folder[scene["key"]] = used_videos
+                                
+                                # 创建新的concat文件
+                                os.remove(concat_file_path)  # 删除原来的concat文件
+                                with open(concat_file_path, 'w', encoding='utf-8') as concat_file:
+                                    # 写入所有选择的视频（包括新添加的）
+                                    for video in selected_videos:
+                                        video_file = self._local_media(video["path"])
+                                        if not isinstance(video_file, str):
+                                            video_file = str(video_file)
+                                        video_file_escaped = video_file.replace("'", "\\'")
+                                        concat_file.write(f"file '{video_file_escaped}'\n")
+                                
+                                # 重新执行拼接命令
+                                concat_cmd = [
+                                    self._get_ffmpeg_cmd(),
+                                    "-y",
+                                    "-f", "concat",
+                                    "-safe", "0",
+                                    "-i", concat_file_path,
+                                    "-c", "copy",  # 直接复制，不重新编码
+                                    temp_video
+                                ]
+                                
+                                logger.info(f"重新拼接视频: {' '.join(concat_cmd)}")
+                                self._run_scene_command(concat_cmd, "concat_clips", check=True)
+                                
+                                # 重新获取拼接后的视频时长
+                                actual_video_duration = self._get_video_duration_fast(temp_video)
+                                logger.info(f"场景 {i+1} 重新拼接后视频实际时长: {actual_video_duration:.2f}秒, 配音时长: {scene_audio_duration:.2f}秒")
                             
-                            # 从可用列表中移除已选择的视频
-                            available_videos = [v for v in available_videos if v.get("path") != selected_video.get("path")]
+                            # 替换音频 - 不使用-t参数限制时长，而是使用shortest参数
+                            audio_cmd = [
+                                self._get_ffmpeg_cmd(),
+                                "-y",
+                                "-i", temp_video,  # 视频输入
+                                "-i", self._local_media(scene_audio_file),  # 音频输入
+                                "-map", "0:v:0",  # 使用第一个输入的视频
+                                "-map", "1:a:0",  # 使用第二个输入的音频
+                                *self._voice_gain_args(selected_audio),  # 配音响度增益
+                                "-c:v", "copy",  # 不重新编码视频
+                                "-c:a", "aac",  # 音频转AAC格式（兼容性好）
+                                "-fps_mode", "cfr",  # 使用恒定帧率模式代替旧的vsync
+                                "-r", "30",  # 强制使用30fps的输出帧率
+                                "-fflags", "+genpts",  # 生成准确的时间戳
+                                "-avoid_negative_ts", "make_zero",  # 避免负时间戳
+                                "-max_muxing_queue_size", "1024",  # 增加复用队列大小
+                                "-async", "1",  # 音频同步处理
+                                "-shortest",  # 输出长度与最短的输入流一致
+                                scene_output
+                            ]
                             
-                            # 累加时长
-                            total_video_duration += video_duration
+                            logger.info(f"替换音频: {' '.join(audio_cmd)}")
+                            self._run_scene_command(audio_cmd, "mux_voice", check=True)
                             
-                            logger.info(f"为场景{i+1}选择视频: {os.path.basename(selected_video.get('path'))}, "
-                                       f"累计时长: {total_video_duration:.2f}/{scene_audio_duration:.2f}秒")
-                        
-                        # 更新已使用视频记录
-                        self.used_videos_by_folder[scene["key"]] = used_videos
+                            # 添加到场景视频列表
+                            scene_result = (scene_output, scene_audio_duration if scene_audio_file else None)
+                            logger.info(f"场景 {i+1} 处理完成")
+                        except InterruptedError:
+                            raise
+                        except Exception as e:
+                            logger.error(f"处理场景 {i+1} 失败: {str(e)}")
+                    else:
+                        # 没有音频，直接输出到场景视频文件
+                        concat_cmd.append(scene_output)
                         
-                        if not selected_videos:
-                            logger.warning(f"场景 {i+1} 没有找到足够的视频，跳过")
-                            self.report_progress(f"警告: 场景 {i+1} 没有找到足够的视频", scene_progress_start + 15)
-                            continue
+                        try:
+                            logger.info(f"拼接视频: {' '.join(concat_cmd)}")
+                            self._run_scene_command(concat_cmd, "concat_clips", check=True)
+                            
+                            # 添加到场景视频列表
+                            scene_result = (scene_output, scene_audio_duration if scene_audio_file else None)
+                            logger.info(f"场景 {i+1} 处理完成")
+                        except InterruptedError:
+                            raise
+                        except Exception as e:
+                            logger.error(f"处理场景 {i+1} 失败: {str(e)}")
+                else:
+                    logger.warning(f"场景 {i+1} 没有视频文件，跳过")
+            else:
+                # 单视频模式 - 随机选择一个时长足够的视频
+                logger.info(f"场景 {i+1} 使用单视频模式 配音时长 {scene_audio_duration:.2f}秒")
+                
+                if scene_videos_list:
+                    # 直接传入配音时长+0.1秒作为最小时长要求，确保选出的视频时长足够
+                    min_duration = scene_audio_duration + 0.1  # 增加0.1秒缓冲
+                    with self.tracer.span("select_clips", scene=i + 1):
+                        selected_video = (self._reserved_pick(scene["key"], "single", min_duration)
+                                          or self._get_random_video(scene["key"], scene_videos_list, min_duration))
+                    
+                    # 如果没有找到足够长的视频，则自动切换到多视频模式
+                    if not selected_video:
+                        logger.warning(f"场景 {i+1} 没有找到时长大于{min_duration:.2f}秒的视频，自动切换到多视频模式")
                         
-                        logger.info(f"为场景{i+1} 选择{len(selected_videos)} 个视频，总时长{total_video_duration:.2f}秒")
+                        with self.tracer.span("select_clips", scene=i + 1):
+                            selected_videos, total_video_duration = self._select_multi_clips(
+                                scene["key"], scene_videos_list, scene_audio_duration, f"场景{i+1}")
+                        used_videos = self.used_videos_by_folder[scene["key"]]
                         
+                        # 剩余代码与多视频模式相同，继续执行拼接和音频替换...
                         # 创建concat文件
                         concat_file_path = os.path.join(concat_dir, f"scene_{i+1}_concat.txt")
-                        scene_concat_files.append(concat_file_path)
                         
                         with open(concat_file_path, 'w', encoding='utf-8') as concat_file:
                             # 写入所有选择的视频（不裁剪任何视频，包括最后一个）
                             for video in selected_videos:
-                                video_file = video["path"]
+                                video_file = self._local_media(video["path"])
                                 if not isinstance(video_file, str):
                                     video_file = str(video_file)
                                 video_file_escaped = video_file.replace("'", "\\'")
@@ -1731,7 +3017,7 @@ class VideoProcessor:
                             
                             try:
                                 logger.info(f"拼接视频: {' '.join(concat_cmd)}")
-                                subprocess.run(concat_cmd, check=True)
+                                self._run_scene_command(concat_cmd, "concat_clips", check=True)
                                 
                                 # 验证拼接后的视频时长是否真的大于配音时长
                                 actual_video_duration = self._get_video_duration_fast(temp_video)
@@ -1765,7 +3051,8 @@ class VideoProcessor:
                                     # 继续选择视频直到时长足够
                                     while additional_duration < buffer_duration and available_videos:
                                         # 随机选择一个未使用的视频
-                                        additional_video = random.choice(available_videos)
+                                        additional_video = random.choice(self._dissimilar_clips(available_videos))
+                                        self._remember_clip(additional_video)
                                         video_duration = additional_video.get("duration", 0)
                                         
                                         # 添加到已选择列表和已使用记录
@@ -1791,7 +3078,7 @@ class VideoProcessor:
                                     with open(concat_file_path, 'w', encoding='utf-8') as concat_file:
                                         # 写入所有选择的视频（包括新添加的）
                                         for video in selected_videos:
-                                            video_file = video["path"]
+                                            video_file = self._local_media(video["path"])
                                             if not isinstance(video_file, str):
                                                 video_file = str(video_file)
                                             video_file_escaped = video_file.replace("'", "\\'")
@@ -1809,7 +3096,7 @@ class VideoProcessor:
                                     ]
                                     
                                     logger.info(f"重新拼接视频: {' '.join(concat_cmd)}")
-                                    subprocess.run(concat_cmd, check=True)
+                                    self._run_scene_command(concat_cmd, "concat_clips", check=True)
                                     
                                     # 重新获取拼接后的视频时长
                                     actual_video_duration = self._get_video_duration_fast(temp_video)
@@ -1820,9 +3107,10 @@ class VideoProcessor:
                                     self._get_ffmpeg_cmd(),
                                     "-y",
                                     "-i", temp_video,  # 视频输入
-                                    "-i", scene_audio_file,  # 音频输入
+                                    "-i", self._local_media(scene_audio_file),  # 音频输入
                                     "-map", "0:v:0",  # 使用第一个输入的视频
                                     "-map", "1:a:0",  # 使用第二个输入的音频
+                                    *self._voice_gain_args(selected_audio),  # 配音响度增益
                                     "-c:v", "copy",  # 不重新编码视频
                                     "-c:a", "aac",  # 音频转AAC格式（兼容性好）
                                     "-fps_mode", "cfr",  # 使用恒定帧率模式代替旧的vsync
@@ -1836,11 +3124,13 @@ class VideoProcessor:
                                 ]
                                 
                                 logger.info(f"替换音频: {' '.join(audio_cmd)}")
-                                subprocess.run(audio_cmd, check=True)
+                                self._run_scene_command(audio_cmd, "mux_voice", check=True)
                                 
                                 # 添加到场景视频列表
-                                scene_videos.append(scene_output)
+                                scene_result = (scene_output, scene_audio_duration if scene_audio_file else None)
                                 logger.info(f"场景 {i+1} 处理完成")
+                            except InterruptedError:
+                                raise
                             except Exception as e:
                                 logger.error(f"处理场景 {i+1} 失败: {str(e)}")
                         else:
@@ -1849,471 +3139,89 @@ class VideoProcessor:
                             
                             try:
                                 logger.info(f"拼接视频: {' '.join(concat_cmd)}")
-                                subprocess.run(concat_cmd, check=True)
+                                self._run_scene_command(concat_cmd, "concat_clips", check=True)
                                 
                                 # 添加到场景视频列表
-                                scene_videos.append(scene_output)
+                                scene_result = (scene_output, scene_audio_duration if scene_audio_file else None)
                                 logger.info(f"场景 {i+1} 处理完成")
+                            except InterruptedError:
+                                raise
                             except Exception as e:
                                 logger.error(f"处理场景 {i+1} 失败: {str(e)}")
-                    else:
-                        logger.warning(f"场景 {i+1} 没有视频文件，跳过")
-                else:
-                    # 单视频模式 - 随机选择一个时长足够的视频
-                    logger.info(f"场景 {i+1} 使用单视频模式 配音时长 {scene_audio_duration:.2f}秒")
-                    
-                    if scene_videos_list:
-                        # 直接传入配音时长+0.1秒作为最小时长要求，确保选出的视频时长足够
-                        min_duration = scene_audio_duration + 0.1  # 增加0.1秒缓冲
-                        selected_video = self._get_random_video(scene["key"], scene_videos_list, min_duration)
                         
-                        # 如果没有找到足够长的视频，则自动切换到多视频模式
-                        if not selected_video:
-                            logger.warning(f"场景 {i+1} 没有找到时长大于{min_duration:.2f}秒的视频，自动切换到多视频模式")
-                            
-                            # 重置随机种子以确保随机性
-                            random.seed(time.time() + random.random())
-                            
-                            # 初始化文件夹视频使用记录
-                            if scene["key"] not in self.used_videos_by_folder:
-                                self.used_videos_by_folder[scene["key"]] = set()
-                            
-                            # 获取该文件夹已使用的视频
-                            used_videos = self.used_videos_by_folder[scene["key"]]
-                            
-                            # 将视频列表随机打乱
-                            all_videos = list(scene_videos_list)
-                            random.shuffle(all_videos)
-                            
-                            # 创建可供选择的视频列表
-                            available_videos = all_videos.copy()
-                            
-                            # 选择视频直到总时长超过音频时长
-                            selected_videos = []
-                            total_video_duration = 0
-                            
-                            while total_video_duration < scene_audio_duration and available_videos:
-                                # 找出未使用的视频
-                                unused_videos = [v for v in available_videos if v.get("path") not in used_videos]
-                                
-                                # 如果没有未使用的视频，重置使用记录
-                                if not unused_videos:
-                                    logger.info(f"场景 {i+1} 所有视频已用过一轮，重新开始")
-                                    used_videos.clear()
-                                    unused_videos = available_videos
-                                
-                                # 随机选择一个未使用的视频
-                                selected_video = random.choice(unused_videos)
-                                video_duration = selected_video.get("duration", 0)
-                                
-                                # 添加到已选择列表和已使用记录
-                                selected_videos.append(selected_video)
-                                used_videos.add(selected_video.get("path"))
-                                
-                                # 从可用列表中移除已选择的视频
-                                available_videos = [v for v in available_videos if v.get("path") != selected_video.get("path")]
-                                
-                                # 累加时长
-                                total_video_duration += video_duration
-                                
-                                logger.info(f"为场景{i+1}选择视频: {os.path.basename(selected_video.get('path'))}, "
-                                           f"累计时长: {total_video_duration:.2f}/{scene_audio_duration:.2f}秒")
-                            
-                            # 更新已使用视频记录
-                            self.used_videos_by_folder[scene["key"]] = used_videos
-                            
-                            # 剩余代码与多视频模式相同，继续执行拼接和音频替换...
-                            # 创建concat文件
-                            concat_file_path = os.path.join(concat_dir, f"scene_{i+1}_concat.txt")
-                            scene_concat_files.append(concat_file_path)
-                            
-                            with open(concat_file_path, 'w', encoding='utf-8') as concat_file:
-                                # 写入所有选择的视频（不裁剪任何视频，包括最后一个）
-                                for video in selected_videos:
-                                    video_file = video["path"]
-                                    if not isinstance(video_file, str):
-                                        video_file = str(video_file)
-                                    video_file_escaped = video_file.replace("'", "\\'")
-                                    concat_file.write(f"file '{video_file_escaped}'\n")
-                            
-                            # 执行拼接，生成场景视频
-                            concat_cmd = [
+                        # 多视频模式已处理完，跳过单视频处理
+                        return scene_result
+                    
+                    # 继续使用选择的单个视频处理
+                    video_file = self._local_media(selected_video["path"])
+                    video_duration = selected_video.get("duration", 0)
+                    logger.info(f"为场景{i+1} 选择视频: {os.path.basename(video_file)}, 时长: {video_duration:.2f}秒")
+                    
+                    # 确保视频文件路径是字符串
+                    if not isinstance(video_file, str):
+                        video_file = str(video_file)
+                    
+                    # 处理视频 - 不需要判断时长是否足够，因为已经在选择时确保了时长足够
+                    try:
+                        # 如果有音频，同时处理视频和音频
+                        if scene_audio_file:
+                            cmd = [
                                 self._get_ffmpeg_cmd(),
                                 "-y",
-                                "-f", "concat",
-                                "-safe", "0",
-                                "-i", concat_file_path,
-                                "-c", "copy"  # 直接复制，不重新编码
+                                "-i", video_file,  # 视频输入
+                                "-i", self._local_media(scene_audio_file),  # 音频输入
+                                "-map", "0:v:0",  # 使用第一个输入的视频
+                                "-map", "1:a:0",  # 使用第二个输入的音频
+                                *self._voice_gain_args(selected_audio),  # 配音响度增益
+                                "-c:v", "copy",  # 不重新编码视频
+                                "-c:a", "aac",  # 音频转AAC格式
+                                "-fps_mode", "cfr",  # 使用恒定帧率模式代替旧的vsync
+                                "-r", "30",  # 强制使用30fps的输出帧率
+                                "-fflags", "+genpts",  # 生成准确的时间戳
+                                "-avoid_negative_ts", "make_zero",  # 避免负时间戳
+                                "-max_muxing_queue_size", "1024",  # 增加复用队列大小
+                                "-async", "1",  # 音频同步处理
+                                "-shortest",  # 输出长度与最短的输入流一致
+                                scene_output
+                            ]
+                        else:
+                            # 没有音频，只处理视频
+                            cmd = [
+                                self._get_ffmpeg_cmd(),
+                                "-y",
+                                "-i", video_file,
+                                "-fps_mode", "cfr",  # 使用恒定帧率模式代替旧的vsync
+                                "-r", "30",  # 强制使用30fps的输出帧率
+                                "-fflags", "+genpts",  # 生成准确的时间戳
+                                "-avoid_negative_ts", "make_zero",  # 避免负时间戳
+                                "-max_muxing_queue_size", "1024",  # 增加复用队列大小
+                                # 删除-t参数，不限制输出时长，防止音频被截断
+                                "-c:v", "copy",  # 不重新编码视频
+                                "-c:a", "copy",  # 不重新编码音频
+                                scene_output
                             ]
-                            
-                            # 如果有音频，替换音频
-                            if scene_audio_file:
-                                # 先拼接视频到临时文件
-                                temp_video = os.path.join(temp_dir, f"temp_scene_{i+1}.mp4")
-                                concat_cmd.append(temp_video)
-                                
-                                try:
-                                    logger.info(f"拼接视频: {' '.join(concat_cmd)}")
-                                    subprocess.run(concat_cmd, check=True)
-                                    
-                                    # 验证拼接后的视频时长是否真的大于配音时长
-                                    actual_video_duration = self._get_video_duration_fast(temp_video)
-                                    logger.info(f"场景 {i+1} 拼接后视频实际时长: {actual_video_duration:.2f}秒, 配音时长: {scene_audio_duration:.2f}秒")
-                                    
-                                    # 如果拼接后视频时长小于配音时长，则继续添加更多视频
-                                    while actual_video_duration < scene_audio_duration and scene_videos_list:
-                                        logger.warning(f"场景 {i+1} 拼接后视频时长({actual_video_duration:.2f}秒)小于配音时长({scene_audio_duration:.2f}秒)，需要添加更多视频")
-                                        
-                                        # 再选择几个视频
-                                        buffer_duration = scene_audio_duration - actual_video_duration + 0.5  # 额外增加0.5秒缓冲
-                                        additional_videos = []
-                                        additional_duration = 0
-                                        
-                                        # 将视频列表随机打乱
-                                        all_remaining_videos = list(scene_videos_list)
-                                        random.shuffle(all_remaining_videos)
-                                        
-                                        # 创建可供选择的视频列表
-                                        available_videos = [v for v in all_remaining_videos if v.get("path") not in used_videos]
-                                        if not available_videos:
-                                            # 如果没有未使用的视频，重置使用记录
-                                            logger.info(f"场景 {i+1} 所有视频已用过一轮，重新开始")
-                                            # 保留已选的视频仍然标记为已使用
-                                            temp_used = set()
-                                            for v in selected_videos:
-                                                temp_used.add(v.get("path"))
-                                            used_videos = temp_used
-                                            available_videos = all_remaining_videos
-                                        
-                                        # 继续选择视频直到时长足够
-                                        while additional_duration < buffer_duration and available_videos:
-                                            # 随机选择一个未使用的视频
-                                            additional_video = random.choice(available_videos)
-                                            video_duration = additional_video.get("duration", 0)
-                                            
-                                            # 添加到已选择列表和已使用记录
-                                            additional_videos.append(additional_video)
-                                            selected_videos.append(additional_video)
-                                            used_videos.add(additional_video.get("path"))
-                                            
-                                            # 从可用列表中移除已选择的视频
-                                            available_videos = [v for v in available_videos if v.get("path") != additional_video.get("path")]
-                                            
-                                            # 累加时长
-                                            additional_duration += video_duration
-                                            total_video_duration += video_duration
-                                            
-                                            logger.info(f"为场景{i+1}选择额外补充视频: {os.path.basename(additional_video.get('path'))}, "
-                                                      f"累计补充时长: {additional_duration:.2f}/{buffer_duration:.2f}秒")
-                                        
-                                        # 更新已使用视频记录
-                                        self.used_videos_by_folder[scene["key"]] = used_videos
-                                        
-                                        # 创建新的concat文件
-                                        os.remove(concat_file_path)  # 删除原来的concat文件
-                                        with open(concat_file_path, 'w', encoding='utf-8') as concat_file:
-                                            # 写入所有选择的视频（包括新添加的）
-                                            for video in selected_videos:
-                                                video_file = video["path"]
-                                                if not isinstance(video_file, str):
-                                                    video_file = str(video_file)
-                                                video_file_escaped = video_file.replace("'", "\\'")
-                                                concat_file.write(f"file '{video_file_escaped}'\n")
-                                        
-                                        # 重新执行拼接命令
-                                        concat_cmd = [
-                                            self._get_ffmpeg_cmd(),
-                                            "-y",
-                                            "-f", "concat",
-                                            "-safe", "0",
-                                            "-i", concat_file_path,
-                                            "-c", "copy",  # 直接复制，不重新编码
-                                            temp_video
-                                        ]
-                                        
-                                        logger.info(f"重新拼接视频: {' '.join(concat_cmd)}")
-                                        subprocess.run(concat_cmd, check=True)
-                                        
-                                        # 重新获取拼接后的视频时长
-                                        actual_video_duration = self._get_video_duration_fast(temp_video)
-                                        logger.info(f"场景 {i+1} 重新拼接后视频实际时长: {actual_video_duration:.2f}秒, 配音时长: {scene_audio_duration:.2f}秒")
-                                    
-                                    # 替换音频 - 不使用-t参数限制时长，而是使用shortest参数
-                                    audio_cmd = [
-                                        self._get_ffmpeg_cmd(),
-                                        "-y",
-                                        "-i", temp_video,  # 视频输入
-                                        "-i", scene_audio_file,  # 音频输入
-                                        "-map", "0:v:0",  # 使用第一个输入的视频
-                                        "-map", "1:a:0",  # 使用第二个输入的音频
-                                        "-c:v", "copy",  # 不重新编码视频
-                                        "-c:a", "aac",  # 音频转AAC格式（兼容性好）
-                                        "-fps_mode", "cfr",  # 使用恒定帧率模式代替旧的vsync
-                                        "-r", "30",  # 强制使用30fps的输出帧率
-                                        "-fflags", "+genpts",  # 生成准确的时间戳
-                                        "-avoid_negative_ts", "make_zero",  # 避免负时间戳
-                                        "-max_muxing_queue_size", "1024",  # 增加复用队列大小
-                                        "-async", "1",  # 音频同步处理
-                                        "-shortest",  # 输出长度与最短的输入流一致
-                                        scene_output
-                                    ]
-                                    
-                                    logger.info(f"替换音频: {' '.join(audio_cmd)}")
-                                    subprocess.run(audio_cmd, check=True)
-                                    
-                                    # 添加到场景视频列表
-                                    scene_videos.append(scene_output)
-                                    logger.info(f"场景 {i+1} 处理完成")
-                                except Exception as e:
-                                    logger.error(f"处理场景 {i+1} 失败: {str(e)}")
-                            else:
-                                # 没有音频，直接输出到场景视频文件
-                                concat_cmd.append(scene_output)
-                                
-                                try:
-                                    logger.info(f"拼接视频: {' '.join(concat_cmd)}")
-                                    subprocess.run(concat_cmd, check=True)
-                                    
-                                    # 添加到场景视频列表
-                                    scene_videos.append(scene_output)
-                                    logger.info(f"场景 {i+1} 处理完成")
-                                except Exception as e:
-                                    logger.error(f"处理场景 {i+1} 失败: {str(e)}")
-                            
-                            # 继续下一个场景，跳过单视频处理
-                            continue
-                        
-                        # 继续使用选择的单个视频处理
-                        video_file = selected_video["path"]
-                        video_duration = selected_video.get("duration", 0)
-                        logger.info(f"为场景{i+1} 选择视频: {os.path.basename(video_file)}, 时长: {video_duration:.2f}秒")
-                        
-                        # 确保视频文件路径是字符串
-                        if not isinstance(video_file, str):
-                            video_file = str(video_file)
                         
-                        # 处理视频 - 不需要判断时长是否足够，因为已经在选择时确保了时长足够
-                        try:
-                            # 如果有音频，同时处理视频和音频
-                            if scene_audio_file:
-                                cmd = [
-                                    self._get_ffmpeg_cmd(),
-                                    "-y",
-                                    "-i", video_file,  # 视频输入
-                                    "-i", scene_audio_file,  # 音频输入
-                                    "-map", "0:v:0",  # 使用第一个输入的视频
-                                    "-map", "1:a:0",  # 使用第二个输入的音频
-                                    "-c:v", "copy",  # 不重新编码视频
-                                    "-c:a", "aac",  # 音频转AAC格式
-                                    "-fps_mode", "cfr",  # 使用恒定帧率模式代替旧的vsync
-                                    "-r", "30",  # 强制使用30fps的输出帧率
-                                    "-fflags", "+genpts",  # 生成准确的时间戳
-                                    "-avoid_negative_ts", "make_zero",  # 避免负时间戳
-                                    "-max_muxing_queue_size", "1024",  # 增加复用队列大小
-                                    "-async", "1",  # 音频同步处理
-                                    "-shortest",  # 输出长度与最短的输入流一致
-                                    scene_output
-                                ]
-                            else:
-                                # 没有音频，只处理视频
-                                cmd = [
-                                    self._get_ffmpeg_cmd(),
-                                    "-y",
-                                    "-i", video_file,
-                                    "-fps_mode", "cfr",  # 使用恒定帧率模式代替旧的vsync
-                                    "-r", "30",  # 强制使用30fps的输出帧率
-                                    "-fflags", "+genpts",  # 生成准确的时间戳
-                                    "-avoid_negative_ts", "make_zero",  # 避免负时间戳
-                                    "-max_muxing_queue_size", "1024",  # 增加复用队列大小
-                                    # 删除-t参数，不限制输出时长，防止音频被截断
-                                    "-c:v", "copy",  # 不重新编码视频
-                                    "-c:a", "copy",  # 不重新编码音频
-                                    scene_output
-                                ]
-                            
-                            logger.info(f"处理视频: {' '.join(cmd)}")
-                            subprocess.run(cmd, check=True)
-                            
-                            # 添加到场景视频列表
-                            scene_videos.append(scene_output)
-                            logger.info(f"场景 {i+1} 处理完成")
-                        except Exception as e:
-                            logger.error(f"处理场景 {i+1} 失败: {str(e)}")
-                    else:
-                        logger.warning(f"场景 {i+1} 没有视频文件，跳过")
-            
-            # 没有处理好的场景视频，提前返回
-            if not scene_videos:
-                logger.error("没有生成任何场景视频，处理结束")
-                return None
-            
-            # 阶段3: 最终合并阶段 - 拼接所有场景视频
-            logger.info(f"开始拼接{len(scene_videos)} 个场景视频...")
-            
-            # 创建最终concat文件
-            concat_file = os.path.join(temp_dir, "final_concat.txt")
-            try:
-                with open(concat_file, "w", encoding="utf-8") as f:
-                    for scene_video in scene_videos:
-                        # 确保路径是字符串
-                        if not isinstance(scene_video, str):
-                            scene_video = str(scene_video)
+                        logger.info(f"处理视频: {' '.join(cmd)}")
+                        self._run_scene_command(cmd, "mux_single_clip", check=True)
                         
-                        # 处理路径中的单引号
-                        scene_video_escaped = scene_video.replace("'", "\\'")
-                        f.write(f"file '{scene_video_escaped}'\n")
-            except Exception as e:
-                logger.error(f"创建concat文件失败: {str(e)}")
-                return None
-            
-            # 拼接所有视频
-            merge_cmd = [
-                self._get_ffmpeg_cmd(),
-                "-y",
-                "-f", "concat",
-                "-safe", "0",
-                "-i", concat_file,
-                "-fps_mode", "cfr",  # 使用恒定帧率模式代替旧的vsync
-                "-r", "30",  # 强制使用30fps的输出帧率
-                "-fflags", "+genpts",  # 生成准确的时间戳
-                "-avoid_negative_ts", "make_zero",  # 避免负时间戳
-                "-max_muxing_queue_size", "1024",  # 增加复用队列大小
-                "-async", "1",  # 音频同步处理
-                "-c:v", "copy",  # 不重新编码视频
-                "-c:a", "aac"  # 音频强制编码为AAC以提高兼容性
-            ]
+                        # 添加到场景视频列表
+                        scene_result = (scene_output, scene_audio_duration if scene_audio_file else None)
+                        logger.info(f"场景 {i+1} 处理完成")
+                    except InterruptedError:
+                        raise
+                    except Exception as e:
+                        logger.error(f"处理场景 {i+1} 失败: {str(e)}")
+                else:
+                    logger.warning(f"场景 {i+1} 没有视频文件，跳过")
             
-            # 添加背景音乐
-            if bgm_path and os.path.exists(bgm_path):
-                # 拼接没有音频的视频版本
-                temp_merge_without_audio = os.path.join(temp_dir, "temp_merged_no_audio.mp4")
-                temp_merge_cmd = merge_cmd.copy()
-                temp_merge_cmd.append("-an")  # 去除音频
-                temp_merge_cmd.append(temp_merge_without_audio)
-                
-                try:
-                    logger.info(f"创建无音频临时合并视频: {' '.join(temp_merge_cmd)}")
-                    subprocess.run(temp_merge_cmd, check=True)
-                    
-                    # 修改此部分，直接使用concat合并的视频音频
-                    # 不再单独提取音频，而是使用原始场景视频的音频（含配音和缓冲）
-                    temp_with_original_audio = os.path.join(temp_dir, "temp_with_original_audio.mp4")
-                    
-                    # 先合并所有场景视频（保留原始配音+缓冲）
-                    original_audio_cmd = merge_cmd.copy()
-                    original_audio_cmd.append(temp_with_original_audio)
-                    
-                    logger.info(f"合并保留原始音频（配音+缓冲）的场景视频: {' '.join(original_audio_cmd)}")
-                    subprocess.run(original_audio_cmd, check=True)
-                    
-                    # 从合并视频中提取音频（保留了每个配音间的缓冲）
-                    temp_audio = os.path.join(temp_dir, "temp_original_audio.aac")
-                    audio_extract_cmd = [
-                        self._get_ffmpeg_cmd(),
-                        "-y",
-                        "-i", temp_with_original_audio,  # 合并后的含原始音频的视频
-                        "-c:a", "aac",
-                        "-vn",  # 不包含视频
-                        temp_audio
-                    ]
-                    
-                    logger.info(f"提取合并视频的原始音频（保留每个配音间的0.1秒留白）: {' '.join(audio_extract_cmd)}")
-                    subprocess.run(audio_extract_cmd, check=True)
-                    
-                    # 添加背景音乐和原始音频
-                    audio_mix_cmd = [
-                        self._get_ffmpeg_cmd(),
-                        "-y",
-                        "-i", temp_merge_without_audio,  # 视频（无音频）
-                        "-i", temp_audio,  # 原始音频（已包含配音间的留白）
-                        "-i", bgm_path,  # 背景音乐
-                        "-filter_complex",
-                        f"[1:a]aformat=sample_fmts=fltp:sample_rates=44100:channel_layouts=stereo,volume={self.settings.get('voice_volume', 1.0)}[voice];" +
-                        f"[2:a]aformat=sample_fmts=fltp:sample_rates=44100:channel_layouts=stereo,volume={self.settings.get('bgm_volume', 0.3)}[bgm];" +
-                        "[voice][bgm]amix=inputs=2:duration=first[aout]",
-                        "-map", "0:v:0",  # 使用第一个输入的视频流
-                        "-map", "[aout]",  # 使用混合后的音频流
-                        "-fps_mode", "cfr",  # 使用恒定帧率模式代替旧的vsync
-                        "-r", "30",  # 强制使用30fps的输出帧率
-                        "-fflags", "+genpts",  # 生成准确的时间戳
-                        "-avoid_negative_ts", "make_zero",  # 避免负时间戳
-                        "-max_muxing_queue_size", "1024",  # 增加复用队列大小
-                        "-async", "1",  # 音频同步处理
-                        "-c:v", "copy",  # 不重新编码视频
-                        "-c:a", "aac",  # 音频使用AAC编码
-                        output_path
-                    ]
-                    
-                    logger.info(f"添加背景音乐: {' '.join(audio_mix_cmd)}")
-                    subprocess.run(audio_mix_cmd, check=True)
-                    
-                    return output_path
-                except Exception as e:
-                    logger.error(f"添加背景音乐失败: {str(e)}")
-                    # 如果背景音乐处理失败，尝试使用原始合并视频
-                    try:
-                        import shutil
-                        logger.warning("尝试使用无背景音乐的版本...")
-                        shutil.copy(temp_merge_without_audio, output_path)
-                        return output_path
-                    except Exception as copy_error:
-                        logger.error(f"复制备份视频失败: {str(copy_error)}")
-                        return None
-            else:
-                # 没有背景音乐，直接输出
-                merge_cmd.append(output_path)
-                
-                try:
-                    logger.info(f"合并所有场景视频: {' '.join(merge_cmd)}")
-                    subprocess.run(merge_cmd, check=True)
-                    return output_path
-                except Exception as e:
-                    logger.error(f"合并视频失败: {str(e)}")
-                    return None
-                
-        except Exception as e:
-            logger.error(f"处理视频时出错: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
-            return None
-        
+            return scene_result
         finally:
-            # 清理临时文件
-            if self.settings.get("clean_temp_files", True):
-                try:
-                    import shutil
-                    logger.info(f"清理临时文件: {temp_dir}")
-                    shutil.rmtree(temp_dir, ignore_errors=True)
-                except Exception as e:
-                    logger.warning(f"清理临时文件失败: {str(e)}")
-            
-            # 释放内存
-            gc.collect()
-
-    def _get_ffmpeg_cmd(self):
-        """
-        获取FFmpeg命令
-        
-        Returns:
-            str: FFmpeg命令
-        """
-        ffmpeg_cmd = "ffmpeg"
-        
-        try:
-            # 获取项目根目录
-            project_root = Path(__file__).resolve().parent.parent.parent
-            ffmpeg_path_file = project_root / "ffmpeg_path.txt"
-            
-            if ffmpeg_path_file.exists():
-                with open(ffmpeg_path_file, 'r', encoding="utf-8") as f:
-                    custom_path = f.read().strip()
-                    if custom_path and os.path.exists(custom_path):
-                        ffmpeg_cmd = custom_path
-        except Exception as e:
-            logger.error(f"读取自定义FFmpeg路径时出错: {str(e)}")
-        
-        return ffmpeg_cmd
-
+            self._scenes_completed += 1
+            self.report_progress(f"已完成场景 {self._scenes_completed}/{scene_count}",
+                                 progress_start + (progress_range * self._scenes_completed / scene_count))
+            self._selection_lock.release()
+            self.tracer.end(scene_span)
+    
     def _get_random_video(self, folder_key: str, videos_list: List[Dict], min_duration: float = 0):
         """
         从视频列表中随机选择一个视频，并实现"用完一轮再重新开始随机"的策略
@@ -2358,16 +3266,17 @@ class VideoProcessor:
         if unused_video_paths:
             # 还有未使用的视频，从中随机选择
             unused_videos = [v for v in suitable_videos if v.get("path") in unused_video_paths]
-            selected_video = random.choice(unused_videos)
+            selected_video = random.choice(self._dissimilar_clips(unused_videos))
             logger.info(f"从{len(unused_videos)}个未使用视频中随机选择")
         else:
             # 所有视频都已使用过，重新开始，清空记录并随机选择
             self.used_videos_by_folder[folder_key].clear()
-            selected_video = random.choice(suitable_videos)
+            selected_video = random.choice(self._dissimilar_clips(suitable_videos))
             logger.info(f"所有视频已用完一轮，重新开始随机选择")
         
         # 记录已使用的视频
         self.used_videos_by_folder[folder_key].add(selected_video.get("path"))
+        self._remember_clip(selected_video)
         logger.info(f"选中视频: {os.path.basename(selected_video.get('path'))}, 时长: {selected_video.get('duration', 0):.2f}秒")
         
         return selected_video
@@ -2479,10 +3388,10 @@ class VideoProcessor:
                                 audio_path = os.path.join(root, file)
                                 # 使用FFprobe获取音频时长
                                 try:
-                                    ffprobe_cmd = self._get_ffmpeg_cmd().replace("ffmpeg", "ffprobe")
+                                    ffprobe_cmd = self._get_ffprobe_cmd()
                                     cmd_duration = [ffprobe_cmd, "-v", "error", "-show_entries", 
                                                   "format=duration", "-of", "default=noprint_wrappers=1:nokey=1", audio_path]
-                                    result = subprocess.run(cmd_duration, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=5)
+                                    result = self._run_command(cmd_duration, "probe_audio_duration", stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=5)
                                     if result.returncode == 0 and result.stdout.strip():
                                         audios_durations.append(float(result.stdout.strip()))
                                 except Exception as e:
@@ -2567,7 +3476,7 @@ class VideoProcessor:
             logger.info(f"执行备用视频拼接命令: {' '.join(cmd)}")
             
             try:
-                result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+                result = self._run_command(cmd, "fallback_concat", check=True, capture_output=True, text=True)
                 logger.info(f"备用方法成功，输出到: {output_path}")
                 self.report_progress("视频合成完成！", 100)
                 return True
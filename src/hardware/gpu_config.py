@@ -18,6 +18,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 from utils.path_utils import get_config_dir
 
 from .system_analyzer import SystemAnalyzer
+from src.utils.ffmpeg_registry import get_ffmpeg_registry
 
 # 日志设置
 logger = logging.getLogger(__name__)
@@ -91,16 +92,20 @@ class GPUConfig:
         except Exception as e:
             logger.error(f"保存GPU配置出错: {e}")
     
-    def detect_and_set_optimal_config(self):
+    def detect_and_set_optimal_config(self, system_info=None):
         """
         检测GPU并设置最优配置
         
+        Args:
+            system_info: 已有的SystemAnalyzer检测结果，为None时重新检测
+        
         Returns:
             bool: 是否成功应用硬件加速
         """
         try:
-            analyzer = SystemAnalyzer()
-            system_info = analyzer.analyze()
+            if system_info is None:
+                analyzer = SystemAnalyzer()
+                system_info = analyzer.analyze()
             gpu_info = system_info.get('gpu', {})
             
             # 检查是否有可用GPU
@@ -260,6 +265,8 @@ class GPUConfig:
             
     def _set_nvidia_config_direct(self):
         """直接设置NVIDIA GPU加速，无需深度检测"""
+        if not self.is_encoder_supported('h264_nvenc'):
+            logger.warning("当前FFmpeg未编译h264_nvenc编码器，硬件编码可能失败")
         self.config['use_hardware_acceleration'] = True
         self.config['encoder'] = 'h264_nvenc'
         self.config['decoder'] = 'h264_cuvid'
@@ -547,6 +554,21 @@ class GPUConfig:
                 return 'libx264'
         return encoder
     
+    def is_encoder_supported(self, encoder):
+        """
+        检查当前FFmpeg是否支持指定编码器（使用FFmpeg注册表的缓存信息）
+        
+        Args:
+            encoder: 编码器名称，如h264_nvenc
+            
+        Returns:
+            bool: 是否支持；FFmpeg不可用时无法判断，返回True
+        """
+        registry = get_ffmpeg_registry()
+        if not registry.available():
+            return True
+        return registry.has_encoder(encoder)
+    
     def set_compatibility_mode(self, enabled):
         """设置兼容模式状态
         
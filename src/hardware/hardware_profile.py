@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+硬件能力档案模块
+将SystemAnalyzer的检测结果和GPUConfig的编码器配置持久化到配置目录，
+以廉价的机器指纹（CPU型号、核心数、FFmpeg路径和修改时间、显卡驱动版本文件）为键：
+启动时直接加载档案，只有指纹变化时才在后台线程中重新检测
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import platform
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, Callable, List
+
+from src.utils.path_utils import get_config_dir
+from src.utils.ffmpeg_registry import get_ffmpeg_registry
+
+# 日志设置
+logger = logging.getLogger(__name__)
+
+# 档案文件路径
+CONFIG_DIR = get_config_dir()
+PROFILE_FILE = CONFIG_DIR / "hardware_profile_global.json"
+
+# 档案格式版本，版本变化时视为指纹不匹配
+PROFILE_VERSION = 1
+
+# 显卡驱动版本文件（驱动更新时这些文件的修改时间或内容会变化）
+if sys.platform == "win32":
+    _system_root = os.environ.get("SystemRoot", r"C:\Windows")
+    DRIVER_VERSION_FILES = [
+        os.path.join(_system_root, "System32", "nvapi64.dll"),
+        os.path.join(_system_root, "System32", "nvml.dll"),
+        os.path.join(_system_root, "System32", "amdxc64.dll"),
+        os.path.join(_system_root, "System32", "igdumdim64.dll"),
+    ]
+else:
+    DRIVER_VERSION_FILES = [
+        "/proc/driver/nvidia/version",
+        "/sys/module/amdgpu/version",
+        "/sys/module/i915/version",
+    ]
+
+
+def _cpu_model() -> str:
+    """获取CPU型号（只读取本地信息，不启动子进程）"""
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/cpuinfo", "r", encoding="utf-8", errors="ignore") as f:
+                for line in f:
+                    if line.startswith("model name"):
+                        return line.split(":", 1)[1].strip()
+        except OSError:
+            pass
+    if sys.platform == "win32":
+        model = os.environ.get("PROCESSOR_IDENTIFIER")
+        if model:
+            return model
+    return platform.processor() or platform.machine()
+
+
+def _ffmpeg_binary_path() -> str:
+    """获取FFmpeg可执行文件路径（由FFmpeg注册表解析，不启动子进程）"""
+    return get_ffmpeg_registry().binary_location()
+
+
+def _file_signature(path: str) -> str:
+    """文件签名：路径、修改时间和大小；小文件（如/proc下的版本文件）直接取内容"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ""
+    if stat.st_size == 0 or path.startswith(("/proc/", "/sys/")):
+        try:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                return f"{path}:{f.read(512).strip()}"
+        except OSError:
+            return ""
+    return f"{path}:{int(stat.st_mtime)}:{stat.st_size}"
+
+
+def compute_fingerprint() -> Dict[str, Any]:
+    """
+    计算机器指纹（耗时应在毫秒级，不启动任何子进程）
+
+    Returns:
+        Dict: 指纹各组成部分和整体摘要digest
+    """
+    ffmpeg_path = _ffmpeg_binary_path()
+    parts = {
+        "version": PROFILE_VERSION,
+        "cpu_model": _cpu_model(),
+        "cpu_count": os.cpu_count() or 0,
+        "ffmpeg": _file_signature(ffmpeg_path) if ffmpeg_path else "",
+        "drivers": [sig for sig in (_file_signature(p) for p in DRIVER_VERSION_FILES) if sig],
+    }
+    digest = hashlib.sha1(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+    parts["digest"] = digest
+    return parts
+
+
+class HardwareProfile:
+    """
+    持久化的硬件能力档案
+
+    用法:
+        profile = get_hardware_profile()
+        if profile.has_data():
+            gpu_info = profile.gpu_info()          # 立即可用
+        if not profile.is_fresh():
+            profile.refresh_async(callback)        # 指纹变化时后台重新检测
+    """
+
+    def __init__(self, path: Path = PROFILE_FILE):
+        """
+        初始化档案（只读取JSON文件，不做任何检测）
+
+        Args:
+            path: 档案文件路径
+        """
+        self.path = Path(path)
+        self.data: Dict[str, Any] = {}
+        self._fingerprint: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._callbacks: List[Callable[["HardwareProfile"], None]] = []
+        self.load()
+
+    def load(self):
+        """从文件加载档案"""
+        try:
+            if self.path.exists():
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.data = json.load(f)
+                logger.info(f"已从 {self.path} 加载硬件档案")
+        except Exception as e:
+            logger.warning(f"加载硬件档案出错: {e}")
+            self.data = {}
+
+    def save(self):
+        """保存档案到文件（先写临时文件再替换，避免多个标签页同时写入时损坏）"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.path)
+            logger.info(f"已保存硬件档案到 {self.path}")
+        except Exception as e:
+            logger.error(f"保存硬件档案出错: {e}")
+
+    def fingerprint(self, recompute: bool = False) -> Dict[str, Any]:
+        """获取当前机器指纹（进程内只计算一次）"""
+        if self._fingerprint is None or recompute:
+            self._fingerprint = compute_fingerprint()
+        return self._fingerprint
+
+    def has_data(self) -> bool:
+        """档案中是否有检测结果"""
+        return bool(self.data.get("system_info"))
+
+    def is_fresh(self) -> bool:
+        """档案是否与当前机器指纹匹配"""
+        return self.has_data() and self.data.get("fingerprint", {}).get("digest") == self.fingerprint()["digest"]
+
+    def system_info(self) -> Dict[str, Any]:
+        """缓存的SystemAnalyzer检测结果"""
+        return self.data.get("system_info", {})
+
+    def gpu_info(self) -> Dict[str, Any]:
+        """缓存的GPU检测结果"""
+        return self.system_info().get("gpu", {})
+
+    def gpu_configured(self) -> bool:
+        """上次检测是否成功配置了硬件加速"""
+        return bool(self.data.get("gpu_configured", False))
+
+    def update(self, system_info: Dict[str, Any], gpu_configured: bool):
+        """
+        写入新的检测结果并保存
+
+        Args:
+            system_info: SystemAnalyzer.analyze()的结果
+            gpu_configured: GPUConfig.detect_and_set_optimal_config()的结果
+        """
+        with self._lock:
+            self.data = {
+                "fingerprint": self.fingerprint(recompute=True),
+                "detected_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "system_info": system_info,
+                "gpu_configured": bool(gpu_configured),
+            }
+            self.save()
+
+    def detect(self) -> bool:
+        """
+        同步执行完整检测（深度GPU检测 + 最优编码器配置）并更新档案
+
+        Returns:
+            bool: 是否成功配置硬件加速
+        """
+        from .system_analyzer import SystemAnalyzer
+        from .gpu_config import GPUConfig
+
+        start_time = time.time()
+        system_info = SystemAnalyzer(deep_gpu_detection=True).analyze()
+        gpu_configured = False
+        if system_info.get("gpu", {}).get("available", False):
+            gpu_configured = GPUConfig().detect_and_set_optimal_config(system_info)
+        self.update(system_info, gpu_configured)
+        logger.info(f"硬件检测完成，耗时: {time.time() - start_time:.3f} 秒")
+        return gpu_configured
+
+    def refresh_async(self, callback: Callable[["HardwareProfile"], None] = None,
+                      force: bool = False) -> bool:
+        """
+        在后台线程中重新检测，同一进程内同时只运行一次检测，
+        检测期间再次调用只追加回调
+
+        Args:
+            callback: 检测完成后调用（在后台线程中），参数为档案对象
+            force: 为True时即使指纹未变化也重新检测
+
+        Returns:
+            bool: 是否启动或加入了后台检测
+        """
+        if not force and self.is_fresh():
+            return False
+        with self._lock:
+            if callback is not None:
+                self._callbacks.append(callback)
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return True
+            self._refresh_thread = threading.Thread(target=self._refresh_worker, daemon=True)
+            self._refresh_thread.start()
+        return True
+
+    def _refresh_worker(self):
+        try:
+            logger.info("硬件指纹已变化或档案不存在，后台重新检测硬件能力")
+            self.detect()
+        except Exception as e:
+            logger.error(f"后台硬件检测出错: {e}")
+        finally:
+            with self._lock:
+                callbacks, self._callbacks = self._callbacks, []
+            for callback in callbacks:
+                try:
+                    callback(self)
+                except Exception as e:
+                    logger.warning(f"硬件档案回调出错: {e}")
+
+
+# 进程内共享的档案实例
+_profile_instance: Optional[HardwareProfile] = None
+_profile_lock = threading.Lock()
+
+
+def get_hardware_profile() -> HardwareProfile:
+    """获取进程内共享的硬件档案（所有标签页共用）"""
+    global _profile_instance
+    if _profile_instance is None:
+        with _profile_lock:
+            if _profile_instance is None:
+                _profile_instance = HardwareProfile()
+    return _profile_instance
@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+资源采样监视模块
+合成任务运行期间按固定间隔（默认每秒一次）采样CPU占用、本程序及其FFmpeg子进程的常驻内存、
+磁盘读写吞吐量、IO等待和缓存/输出目录的剩余空间，任务结束时生成时间序列和汇总，
+并标记受磁盘或内存限制的任务；与SystemAnalyzer的一次性快照不同，记录的是任务全过程
+"""
+
+import time
+import shutil
+import logging
+import threading
+from typing import Callable, Dict, Any, Iterable, List, Optional
+
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
+logger = logging.getLogger(__name__)
+
+# 默认采样间隔（秒）
+DEFAULT_INTERVAL = 1.0
+
+# 判定受限的阈值：超过阈值的采样占比达到BOUND_FRACTION时标记
+DISK_BUSY_PERCENT = 90      # 磁盘繁忙时间占比
+IOWAIT_PERCENT = 20         # CPU的IO等待占比
+MEMORY_PERCENT = 90         # 系统内存使用率
+BOUND_FRACTION = 0.3
+
+MB = 1024 * 1024
+
+
+class ResourceMonitor:
+    """
+    任务资源监视器
+
+    用法:
+        monitor = ResourceMonitor([cache_dir, output_dir], child_pids=supervisor.active_pids)
+        monitor.start()
+        ...
+        report = monitor.stop()   # {"interval", "samples", "peak", "mean", "flags"}
+    """
+
+    def __init__(self, watch_dirs: Iterable[str] = (), child_pids: Callable[[], List[int]] = None,
+                 interval: float = DEFAULT_INTERVAL):
+        """
+        初始化监视器
+
+        Args:
+            watch_dirs: 需要记录剩余空间的目录（如缓存目录、输出目录）
+            child_pids: 返回当前FFmpeg子进程PID列表的函数
+            interval: 采样间隔（秒）
+        """
+        self.watch_dirs = [d for d in dict.fromkeys(watch_dirs) if d]
+        self.child_pids = child_pids
+        self.interval = max(0.1, float(interval))
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_time = 0.0
+        self._samples: Dict[str, List] = {
+            "t": [], "cpu_percent": [], "iowait_percent": [], "memory_percent": [],
+            "app_rss_mb": [], "ffmpeg_rss_mb": [], "ffmpeg_processes": [],
+            "disk_read_mbps": [], "disk_write_mbps": [], "disk_busy_percent": [],
+        }
+        self._free_space: Dict[str, List] = {d: [] for d in self.watch_dirs}
+        self._process = None
+        self._children: Dict[int, Any] = {}
+        self._last_disk = None
+        self._last_cpu = None
+        self._last_time = 0.0
+
+    def start(self) -> bool:
+        """开始采样，没有psutil时返回False"""
+        if not HAS_PSUTIL:
+            logger.info("未安装psutil，不记录任务资源使用情况")
+            return False
+        self._process = psutil.Process()
+        self._start_time = self._last_time = time.time()
+        self._last_disk = self._disk_counters()
+        self._last_cpu = psutil.cpu_times()
+        self._thread = threading.Thread(target=self._run, name="resource-monitor", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> Optional[Dict[str, Any]]:
+        """停止采样并返回报告，未开始采样时返回None"""
+        if self._thread is None:
+            return None
+        self._stop_event.set()
+        self._thread.join(timeout=self.interval + 1)
+        self._thread = None
+        return self.report()
+
+    def report(self) -> Dict[str, Any]:
+        """时间序列、峰值、平均值和受限标记"""
+        samples = self._samples
+        count = len(samples["t"])
+        peak, mean = {}, {}
+        for key in ("cpu_percent", "iowait_percent", "memory_percent", "app_rss_mb", "ffmpeg_rss_mb",
+                    "disk_read_mbps", "disk_write_mbps", "disk_busy_percent"):
+            values = [v for v in samples[key] if v is not None]
+            if values:
+                peak[key] = max(values)
+                mean[key] = round(sum(values) / len(values), 2)
+        min_free = {}
+        for directory, values in self._free_space.items():
+            values = [v for v in values if v is not None]
+            if values:
+                min_free[directory] = min(values)
+
+        flags = []
+        if count:
+            disk_bound = sum(1 for busy, iowait in zip(samples["disk_busy_percent"], samples["iowait_percent"])
+                             if (busy or 0) >= DISK_BUSY_PERCENT or (iowait or 0) >= IOWAIT_PERCENT)
+            if disk_bound / count >= BOUND_FRACTION:
+                flags.append("disk_bound")
+            memory_bound = sum(1 for value in samples["memory_percent"] if value >= MEMORY_PERCENT)
+            if memory_bound / count >= BOUND_FRACTION:
+                flags.append("memory_bound")
+
+        return {
+            "interval": self.interval,
+            "samples": {key: list(values) for key, values in samples.items()},
+            "free_space_mb": {d: list(values) for d, values in self._free_space.items()},
+            "peak": peak,
+            "mean": mean,
+            "min_free_space_mb": min_free,
+            "flags": flags,
+        }
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self._sample()
+            except Exception as e:
+                logger.debug(f"资源采样失败: {str(e)}")
+
+    @staticmethod
+    def _disk_counters():
+        try:
+            return psutil.disk_io_counters()
+        except Exception:
+            return None
+
+    def _child_rss(self):
+        """FFmpeg子进程的常驻内存合计（MB）和进程数；进程对象按PID保留，避免每次重新创建"""
+        pids = set(self.child_pids() if self.child_pids else [])
+        for pid in list(self._children):
+            if pid not in pids:
+                del self._children[pid]
+        total = 0
+        for pid in pids:
+            try:
+                process = self._children.get(pid)
+                if process is None:
+                    process = self._children[pid] = psutil.Process(pid)
+                total += process.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                self._children.pop(pid, None)
+        return round(total / MB, 1), len(self._children)
+
+    def _cpu_usage(self):
+        """
+        两次采样之间的CPU占用和IO等待百分比
+
+        由各监视器自己保存的cpu_times计算，不使用psutil.cpu_percent的全局基准，
+        同一进程中的多个监视器互不影响；没有iowait的平台上IO等待为None
+        """
+        cpu = psutil.cpu_times()
+        last, self._last_cpu = self._last_cpu, cpu
+        total = sum(cpu) - sum(last)
+        if total <= 0:
+            return 0.0, None
+        idle = (cpu.idle - last.idle) + (getattr(cpu, "iowait", 0) - getattr(last, "iowait", 0))
+        iowait = None
+        if hasattr(cpu, "iowait"):
+            iowait = round(100.0 * (cpu.iowait - last.iowait) / total, 1)
+        return round(100.0 * (1 - idle / total), 1), iowait
+
+    def _sample(self):
+        now = time.time()
+        elapsed = max(1e-6, now - self._last_time)
+        self._last_time = now
+        samples = self._samples
+
+        disk = self._disk_counters()
+        read_mbps = write_mbps = busy = None
+        if disk is not None and self._last_disk is not None:
+            read_mbps = round((disk.read_bytes - self._last_disk.read_bytes) / MB / elapsed, 2)
+            write_mbps = round((disk.write_bytes - self._last_disk.write_bytes) / MB / elapsed, 2)
+            if hasattr(disk, "busy_time"):
+                # busy_time单位为毫秒（Linux），多块磁盘累加时可能超过100%
+                busy = round(min(100.0, (disk.busy_time - self._last_disk.busy_time) / 10 / elapsed), 1)
+        self._last_disk = disk
+
+        ffmpeg_rss, ffmpeg_count = self._child_rss()
+        cpu_percent, iowait_percent = self._cpu_usage()
+
+        samples["t"].append(round(now - self._start_time, 1))
+        samples["cpu_percent"].append(cpu_percent)
+        samples["iowait_percent"].append(iowait_percent)
+        samples["memory_percent"].append(psutil.virtual_memory().percent)
+        samples["app_rss_mb"].append(round(self._process.memory_info().rss / MB, 1))
+        samples["ffmpeg_rss_mb"].append(ffmpeg_rss)
+        samples["ffmpeg_processes"].append(ffmpeg_count)
+        samples["disk_read_mbps"].append(read_mbps)
+        samples["disk_write_mbps"].append(write_mbps)
+        samples["disk_busy_percent"].append(busy)
+        for directory, values in self._free_space.items():
+            try:
+                values.append(round(shutil.disk_usage(directory).free / MB))
+            except OSError:
+                values.append(None)
@@ -13,6 +13,8 @@ import re
 import psutil
 from pathlib import Path
 
+from src.utils.ffmpeg_registry import get_ffmpeg_registry
+
 try:
     import GPUtil
     HAS_GPUTIL = True
@@ -901,24 +903,11 @@ class SystemAnalyzer:
         
         primary_vendor = gpu_info.get('primary_vendor', '').lower()
         
-        # 获取FFmpeg支持的编码器
+        # 获取FFmpeg支持的编码器和解码器（来自进程内共享的FFmpeg注册表，不再启动子进程）
         try:
-            if platform.system() == 'Windows':
-                process = subprocess.Popen(['ffmpeg', '-encoders'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True)
-            else:
-                process = subprocess.Popen(['ffmpeg', '-encoders'], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            
-            stdout, stderr = process.communicate()
-            encoders_output = stdout.decode('utf-8')
-            
-            # 获取FFmpeg支持的解码器
-            if platform.system() == 'Windows':
-                process = subprocess.Popen(['ffmpeg', '-decoders'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True)
-            else:
-                process = subprocess.Popen(['ffmpeg', '-decoders'], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            
-            stdout, stderr = process.communicate()
-            decoders_output = stdout.decode('utf-8')
+            registry = get_ffmpeg_registry()
+            encoders_output = "\n".join(registry.encoders())
+            decoders_output = "\n".join(registry.decoders())
             
             # NVIDIA GPU
             if 'nvidia' in primary_vendor:
@@ -1035,43 +1024,37 @@ class SystemAnalyzer:
         ffmpeg_info = {'available': False}
         
         try:
-            # 尝试运行ffmpeg -version命令
-            if platform.system() == 'Windows':
-                process = subprocess.Popen(['ffmpeg', '-version'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True)
-            else:
-                process = subprocess.Popen(['ffmpeg', '-version'], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            
-            stdout, stderr = process.communicate()
-            output = stdout.decode('utf-8')
+            registry = get_ffmpeg_registry()
+            capabilities = registry.capabilities()
             
-            if 'ffmpeg version' in output:
+            if capabilities.get('available'):
                 ffmpeg_info['available'] = True
+                ffmpeg_info['path'] = registry.ffmpeg_path()
                 
                 # 提取版本信息
-                version_match = re.search(r'ffmpeg version (\S+)', output)
-                if version_match:
-                    ffmpeg_info['version'] = version_match.group(1)
+                if capabilities.get('version'):
+                    ffmpeg_info['version'] = capabilities['version']
                 
                 # 检查编码器支持
                 ffmpeg_info['encoders'] = {}
+                encoders = capabilities.get('encoders', [])
                 
                 # 检查H.264支持
-                if 'libx264' in output:
+                if 'libx264' in encoders:
                     ffmpeg_info['encoders']['h264'] = True
                 
                 # 检查H.265支持
-                if 'libx265' in output:
+                if 'libx265' in encoders:
                     ffmpeg_info['encoders']['h265'] = True
                 
                 # 检查GPU加速支持
-                if 'nvenc' in output or 'nvidia' in output.lower():
-                    ffmpeg_info['encoders']['nvenc'] = True
-                
-                if 'qsv' in output:
-                    ffmpeg_info['encoders']['qsv'] = True
+                for keyword in ('nvenc', 'qsv', 'amf'):
+                    if any(keyword in name for name in encoders):
+                        ffmpeg_info['encoders'][keyword] = True
                 
-                if 'amf' in output:
-                    ffmpeg_info['encoders']['amf'] = True
+                ffmpeg_info['hwaccels'] = capabilities.get('hwaccels', [])
+            elif capabilities.get('error'):
+                ffmpeg_info['error'] = capabilities['error']
         except Exception as e:
             ffmpeg_info['error'] = str(e)
         
@@ -10,14 +10,16 @@ import random
 import numpy as np
 from typing import Callable, Dict, List, Tuple, Union, Any, Optional
 
-try:
-    import cv2
-    from moviepy.editor import VideoClip, VideoFileClip, CompositeVideoClip
-    from moviepy.video.fx import fadein, fadeout
-except ImportError as e:
-    raise ImportError(f"请安装必要的依赖: {e}")
-
 from src.utils.logger import get_logger
+from src.utils.lazy_import import LazyImport
+
+# 转场很少使用，cv2和moviepy延迟到首次应用转场时导入
+cv2 = LazyImport("cv2")
+VideoClip = LazyImport("moviepy.editor", "VideoClip")
+VideoFileClip = LazyImport("moviepy.editor", "VideoFileClip")
+CompositeVideoClip = LazyImport("moviepy.editor", "CompositeVideoClip")
+fadein = LazyImport("moviepy.video.fx.all", "fadein")
+fadeout = LazyImport("moviepy.video.fx.all", "fadeout")
 
 logger = get_logger()
 
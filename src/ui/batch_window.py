@@ -10,7 +10,6 @@ import sys
 import time
 import json
 import traceback
-import gc
 import logging
 import threading
 from pathlib import Path
@@ -35,6 +34,9 @@ from PyQt5.QtWidgets import (
 )
 
 from src.ui.main_window import MainWindow
+from src.ui.job_events import (
+    JobEventBus, JobEvent, JOB_QUEUED, JOB_STARTED, JOB_PROGRESS, JOB_FINISHED, JOB_FAILED
+)
 from src.utils.logger import get_logger
 from src.utils.template_state import TemplateState
 
@@ -64,6 +66,11 @@ class BatchWindow(QMainWindow):
         # 初始化模板状态管理
         self.template_state = TemplateState()
         
+        # 任务事件总线：各模板的合成线程发布事件，界面按事件更新，进度每秒最多刷新4次
+        self.job_bus = JobEventBus(max_updates_per_second=4, parent=self)
+        self.job_bus.subscribe(self._on_job_event)
+        self.batch_total = 0  # 本次批处理选中的任务数
+        
         # 初始化界面
         self._init_ui()
         
@@ -80,39 +87,8 @@ class BatchWindow(QMainWindow):
         if len(self.tabs) == 0:
             self._add_new_tab()
         
-        # 创建定时器用于刷新UI
-        self.ui_refresh_timer = QTimer(self)
-        self.ui_refresh_timer.timeout.connect(self._periodic_ui_refresh)
-        self.ui_refresh_timer.start(5000)  # 每5秒刷新一次UI
-        
         logger.info("批量处理窗口初始化完成")
     
-    def _periodic_ui_refresh(self):
-        """定期刷新UI状态"""
-        try:
-            # 如果当前正在处理任务，则不刷新UI
-            if self.is_processing:
-                return
-                
-            # 检查是否有标签页需要刷新
-            for tab in self.tabs:
-                if "window" in tab and tab["window"] and tab["window"].isVisible():
-                    try:
-                        # 确保标签页内容可见
-                        tab["window"].update()
-                    except Exception as e:
-                        logger.debug(f"定期刷新标签页 '{tab['name']}' 时出错: {str(e)}")
-            
-            # 刷新整个窗口
-            self.update()
-            
-            # 更新任务表格
-            self._update_tasks_table()
-            
-            logger.debug("完成定期UI刷新")
-        except Exception as e:
-            logger.error(f"定期刷新UI时出错: {str(e)}")
-    
     def _load_saved_templates(self):
         """加载保存的模板标签页状态"""
         saved_tabs = self.template_state.load_template_tabs()
@@ -202,6 +178,9 @@ class BatchWindow(QMainWindow):
         # 覆盖方法
         main_window.on_compose_completed = batch_on_completed
         
+        # 合成线程通过批量窗口的事件总线报告状态
+        main_window.job_events = self.job_bus
+        
         # 确保这个标签页拥有自己独立的用户设置
         if hasattr(main_window, "user_settings") and main_window.user_settings:
             # 使用保存的实例ID
@@ -560,6 +539,9 @@ class BatchWindow(QMainWindow):
         # 覆盖方法
         main_window.on_compose_error = batch_on_error
         
+        # 合成线程通过批量窗口的事件总线报告状态
+        main_window.job_events = self.job_bus
+        
         # 自动为新的标签页创建编号
         tab_name = f"模板 {len(self.tabs) + 1}"
         
@@ -698,40 +680,60 @@ class BatchWindow(QMainWindow):
             
             self.tasks_table.setCellWidget(row, 0, checkbox_container)
             
-            # 模板名称
-            self.tasks_table.setItem(row, 1, QTableWidgetItem(tab["name"]))
-            
-            # 状态
-            status_item = QTableWidgetItem(tab["status"])
-            if tab["status"] == "完成":
-                status_item.setForeground(QColor("#4CAF50"))
-            elif tab["status"] == "处理中":
-                status_item.setForeground(QColor("#2196F3"))
-            elif tab["status"] == "等待中":
-                status_item.setForeground(QColor("#FF9800"))
-            elif tab["status"] == "失败":
-                status_item.setForeground(QColor("#F44336"))
-            self.tasks_table.setItem(row, 2, status_item)
-            
-            # 处理数量
-            process_count = tab.get("process_count", 0)
-            self.tasks_table.setItem(row, 3, QTableWidgetItem(str(process_count)))
-            
-            # 处理时间
-            process_time = tab.get("process_time", "-")
-            if isinstance(process_time, (int, float)) and process_time > 0:
-                time_str = self._format_time(process_time)
-            else:
-                time_str = "-"
-            self.tasks_table.setItem(row, 4, QTableWidgetItem(time_str))
-            
-            # 最后处理时间
-            last_time = tab.get("last_process_time", "-")
-            if last_time is None:
-                last_time = "-"
-            self.tasks_table.setItem(row, 5, QTableWidgetItem(last_time))
+            self._update_task_row(row)
+        
+        self._update_statistics()
         
-        # 更新统计区域
+        # 更新队列信息：未开始批处理时，显示选中的模板数量
+        if not self.is_processing:
+            self._update_queue_display()
+    
+    def _update_task_row(self, row):
+        """更新任务表格中一行的文字（不重建复选框）"""
+        if not 0 <= row < len(self.tabs) or row >= self.tasks_table.rowCount():
+            return
+        tab = self.tabs[row]
+        
+        # 模板名称
+        self.tasks_table.setItem(row, 1, QTableWidgetItem(tab["name"]))
+        
+        # 状态（处理中时附带进度百分比）
+        status_text = tab["status"]
+        if tab["status"] == "处理中" and tab.get("progress_percent"):
+            status_text = f"处理中 {tab['progress_percent']:.0f}%"
+        status_item = QTableWidgetItem(status_text)
+        if tab["status"] == "完成":
+            status_item.setForeground(QColor("#4CAF50"))
+        elif tab["status"] == "处理中":
+            status_item.setForeground(QColor("#2196F3"))
+        elif tab["status"] == "等待中":
+            status_item.setForeground(QColor("#FF9800"))
+        elif tab["status"].startswith("失败"):
+            status_item.setForeground(QColor("#F44336"))
+        if tab.get("progress_message"):
+            status_item.setToolTip(tab["progress_message"])
+        self.tasks_table.setItem(row, 2, status_item)
+        
+        # 处理数量
+        process_count = tab.get("process_count", 0)
+        self.tasks_table.setItem(row, 3, QTableWidgetItem(str(process_count)))
+        
+        # 处理时间
+        process_time = tab.get("process_time", "-")
+        if isinstance(process_time, (int, float)) and process_time > 0:
+            time_str = self._format_time(process_time)
+        else:
+            time_str = "-"
+        self.tasks_table.setItem(row, 4, QTableWidgetItem(time_str))
+        
+        # 最后处理时间
+        last_time = tab.get("last_process_time", "-")
+        if last_time is None:
+            last_time = "-"
+        self.tasks_table.setItem(row, 5, QTableWidgetItem(last_time))
+    
+    def _update_statistics(self):
+        """更新统计区域"""
         self.label_total_videos.setText(f"总视频数: {self.total_processed_count}")
         
         if self.total_process_time > 0:
@@ -742,10 +744,6 @@ class BatchWindow(QMainWindow):
         # 如果有统计信息，在状态栏显示
         if self.total_processed_count > 0:
             self.statusBar.showMessage(f"总计: 处理了 {self.total_processed_count} 个视频，总耗时 {self._format_time(self.total_process_time)}")
-            
-        # 更新队列信息：未开始批处理时，显示选中的模板数量
-        if not self.is_processing:
-            self._update_queue_display()
     
     def _update_queue_display(self):
         """更新队列显示信息"""
@@ -851,12 +849,12 @@ class BatchWindow(QMainWindow):
             
             # 更新完成后显示结果
             if success_count > 0:
-                result_message = f"已成功刷新 {success_count} 个模板的素材数量"
+                result_message = f"已开始刷新 {success_count} 个模板的素材数量，各模板会在后台逐行更新"
                 if failed_tabs:
                     result_message += f"\n\n以下模板刷新失败:\n" + "\n".join(failed_tabs)
                 
-                QMessageBox.information(self, "刷新完成", result_message)
-                self.status_label.setText(f"已刷新 {success_count} 个模板的素材数量")
+                QMessageBox.information(self, "刷新素材数量", result_message)
+                self.status_label.setText(f"正在后台刷新 {success_count} 个模板的素材数量")
             else:
                 error_message = "所有模板刷新失败"
                 if failed_tabs:
@@ -914,9 +912,6 @@ class BatchWindow(QMainWindow):
             # 先停止可能正在运行的任何处理
             self._reset_batch_ui()
             
-            # 在开始前先进行垃圾回收，释放资源
-            gc.collect()
-            
             # 重置统计信息
             self.batch_start_time = time.time()
             self.total_processed_count = 0
@@ -924,6 +919,7 @@ class BatchWindow(QMainWindow):
             
             # 清空处理队列并重新添加选中的任务
             self.processing_queue = selected_indexes.copy()
+            self.batch_total = len(selected_indexes)
             
             # 记录处理队列日志
             queue_info = []
@@ -938,14 +934,15 @@ class BatchWindow(QMainWindow):
                 if tab["status"] in ["处理中", "等待中"]:
                     tab["status"] = "准备就绪"
             
-            # 然后设置选中标签页的状态
+            # 重置选中任务的处理统计，状态由排队事件更新
             for idx in selected_indexes:
                 if 0 <= idx < len(self.tabs):
-                    self.tabs[idx]["status"] = "等待中"
-                    # 重置各个任务的处理统计
                     self.tabs[idx]["process_count"] = 0
                     self.tabs[idx]["process_time"] = 0
                     self.tabs[idx]["start_time"] = None
+                    self.tabs[idx]["progress_percent"] = 0
+                    self.tabs[idx]["progress_message"] = ""
+                    self.job_bus.publish(JOB_QUEUED, self.tabs[idx]["instance_id"])
             
             self._update_tasks_table()
             
@@ -960,11 +957,8 @@ class BatchWindow(QMainWindow):
             # 批处理模式下启用对话框过滤
             logger.info("启用批处理模式对话框过滤")
             
-            # 确保UI完全更新
-            QApplication.processEvents()
-            
-            # 使用定时器延迟开始处理，给UI一些响应时间
-            QTimer.singleShot(500, self._process_next_task)
+            # 回到事件循环后开始处理，先让排队事件和表格刷新完成
+            QTimer.singleShot(0, self._process_next_task)
             
             # 记录详细日志，以便排查问题
             logger.info(f"将处理以下标签页索引: {selected_indexes}")
@@ -1027,9 +1021,6 @@ class BatchWindow(QMainWindow):
                 
             # 更新任务表格
             self._update_tasks_table()
-            
-            # 执行垃圾回收
-            gc.collect()
     
     def _reset_batch_ui(self):
         """重置批处理界面状态"""
@@ -1079,12 +1070,6 @@ class BatchWindow(QMainWindow):
                 except Exception as e:
                     logger.error(f"重置标签页资源时出错: {str(e)}")
         
-        # 强制处理所有挂起的事件
-        QApplication.processEvents()
-        
-        # 执行垃圾回收
-        gc.collect()
-        
         # 刷新所有标签页显示
         self._refresh_all_tabs_ui()
         
@@ -1097,47 +1082,17 @@ class BatchWindow(QMainWindow):
         logger.info("批处理模式已重置")
     
     def _refresh_all_tabs_ui(self):
-        """刷新所有标签页的UI显示"""
-        logger.info("开始刷新所有标签页UI显示")
+        """刷新任务表格和当前标签页（其他标签页切换到时由Qt自行重绘）"""
         try:
-            # 更新任务表格
             self._update_tasks_table()
-            
-            # 刷新标签页控件
-            self.tab_widget.update()
-            
-            # 遍历所有标签页，刷新UI
-            for i in range(self.tab_widget.count()):
-                # 获取标签页窗口
-                tab_widget = self.tab_widget.widget(i)
-                if tab_widget:
-                    # 切换到该标签页以确保其可见
-                    self.tab_widget.setCurrentIndex(i)
-                    
-                    # 尝试刷新标签页的UI
-                    try:
-                        # 强制重绘
-                        tab_widget.update()
-                        
-                        # 如果有子窗口，也刷新它们
-                        for child in tab_widget.findChildren(QWidget):
-                            if child and not child.isHidden():
-                                child.update()
-                    except Exception as e:
-                        logger.error(f"刷新标签页 {i} UI时出错: {str(e)}")
-                
-                # 确保Qt事件循环处理绘制事件
-                QApplication.processEvents()
-            
-            # 最后再次更新整个窗口
-            self.update()
-            
-            logger.info("所有标签页UI刷新完成")
+            current = self.tab_widget.currentWidget()
+            if current:
+                current.update()
         except Exception as e:
-            logger.error(f"刷新所有标签页UI时出错: {str(e)}")
+            logger.error(f"刷新标签页UI时出错: {str(e)}")
     
     def _process_next_task(self):
-        """处理队列中的下一个任务"""
+        """处理队列中的下一个任务（任务结束由事件总线的完成/失败事件触发下一个）"""
         # 首先检查是否还在批处理过程中
         if not self.is_processing:
             logger.info("批处理已停止，不再继续处理队列")
@@ -1146,131 +1101,17 @@ class BatchWindow(QMainWindow):
         
         # 检查队列是否为空
         if not self.processing_queue:
-            logger.info("批处理队列已处理完毕")
-            
-            # 计算总的处理时间
-            if self.batch_start_time:
-                total_batch_time = time.time() - self.batch_start_time
-                self.total_process_time = total_batch_time
-                
-                # 显示完成信息
-                completion_message = f"批量处理完成！总计处理了 {self.total_processed_count} 个视频，总耗时 {self._format_time(total_batch_time)}"
-                self.statusBar.showMessage(completion_message, 0) # 0表示不会自动消失
-                
-                # 弹出提示通知
-                QMessageBox.information(self, "批量处理完成", completion_message)
-            else:
-                self.statusBar.showMessage("批量处理完成！", 5000)
-                QMessageBox.information(self, "批量处理完成", "所有选中的模板处理已完成！")
-                
-            self._reset_batch_ui()
-            # 发出提示音（如果启用）
-            QApplication.beep()
-            
-            # 强制清理所有标签页的资源
-            try:
-                logger.info("批处理完成，清理所有标签页资源...")
-                # 清理每个标签页的处理器资源
-                for tab in self.tabs:
-                    if "window" in tab and tab["window"]:
-                        window = tab["window"]
-                        if hasattr(window, "processor") and window.processor:
-                            try:
-                                # 使用新添加的资源释放方法
-                                if hasattr(window.processor, "release_resources"):
-                                    logger.info(f"释放标签页 '{tab['name']}' 的处理器资源")
-                                    try:
-                                        # 安全地释放处理器资源，防止清理UI元素
-                                        window.processor.release_resources()
-                                    except Exception as e:
-                                        logger.error(f"使用release_resources方法释放资源时出错: {str(e)}")
-                                elif hasattr(window.processor, "clean_temp_files"):
-                                    # 退化方案：至少清理临时文件
-                                    logger.info(f"使用clean_temp_files备选方案清理标签页 '{tab['name']}' 的临时文件")
-                                    try:
-                                        window.processor.clean_temp_files()
-                                    except Exception as e:
-                                        logger.error(f"使用clean_temp_files方法清理临时文件时出错: {str(e)}")
-                                
-                                # 清空处理器引用
-                                window.processor = None
-                            except Exception as e:
-                                logger.error(f"释放标签页 '{tab['name']}' 资源时出错: {str(e)}")
-                        
-                        # 确保窗口UI元素完好
-                        try:
-                            # 刷新窗口
-                            if hasattr(window, "update"):
-                                window.update()
-                                
-                            # 确保窗口组件可见
-                            for widget_name in ["stackedWidget", "panel_material", "panel_setting", "save_dir_display"]:
-                                if hasattr(window, widget_name):
-                                    widget = getattr(window, widget_name)
-                                    if widget and hasattr(widget, "show"):
-                                        widget.show()
-                                        if hasattr(widget, "update"):
-                                            widget.update()
-                        except Exception as e:
-                            logger.error(f"刷新窗口UI元素时出错: {str(e)}")
-                
-                # 执行一次完整的垃圾回收
-                import gc
-                gc.collect(0)
-                gc.collect(1)
-                gc.collect(2)
-                
-                # 强制执行一次Qt事件处理
-                QApplication.processEvents()
-                
-                # 刷新界面显示
-                self._refresh_all_tabs_ui()
-                
-                logger.info("所有标签页资源清理完成")
-                
-                # 确保所有标签页仍然可见
-                for i, tab in enumerate(self.tabs):
-                    if "window" in tab and tab["window"]:
-                        try:
-                            # 刷新标签页显示
-                            self.tab_widget.setCurrentIndex(i)
-                            QApplication.processEvents()
-                            self.tab_widget.update()
-                            
-                            # 额外确保标签页内容显示正确
-                            tab_widget = self.tab_widget.widget(i)
-                            if tab_widget:
-                                tab_widget.show()
-                                tab_widget.update()
-                        except Exception as e:
-                            logger.error(f"刷新标签页 {tab['name']} 显示时出错: {str(e)}")
-                
-                # 最后再刷新一次整个批处理窗口
-                self.update()
-                QApplication.processEvents()
-                
-                # 使用专门的函数全面刷新所有标签页UI
-                self._refresh_tabs_after_resource_release()
-                
-                # 确保主界面显示正常
-                self.show()
-                self.activateWindow()
-                self.raise_()
-                QApplication.processEvents()
-            except Exception as e:
-                logger.error(f"批处理结束清理资源时出错: {str(e)}")
-                
+            self._finish_batch()
             return
         
         logger.info(f"处理队列中的下一个任务，当前队列长度: {len(self.processing_queue)}")
         
         # 获取下一个任务索引
-        next_idx = self.processing_queue[0]
-        self.processing_queue.pop(0)
+        next_idx = self.processing_queue.pop(0)
         
         if next_idx < 0 or next_idx >= len(self.tabs):
             logger.error(f"无效的任务索引: {next_idx}，跳过此任务")
-            QTimer.singleShot(100, self._process_next_task)
+            QTimer.singleShot(0, self._process_next_task)
             return
         
         # 获取对应的标签页信息
@@ -1279,406 +1120,190 @@ class BatchWindow(QMainWindow):
         
         # 记录任务开始时间
         tab["start_time"] = time.time()
+        tab["progress_percent"] = 0
+        tab["progress_message"] = ""
         
         logger.info(f"开始处理任务: {tab['name']}，索引: {next_idx}")
         
-        # 更新状态
-        tab["status"] = "处理中"
-        self._update_tasks_table()
-        
-        # 更新队列状态 - 只计算当前批次中被选中的任务
-        # 注意：此处计算逻辑是处理队列的总数 = 已完成任务数 + 队列中剩余任务数 + 当前正在处理的任务(1)
-        completed_tasks = sum(1 for t in self.tabs if t["status"] == "完成")
-        total_selected_tasks = completed_tasks + len(self.processing_queue) + 1  # 已完成的任务 + 队列中剩余的任务 + 当前正在处理的任务
-        
-        self.label_queue.setText(f"队列: {completed_tasks}/{total_selected_tasks}")
-        
-        # 更新当前任务标签
+        # 更新队列状态和当前任务标签
+        self._update_batch_progress()
         self.label_current_task.setText(f"当前任务: {tab['name']}")
+        self.statusBar.showMessage(f"正在处理: {tab['name']}")
         
         # 获取标签页的主窗口实例
         window = tab.get("window")
         if not window:
             logger.error(f"标签页 {next_idx} 的窗口实例为空，跳过此任务")
-            self.current_processing_tab = None
-            tab["status"] = "失败"
-            self._update_tasks_table()
-            QTimer.singleShot(100, self._process_next_task)
+            self._finish_current_task(next_idx, "失败")
             return
         
-        # 在开始新模板前执行一次内存清理，确保系统内存充足
-        try:
-            # 执行内存清理
-            import gc
-            logger.info("在开始新模板前执行内存清理...")
-            before_count = gc.get_count()
-            # 执行完整的垃圾回收
-            gc.collect(0)  # 收集第0代对象
-            gc.collect(1)  # 收集第1代对象
-            gc.collect(2)  # 收集第2代对象
-            after_count = gc.get_count()
-            logger.info(f"内存清理完成: {before_count} -> {after_count}")
-            
-            # 强制执行一次Qt事件处理
-            QApplication.processEvents()
-        except Exception as e:
-            logger.error(f"内存清理过程中出错: {str(e)}")
-            # 错误不应阻止继续进行
+        # 重置处理状态标志
+        window.compose_completed = False
+        window.compose_error = False
+        window.last_progress_update = time.time()
+        window.processing_thread = None
         
-        # 更新进度条 - 使用实际完成比例
-        if total_selected_tasks > 0:
-            progress_percentage = (completed_tasks / total_selected_tasks) * 100
-            self.batch_progress.setValue(int(progress_percentage))
+        # 确保标签页处于可见状态，切换到相应标签
+        self.tab_widget.setCurrentIndex(next_idx)
         
-        # 显示当前处理的任务信息
-        self.statusBar.showMessage(f"正在处理: {tab['name']}")
+        # 启动合成：合成线程会发布开始、进度和结束事件
+        try:
+            # 尝试触发关键UI事件，确保实际点击按钮而不只是调用后台函数
+            if hasattr(window, "btn_start_compose") and window.btn_start_compose:
+                window.btn_start_compose.click()
+                logger.info(f"通过点击按钮启动合成: {tab['name']}")
+            else:
+                window.on_start_compose()
+                logger.info(f"通过调用方法启动合成: {tab['name']}")
+        except Exception as e:
+            logger.error(f"启动合成过程时出错: {str(e)}")
+            logger.error(f"详细错误信息: {traceback.format_exc()}")
         
-        # 确保UI更新
-        QApplication.processEvents()
+        # 合成前的检查未通过（如没有素材、没有保存目录）时不会启动线程，也不会有结束事件
+        if window.processing_thread is None:
+            logger.warning(f"任务 {tab['name']} 未能启动合成，继续下一个任务")
+            self._finish_current_task(next_idx, "失败(无法启动)")
+    
+    def _on_job_event(self, event: JobEvent):
+        """处理任务事件（在主线程中调用，进度事件已由总线合并限流）"""
+        tab_idx = next((i for i, tab in enumerate(self.tabs) if tab.get("instance_id") == event.job_id), None)
+        if tab_idx is None:
+            return
+        tab = self.tabs[tab_idx]
         
-        try:
-            # 设置一个检查完成状态的定时器函数
-            def check_completion():
-                try:
-                    if not self.is_processing:
-                        logger.info("批处理已停止，不再检查任务完成状态")
-                        return
-                    
-                    # 添加更详细的日志，帮助诊断问题
-                    logger.debug(f"检查任务 {tab['name']} 完成状态:")
-                    
-                    # 检查线程状态
-                    thread_exists = hasattr(window, "processing_thread")
-                    thread_running = thread_exists and window.processing_thread is not None
-                    thread_alive = thread_running and (
-                        hasattr(window.processing_thread, "is_alive") and 
-                        window.processing_thread.is_alive()
-                    )
-                    
-                    # 检查完成标志状态
-                    has_completion_attr = hasattr(window, "compose_completed")
-                    completion_flag = has_completion_attr and window.compose_completed
-                    
-                    # 记录详细状态日志
-                    logger.debug(f"  - 线程状态: 存在={thread_exists}, 运行中={thread_running}, 活跃={thread_alive}")
-                    logger.debug(f"  - 完成标志: 存在={has_completion_attr}, 已设置={completion_flag}")
-                    
-                    # 检查是否有文件正在生成
-                    is_generating_files = False
-                    if hasattr(window, "processor") and window.processor:
-                        is_generating_files = True
-                    
-                    # 检查是否完成的条件：1.线程不存在或已结束 2.有专门的完成标志
-                    thread_completed = not thread_running or (thread_running and not thread_alive)
-                    has_completion_flag = completion_flag
-                    
-                    # 添加处理器检查 - 如果处理器已被清空，也视为完成
-                    processor_cleared = not hasattr(window, "processor") or window.processor is None
-                    logger.debug(f"  - 处理器状态: 已清除={processor_cleared}, 正在生成文件={is_generating_files}")
-                    
-                    if thread_completed or has_completion_flag or processor_cleared:
-                        # 处理已完成，更新状态
-                        logger.info(f"检测到任务 {tab['name']} 已完成，更新状态")
-                        
-                        # 记录结束时间和处理时间
-                        end_time = time.time()
-                        if tab.get("start_time"):
-                            process_time = end_time - tab["start_time"]
-                            tab["process_time"] = process_time
-                        
-                        # 获取处理数量
-                        process_count = 0
-                        if hasattr(window, "last_compose_count"):
-                            process_count = window.last_compose_count
-                        tab["process_count"] = process_count
-                        
-                        # 更新总计数据
-                        self.total_processed_count += process_count
-                        if tab.get("process_time"):
-                            self.total_process_time += tab["process_time"]
-                        
-                        # 更新状态
-                        tab["status"] = "完成"
-                        tab["last_process_time"] = time.strftime("%Y-%m-%d %H:%M:%S")
-                        self._update_tasks_table()
-                        self.current_processing_tab = None
-                        
-                        # 更新进度信息 - 使用当前批次中被选中的任务进行计算
-                        # 注意：此处当前任务已被标记为"完成"，因此计算逻辑是 总数 = 已完成任务数(包含当前任务) + 队列中剩余任务数
-                        completed_tasks = sum(1 for t in self.tabs if t["status"] == "完成")
-                        total_selected_tasks = completed_tasks + len(self.processing_queue)  # 已完成的任务 + 队列中剩余的任务
-                        
-                        self.label_queue.setText(f"队列: {completed_tasks}/{total_selected_tasks}")
-                        
-                        if total_selected_tasks > 0:
-                            progress_percentage = (completed_tasks / total_selected_tasks) * 100
-                            self.batch_progress.setValue(int(progress_percentage))
-                        
-                        # 确保资源被清理
-                        try:
-                            if hasattr(window, "processor") and window.processor:
-                                if hasattr(window.processor, "stop_processing"):
-                                    window.processor.stop_processing()
-                                window.processor = None
-                            if hasattr(window, "processing_thread") and window.processing_thread:
-                                window.processing_thread = None
-                        except Exception as e:
-                            logger.error(f"清理资源时出错: {str(e)}")
-                        
-                        # 处理完成后，立即启动下一个任务
-                        logger.info(f"标签页 {next_idx} 处理完成，准备处理下一个任务")
-                        
-                        # 确保彻底清理资源，避免内存泄漏
-                        try:
-                            # 1. 关闭视频处理器的所有资源
-                            if hasattr(window, "processor") and window.processor:
-                                # 使用新添加的资源释放方法
-                                if hasattr(window.processor, "release_resources"):
-                                    logger.info("使用release_resources方法释放处理器资源...")
-                                    window.processor.release_resources()
-                                elif hasattr(window.processor, "clean_temp_files"):
-                                    logger.info("开始清理临时文件...")
-                                    window.processor.clean_temp_files()
-                                    if hasattr(window.processor, "stop_processing"):
-                                        window.processor.stop_processing()
-                                # 清空处理器引用
-                                window.processor = None
-                                logger.info("视频处理器已清空")
-                            
-                            # 2. 清空处理线程
-                            if hasattr(window, "processing_thread") and window.processing_thread:
-                                window.processing_thread = None
-                                logger.info("处理线程已清空")
-                            
-                            # 3. 强制执行一次Python垃圾回收
-                            import gc
-                            # 获取当前未回收对象数量
-                            before_count = gc.get_count()
-                            logger.info(f"执行垃圾回收前未回收对象计数: {before_count}")
-                            
-                            # 执行完整的垃圾回收
-                            gc.collect(0)  # 收集第0代对象
-                            gc.collect(1)  # 收集第1代对象
-                            gc.collect(2)  # 收集第2代对象
-                            
-                            # 获取回收后对象数量
-                            after_count = gc.get_count()
-                            logger.info(f"执行垃圾回收后未回收对象计数: {after_count}")
-                            
-                            # 4. 尝试释放其他可能的资源 - 但保留UI界面元素
-                            for attr_name in dir(window):
-                                if attr_name.startswith("__") or attr_name.startswith("ui_"):
-                                    continue  # 跳过UI相关元素
-                                
-                                # 跳过所有QWidget类型的对象，以保留界面元素
-                                attr = getattr(window, attr_name, None)
-                                # 跳过界面相关元素和基本属性
-                                if (attr is None or 
-                                    isinstance(attr, (QWidget, QLayout, QAction, QObject)) or
-                                    attr_name in ['tab_widget', 'menuBar', 'statusBar', 'centralWidget']):
-                                    continue
-                                
-                                # 只关闭明确知道可以关闭的资源类型
-                                if hasattr(attr, "close") and callable(getattr(attr, "close")):
-                                    try:
-                                        getattr(attr, "close")()
-                                        logger.debug(f"已关闭资源: {attr_name}")
-                                    except Exception as e:
-                                        logger.debug(f"关闭资源 {attr_name} 时出错: {str(e)}")
-                            
-                            # 5. 强制执行一次Qt事件处理
-                            QApplication.processEvents()
-                            
-                            logger.info("资源清理完成，系统内存已释放")
-                        except Exception as e:
-                            logger.error(f"清理资源时出错: {str(e)}")
-                            error_detail = traceback.format_exc()
-                            logger.error(f"详细错误信息: {error_detail}")
-                        
-                        # 使用短时间延迟调用下一个任务，确保UI有时间更新
-                        QTimer.singleShot(1000, self._process_next_task)  # 延长等待时间到1秒，给系统更多时间释放资源
-                    else:
-                        # 如果线程仍在运行，再次检查
-                        # 为了避免卡住，我们也检查一下是否线程确实在工作
-                        if hasattr(window, "last_progress_update"):
-                            current_time = time.time()
-                            time_since_update = current_time - window.last_progress_update
-                            logger.debug(f"  - 上次进度更新: {time_since_update:.1f}秒前")
-                            
-                            # 增加超时时间到30秒，视频处理可能需要更长时间
-                            if time_since_update > 30:  # 如果30秒没有进度更新
-                                logger.warning(f"任务 {tab['name']} 似乎已卡住 (>30秒无进度更新)，尝试强制更新进度")
-                                
-                                # 获取此标签页的强制更新尝试次数
-                                force_update_retries = tab.get("force_update_retries", 0)
-                                
-                                # 尝试使用强制更新方法
-                                if force_update_retries < 3 and hasattr(window, "force_progress_update"):
-                                    logger.info(f"尝试强制更新进度状态，第{force_update_retries + 1}次尝试")
-                                    force_update_success = window.force_progress_update()
-                                    
-                                    # 不管结果如何，都增加尝试次数
-                                    tab["force_update_retries"] = force_update_retries + 1
-                                    
-                                    if force_update_success:
-                                        logger.info(f"强制更新进度成功，继续等待处理")
-                                        # 更新上次进度时间以避免立即再次触发
-                                        window.last_progress_update = time.time()
-                                        QTimer.singleShot(5000, check_completion)  # 5秒后再次检查
-                                        return
-                                    else:
-                                        logger.warning(f"强制更新进度失败，尝试启用传统恢复方式")
-                                
-                                # 如果强制更新失败或尝试次数已用完，尝试传统恢复方法
-                                if force_update_retries >= 3:
-                                    logger.warning(f"任务 {tab['name']} 已尝试强制更新 {force_update_retries} 次，仍无响应，判定为超时")
-                                
-                                # 尝试直接调用处理过程来恢复
-                                try:
-                                    # 检查是否有进度标签
-                                    if hasattr(window, "label_progress"):
-                                        progress_text = window.label_progress.text()
-                                        logger.debug(f"  - 当前进度标签: {progress_text}")
-                                    
-                                    # 如果处理器存在，尝试强制更新进度来触发进度检测
-                                    if hasattr(window, "processor") and window.processor:
-                                        if hasattr(window.processor, "report_progress"):
-                                            window.processor.report_progress("批处理模式中重新触发进度更新", 50.0)
-                                            window.last_progress_update = time.time()
-                                            logger.info("已重新触发进度更新")
-                                            QTimer.singleShot(500, check_completion)
-                                            return
-                                        
-                                    # 如果无法恢复处理流程，则放弃当前任务，继续下一个
-                                    logger.warning(f"无法恢复任务 {tab['name']} 的处理流程，放弃当前任务")
-                                    tab["status"] = "失败(超时)"
-                                    self._update_tasks_table()
-                                    self.current_processing_tab = None
-                                    
-                                    # 尝试停止当前任务
-                                    window.on_stop_compose()
-                                    
-                                    # 延迟一下再处理下一个任务
-                                    QTimer.singleShot(1000, self._process_next_task)
-                                    return
-                                except Exception as e:
-                                    logger.error(f"尝试恢复处理流程时出错: {str(e)}")
-                                    error_detail = traceback.format_exc()
-                                    logger.error(f"详细错误信息: {error_detail}")
-                                    
-                                    # 停止当前任务，继续下一个
-                                    tab["status"] = "失败(处理错误)"
-                                    self._update_tasks_table()
-                                    self.current_processing_tab = None
-                                    window.on_stop_compose()
-                                    QTimer.singleShot(1000, self._process_next_task)
-                                    return
-                        
-                        # 更快地检查状态 - 1秒检查一次
-                        QTimer.singleShot(1000, check_completion)
-                except Exception as e:
-                    logger.error(f"检查任务完成状态时出错: {str(e)}")
-                    error_detail = traceback.format_exc()
-                    logger.error(f"详细错误信息: {error_detail}")
-                    
-                    # 出错后也要继续下一个任务
-                    tab["status"] = "失败"
-                    self._update_tasks_table()
-                    self.current_processing_tab = None
-                    QTimer.singleShot(500, self._process_next_task)
-            
-            # 在启动前，确保窗口已经初始化完成
-            if hasattr(window, "last_progress_update"):
-                window.last_progress_update = time.time()
+        window = tab.get("window")
+        if window is not None:
+            window.last_progress_update = event.timestamp
+        
+        if event.kind == JOB_QUEUED:
+            if tab["status"] != "处理中":
+                tab["status"] = "等待中"
+                self._update_task_row(tab_idx)
+        elif event.kind == JOB_STARTED:
+            tab["status"] = "处理中"
+            if not tab.get("start_time"):
+                tab["start_time"] = event.timestamp
+            self._update_task_row(tab_idx)
+        elif event.kind == JOB_PROGRESS:
+            tab["progress_percent"] = event.percent
+            tab["progress_message"] = event.message
+            if tab["status"] == "处理中":
+                self._update_task_row(tab_idx)
+            if self.is_processing and tab_idx == self.current_processing_tab:
+                self._update_batch_progress(event.percent)
+        elif self.is_processing and tab_idx == self.current_processing_tab:
+            # 批处理中的当前任务结束，记录结果并开始下一个
+            if event.kind == JOB_FINISHED:
+                self._finish_current_task(tab_idx, "完成", event.count)
+            elif event.kind == JOB_FAILED:
+                if not event.cancelled:
+                    logger.error(f"任务 {tab['name']} 处理出错: {event.error}")
+                self._finish_current_task(tab_idx, "已停止" if event.cancelled else "失败")
+        else:
+            # 单独在标签页中合成（非批处理）时也同步状态
+            if event.kind == JOB_FINISHED:
+                tab["status"] = "完成" if event.count > 0 else "失败"
+                tab["process_count"] = event.count
+            elif event.kind == JOB_FAILED:
+                tab["status"] = "已停止" if event.cancelled else "失败"
             else:
-                # 如果没有这个属性，添加一个
-                window.last_progress_update = time.time()
-            
-            # 重置处理状态标志
-            window.compose_completed = False
-            window.compose_error = False
-            logger.info(f"开始处理标签页 {next_idx}: {tab['name']}")
-            
-            # 确保标签页处于可见状态，切换到相应标签
-            self.tab_widget.setCurrentIndex(next_idx)
-            QApplication.processEvents()  # 确保UI更新
-            
-            # 重置强制更新重试计数
-            tab["force_update_retries"] = 0
-            
-            # 启动合成
+                return
+            if tab.get("start_time"):
+                tab["process_time"] = event.timestamp - tab["start_time"]
+            tab["start_time"] = None
+            tab["last_process_time"] = time.strftime("%Y-%m-%d %H:%M:%S")
+            self._update_task_row(tab_idx)
+    
+    def _update_batch_progress(self, current_percent=0.0):
+        """更新队列标签和批处理进度条"""
+        total = self.batch_total
+        if total <= 0:
+            return
+        running = 1 if self.current_processing_tab is not None else 0
+        done = max(0, total - len(self.processing_queue) - running)
+        self.label_queue.setText(f"队列: {done}/{total}")
+        progress = (done + running * min(max(current_percent, 0.0), 100.0) / 100) / total * 100
+        self.batch_progress.setValue(int(progress))
+    
+    def _release_processor(self, window):
+        """释放标签页处理器的资源（临时文件、进程等），保留界面元素"""
+        if hasattr(window, "processor") and window.processor:
             try:
-                # 尝试触发关键UI事件，确保实际点击按钮而不只是调用后台函数
-                if hasattr(window, "btn_start_compose") and window.btn_start_compose:
-                    window.btn_start_compose.click()
-                    logger.info(f"通过点击按钮启动合成: {tab['name']}")
-                else:
-                    # 如果无法找到按钮，直接调用方法
-                    window.on_start_compose()
-                    logger.info(f"通过调用方法启动合成: {tab['name']}")
+                if hasattr(window.processor, "release_resources"):
+                    window.processor.release_resources()
+                elif hasattr(window.processor, "clean_temp_files"):
+                    window.processor.clean_temp_files()
+                    if hasattr(window.processor, "stop_processing"):
+                        window.processor.stop_processing()
             except Exception as e:
-                logger.error(f"启动合成过程时出错: {str(e)}")
-                error_detail = traceback.format_exc()
-                logger.error(f"详细错误信息: {error_detail}")
-                
-                # 尝试一次直接方法调用
-                try:
-                    window.on_start_compose()
-                    logger.info("使用备用方法启动合成")
-                except Exception as e2:
-                    logger.error(f"备用启动方法也失败: {str(e2)}")
-                    # 失败后继续下一个任务
-                    tab["status"] = "失败(无法启动)"
-                    self._update_tasks_table()
-                    self.current_processing_tab = None
-                    QTimer.singleShot(500, self._process_next_task)
-                    return
-            
-            # 启动检查完成状态的定时器，稍微延迟一下确保处理已经开始
-            QTimer.singleShot(1000, check_completion)
-            
-        except Exception as e:
-            logger.error(f"处理标签页 {next_idx} 时出错: {str(e)}")
-            # 添加详细的错误信息
-            error_detail = traceback.format_exc()
-            logger.error(f"详细错误信息: {error_detail}")
+                logger.error(f"释放处理器资源时出错: {str(e)}")
+            window.processor = None
+        if hasattr(window, "processing_thread") and window.processing_thread:
+            window.processing_thread = None
+    
+    def _finish_current_task(self, tab_idx, status, process_count=0):
+        """
+        结束批处理中的当前任务并开始下一个
+        
+        Args:
+            tab_idx: 任务的标签页索引
+            status: 任务的最终状态
+            process_count: 生成的视频数量
+        """
+        tab = self.tabs[tab_idx]
+        logger.info(f"任务 {tab['name']} 结束，状态: {status}，生成 {process_count} 个视频")
+        
+        # 记录处理时间和数量
+        if tab.get("start_time"):
+            tab["process_time"] = time.time() - tab["start_time"]
+            self.total_process_time += tab["process_time"]
+        tab["start_time"] = None
+        tab["process_count"] = process_count
+        self.total_processed_count += process_count
+        
+        tab["status"] = status
+        tab["last_process_time"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.current_processing_tab = None
+        
+        window = tab.get("window")
+        if window is not None:
+            self._release_processor(window)
+        
+        self._update_task_row(tab_idx)
+        self._update_statistics()
+        self._update_batch_progress()
+        
+        # 回到事件循环后再开始下一个任务，让本次结束的界面更新先完成
+        QTimer.singleShot(0, self._process_next_task)
+    
+    def _finish_batch(self):
+        """队列处理完毕：显示汇总、重置界面并释放各标签页的处理器资源"""
+        logger.info("批处理队列已处理完毕")
+        
+        # 计算总的处理时间
+        if self.batch_start_time:
+            total_batch_time = time.time() - self.batch_start_time
+            self.total_process_time = total_batch_time
             
-            tab["status"] = "失败"
-            self._update_tasks_table()
-            self.current_processing_tab = None
+            # 显示完成信息
+            completion_message = f"批量处理完成！总计处理了 {self.total_processed_count} 个视频，总耗时 {self._format_time(total_batch_time)}"
+            self.statusBar.showMessage(completion_message, 0) # 0表示不会自动消失
             
-            # 出错后，继续处理下一个任务
-            QTimer.singleShot(500, self._process_next_task)
-    
-    def _update_task_status(self, tab_idx, status):
-        """更新任务状态（由工作线程调用，保证在UI线程执行）"""
-        try:
-            if 0 <= tab_idx < len(self.tabs):
-                old_status = self.tabs[tab_idx].get("status", "")
-                self.tabs[tab_idx]["status"] = status
-                
-                # 如果是完成状态，更新最后处理时间
-                if status in ["完成", "失败"]:
-                    import datetime
-                    self.tabs[tab_idx]["last_process_time"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    
-                    # 处理完成后自动保存模板状态
-                    self._save_template_state()
-                
-                self._update_tasks_table()
-                logger.info(f"任务 '{self.tabs[tab_idx]['name']}' 状态更新为: {status} (之前: {old_status})")
-                
-                # 如果是在批处理过程中，并且状态变为"失败"，需要处理队列
-                if self.is_processing and status == "失败" and self.current_processing_tab == tab_idx:
-                    logger.info(f"任务 '{self.tabs[tab_idx]['name']}' 失败，准备处理下一个任务")
-                    self.current_processing_tab = None
-                    # 使用短延迟再处理下一个任务，以确保UI有时间更新
-                    QTimer.singleShot(500, self._process_next_task)
-            else:
-                logger.warning(f"无效的标签索引: {tab_idx}")
-        except Exception as e:
-            logger.error(f"更新任务状态时出错: {str(e)}")
-            logger.error(traceback.format_exc())
+            # 弹出提示通知
+            QMessageBox.information(self, "批量处理完成", completion_message)
+        else:
+            self.statusBar.showMessage("批量处理完成！", 5000)
+            QMessageBox.information(self, "批量处理完成", "所有选中的模板处理已完成！")
+        
+        self._reset_batch_ui()
+        # 发出提示音（如果启用）
+        QApplication.beep()
+        
+        logger.info("批处理完成，清理所有标签页资源...")
+        for tab in self.tabs:
+            if "window" in tab and tab["window"]:
+                self._release_processor(tab["window"])
+        logger.info("所有标签页资源清理完成")
     
     def _setup_dialog_filter(self):
         """设置全局对话框过滤器，用于在批处理模式下抑制对话框"""
@@ -1786,9 +1411,6 @@ class BatchWindow(QMainWindow):
                 except Exception as e:
                     logger.error(f"关闭标签页 {tab['name']} 时出错: {str(e)}")
         
-        # 执行垃圾回收
-        gc.collect()
-        
         # 接受关闭事件
         event.accept()
     
@@ -1852,79 +1474,6 @@ class BatchWindow(QMainWindow):
             logger.error(f"打开模板选择器时出错: {str(e)}")
             QMessageBox.warning(self, "错误", f"打开模板选择器时出错: {str(e)}")
 
-    def _refresh_tabs_after_resource_release(self):
-        """在资源释放后刷新所有标签页的UI显示，确保UI保持可见"""
-        try:
-            logger.info("在资源释放后刷新所有标签页UI...")
-            
-            # 首先确保批处理窗口自身显示正常
-            self.update()
-            QApplication.processEvents()
-            
-            # 更新任务表格
-            self._update_tasks_table()
-            
-            # 刷新标签控件
-            self.tab_widget.update()
-            
-            # 遍历所有标签页
-            for i in range(self.tab_widget.count()):
-                try:
-                    # 获取标签页和对应的窗口
-                    tab_widget = self.tab_widget.widget(i)
-                    if not tab_widget:
-                        continue
-                    
-                    # 切换到该标签页
-                    self.tab_widget.setCurrentIndex(i)
-                    QApplication.processEvents()
-                    
-                    # 确保标签页可见
-                    tab_widget.show()
-                    tab_widget.update()
-                    
-                    # 刷新标签页中的窗口
-                    if i < len(self.tabs):
-                        tab = self.tabs[i]
-                        if "window" in tab and tab["window"]:
-                            window = tab["window"]
-                            
-                            # 刷新主窗口
-                            if hasattr(window, "update"):
-                                window.update()
-                                
-                            # 刷新关键UI组件
-                            for widget_name in ["stackedWidget", "panel_material", "panel_setting", 
-                                               "save_dir_display", "material_table", "btn_start"]:
-                                if hasattr(window, widget_name):
-                                    widget = getattr(window, widget_name)
-                                    if widget and hasattr(widget, "show"):
-                                        widget.show()
-                                        if hasattr(widget, "update"):
-                                            widget.update()
-                
-                    # 刷新所有子组件
-                    for child in tab_widget.findChildren(QWidget):
-                        if child and not child.isHidden():
-                            try:
-                                child.show()
-                                child.update()
-                            except Exception as e:
-                                logger.debug(f"刷新子组件时出错: {str(e)}")
-                    
-                    # 处理事件循环
-                    QApplication.processEvents()
-                except Exception as e:
-                    logger.error(f"刷新标签页 {i} 时出错: {str(e)}")
-                
-            # 最后确保整体UI刷新
-            self.update()
-            QApplication.processEvents()
-            
-            logger.info("标签页UI刷新完成")
-        except Exception as e:
-            logger.error(f"刷新标签页UI时出错: {str(e)}")
-
 # 新增模板选择器对话框类
 class TemplateSelector(QDialog):
     """模板选择器对话框，提供一个更大的窗口来选择要批处理的模板"""
@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+任务事件总线
+批量处理中各模板的合成任务通过事件总线报告状态（排队、开始、进度、完成、失败），
+处理线程只负责发布事件，界面在主线程中订阅；进度事件按任务合并，
+每秒最多刷新有限次数，避免界面轮询和频繁重绘
+"""
+
+import time
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot, Qt
+
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# 事件类型
+JOB_QUEUED = "queued"
+JOB_STARTED = "started"
+JOB_PROGRESS = "progress"
+JOB_FINISHED = "finished"
+JOB_FAILED = "failed"
+
+JOB_EVENT_KINDS = (JOB_QUEUED, JOB_STARTED, JOB_PROGRESS, JOB_FINISHED, JOB_FAILED)
+
+# 表示任务结束的事件类型
+TERMINAL_KINDS = (JOB_FINISHED, JOB_FAILED)
+
+
+class JobEvent:
+    """一条任务事件"""
+
+    __slots__ = ("kind", "job_id", "timestamp", "message", "percent", "count",
+                 "output_dir", "total_time", "error", "detail", "cancelled")
+
+    def __init__(self, kind: str, job_id: str, message: str = "", percent: float = 0.0,
+                 count: int = 0, output_dir: str = "", total_time: str = "",
+                 error: str = "", detail: str = "", cancelled: bool = False):
+        """
+        创建任务事件
+
+        Args:
+            kind: 事件类型（JOB_QUEUED、JOB_STARTED、JOB_PROGRESS、JOB_FINISHED、JOB_FAILED）
+            job_id: 任务标识（批量窗口中为模板的实例ID）
+            message: 进度消息
+            percent: 进度百分比 (0-100)
+            count: 完成时生成的视频数量
+            output_dir: 完成时的输出目录
+            total_time: 完成时的总用时文本
+            error: 失败时的错误信息
+            detail: 失败时的详细信息
+            cancelled: 失败是否由用户中止引起
+        """
+        if kind not in JOB_EVENT_KINDS:
+            raise ValueError(f"未知的任务事件类型: {kind}")
+        self.kind = kind
+        self.job_id = job_id
+        self.timestamp = time.time()
+        self.message = message
+        self.percent = percent
+        self.count = count
+        self.output_dir = output_dir
+        self.total_time = total_time
+        self.error = error
+        self.detail = detail
+        self.cancelled = cancelled
+
+    def __repr__(self):
+        return f"JobEvent({self.kind}, {self.job_id}, {self.percent:.0f}%)"
+
+
+class JobEventBus(QObject):
+    """
+    任务事件总线
+
+    publish可以在任意线程调用，事件经队列连接转到总线所在的主线程后分发给订阅者；
+    排队、开始、完成、失败事件立即分发，进度事件按任务只保留最新一条，
+    按max_updates_per_second限定的间隔统一分发
+
+    用法:
+        bus = JobEventBus(max_updates_per_second=4, parent=window)
+        bus.subscribe(window._on_job_event)
+        bus.publish(JOB_PROGRESS, job_id, message="正在生成第1/3个视频", percent=30)
+    """
+
+    # 跨线程转发事件的内部信号
+    _posted = pyqtSignal(object)
+
+    def __init__(self, max_updates_per_second: float = 4, parent: QObject = None):
+        """
+        初始化事件总线
+
+        Args:
+            max_updates_per_second: 进度事件每秒最多分发的次数
+            parent: 父对象（决定总线所在的线程）
+        """
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._subscribers: List[Tuple[Callable[[JobEvent], None], Optional[frozenset]]] = []
+        self._pending_progress: Dict[str, JobEvent] = {}
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.timeout.connect(self._flush_progress)
+        self.set_max_updates_per_second(max_updates_per_second)
+        self._posted.connect(self._dispatch, Qt.QueuedConnection)
+
+    def set_max_updates_per_second(self, max_updates_per_second: float):
+        """设置进度事件每秒最多分发的次数"""
+        self._flush_timer.setInterval(int(1000 / max(0.1, max_updates_per_second)))
+
+    def subscribe(self, callback: Callable[[JobEvent], None], kinds: Tuple[str, ...] = None):
+        """
+        订阅事件（回调总在主线程中调用）
+
+        Args:
+            callback: 回调函数，参数为JobEvent
+            kinds: 只接收的事件类型，为None时接收全部
+        """
+        with self._lock:
+            self._subscribers.append((callback, frozenset(kinds) if kinds else None))
+
+    def unsubscribe(self, callback: Callable[[JobEvent], None]):
+        """取消订阅"""
+        with self._lock:
+            self._subscribers = [item for item in self._subscribers if item[0] != callback]
+
+    def publish(self, kind: str, job_id: str, **data) -> JobEvent:
+        """
+        发布事件（线程安全）
+
+        Args:
+            kind: 事件类型
+            job_id: 任务标识
+            **data: JobEvent的其他字段
+
+        Returns:
+            JobEvent: 发布的事件
+        """
+        event = JobEvent(kind, job_id, **data)
+        self._posted.emit(event)
+        return event
+
+    @pyqtSlot(object)
+    def _dispatch(self, event: JobEvent):
+        if event.kind == JOB_PROGRESS:
+            self._pending_progress[event.job_id] = event
+            if not self._flush_timer.isActive():
+                self._flush_timer.start()
+            return
+        # 状态变化前先送出该任务尚未分发的进度，保证订阅者看到的顺序与发布顺序一致
+        pending = self._pending_progress.pop(event.job_id, None)
+        if pending is not None:
+            self._deliver(pending)
+        self._deliver(event)
+
+    def _flush_progress(self):
+        pending, self._pending_progress = self._pending_progress, {}
+        for event in pending.values():
+            self._deliver(event)
+
+    def _deliver(self, event: JobEvent):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback, kinds in subscribers:
+            if kinds is not None and event.kind not in kinds:
+                continue
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"处理任务事件 {event!r} 时出错: {str(e)}")
@@ -27,15 +27,19 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, pyqtSlot, QMetaObject, Q_ARG, Qt, QPoint, QRect
 from PyQt5 import QtCore
-from PyQt5.QtGui import QFont, QIcon, QPainter, QColor, QPen, QBrush, QMouseEvent
+from PyQt5.QtGui import QFont, QIcon, QPainter, QColor, QPen, QBrush, QMouseEvent, QPixmap
 
 from src.utils.logger import get_logger
 from src.utils.cache_config import CacheConfig
 from src.hardware.system_analyzer import SystemAnalyzer
 from src.hardware.gpu_config import GPUConfig
+from src.hardware.hardware_profile import get_hardware_profile
+from src.utils.ffmpeg_registry import get_ffmpeg_registry
 from src.utils.help_system import HelpSystem
 from src.utils.file_utils import list_media_files, resolve_shortcut
 from src.utils.user_settings import UserSettings  # 导入用户设置类
+from src.core.render_worker import RenderJob
+from src.ui.job_events import JOB_STARTED, JOB_PROGRESS, JOB_FINISHED, JOB_FAILED
 
 logger = get_logger()
 
@@ -95,6 +99,111 @@ class ExtractModeItem(QTableWidgetItem):
         self.status = status
         self._update_appearance()
 
+class MediaCountWorker(QThread):
+    """
+    后台统计素材数量的线程
+
+    逐行解析"视频"/"配音"文件夹（含快捷方式）并统计文件数，每完成一行通过信号通知界面；
+    素材文件夹在共享素材目录中有数据且子文件夹自登记后未变化时，直接使用目录中的数量。
+    信号带有本次统计的代号，界面只接受最新一次统计的结果
+    """
+
+    # 统计代号, 行号, 素材文件夹路径, 视频数量, 配音数量
+    row_counted = pyqtSignal(int, int, str, int, int)
+    # 统计代号, 已完成行数, 是否被取消
+    counting_finished = pyqtSignal(int, int, bool)
+
+    def __init__(self, rows: List[Tuple[int, str]], temp_dir: str, generation: int = 0, parent=None):
+        """
+        Args:
+            rows: (行号, 素材文件夹路径) 列表
+            temp_dir: 扫描缓存所在的缓存目录
+            generation: 统计代号，随信号发出
+        """
+        super().__init__(parent)
+        self.rows = rows
+        self.temp_dir = temp_dir
+        self.generation = generation
+
+    def cancel(self):
+        """请求停止统计（正在统计的行完成后结束）"""
+        self.requestInterruption()
+
+    @staticmethod
+    def find_media_dir(folder_path: str, name: str) -> Optional[str]:
+        """查找素材文件夹下的"视频"/"配音"子文件夹，支持快捷方式"""
+        media_dir = os.path.join(folder_path, name)
+        if os.path.isdir(media_dir):
+            return media_dir
+        for shortcut_name in (f"{name} - 快捷方式.lnk", f"{name}.lnk", f"{name}快捷方式.lnk"):
+            shortcut_path = os.path.join(folder_path, shortcut_name)
+            if os.path.exists(shortcut_path):
+                target = resolve_shortcut(shortcut_path)
+                if target:
+                    return target
+        try:
+            for item in os.listdir(folder_path):
+                if item.lower().endswith(".lnk") and name in item:
+                    target = resolve_shortcut(os.path.join(folder_path, item))
+                    if target and os.path.isdir(target):
+                        return target
+        except OSError as e:
+            logger.error(f"搜索{name}快捷方式时出错: {str(e)}")
+        return None
+
+    def _count_from_catalogue(self, folder_path: str, media_dirs: List[Optional[str]]) -> Optional[Tuple[int, int]]:
+        """共享素材目录中有该文件夹的数据且子文件夹在登记后没有变化时返回(视频数, 配音数)"""
+        from src.core.media_catalogue import MediaCatalogue, get_media_catalogue
+        from src.core.video_processor import media_cache_paths
+
+        signature = MediaCatalogue.signature(*media_cache_paths(self.temp_dir, folder_path))
+        entry = get_media_catalogue().get(folder_path, signature)
+        if entry is None:
+            return None
+        for media_dir in media_dirs:
+            try:
+                if media_dir and os.stat(media_dir).st_mtime >= entry.created:
+                    return None
+            except OSError:
+                return None
+        return len(entry.videos), len(entry.audios)
+
+    def _count_folder(self, folder_path: str) -> Tuple[int, int]:
+        video_dir = self.find_media_dir(folder_path, "视频")
+        audio_dir = self.find_media_dir(folder_path, "配音")
+        try:
+            counts = self._count_from_catalogue(folder_path, [video_dir, audio_dir])
+            if counts is not None:
+                return counts
+        except Exception as e:
+            logger.debug(f"读取共享素材目录失败: {str(e)}")
+
+        video_count = audio_count = 0
+        if video_dir:
+            try:
+                video_count = len(list_media_files(video_dir, recursive=True)["videos"])
+            except Exception as e:
+                logger.error(f"扫描视频文件夹失败: {str(e)}")
+        if audio_dir:
+            try:
+                audio_count = len(list_media_files(audio_dir, recursive=True)["audios"])
+            except Exception as e:
+                logger.error(f"扫描音频文件夹失败: {str(e)}")
+        return video_count, audio_count
+
+    def run(self):
+        done = 0
+        for row, folder_path in self.rows:
+            if self.isInterruptionRequested():
+                break
+            if not folder_path or not os.path.exists(folder_path):
+                continue
+            video_count, audio_count = self._count_folder(folder_path)
+            logger.info(f"更新素材数量: {folder_path}，视频 {video_count} 个，配音 {audio_count} 个")
+            self.row_counted.emit(self.generation, row, folder_path, video_count, audio_count)
+            done += 1
+        self.counting_finished.emit(self.generation, done, self.isInterruptionRequested())
+
 class MainWindow(QMainWindow):
     """应用程序主窗口"""
     
@@ -108,6 +217,10 @@ class MainWindow(QMainWindow):
         self.processing_thread = None
         self.last_compose_count = 0  # 记录最后一次合成的视频数量
         
+        # 任务事件总线（批量窗口中由BatchWindow设置），合成线程向其报告开始、进度和结束
+        self.job_events = None
+        self.job_id = instance_id or ""
+        
         # 初始化GPU配置
         self.gpu_config = GPUConfig()
         self.gpu_info = {}  # 存储GPU信息
@@ -133,8 +246,8 @@ class MainWindow(QMainWindow):
         # 加载用户设置
         self._load_user_settings()
         
-        # 检测GPU（软件启动时自动检测一次）
-        self.detect_gpu()
+        # 加载缓存的硬件档案，硬件或驱动变化时才在后台重新检测
+        self._load_hardware_profile()
     
     def _init_ui(self):
         """初始化UI界面"""
@@ -300,8 +413,8 @@ class MainWindow(QMainWindow):
         
         # 创建视频列表表格
         self.video_table = QTableWidget()
-        self.video_table.setColumnCount(6)
-        self.video_table.setHorizontalHeaderLabels(["序号", "场景名称", "路径", "视频数量", "配音数量", "抽取模式"])
+        self.video_table.setColumnCount(7)
+        self.video_table.setHorizontalHeaderLabels(["序号", "场景名称", "路径", "视频数量", "配音数量", "抽取模式", "预览"])
         self.video_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.video_table.verticalHeader().setVisible(False)
         self.video_table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
@@ -316,6 +429,9 @@ class MainWindow(QMainWindow):
         
         list_layout.addWidget(self.video_table)
         
+        # 预览列的缩略图在行滚动到可见区域时才加载
+        self._init_thumbnail_preview()
+        
         # 素材操作按钮
         btn_layout = QHBoxLayout()
         list_layout.addLayout(btn_layout)
@@ -1056,35 +1172,24 @@ FFmpeg是一个功能强大的视频处理工具，它是本软件处理视频
             QMessageBox.warning(self, "刷新素材", "请先选择有效的素材根目录")
             return
             
-        # 设置鼠标等待状态
-        QApplication.setOverrideCursor(Qt.WaitCursor)
-        self.status_label.setText("正在刷新素材列表和数量...")
+        self.status_label.setText("正在刷新素材列表...")
         
-        try:
-            # 清空表格
-            self.video_table.setRowCount(0)
-            
-            # 刷新导入
-            self._import_material_folder(last_import_folder)
-            
-            # 移除自动保存设置代码
-            # self._save_user_settings()
-            
-            # 刷新素材数量
-            self._update_media_counts()
-            
-            # 显示刷新结果
-            imported_rows = self.video_table.rowCount()
+        # 清空表格并重新导入（只列出文件夹），素材数量在后台逐行更新
+        self.video_table.setRowCount(0)
+        self._import_material_folder(last_import_folder)
+        imported_rows = self.video_table.rowCount()
+        
+        def _on_counts_finished(done, cancelled):
+            if cancelled:
+                return
             QMessageBox.information(
                 self, 
                 "刷新素材", 
                 f"素材列表已刷新，当前有 {imported_rows} 个素材文件夹\n已更新所有素材的视频和配音数量\n您可以点击\"保存当前所有设置\"按钮保存这些设置"
             )
-            
             self.status_label.setText("素材和数量刷新完成")
-        finally:
-            # 恢复鼠标指针
-            QApplication.restoreOverrideCursor()
+        
+        self._update_media_counts(on_finished=_on_counts_finished)
     
     @pyqtSlot()
     def on_clear_material(self):
@@ -1093,6 +1198,7 @@ FFmpeg是一个功能强大的视频处理工具，它是本软件处理视频
             reply = QMessageBox.question(self, "清空素材", "确定要清空所有添加的素材吗？",
                                          QMessageBox.Yes | QMessageBox.No)
             if reply == QMessageBox.Yes:
+                self.cancel_media_counts()
                 self.video_table.setRowCount(0)
                 self.parent_folder_title.setText("未选择文件夹")
                 # 清空抽取模式字典
@@ -1109,15 +1215,16 @@ FFmpeg是一个功能强大的视频处理工具，它是本软件处理视频
             QMessageBox.information(self, "刷新数量", "素材列表为空，没有可刷新的素材")
             return
             
-        # 执行更新
-        self._update_media_counts()
+        # 后台更新，完成后显示消息
+        def _on_counts_finished(done, cancelled):
+            if not cancelled:
+                QMessageBox.information(
+                    self, 
+                    "刷新完成", 
+                    "已更新所有素材的视频和配音数量"
+                )
         
-        # 显示完成消息
-        QMessageBox.information(
-            self, 
-            "刷新完成", 
-            "已更新所有素材的视频和配音数量"
-        )
+        self._update_media_counts(on_finished=_on_counts_finished)
     
     @pyqtSlot()
     def on_browse_save_dir(self):
@@ -1241,6 +1348,8 @@ FFmpeg是一个功能强大的视频处理工具，它是本软件处理视频
             message: 进度消息
             percent: 进度百分比 (0-100)
         """
+        self._publish_job_event(JOB_PROGRESS, message=message, percent=float(percent))
+        
         # 使用Qt的信号槽机制确保在主线程中更新UI
         QtCore.QMetaObject.invokeMethod(
             self,
@@ -1250,6 +1359,11 @@ FFmpeg是一个功能强大的视频处理工具，它是本软件处理视频
             QtCore.Q_ARG(float, percent)
         )
     
+    def _publish_job_event(self, kind, **data):
+        """向任务事件总线发布事件（未设置总线时忽略，可在任意线程调用）"""
+        if self.job_events is not None:
+            self.job_events.publish(kind, self.job_id, **data)
+    
     @QtCore.pyqtSlot(str, float)
     def _do_update_progress(self, message, percent):
         """在主线程中实际执行UI更新"""
@@ -1611,10 +1725,13 @@ FFmpeg是一个功能强大的视频处理工具，它是本软件处理视频
                     
                     # 尝试自动配置GPU
                     config_start_time = time.time()
-                    gpu_configured = self.gpu_config.detect_and_set_optimal_config()
+                    gpu_configured = self.gpu_config.detect_and_set_optimal_config(system_info)
                     config_time = time.time() - config_start_time
                     logging.info(f"GPU配置完成，耗时: {config_time:.3f} 秒")
                     
+                    # 更新硬件档案，供下次启动和其他标签页直接使用
+                    get_hardware_profile().update(system_info, gpu_configured)
+                    
                     # 更新完整UI
                     QtCore.QMetaObject.invokeMethod(
                         self, 
@@ -1656,6 +1773,51 @@ FFmpeg是一个功能强大的视频处理工具，它是本软件处理视频
         detection_thread = threading.Thread(target=do_detect_gpu, daemon=True)
         detection_thread.start()
     
+    def _load_hardware_profile(self):
+        """加载硬件档案并更新GPU状态（不弹窗），档案缺失或机器指纹变化时在后台重新检测"""
+        profile = get_hardware_profile()
+        if profile.has_data():
+            self._apply_hardware_profile()
+        
+        def on_refreshed(_profile):
+            QtCore.QMetaObject.invokeMethod(self, "_apply_hardware_profile", QtCore.Qt.QueuedConnection)
+        
+        if profile.refresh_async(on_refreshed) and not profile.has_data():
+            self.gpu_status_label.setText("GPU: 检测中...")
+    
+    @QtCore.pyqtSlot()
+    def _apply_hardware_profile(self):
+        """根据硬件档案更新GPU相关UI"""
+        profile = get_hardware_profile()
+        if not profile.has_data():
+            return
+        self.gpu_info = profile.gpu_info()
+        # 后台检测可能已更新GPU配置文件
+        self.gpu_config.load_config()
+        
+        if not self.gpu_info.get('available', False):
+            self.combo_gpu.setCurrentText("CPU处理")
+            self.gpu_status_label.setText("GPU: 未检测到")
+            return
+        
+        primary_gpu = self.gpu_info.get('primary_gpu', '未知')
+        primary_vendor = self.gpu_info.get('primary_vendor', '未知')
+        if profile.gpu_configured() and self.gpu_config.is_hardware_acceleration_enabled():
+            gpu_name, gpu_vendor = self.gpu_config.get_gpu_info()
+            primary_vendor = gpu_vendor if gpu_vendor != '未知' else primary_vendor
+            self.gpu_status_label.setText(f"GPU: {gpu_name} | 编码器: {self.gpu_config.get_encoder()}")
+        else:
+            self.gpu_status_label.setText(f"GPU: {primary_gpu} | 不支持硬件加速")
+        
+        if 'nvidia' in primary_vendor.lower():
+            self.combo_gpu.setCurrentText("Nvidia显卡")
+        elif 'amd' in primary_vendor.lower():
+            self.combo_gpu.setCurrentText("AMD显卡")
+        elif 'intel' in primary_vendor.lower():
+            self.combo_gpu.setCurrentText("Intel显卡")
+        else:
+            self.combo_gpu.setCurrentText("自动检测")
+    
     @QtCore.pyqtSlot(bool)
     def _update_basic_gpu_ui(self, gpu_available):
         """快速更新基本GPU信息"""
@@ -1927,6 +2089,7 @@ FFmpeg是一个功能强大的视频处理工具，它是本软件处理视频
                     
                     with open(project_root / "ffmpeg_path.txt", "w", encoding="utf-8") as f:
                         f.write(selected_path)
+                    get_ffmpeg_registry().reload()
                     
                     logger.info(f"已配置FFmpeg路径: {selected_path}")
                     self.status_label.setText(f"已配置FFmpeg路径: {selected_path}")
@@ -2132,6 +2295,7 @@ FFmpeg是一个功能强大的视频处理工具，它是本软件处理视频
 
     def process_videos(self):
         """在独立线程中执行视频合成"""
+        self._publish_job_event(JOB_STARTED)
         try:
             from core.video_processor import VideoProcessor
             
@@ -2248,24 +2412,33 @@ FFmpeg是一个功能强大的视频处理工具，它是本软件处理视频
             else:
                 self.status_label.setText(f"正在使用CPU处理视频 (编码器: {encoder})")
             
-            # 保存处理器实例以便停止处理
-            self.processor = VideoProcessor(settings, progress_callback=self._update_progress)
-            
             # 执行批量处理
             bgm_path = params["bgm_path"] if os.path.exists(params["bgm_path"]) else None
             count = params["generate_count"]
+            batch_kwargs = {
+                "material_folders": material_folders,
+                "output_dir": save_dir,
+                "count": count,
+                "bgm_path": bgm_path
+            }
             
-            # 实际生成视频，注意现在返回值是一个元组(视频列表, 总时长)
-            result = self.processor.process_batch(
-                material_folders=material_folders,
-                output_dir=save_dir,
-                count=count,
-                bgm_path=bgm_path
-            )
+            # 保存处理器实例以便停止处理
+            if self.user_settings.get_setting("render_in_worker_process", True):
+                # 在独立的渲染工作进程中合成，界面进程只转发进度；
+                # 工作进程扫描的素材在任务完成后登记到界面进程的共享素材目录
+                self.processor = RenderJob(settings, batch_kwargs, progress_callback=self._update_progress)
+                result = self.processor.run()
+            else:
+                self.processor = VideoProcessor(settings, progress_callback=self._update_progress)
+                # 实际生成视频，注意现在返回值是一个元组(视频列表, 总时长)
+                result = self.processor.process_batch(**batch_kwargs)
             
             # 解包结果
             output_videos, total_time = result
             
+            self._publish_job_event(JOB_FINISHED, count=len(output_videos),
+                                    output_dir=save_dir, total_time=total_time)
+            
             # 处理完成
             QtCore.QMetaObject.invokeMethod(
                 self, 
@@ -2278,6 +2451,7 @@ FFmpeg是一个功能强大的视频处理工具，它是本软件处理视频
             )
         except InterruptedError:
             # 处理被用户中断
+            self._publish_job_event(JOB_FAILED, error="用户中止", cancelled=True)
             QtCore.QMetaObject.invokeMethod(
                 self, 
                 "on_compose_interrupted", 
@@ -2285,7 +2459,9 @@ FFmpeg是一个功能强大的视频处理工具，它是本软件处理视频
             )
         except Exception as e:
             import traceback
-            error_msg = traceback.format_exc()
+            # 工作进程中的错误带有工作进程内的堆栈
+            error_msg = getattr(e, "detail", "") or traceback.format_exc()
+            self._publish_job_event(JOB_FAILED, error=str(e), detail=error_msg)
             QtCore.QMetaObject.invokeMethod(
                 self, 
                 "on_compose_error", 
@@ -2644,6 +2820,7 @@ FFmpeg是一个功能强大的视频处理工具，它是本软件处理视频
             
             with open(ffmpeg_path_file, "w") as f:
                 f.write(ffmpeg_file)
+            get_ffmpeg_registry().reload()
             
             QMessageBox.information(
                 self, 
@@ -2793,36 +2970,8 @@ FFmpeg是一个功能强大的视频处理工具，它是本软件处理视频
                 elif 'intel' in gpu_vendor.lower():
                     self.combo_gpu.setCurrentText("Intel显卡")
             else:
-                # 未配置GPU，显示默认状态
+                # 未配置GPU，显示默认状态（硬件档案加载后会更新）
                 self.gpu_status_label.setText("GPU: 未检测 (点击检测按钮)")
-                
-                # 尝试进行简单的GPU检测，不阻塞UI
-                import threading
-                
-                def quick_detect():
-                    try:
-                        from hardware.system_analyzer import SystemAnalyzer
-                        
-                        # 仅进行基本检测
-                        analyzer = SystemAnalyzer(deep_gpu_detection=False)
-                        system_info = analyzer.analyze()
-                        gpu_info = system_info.get('gpu', {})
-                        
-                        # 如果检测到GPU，更新状态栏
-                        if gpu_info.get('available', False):
-                            primary_gpu = gpu_info.get('primary_gpu', '未知')
-                            QtCore.QMetaObject.invokeMethod(
-                                self, 
-                                "_update_initial_gpu_label", 
-                                QtCore.Qt.QueuedConnection,
-                                QtCore.Q_ARG(str, primary_gpu)
-                            )
-                    except Exception:
-                        pass
-                
-                # 启动快速检测线程
-                detect_thread = threading.Thread(target=quick_detect, daemon=True)
-                detect_thread.start()
         except Exception as e:
             # 出错时不更新GPU状态，保持默认状态
             import logging
@@ -4036,9 +4185,11 @@ FFmpeg是一个功能强大的视频处理工具，它是本软件处理视频
                         event.ignore()
                         return
                 # 继续默认的关闭行为
+                self.cancel_media_counts(wait=True)
                 super().closeEvent(event)
             elif reply == QMessageBox.No:
                 # 不保存，继续关闭
+                self.cancel_media_counts(wait=True)
                 super().closeEvent(event)
             else:
                 # 取消关闭
@@ -4054,6 +4205,7 @@ FFmpeg是一个功能强大的视频处理工具，它是本软件处理视频
                 QMessageBox.No
             )
             if error_reply == QMessageBox.Yes:
+                self.cancel_media_counts(wait=True)
                 super().closeEvent(event)
             else:
                 event.ignore()
@@ -4465,6 +4617,163 @@ FFmpeg是一个功能强大的视频处理工具，它是本软件处理视频
         dialog.exec_()
 
     # 添加处理表格点击事件的方法
+    # 预览列：每个场景显示前几个视频片段的封面帧
+    THUMBNAIL_COLUMN = 6
+    THUMBNAILS_PER_ROW = 4
+    THUMBNAIL_WIDTH = 48
+    THUMBNAIL_HEIGHT = 27
+    
+    def _init_thumbnail_preview(self):
+        """初始化素材列表的预览列（滚动、新增行后延迟加载可见行的缩略图）"""
+        self._thumbnail_strips = {}     # 文件夹路径 -> 预览图
+        self._thumbnail_clips = {}      # 文件夹路径 -> 用于预览的片段列表
+        self._thumbnail_data = {}       # 文件夹路径 -> {片段路径: JPEG数据}
+        self.video_table.setIconSize(QtCore.QSize(self.THUMBNAIL_WIDTH * self.THUMBNAILS_PER_ROW,
+                                                  self.THUMBNAIL_HEIGHT))
+        self._thumbnail_timer = QtCore.QTimer(self)
+        self._thumbnail_timer.setSingleShot(True)
+        self._thumbnail_timer.setInterval(150)
+        self._thumbnail_timer.timeout.connect(self._load_visible_thumbnails)
+        self.video_table.verticalScrollBar().valueChanged.connect(lambda _: self._thumbnail_timer.start())
+        self.video_table.model().rowsInserted.connect(lambda *_: self._thumbnail_timer.start())
+        self.video_table.model().rowsRemoved.connect(self._on_table_rows_removed)
+    
+    def _on_table_rows_removed(self, *_):
+        """素材列表清空时丢弃预览图和未开始的缩略图任务"""
+        if self.video_table.rowCount() == 0 and self._thumbnail_clips:
+            self._thumbnail_strips.clear()
+            self._thumbnail_clips.clear()
+            self._thumbnail_data.clear()
+            from src.core.thumbnail_cache import get_thumbnail_cache
+            get_thumbnail_cache().cancel_pending()
+    
+    def _visible_table_rows(self):
+        """素材列表中当前可见的行号"""
+        row_count = self.video_table.rowCount()
+        if row_count == 0:
+            return []
+        first = self.video_table.rowAt(0)
+        last = self.video_table.rowAt(self.video_table.viewport().height() - 1)
+        if first < 0:
+            return []
+        if last < 0:
+            last = row_count - 1
+        return list(range(first, last + 1))
+    
+    def _load_visible_thumbnails(self):
+        """为可见行请求缩略图：已有预览图的直接显示，其余行的片段列表在后台线程中获取"""
+        pending = []
+        for row in self._visible_table_rows():
+            path_item = self.video_table.item(row, 2)
+            if path_item is None or not path_item.text():
+                continue
+            folder = path_item.text()
+            if folder in self._thumbnail_strips:
+                self._set_thumbnail_cell(row, folder)
+                continue
+            if folder in self._thumbnail_clips:
+                continue  # 已在加载中
+            self._thumbnail_clips[folder] = []
+            pending.append(folder)
+        if pending:
+            threading.Thread(target=self._list_thumbnail_clips, args=(pending, self.cache_config.get_cache_dir()),
+                             daemon=True, name="thumbnail-list").start()
+    
+    def _list_thumbnail_clips(self, folders, temp_dir):
+        """
+        后台线程：确定各文件夹用于预览的片段并请求缩略图
+
+        缩略图数据随排队的调用交给界面线程，界面线程不读取缩略图缓存（不访问片段和缩略图包）
+        """
+        from src.core.thumbnail_cache import get_thumbnail_cache
+        
+        thumbnails = get_thumbnail_cache()
+        for folder in folders:
+            clips = []
+            try:
+                clips = self._preview_clips(folder, temp_dir)
+            except Exception as e:
+                logger.debug(f"列出预览片段失败: {str(e)}")
+            QtCore.QMetaObject.invokeMethod(self, "_on_thumbnail_clips_listed", QtCore.Qt.QueuedConnection,
+                                            QtCore.Q_ARG(str, folder), QtCore.Q_ARG(list, clips))
+            
+            def on_ready(clip, data, folder=folder):
+                if data:
+                    QtCore.QMetaObject.invokeMethod(self, "_on_thumbnail_ready", QtCore.Qt.QueuedConnection,
+                                                    QtCore.Q_ARG(str, folder), QtCore.Q_ARG(str, clip),
+                                                    QtCore.Q_ARG(bytes, data))
+            
+            # 已缓存的缩略图在本线程中立即回调，排在片段列表之后送达界面线程
+            for clip in clips:
+                thumbnails.request(folder, clip, on_ready)
+    
+    def _preview_clips(self, folder, temp_dir) -> List[str]:
+        """
+        文件夹用于预览的片段：共享素材目录中有该文件夹的数据时直接使用，
+        否则按扫描的规则查找"视频"子文件夹（支持快捷方式）并列出片段
+        """
+        from src.core.media_catalogue import MediaCatalogue, get_media_catalogue
+        from src.core.video_processor import media_cache_paths
+        
+        signature = MediaCatalogue.signature(*media_cache_paths(temp_dir, folder))
+        entry = get_media_catalogue().get(folder, signature)
+        if entry is not None:
+            paths = list(entry.videos.paths)
+        else:
+            video_dir = MediaCountWorker.find_media_dir(folder, "视频")
+            paths = [str(p) for p in list_media_files(video_dir, recursive=True)["videos"]] if video_dir else []
+        return sorted(paths)[:self.THUMBNAILS_PER_ROW]
+    
+    @QtCore.pyqtSlot(str, list)
+    def _on_thumbnail_clips_listed(self, folder, clips):
+        """记录文件夹用于预览的片段（期间素材列表被清空时忽略）"""
+        if folder not in self._thumbnail_clips:
+            return
+        self._thumbnail_clips[folder] = clips
+        self._thumbnail_data[folder] = {}
+    
+    @QtCore.pyqtSlot(str, str, bytes)
+    def _on_thumbnail_ready(self, folder, clip, data):
+        """收到一个缩略图后，用已收到的缩略图重新拼成预览图并更新对应行"""
+        clips = self._thumbnail_clips.get(folder)
+        received = self._thumbnail_data.get(folder)
+        if not clips or received is None or clip not in clips:
+            return
+        received[clip] = data
+        strip = QPixmap(self.THUMBNAIL_WIDTH * self.THUMBNAILS_PER_ROW, self.THUMBNAIL_HEIGHT)
+        strip.fill(Qt.transparent)
+        painter = QPainter(strip)
+        try:
+            for i, clip_path in enumerate(clips):
+                image_data = received.get(clip_path)
+                if not image_data:
+                    continue
+                image = QPixmap()
+                if not image.loadFromData(image_data):
+                    continue
+                image = image.scaled(self.THUMBNAIL_WIDTH, self.THUMBNAIL_HEIGHT,
+                                     Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                x = i * self.THUMBNAIL_WIDTH + (self.THUMBNAIL_WIDTH - image.width()) // 2
+                y = (self.THUMBNAIL_HEIGHT - image.height()) // 2
+                painter.drawPixmap(x, y, image)
+        finally:
+            painter.end()
+        self._thumbnail_strips[folder] = strip
+        for row in range(self.video_table.rowCount()):
+            path_item = self.video_table.item(row, 2)
+            if path_item is not None and path_item.text() == folder:
+                self._set_thumbnail_cell(row, folder)
+    
+    def _set_thumbnail_cell(self, row, folder):
+        """设置预览列的图标"""
+        item = self.video_table.item(row, self.THUMBNAIL_COLUMN)
+        if item is None:
+            item = QTableWidgetItem()
+            item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+            self.video_table.setItem(row, self.THUMBNAIL_COLUMN, item)
+        item.setIcon(QIcon(self._thumbnail_strips[folder]))
+        item.setToolTip("\n".join(os.path.basename(clip) for clip in self._thumbnail_clips.get(folder, [])))
+    
     def _on_table_cell_clicked(self, row, column):
         """处理表格单元格点击事件"""
         # 只处理状态列（第6列，索引为5）的点击
@@ -4534,159 +4843,77 @@ FFmpeg是一个功能强大的视频处理工具，它是本软件处理视频
                     # 记录日志
                     logger.info(f"将表格项转换为抽取模式项: {folder_path}")
 
-    # 修改 _update_media_counts 方法
-    def _update_media_counts(self):
-        """更新素材表格中每一行的视频和配音数量"""
-        from src.utils.file_utils import list_media_files, resolve_shortcut
-        logger.info("正在更新素材数量...")
+    def _update_media_counts(self, on_finished: Callable[[int, bool], None] = None):
+        """
+        在后台线程中更新素材表格中每一行的视频和配音数量，每完成一行立即更新表格
         
-        # 设置鼠标等待状态
-        QApplication.setOverrideCursor(Qt.WaitCursor)
+        Args:
+            on_finished: 全部完成或被取消后的回调，参数为(已完成行数, 是否被取消)
+        """
+        self.cancel_media_counts()
+        rows = []
+        for row in range(self.video_table.rowCount()):
+            item = self.video_table.item(row, 2)
+            if item and item.text():
+                rows.append((row, item.text()))
+        logger.info(f"正在后台更新素材数量，共 {len(rows)} 行...")
+        self.status_label.setText(f"正在更新素材数量 (0/{len(rows)})")
+        
+        # 每次统计使用新的代号，之前的统计已在队列中的结果在槽函数中丢弃
+        self._media_count_generation = getattr(self, "_media_count_generation", 0) + 1
+        worker = MediaCountWorker(rows, self.cache_config.get_cache_dir(), self._media_count_generation, self)
+        worker.row_counted.connect(self._on_media_counted)
+        worker.counting_finished.connect(lambda _generation, done, cancelled: self._on_media_counts_finished(
+            worker, len(rows), done, cancelled, on_finished))
+        self._count_worker = worker
+        self._counted_rows = 0
+        worker.start()
+    
+    def cancel_media_counts(self, wait: bool = False):
+        """
+        取消正在进行的素材数量统计，之后不再接收其逐行结果（结束通知仍会发出，用于释放线程）
         
-        try:
-            for row in range(self.video_table.rowCount()):
-                folder_path = self.video_table.item(row, 2).text()
-                if not folder_path or not os.path.exists(folder_path):
-                    continue
-                
-                # 检查"视频"子文件夹是否存在
-                video_path = os.path.join(folder_path, "视频")
-                video_count = 0
-                
-                # 处理视频文件夹或快捷方式
-                has_video_folder = os.path.exists(video_path) and os.path.isdir(video_path)
-                
-                # 如果视频文件夹不存在，检查可能的快捷方式
-                if not has_video_folder:
-                    # 检查特定命名格式的快捷方式
-                    video_shortcut_paths = [
-                        os.path.join(folder_path, "视频 - 快捷方式.lnk"),
-                        os.path.join(folder_path, "视频.lnk"),
-                        os.path.join(folder_path, "视频快捷方式.lnk")
-                    ]
-                    
-                    # 检查所有可能的命名格式
-                    for shortcut_path in video_shortcut_paths:
-                        if os.path.exists(shortcut_path):
-                            logger.info(f"发现视频快捷方式: {shortcut_path}")
-                            video_target = resolve_shortcut(shortcut_path)
-                            if video_target:
-                                video_path = video_target
-                                has_video_folder = True
-                                logger.info(f"检测到视频快捷方式: {shortcut_path} -> {video_path}")
-                                break
-                    
-                    # 如果仍未找到，则尝试搜索包含"视频"的所有.lnk文件
-                    if not has_video_folder:
-                        try:
-                            for item in os.listdir(folder_path):
-                                # 确保文件名是正确的字符串格式
-                                if isinstance(item, bytes):
-                                    try:
-                                        item = item.decode('utf-8')
-                                    except UnicodeDecodeError:
-                                        try:
-                                            item = item.decode('gbk')
-                                        except UnicodeDecodeError:
-                                            logger.error(f"无法解码文件名: {item}")
-                                            continue
-                                
-                                if item.lower().endswith('.lnk') and "视频" in item:
-                                    shortcut_path = os.path.join(folder_path, item)
-                                    logger.info(f"发现可能的视频快捷方式: {shortcut_path}")
-                                    video_target = resolve_shortcut(shortcut_path)
-                                    if video_target and os.path.isdir(video_target):
-                                        video_path = video_target
-                                        has_video_folder = True
-                                        logger.info(f"检测到视频快捷方式: {shortcut_path} -> {video_path}")
-                                        break
-                        except Exception as e:
-                            logger.error(f"搜索视频快捷方式时出错: {str(e)}")
-                
-                # 如果找到了视频文件夹，计算视频数量
-                if has_video_folder:
-                    try:
-                        media = list_media_files(video_path, recursive=True)
-                        video_count = len(media['videos'])
-                        logger.info(f"更新素材数量: 找到视频 {video_count} 个，路径: {video_path}")
-                    except Exception as e:
-                        logger.error(f"扫描视频文件夹失败: {str(e)}")
-                
-                # 检查"配音"子文件夹是否存在
-                audio_path = os.path.join(folder_path, "配音")
-                audio_count = 0
-                
-                # 处理配音文件夹或快捷方式
-                has_audio_folder = os.path.exists(audio_path) and os.path.isdir(audio_path)
-                
-                # 如果配音文件夹不存在，检查可能的快捷方式
-                if not has_audio_folder:
-                    # 检查特定命名格式的快捷方式
-                    audio_shortcut_paths = [
-                        os.path.join(folder_path, "配音 - 快捷方式.lnk"),
-                        os.path.join(folder_path, "配音.lnk"),
-                        os.path.join(folder_path, "配音快捷方式.lnk")
-                    ]
-                    
-                    # 检查所有可能的命名格式
-                    for shortcut_path in audio_shortcut_paths:
-                        if os.path.exists(shortcut_path):
-                            logger.info(f"发现配音快捷方式: {shortcut_path}")
-                            audio_target = resolve_shortcut(shortcut_path)
-                            if audio_target:
-                                audio_path = audio_target
-                                has_audio_folder = True
-                                logger.info(f"检测到配音快捷方式: {shortcut_path} -> {audio_path}")
-                                break
-                    
-                    # 如果仍未找到，则尝试搜索包含"配音"的所有.lnk文件
-                    if not has_audio_folder:
-                        try:
-                            for item in os.listdir(folder_path):
-                                # 确保文件名是正确的字符串格式
-                                if isinstance(item, bytes):
-                                    try:
-                                        item = item.decode('utf-8')
-                                    except UnicodeDecodeError:
-                                        try:
-                                            item = item.decode('gbk')
-                                        except UnicodeDecodeError:
-                                            logger.error(f"无法解码文件名: {item}")
-                                            continue
-                                
-                                if item.lower().endswith('.lnk') and "配音" in item:
-                                    shortcut_path = os.path.join(folder_path, item)
-                                    logger.info(f"发现可能的配音快捷方式: {shortcut_path}")
-                                    audio_target = resolve_shortcut(shortcut_path)
-                                    if audio_target and os.path.isdir(audio_target):
-                                        audio_path = audio_target
-                                        has_audio_folder = True
-                                        logger.info(f"检测到配音快捷方式: {shortcut_path} -> {audio_path}")
-                                        break
-                        except Exception as e:
-                            logger.error(f"搜索配音快捷方式时出错: {str(e)}")
-                
-                # 如果找到了配音文件夹，计算音频数量
-                if has_audio_folder:
-                    try:
-                        media = list_media_files(audio_path, recursive=True)
-                        audio_count = len(media['audios'])
-                        logger.info(f"更新素材数量: 找到配音 {audio_count} 个，路径: {audio_path}")
-                    except Exception as e:
-                        logger.error(f"扫描音频文件夹失败: {str(e)}")
-                
-                # 更新表格项
-                self.video_table.setItem(row, 3, QTableWidgetItem(str(video_count)))
-                self.video_table.setItem(row, 4, QTableWidgetItem(str(audio_count)))
-            
-            logger.info("素材数量更新完成")
-        except Exception as e:
-            logger.error(f"更新素材数量时出错: {str(e)}")
-        finally:
-            # 恢复鼠标指针
-            QApplication.restoreOverrideCursor()
-
+        Args:
+            wait: 是否等待后台线程结束（关闭窗口时使用）
+        """
+        worker = getattr(self, "_count_worker", None)
+        if worker is not None and worker.isRunning():
+            worker.cancel()
+            try:
+                worker.row_counted.disconnect(self._on_media_counted)
+            except TypeError:
+                pass
+            if wait:
+                worker.wait(3000)
     
+    @pyqtSlot(int, int, str, int, int)
+    def _on_media_counted(self, generation, row, folder_path, video_count, audio_count):
+        """后台统计完成一行时更新表格（行可能已被移动或删除，按路径重新定位）"""
+        if generation != getattr(self, "_media_count_generation", 0):
+            return  # 已被新的统计取代
+        item = self.video_table.item(row, 2) if row < self.video_table.rowCount() else None
+        if item is None or item.text() != folder_path:
+            row = next((r for r in range(self.video_table.rowCount())
+                        if self.video_table.item(r, 2) and self.video_table.item(r, 2).text() == folder_path), -1)
+            if row < 0:
+                return
+        self.video_table.setItem(row, 3, QTableWidgetItem(str(video_count)))
+        self.video_table.setItem(row, 4, QTableWidgetItem(str(audio_count)))
+        self._counted_rows += 1
+        self.status_label.setText(f"正在更新素材数量 ({self._counted_rows}/{self.video_table.rowCount()})")
+    
+    def _on_media_counts_finished(self, worker, total, done, cancelled, on_finished):
+        if worker is getattr(self, "_count_worker", None):
+            self._count_worker = None
+            if cancelled:
+                self.status_label.setText(f"素材数量更新已取消 ({done}/{total})")
+            else:
+                self.status_label.setText("素材数量更新完成")
+        logger.info(f"素材数量更新{'已取消' if cancelled else '完成'}，已更新 {done}/{total} 行")
+        worker.deleteLater()
+        if on_finished is not None:
+            on_finished(done, cancelled)
+
     # 已移除重复的_import_material_folder方法实现
 
     def force_progress_update(self):
@@ -0,0 +1,332 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+FFmpeg注册表模块
+进程内只解析一次FFmpeg/FFprobe可执行文件路径，
+并把版本、编码器、解码器、滤镜和硬件加速方式缓存到配置目录
+（以可执行文件路径+修改时间+大小为键），
+供VideoProcessor、GPUConfig和SystemAnalyzer共用，避免重复启动子进程
+"""
+
+import os
+import re
+import sys
+import json
+import shutil
+import logging
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+
+from .path_utils import get_config_dir, get_project_root
+
+# 日志设置
+logger = logging.getLogger(__name__)
+
+# 能力缓存文件路径
+CACHE_FILE = get_config_dir() / "ffmpeg_registry_cache.json"
+
+# 缓存格式版本
+CACHE_VERSION = 1
+
+# 硬件编码器关键字
+HW_ENCODER_KEYWORDS = ("nvenc", "qsv", "amf", "vaapi", "videotoolbox")
+
+
+def _parse_codec_list(output: str) -> List[str]:
+    """解析 ffmpeg -encoders / -decoders 的输出，返回编解码器名称列表"""
+    names = []
+    started = False
+    for line in output.splitlines():
+        if not started:
+            # 列表以 " ------" 分隔行开始
+            if line.strip().startswith("------"):
+                started = True
+            continue
+        match = re.match(r"^\s*[VASD.][A-Z.]{5}\s+(\S+)", line)
+        if match:
+            names.append(match.group(1))
+    return names
+
+
+def _parse_filter_list(output: str) -> List[str]:
+    """解析 ffmpeg -filters 的输出，返回滤镜名称列表"""
+    names = []
+    for line in output.splitlines():
+        match = re.match(r"^\s*[TSC.|]{2,3}\s+(\S+)\s+\S*->\S*", line)
+        if match:
+            names.append(match.group(1))
+    return names
+
+
+def _parse_hwaccels(output: str) -> List[str]:
+    """解析 ffmpeg -hwaccels 的输出"""
+    lines = [line.strip() for line in output.splitlines()]
+    if "Hardware acceleration methods:" in lines:
+        lines = lines[lines.index("Hardware acceleration methods:") + 1:]
+    return [line for line in lines if line and " " not in line]
+
+
+class FFmpegRegistry:
+    """
+    进程内共享的FFmpeg注册表
+
+    用法:
+        registry = get_ffmpeg_registry()
+        cmd = [registry.ffmpeg_path(), "-i", ...]
+        if registry.has_encoder("h264_nvenc"):
+            ...
+    """
+
+    def __init__(self, cache_file=CACHE_FILE):
+        """
+        初始化注册表（不启动子进程，能力信息在首次访问时获取）
+
+        Args:
+            cache_file: 能力缓存文件路径
+        """
+        self.cache_file = cache_file
+        self._lock = threading.RLock()
+        self._ffmpeg_path: Optional[str] = None
+        self._ffprobe_path: Optional[str] = None
+        self._custom_path = False
+        self._capabilities: Optional[Dict[str, Any]] = None
+
+    def reload(self):
+        """重新解析路径和能力（用户修改ffmpeg_path.txt后调用）"""
+        with self._lock:
+            self._ffmpeg_path = None
+            self._ffprobe_path = None
+            self._capabilities = None
+
+    def _resolve(self):
+        """解析FFmpeg和FFprobe路径，优先使用项目根目录ffmpeg_path.txt中的自定义路径"""
+        ffmpeg_cmd = "ffmpeg"
+        custom = False
+        try:
+            ffmpeg_path_file = get_project_root() / "ffmpeg_path.txt"
+            if ffmpeg_path_file.exists():
+                custom_path = ffmpeg_path_file.read_text(encoding="utf-8").strip()
+                if custom_path and os.path.exists(custom_path):
+                    logger.info(f"使用自定义FFmpeg路径: {custom_path}")
+                    ffmpeg_cmd = custom_path
+                    custom = True
+                elif custom_path:
+                    logger.warning(f"自定义FFmpeg路径无效或不存在: {custom_path}")
+        except Exception as e:
+            logger.error(f"读取自定义FFmpeg路径时出错: {str(e)}")
+
+        # FFprobe优先取与FFmpeg同目录的可执行文件
+        ffprobe_cmd = "ffprobe"
+        directory, filename = os.path.split(ffmpeg_cmd)
+        if directory:
+            candidate = os.path.join(directory, filename.replace("ffmpeg", "ffprobe"))
+            if os.path.exists(candidate):
+                ffprobe_cmd = candidate
+        self._ffmpeg_path = ffmpeg_cmd
+        self._ffprobe_path = ffprobe_cmd
+        self._custom_path = custom
+
+    def ffmpeg_path(self) -> str:
+        """FFmpeg命令路径"""
+        if self._ffmpeg_path is None:
+            with self._lock:
+                if self._ffmpeg_path is None:
+                    self._resolve()
+        return self._ffmpeg_path
+
+    def ffprobe_path(self) -> str:
+        """FFprobe命令路径"""
+        if self._ffprobe_path is None:
+            self.ffmpeg_path()
+        return self._ffprobe_path
+
+    def is_custom_path(self) -> bool:
+        """是否使用了ffmpeg_path.txt中的自定义路径"""
+        self.ffmpeg_path()
+        return self._custom_path
+
+    def binary_location(self) -> str:
+        """FFmpeg可执行文件的绝对路径，找不到时返回空字符串"""
+        path = self.ffmpeg_path()
+        if os.path.isabs(path) or os.path.dirname(path):
+            return os.path.abspath(path) if os.path.exists(path) else ""
+        return shutil.which(path) or ""
+
+    def _cache_key(self) -> Optional[str]:
+        location = self.binary_location()
+        if not location:
+            return None
+        try:
+            stat = os.stat(location)
+        except OSError:
+            return None
+        return f"{location}|{int(stat.st_mtime)}|{stat.st_size}"
+
+    def _load_cache(self) -> Dict[str, Any]:
+        try:
+            if self.cache_file.exists():
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == CACHE_VERSION:
+                    return data
+        except Exception as e:
+            logger.warning(f"加载FFmpeg能力缓存出错: {e}")
+        return {"version": CACHE_VERSION, "binaries": {}}
+
+    def _save_cache(self, key: str, capabilities: Dict[str, Any]):
+        try:
+            data = self._load_cache()
+            data["binaries"][key] = capabilities
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.cache_file.with_suffix(f".{os.getpid()}.tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.cache_file)
+            logger.info(f"已保存FFmpeg能力缓存到 {self.cache_file}")
+        except Exception as e:
+            logger.warning(f"保存FFmpeg能力缓存出错: {e}")
+
+    def _run_query(self, option: str) -> str:
+        kwargs = {}
+        if sys.platform == "win32":
+            kwargs["creationflags"] = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        result = subprocess.run([self.ffmpeg_path(), "-hide_banner", option],
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                text=True, encoding="utf-8", errors="ignore",
+                                timeout=10, **kwargs)
+        return result.stdout or ""
+
+    def _probe(self) -> Dict[str, Any]:
+        """启动FFmpeg查询版本和能力（四个查询并发执行）"""
+        capabilities: Dict[str, Any] = {
+            "available": False, "path": self.ffmpeg_path(), "version": "", "version_line": "",
+            "encoders": [], "decoders": [], "filters": [], "hwaccels": [],
+        }
+        try:
+            kwargs = {}
+            if sys.platform == "win32":
+                kwargs["creationflags"] = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+            logger.info(f"正在检查FFmpeg: {self.ffmpeg_path()}")
+            result = subprocess.run([self.ffmpeg_path(), "-version"], stdout=subprocess.PIPE,
+                                    stderr=subprocess.PIPE, text=True, encoding="utf-8",
+                                    errors="ignore", timeout=5, **kwargs)
+        except FileNotFoundError:
+            capabilities["error"] = "未找到FFmpeg"
+            return capabilities
+        except PermissionError:
+            capabilities["error"] = "没有执行FFmpeg的权限"
+            return capabilities
+        except subprocess.TimeoutExpired:
+            capabilities["error"] = "检查FFmpeg超时"
+            return capabilities
+        except Exception as e:
+            capabilities["error"] = str(e)
+            return capabilities
+
+        if result.returncode != 0:
+            capabilities["error"] = f"返回码: {result.returncode}, 错误: {result.stderr}"
+            return capabilities
+
+        output = result.stdout or ""
+        capabilities["available"] = True
+        capabilities["version_line"] = output.splitlines()[0] if output else ""
+        version_match = re.search(r"ffmpeg version (\S+)", output)
+        if version_match:
+            capabilities["version"] = version_match.group(1)
+        capabilities["buildconf"] = " ".join(re.findall(r"--enable-\S+", output))
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {option: executor.submit(self._run_query, option)
+                       for option in ("-encoders", "-decoders", "-filters", "-hwaccels")}
+            try:
+                capabilities["encoders"] = _parse_codec_list(futures["-encoders"].result())
+                capabilities["decoders"] = _parse_codec_list(futures["-decoders"].result())
+                capabilities["filters"] = _parse_filter_list(futures["-filters"].result())
+                capabilities["hwaccels"] = _parse_hwaccels(futures["-hwaccels"].result())
+            except Exception as e:
+                logger.warning(f"查询FFmpeg能力时出错: {str(e)}")
+        return capabilities
+
+    def capabilities(self) -> Dict[str, Any]:
+        """
+        获取FFmpeg能力信息，优先使用内存和磁盘缓存
+
+        Returns:
+            Dict: available, path, version, version_line, encoders, decoders, filters, hwaccels
+        """
+        if self._capabilities is not None:
+            return self._capabilities
+        with self._lock:
+            if self._capabilities is not None:
+                return self._capabilities
+            key = self._cache_key()
+            if key:
+                cached = self._load_cache()["binaries"].get(key)
+                if cached:
+                    logger.debug(f"使用缓存的FFmpeg能力信息: {key}")
+                    self._capabilities = cached
+                    return cached
+            capabilities = self._probe()
+            # 只缓存成功的结果，找不到FFmpeg时下次仍会重新检查
+            if key and capabilities.get("available"):
+                self._save_cache(key, capabilities)
+            self._capabilities = capabilities
+            return capabilities
+
+    def available(self) -> bool:
+        """FFmpeg是否可用"""
+        return bool(self.capabilities().get("available"))
+
+    def version(self) -> str:
+        """FFmpeg版本号"""
+        return self.capabilities().get("version", "")
+
+    def encoders(self) -> List[str]:
+        """支持的编码器列表"""
+        return self.capabilities().get("encoders", [])
+
+    def decoders(self) -> List[str]:
+        """支持的解码器列表"""
+        return self.capabilities().get("decoders", [])
+
+    def filters(self) -> List[str]:
+        """支持的滤镜列表"""
+        return self.capabilities().get("filters", [])
+
+    def hwaccels(self) -> List[str]:
+        """支持的硬件加速方式列表"""
+        return self.capabilities().get("hwaccels", [])
+
+    def has_encoder(self, name: str) -> bool:
+        """是否支持指定编码器"""
+        return name in self.encoders()
+
+    def has_decoder(self, name: str) -> bool:
+        """是否支持指定解码器"""
+        return name in self.decoders()
+
+    def has_filter(self, name: str) -> bool:
+        """是否支持指定滤镜"""
+        return name in self.filters()
+
+    def hardware_encoders(self) -> List[str]:
+        """支持的硬件编码器列表，如h264_nvenc、hevc_qsv"""
+        return [name for name in self.encoders() if any(k in name for k in HW_ENCODER_KEYWORDS)]
+
+
+# 进程内共享的注册表实例
+_registry_instance: Optional[FFmpegRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_ffmpeg_registry() -> FFmpegRegistry:
+    """获取进程内共享的FFmpeg注册表"""
+    global _registry_instance
+    if _registry_instance is None:
+        with _registry_lock:
+            if _registry_instance is None:
+                _registry_instance = FFmpegRegistry()
+    return _registry_instance
@@ -47,6 +47,16 @@ def resolve_shortcut(shortcut_path):
         logger.warning(f"文件不是快捷方式(.lnk): {shortcut_path}")
         return None
     
+    # 方法0: 纯Python解析快捷方式文件（不依赖COM，结果在进程内缓存）
+    try:
+        from src.utils.lnk_parser import get_shortcut_resolver
+        target_path = get_shortcut_resolver().resolve(shortcut_path)
+        if target_path:
+            logger.debug(f"成功解析快捷方式: {shortcut_path} -> {target_path}")
+            return target_path
+    except Exception as e:
+        logger.debug(f"纯Python解析快捷方式失败，尝试系统接口: {str(e)}")
+    
     # 跟踪COM初始化状态
     com_initialized = False
     
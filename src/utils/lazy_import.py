@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+延迟导入模块
+moviepy、cv2、pydub、librosa、win32等重量级依赖只在首次使用时导入，
+避免拖慢GUI和批处理入口的启动速度
+"""
+
+import importlib
+import importlib.util
+import threading
+from typing import Any, Optional
+
+
+class LazyImport:
+    """
+    延迟导入代理：首次访问属性或调用时才真正导入模块
+
+    用法:
+        cv2 = LazyImport("cv2")
+        AudioSegment = LazyImport("pydub", "AudioSegment")
+        cv2.resize(...)                  # 此时才导入cv2
+        AudioSegment.from_file(path)     # 此时才导入pydub
+    """
+
+    def __init__(self, module_name: str, attribute: Optional[str] = None):
+        """
+        初始化延迟导入代理
+
+        Args:
+            module_name: 模块名，如"moviepy.editor"
+            attribute: 模块中的属性名，为None时代理整个模块
+        """
+        object.__setattr__(self, "_module_name", module_name)
+        object.__setattr__(self, "_attribute", attribute)
+        object.__setattr__(self, "_target", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _load(self) -> Any:
+        target = self._target
+        if target is not None:
+            return target
+        with self._lock:
+            if self._target is None:
+                try:
+                    module = importlib.import_module(self._module_name)
+                except ImportError as e:
+                    raise ImportError(f"请安装必要的依赖: {e}") from e
+                target = getattr(module, self._attribute) if self._attribute else module
+                object.__setattr__(self, "_target", target)
+            return self._target
+
+    @property
+    def loaded(self) -> bool:
+        """是否已经导入"""
+        return self._target is not None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._load(), name, value)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self._load()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        name = f"{self._module_name}.{self._attribute}" if self._attribute else self._module_name
+        state = "已导入" if self.loaded else "未导入"
+        return f"<LazyImport {name} ({state})>"
+
+
+def is_available(module_name: str) -> bool:
+    """
+    检查模块是否已安装（只查找模块元数据，不执行导入）
+
+    Args:
+        module_name: 顶层模块名，如"cv2"
+
+    Returns:
+        bool: 模块是否可用
+    """
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
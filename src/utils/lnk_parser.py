@@ -0,0 +1,317 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+快捷方式解析模块
+纯Python解析Windows快捷方式(.lnk，Shell Link二进制格式)：读取LinkInfo中的本地路径和网络路径、
+相对路径、环境变量目标等字符串，不依赖COM，在任何系统上都可以使用；
+解析结果按(快捷方式路径, 修改时间, 大小)在进程内缓存，
+并支持按配置的路径前缀映射（如在Linux渲染机上把 D:\\素材 映射到挂载的共享目录）
+"""
+
+import os
+import sys
+import json
+import struct
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .path_utils import get_config_dir
+
+# 日志设置
+logger = logging.getLogger(__name__)
+
+# 路径映射配置文件
+CONFIG_FILE = get_config_dir() / "shortcut_settings.json"
+
+# 文件头
+HEADER_SIZE = 0x4C
+LINK_CLSID = bytes.fromhex("0114020000000000c000000000000046")
+
+# LinkFlags
+HAS_LINK_TARGET_ID_LIST = 0x00000001
+HAS_LINK_INFO = 0x00000002
+HAS_NAME = 0x00000004
+HAS_RELATIVE_PATH = 0x00000008
+HAS_WORKING_DIR = 0x00000010
+HAS_ARGUMENTS = 0x00000020
+HAS_ICON_LOCATION = 0x00000040
+IS_UNICODE = 0x00000080
+
+# LinkInfoFlags
+VOLUME_ID_AND_LOCAL_BASE_PATH = 0x1
+COMMON_NETWORK_RELATIVE_LINK_AND_PATH_SUFFIX = 0x2
+
+# EnvironmentVariableDataBlock签名
+ENVIRONMENT_BLOCK_SIGNATURE = 0xA0000001
+
+# 非Unicode字符串使用创建快捷方式的系统代码页，非Windows系统上默认按简体中文代码页解码
+DEFAULT_ANSI_ENCODING = "mbcs" if sys.platform == "win32" else "gbk"
+
+# 进程内缓存的最大条目数
+MAX_CACHE_ENTRIES = 4096
+
+
+def _read_cstring(data: bytes, offset: int, encoding: str) -> str:
+    """读取以0结尾的单字节字符串"""
+    end = data.find(b"\x00", offset)
+    if end < 0:
+        end = len(data)
+    return data[offset:end].decode(encoding, errors="replace")
+
+
+def _read_wstring(data: bytes, offset: int) -> str:
+    """读取以0结尾的UTF-16LE字符串"""
+    end = offset
+    while end + 1 < len(data) and data[end:end + 2] != b"\x00\x00":
+        end += 2
+    return data[offset:end].decode("utf-16-le", errors="replace")
+
+
+class ShellLink:
+    """解析后的快捷方式信息"""
+
+    def __init__(self):
+        self.flags = 0
+        self.local_base_path = ""       # LinkInfo中的本地路径（如 D:\\素材\\）
+        self.network_path = ""          # LinkInfo中的网络共享名（如 \\\\server\\share）
+        self.common_path_suffix = ""    # 拼接在本地路径或网络共享名之后的部分
+        self.name = ""
+        self.relative_path = ""         # 相对快捷方式所在目录的路径
+        self.working_dir = ""
+        self.arguments = ""
+        self.icon_location = ""
+        self.environment_target = ""    # 含环境变量的目标路径（如 %USERPROFILE%\\素材）
+
+    @property
+    def local_path(self) -> str:
+        """本地目标路径"""
+        if not self.local_base_path:
+            return ""
+        return self.local_base_path + self.common_path_suffix
+
+    @property
+    def unc_path(self) -> str:
+        """网络目标路径"""
+        if not self.network_path:
+            return ""
+        if not self.common_path_suffix:
+            return self.network_path
+        return self.network_path.rstrip("\\") + "\\" + self.common_path_suffix
+
+
+def _parse_link_info(data: bytes, offset: int, link: ShellLink, encoding: str) -> int:
+    """解析LinkInfo结构，返回结构之后的偏移"""
+    size, header_size, flags = struct.unpack_from("<III", data, offset)
+    (_, local_base_offset, network_offset, suffix_offset) = struct.unpack_from("<IIII", data, offset + 12)
+    local_base_offset_unicode = suffix_offset_unicode = 0
+    if header_size >= 0x24:
+        local_base_offset_unicode, suffix_offset_unicode = struct.unpack_from("<II", data, offset + 28)
+
+    if flags & VOLUME_ID_AND_LOCAL_BASE_PATH:
+        if local_base_offset_unicode:
+            link.local_base_path = _read_wstring(data, offset + local_base_offset_unicode)
+        else:
+            link.local_base_path = _read_cstring(data, offset + local_base_offset, encoding)
+
+    if flags & COMMON_NETWORK_RELATIVE_LINK_AND_PATH_SUFFIX:
+        base = offset + network_offset
+        net_name_offset = struct.unpack_from("<I", data, base + 8)[0]
+        if net_name_offset > 0x14:
+            net_name_offset_unicode = struct.unpack_from("<I", data, base + 20)[0]
+            link.network_path = _read_wstring(data, base + net_name_offset_unicode)
+        else:
+            link.network_path = _read_cstring(data, base + net_name_offset, encoding)
+
+    if suffix_offset_unicode:
+        link.common_path_suffix = _read_wstring(data, offset + suffix_offset_unicode)
+    elif suffix_offset:
+        link.common_path_suffix = _read_cstring(data, offset + suffix_offset, encoding)
+    return offset + size
+
+
+def parse_lnk(data: bytes, encoding: str = DEFAULT_ANSI_ENCODING) -> ShellLink:
+    """
+    解析快捷方式文件内容
+
+    Args:
+        data: .lnk文件的全部字节
+        encoding: 非Unicode字符串的编码
+
+    Returns:
+        ShellLink: 解析结果
+
+    Raises:
+        ValueError: 不是有效的快捷方式文件
+    """
+    if len(data) < HEADER_SIZE or struct.unpack_from("<I", data, 0)[0] != HEADER_SIZE \
+            or data[4:20] != LINK_CLSID:
+        raise ValueError("不是有效的快捷方式文件")
+    link = ShellLink()
+    link.flags = flags = struct.unpack_from("<I", data, 20)[0]
+    try:
+        offset = HEADER_SIZE
+        if flags & HAS_LINK_TARGET_ID_LIST:
+            offset += 2 + struct.unpack_from("<H", data, offset)[0]
+        if flags & HAS_LINK_INFO:
+            offset = _parse_link_info(data, offset, link, encoding)
+
+        # StringData按固定顺序出现，每项以字符数开头
+        for flag, attr in ((HAS_NAME, "name"), (HAS_RELATIVE_PATH, "relative_path"),
+                           (HAS_WORKING_DIR, "working_dir"), (HAS_ARGUMENTS, "arguments"),
+                           (HAS_ICON_LOCATION, "icon_location")):
+            if not flags & flag:
+                continue
+            count = struct.unpack_from("<H", data, offset)[0]
+            offset += 2
+            if flags & IS_UNICODE:
+                value = data[offset:offset + count * 2].decode("utf-16-le", errors="replace")
+                offset += count * 2
+            else:
+                value = data[offset:offset + count].decode(encoding, errors="replace")
+                offset += count
+            setattr(link, attr, value)
+
+        # ExtraData：只关心环境变量目标
+        while offset + 8 <= len(data):
+            block_size, signature = struct.unpack_from("<II", data, offset)
+            if block_size < 8:
+                break
+            if signature == ENVIRONMENT_BLOCK_SIGNATURE and block_size >= 8 + 260 + 520:
+                target = _read_wstring(data, offset + 8 + 260)
+                link.environment_target = target or _read_cstring(data, offset + 8, encoding)
+            offset += block_size
+    except struct.error as e:
+        raise ValueError(f"快捷方式文件不完整: {str(e)}")
+    return link
+
+
+class ShortcutResolver:
+    """
+    快捷方式解析器（带进程内缓存和路径前缀映射）
+
+    用法:
+        resolver = get_shortcut_resolver()
+        target = resolver.resolve("D:/素材/场景1/视频.lnk")
+    """
+
+    def __init__(self, path_remap: List[Tuple[str, str]] = None, encoding: str = None):
+        """
+        初始化解析器
+
+        Args:
+            path_remap: [(原路径前缀, 替换后的前缀)]，为None时从配置文件加载
+            encoding: 非Unicode字符串的编码，为None时从配置文件加载
+        """
+        config = self._load_config() if path_remap is None or encoding is None else {}
+        if path_remap is None:
+            path_remap = [tuple(item) for item in config.get("path_remap", [])]
+        self.encoding = encoding or config.get("ansi_encoding") or DEFAULT_ANSI_ENCODING
+        self._lock = threading.Lock()
+        self._cache: Dict[Tuple[str, int, int], Optional[str]] = {}
+        self.set_path_remap(path_remap)
+
+    @staticmethod
+    def _load_config() -> dict:
+        try:
+            if os.path.exists(CONFIG_FILE):
+                with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"加载快捷方式配置失败: {str(e)}")
+        return {}
+
+    def set_path_remap(self, path_remap: List[Tuple[str, str]]):
+        """设置路径前缀映射（较长的前缀优先匹配），并清空解析缓存"""
+        normalized = [(src.replace("/", "\\").rstrip("\\").lower(), dst) for src, dst in path_remap if src]
+        with self._lock:
+            self.path_remap = [tuple(item) for item in path_remap]
+            self._remap_rules = sorted(normalized, key=lambda item: len(item[0]), reverse=True)
+            self._cache.clear()
+
+    def save_config(self):
+        """把当前路径映射和编码保存到配置文件"""
+        try:
+            os.makedirs(os.path.dirname(CONFIG_FILE), exist_ok=True)
+            with open(CONFIG_FILE, "w", encoding="utf-8") as f:
+                json.dump({"path_remap": [list(item) for item in self.path_remap],
+                           "ansi_encoding": self.encoding}, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.warning(f"保存快捷方式配置失败: {str(e)}")
+
+    def remap(self, path: str) -> str:
+        """按前缀映射转换快捷方式中记录的Windows路径，并转换为当前系统的分隔符"""
+        normalized = path.replace("/", "\\")
+        lowered = normalized.lower()
+        for src, dst in self._remap_rules:
+            if lowered == src or lowered.startswith(src + "\\"):
+                rest = normalized[len(src):].lstrip("\\")
+                path = os.path.join(dst, *rest.split("\\")) if rest else dst
+                break
+        if os.sep != "\\":
+            path = path.replace("\\", os.sep)
+        return path
+
+    def _candidates(self, shortcut_path: str, link: ShellLink) -> List[str]:
+        candidates = []
+        if link.local_path:
+            candidates.append(self.remap(link.local_path))
+        if link.unc_path:
+            candidates.append(self.remap(link.unc_path))
+        if link.environment_target:
+            candidates.append(self.remap(os.path.expandvars(link.environment_target)))
+        if link.relative_path:
+            relative = link.relative_path.replace("\\", os.sep)
+            candidates.append(os.path.normpath(os.path.join(os.path.dirname(shortcut_path), relative)))
+        return candidates
+
+    def resolve(self, shortcut_path: str) -> Optional[str]:
+        """
+        解析快捷方式目标
+
+        依次尝试本地路径、网络路径、环境变量路径和相对路径，返回第一个存在的路径；
+        都不存在时返回第一个候选路径（与系统解析结果一致），无法解析时返回None
+
+        都不存在时返回的候选路径不缓存，目标（如网络共享、挂载目录）之后出现时可以重新选择
+        """
+        try:
+            stat = os.stat(shortcut_path)
+        except OSError:
+            return None
+        key = (os.path.abspath(shortcut_path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+
+        target = None
+        try:
+            with open(shortcut_path, "rb") as f:
+                link = parse_lnk(f.read(), self.encoding)
+            candidates = self._candidates(shortcut_path, link)
+            target = next((path for path in candidates if os.path.exists(path)), None)
+            if target is None and candidates:
+                return candidates[0]
+        except (OSError, ValueError) as e:
+            logger.debug(f"解析快捷方式失败: {shortcut_path}, 错误: {str(e)}")
+
+        with self._lock:
+            if len(self._cache) >= MAX_CACHE_ENTRIES:
+                self._cache.clear()
+            self._cache[key] = target
+        return target
+
+
+# 进程内共享的解析器
+_resolver_instance: Optional[ShortcutResolver] = None
+_resolver_lock = threading.Lock()
+
+
+def get_shortcut_resolver() -> ShortcutResolver:
+    """获取进程内共享的快捷方式解析器"""
+    global _resolver_instance
+    if _resolver_instance is None:
+        with _resolver_lock:
+            if _resolver_instance is None:
+                _resolver_instance = ShortcutResolver()
+    return _resolver_instance
@@ -0,0 +1,376 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+媒体文件头读取模块
+纯Python读取常见容器的文件头（MP4/MOV/M4A的moov、Matroska的Segment/Info和Tracks、
+MP3的Xing/VBRI帧或固定码率帧头、WAV的fmt/data块），获取时长、画面尺寸和编码标识；
+文件以内存映射方式打开，每个文件只会读入头部所在的几个页面，
+扫描素材时作为首选的时长探测方式，无法识别时再使用FFprobe
+"""
+
+import os
+import mmap
+import struct
+import logging
+from typing import Dict, Any, Optional, Tuple
+
+# 日志设置
+logger = logging.getLogger(__name__)
+
+# MP4中可以包含子box的容器box
+_MP4_CONTAINERS = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+
+# 识别为MP4/MOV的首个box类型
+_MP4_TOP_LEVEL = {b"ftyp", b"moov", b"mdat", b"free", b"wide", b"skip", b"pnot"}
+
+# Matroska元素ID
+_EBML_HEADER = 0x1A45DFA3
+_MKV_SEGMENT = 0x18538067
+_MKV_INFO = 0x1549A966
+_MKV_TIMECODE_SCALE = 0x2AD7B1
+_MKV_DURATION = 0x4489
+_MKV_TRACKS = 0x1654AE6B
+_MKV_TRACK_ENTRY = 0xAE
+_MKV_TRACK_TYPE = 0x83
+_MKV_CODEC_ID = 0x86
+_MKV_VIDEO = 0xE0
+_MKV_PIXEL_WIDTH = 0xB0
+_MKV_PIXEL_HEIGHT = 0xBA
+_MKV_CLUSTER = 0x1F43B675
+
+# MP3比特率表(kbps)，按(MPEG-1, 层)和(MPEG-2/2.5, 层)索引
+_MP3_BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+# MP3帧同步最多向后查找的字节数
+_MP3_SYNC_SEARCH = 64 * 1024
+
+
+def _new_info(fmt: str) -> Dict[str, Any]:
+    return {"format": fmt, "duration": None, "width": None, "height": None,
+            "video_codec": None, "audio_codec": None}
+
+
+# ----------------------------------------------------------------------
+# MP4 / MOV / M4A
+# ----------------------------------------------------------------------
+
+def _mp4_boxes(data, start: int, end: int, clamp: bool = True):
+    """
+    遍历[start, end)范围内的box，生成(类型, 内容起点, box终点)
+
+    clamp为False时遇到超出范围的box（文件被截断）即停止，否则把box终点截到范围末尾
+    """
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, offset)
+        header = 8
+        if size == 1:
+            if offset + 16 > end:
+                return
+            size = struct.unpack_from(">Q", data, offset + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header or (not clamp and offset + size > end):
+            return
+        yield box_type, offset + header, min(offset + size, end)
+        offset += size
+
+
+def _parse_mp4(data) -> Optional[Dict[str, Any]]:
+    info = _new_info("mp4")
+    # moov不完整（文件被截断）时不使用其中的信息
+    moov = next(((start, end) for box_type, start, end in _mp4_boxes(data, 0, len(data), clamp=False)
+                 if box_type == b"moov"), None)
+    if moov is None:
+        return None
+
+    def _walk(start, end, track):
+        for box_type, content, box_end in _mp4_boxes(data, start, end):
+            if box_type == b"mvhd":
+                version = data[content]
+                if version == 1:
+                    timescale, duration = struct.unpack_from(">IQ", data, content + 20)
+                else:
+                    timescale, duration = struct.unpack_from(">II", data, content + 12)
+                if timescale:
+                    info["duration"] = duration / timescale
+            elif box_type == b"trak":
+                track = {"handler": None, "codec": None, "width": 0, "height": 0}
+                _walk(content, box_end, track)
+                if track["handler"] == b"vide" and info["video_codec"] is None:
+                    info["video_codec"] = track["codec"]
+                    info["width"], info["height"] = track["width"] or None, track["height"] or None
+                elif track["handler"] == b"soun" and info["audio_codec"] is None:
+                    info["audio_codec"] = track["codec"]
+            elif box_type == b"tkhd" and track is not None:
+                # 宽高为16.16定点数，位于box末尾
+                width, height = struct.unpack_from(">II", data, box_end - 8)
+                track["width"], track["height"] = width >> 16, height >> 16
+            elif box_type == b"hdlr" and track is not None and track["handler"] is None:
+                # MOV的minf中还有数据引用的hdlr(alis/url)，只取mdia中的第一个
+                track["handler"] = bytes(data[content + 8:content + 12])
+            elif box_type == b"stsd" and track is not None:
+                if struct.unpack_from(">I", data, content + 4)[0]:
+                    codec = bytes(data[content + 12:content + 16])
+                    track["codec"] = codec.decode("latin-1").strip()
+            elif box_type in _MP4_CONTAINERS:
+                _walk(content, box_end, track)
+
+    _walk(moov[0], moov[1], None)
+    if info["duration"] is None:
+        return None
+    if info["video_codec"] is None and info["audio_codec"] is not None:
+        info["format"] = "m4a"
+    return info
+
+
+# ----------------------------------------------------------------------
+# Matroska / WebM
+# ----------------------------------------------------------------------
+
+def _ebml_vint(data, offset: int, keep_marker: bool) -> Tuple[int, int]:
+    """读取EBML变长整数，返回(值, 长度)；keep_marker为True时保留长度标记位（元素ID）"""
+    first = data[offset]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        raise ValueError("无效的EBML变长整数")
+    value = first if keep_marker else first & (mask - 1)
+    all_ones = value == mask - 1
+    for i in range(1, length):
+        byte = data[offset + i]
+        value = (value << 8) | byte
+        all_ones = all_ones and byte == 0xFF
+    if not keep_marker and all_ones:
+        value = -1  # 未知长度
+    return value, length
+
+
+def _ebml_elements(data, start: int, end: int):
+    """遍历[start, end)范围内的元素，生成(元素ID, 内容起点, 内容终点)"""
+    offset = start
+    while offset < end:
+        element_id, id_length = _ebml_vint(data, offset, True)
+        size, size_length = _ebml_vint(data, offset + id_length, False)
+        content = offset + id_length + size_length
+        content_end = end if size < 0 else min(content + size, end)
+        yield element_id, content, content_end
+        offset = content_end
+
+
+def _ebml_uint(data, start: int, end: int) -> int:
+    return int.from_bytes(data[start:end], "big")
+
+
+def _parse_mkv(data) -> Optional[Dict[str, Any]]:
+    info = _new_info("mkv")
+    segment = next(((start, end) for element_id, start, end in _ebml_elements(data, 0, len(data))
+                    if element_id == _MKV_SEGMENT), None)
+    if segment is None:
+        return None
+    timecode_scale = 1000000
+    duration = None
+    for element_id, start, end in _ebml_elements(data, *segment):
+        if element_id == _MKV_INFO:
+            for child_id, child_start, child_end in _ebml_elements(data, start, end):
+                if child_id == _MKV_TIMECODE_SCALE:
+                    timecode_scale = _ebml_uint(data, child_start, child_end)
+                elif child_id == _MKV_DURATION and child_end - child_start in (4, 8):
+                    # 时长为4字节或8字节浮点数，其他长度视为无效
+                    fmt = ">f" if child_end - child_start == 4 else ">d"
+                    duration = struct.unpack_from(fmt, data, child_start)[0]
+        elif element_id == _MKV_TRACKS:
+            for entry_id, entry_start, entry_end in _ebml_elements(data, start, end):
+                if entry_id != _MKV_TRACK_ENTRY:
+                    continue
+                track_type, codec, width, height = None, None, None, None
+                for child_id, child_start, child_end in _ebml_elements(data, entry_start, entry_end):
+                    if child_id == _MKV_TRACK_TYPE:
+                        track_type = _ebml_uint(data, child_start, child_end)
+                    elif child_id == _MKV_CODEC_ID:
+                        codec = bytes(data[child_start:child_end]).rstrip(b"\x00").decode("latin-1")
+                    elif child_id == _MKV_VIDEO:
+                        for video_id, video_start, video_end in _ebml_elements(data, child_start, child_end):
+                            if video_id == _MKV_PIXEL_WIDTH:
+                                width = _ebml_uint(data, video_start, video_end)
+                            elif video_id == _MKV_PIXEL_HEIGHT:
+                                height = _ebml_uint(data, video_start, video_end)
+                if track_type == 1 and info["video_codec"] is None:
+                    info["video_codec"], info["width"], info["height"] = codec, width, height
+                elif track_type == 2 and info["audio_codec"] is None:
+                    info["audio_codec"] = codec
+        elif element_id == _MKV_CLUSTER:
+            # 媒体数据开始，头部信息已经读完
+            break
+    if duration is None:
+        return None
+    info["duration"] = duration * timecode_scale / 1e9
+    return info
+
+
+# ----------------------------------------------------------------------
+# MP3
+# ----------------------------------------------------------------------
+
+def _mp3_frame_header(data, offset: int) -> Optional[Dict[str, int]]:
+    """解析offset处的MP3帧头，不是有效帧头时返回None"""
+    if offset + 4 > len(data) or data[offset] != 0xFF or data[offset + 1] & 0xE0 != 0xE0:
+        return None
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    version_bits = (b1 >> 3) & 0x3
+    layer = 4 - ((b1 >> 1) & 0x3)
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x3
+    if version_bits == 1 or layer == 4 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+    mpeg1 = version_bits == 3
+    if layer == 1:
+        samples = 384
+    elif layer == 3 and not mpeg1:
+        samples = 576
+    else:
+        samples = 1152
+    return {
+        "mpeg1": mpeg1,
+        "layer": layer,
+        "bitrate": _MP3_BITRATES[(1 if mpeg1 else 2, layer)][bitrate_index] * 1000,
+        "sample_rate": _MP3_SAMPLE_RATES[version_bits][sample_rate_index],
+        "samples": samples,
+        "mono": (b3 >> 6) == 3,
+    }
+
+
+def _parse_mp3(data) -> Optional[Dict[str, Any]]:
+    info = _new_info("mp3")
+    offset = 0
+    if bytes(data[:3]) == b"ID3" and len(data) >= 10:
+        size = 0
+        for byte in data[6:10]:
+            size = (size << 7) | (byte & 0x7F)
+        offset = 10 + size + (10 if data[5] & 0x10 else 0)
+
+    limit = min(len(data) - 4, offset + _MP3_SYNC_SEARCH)
+    header = None
+    while offset < limit:
+        header = _mp3_frame_header(data, offset)
+        if header is not None:
+            break
+        offset = data.find(b"\xff", offset + 1, limit)
+        if offset < 0:
+            return None
+    if header is None:
+        return None
+    info["audio_codec"] = "mp3" if header["layer"] == 3 else f"mp{header['layer']}"
+
+    # VBR文件在第一帧中记录总帧数：Xing/Info位于边信息之后，VBRI位于帧头后32字节
+    if header["mpeg1"]:
+        side_info = 17 if header["mono"] else 32
+    else:
+        side_info = 9 if header["mono"] else 17
+    frames = None
+    xing = offset + 4 + side_info
+    if bytes(data[xing:xing + 4]) in (b"Xing", b"Info"):
+        flags = struct.unpack_from(">I", data, xing + 4)[0]
+        if flags & 0x1:
+            frames = struct.unpack_from(">I", data, xing + 8)[0]
+    elif bytes(data[offset + 36:offset + 40]) == b"VBRI":
+        frames = struct.unpack_from(">I", data, offset + 36 + 14)[0]
+
+    if frames:
+        info["duration"] = frames * header["samples"] / header["sample_rate"]
+    else:
+        # 固定码率：按音频数据大小和帧头码率计算
+        audio_bytes = len(data) - offset
+        if len(data) >= 128 and bytes(data[-128:-125]) == b"TAG":
+            audio_bytes -= 128
+        info["duration"] = audio_bytes * 8 / header["bitrate"]
+    return info
+
+
+# ----------------------------------------------------------------------
+# WAV
+# ----------------------------------------------------------------------
+
+def _parse_wav(data) -> Optional[Dict[str, Any]]:
+    info = _new_info("wav")
+    byte_rate = None
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id, size = struct.unpack_from("<4sI", data, offset)
+        content = offset + 8
+        if chunk_id == b"fmt " and size >= 16:
+            audio_format, _, _, byte_rate = struct.unpack_from("<HHII", data, content)
+            info["audio_codec"] = "pcm" if audio_format in (1, 0xFFFE) else f"wav_{audio_format:#x}"
+        elif chunk_id == b"data":
+            if not byte_rate:
+                return None
+            # 数据块大小未知或超出文件时按文件剩余部分计算
+            if size == 0xFFFFFFFF or content + size > len(data):
+                size = len(data) - content
+            info["duration"] = size / byte_rate
+            return info
+        offset = content + size + (size & 1)
+    return None
+
+
+# ----------------------------------------------------------------------
+# 入口
+# ----------------------------------------------------------------------
+
+def _detect(head: bytes, extension: str):
+    if len(head) >= 8 and head[4:8] in _MP4_TOP_LEVEL:
+        return _parse_mp4
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return _parse_mkv
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return _parse_wav
+    # 只凭帧同步无法区分MP3和ADTS格式的AAC，裸帧同步只在扩展名为.mp3时识别
+    if head[:3] == b"ID3" or extension == ".mp3":
+        return _parse_mp3
+    return None
+
+
+def read_media_info(path: str) -> Optional[Dict[str, Any]]:
+    """
+    读取媒体文件头
+
+    Args:
+        path: 媒体文件路径
+
+    Returns:
+        Dict: format、duration(秒)、width、height、video_codec、audio_codec，
+              无法识别的文件或文件头不完整时返回None
+    """
+    try:
+        with open(path, "rb") as f:
+            head = f.read(16)
+            parser = _detect(head, os.path.splitext(path)[1].lower())
+            if parser is None:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                info = parser(data)
+    except (OSError, ValueError, IndexError, struct.error) as e:
+        logger.debug(f"读取媒体文件头失败: {path}, 错误: {str(e)}")
+        return None
+    if info is None or not info.get("duration") or info["duration"] <= 0:
+        return None
+    return info
+
+
+def read_duration(path: str) -> Optional[float]:
+    """只读取文件头中的时长（秒），无法读取时返回None"""
+    info = read_media_info(path)
+    return info["duration"] if info else None
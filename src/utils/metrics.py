@@ -0,0 +1,362 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+运行指标模块
+记录批量合成的吞吐量和健康状况（输出完成/失败数、每个输出的耗时、FFmpeg调用次数、写入字节数、
+扫描缓存命中、队列深度），通过本机HTTP端点以Prometheus文本格式提供，并定期写入JSON快照文件；
+渲染工作进程中的指标以增量形式发回界面进程汇总
+"""
+
+import os
+import json
+import time
+import bisect
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.utils.logger import get_logger
+from src.utils.path_utils import get_config_dir
+
+logger = get_logger()
+
+# 指标导出配置文件
+CONFIG_FILE = get_config_dir() / "metrics_settings.json"
+
+# 默认配置
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 9464
+DEFAULT_SNAPSHOT_INTERVAL = 15
+
+# 耗时直方图的默认分桶（秒）
+DEFAULT_BUCKETS = (5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+# 指标名前缀
+PREFIX = "videomix_"
+
+# 指标说明，用于Prometheus的HELP行
+_HELP = {
+    "outputs_total": "合成的输出数量（result=completed/failed/rejected，rejected为未通过校验）",
+    "output_seconds": "每个输出的合成耗时（秒）",
+    "ffmpeg_invocations_total": "外部命令调用次数（tool=ffmpeg/ffprobe，result=ok/error）",
+    "bytes_written_total": "输出文件写入的字节数",
+    "scan_cache_total": "素材扫描缓存查询次数（result=hit/miss）",
+    "queue_depth": "等待合成的输出数量",
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Tuple[str, str] = None) -> str:
+    items = list(key) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in items) + "}"
+
+
+class _Histogram:
+    """累计分桶直方图"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    进程内的指标登记表（线程安全）
+
+    计数器只增不减，仪表值可增可减，直方图按固定分桶统计；
+    record_deltas为真时（渲染工作进程中）另外记录增量，collect_delta取出上次取出以来的增量发回界面进程，
+    merge把增量加到本登记表
+
+    用法:
+        metrics = get_metrics()
+        metrics.inc("outputs_total", result="completed")
+        metrics.observe("output_seconds", 42.0)
+        metrics.add("queue_depth", -1)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._delta = self._empty_delta()
+        self.record_deltas = False
+
+    @staticmethod
+    def _empty_delta() -> Dict[str, List]:
+        return {"counters": [], "gauges": [], "observations": []}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """计数器增加value"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+            if self.record_deltas:
+                self._delta["counters"].append((name, key, value))
+
+    def add(self, name: str, value: float, **labels):
+        """仪表值增加value（可为负）"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._gauges.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+            if self.record_deltas:
+                self._delta["gauges"].append((name, key, value))
+
+    def observe(self, name: str, value: float, buckets=DEFAULT_BUCKETS, **labels):
+        """直方图记录一个观测值"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(buckets)
+            histogram.observe(value)
+            if self.record_deltas:
+                self._delta["observations"].append((name, key, value, histogram.buckets))
+
+    def collect_delta(self) -> Optional[Dict[str, List]]:
+        """取出上次取出以来的增量，没有变化时返回None"""
+        with self._lock:
+            delta, self._delta = self._delta, self._empty_delta()
+        if not any(delta.values()):
+            return None
+        return delta
+
+    def merge(self, delta: Optional[Dict[str, List]]):
+        """合并其他进程的增量"""
+        if not delta:
+            return
+        for name, key, value in delta.get("counters", []):
+            self.inc(name, value, **dict(key))
+        for name, key, value in delta.get("gauges", []):
+            self.add(name, value, **dict(key))
+        for name, key, value, buckets in delta.get("observations", []):
+            self.observe(name, value, buckets, **dict(key))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前指标的JSON快照"""
+        with self._lock:
+            snapshot = {
+                "timestamp": time.time(),
+                "counters": {name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                             for name, series in self._counters.items()},
+                "gauges": {name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                           for name, series in self._gauges.items()},
+                "histograms": {name: [{"labels": dict(key), "count": h.count, "sum": h.sum,
+                                       "buckets": dict(zip([str(b) for b in h.buckets] + ["+Inf"],
+                                                           _cumulative(h.counts)))}
+                                      for key, h in series.items()]
+                               for name, series in self._histograms.items()},
+            }
+            hits = self._counters.get("scan_cache_total", {}).get((("result", "hit"),), 0)
+            misses = self._counters.get("scan_cache_total", {}).get((("result", "miss"),), 0)
+        snapshot["scan_cache_hit_rate"] = round(hits / (hits + misses), 3) if hits + misses else None
+        return snapshot
+
+    def render_prometheus(self) -> str:
+        """Prometheus文本格式"""
+        lines = []
+        with self._lock:
+            for kind, metrics in (("counter", self._counters), ("gauge", self._gauges)):
+                for name, series in sorted(metrics.items()):
+                    full_name = PREFIX + name
+                    if name in _HELP:
+                        lines.append(f"# HELP {full_name} {_HELP[name]}")
+                    lines.append(f"# TYPE {full_name} {kind}")
+                    for key, value in sorted(series.items()):
+                        lines.append(f"{full_name}{_format_labels(key)} {_format_value(value)}")
+            for name, series in sorted(self._histograms.items()):
+                full_name = PREFIX + name
+                if name in _HELP:
+                    lines.append(f"# HELP {full_name} {_HELP[name]}")
+                lines.append(f"# TYPE {full_name} histogram")
+                for key, histogram in sorted(series.items()):
+                    bounds = [f"{b:g}" for b in histogram.buckets] + ["+Inf"]
+                    for bound, count in zip(bounds, _cumulative(histogram.counts)):
+                        lines.append(f"{full_name}_bucket{_format_labels(key, ('le', bound))} {count}")
+                    lines.append(f"{full_name}_sum{_format_labels(key)} {_format_value(histogram.sum)}")
+                    lines.append(f"{full_name}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_value(value: float) -> str:
+    # 字节数等大整数不使用科学计数法
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _cumulative(counts: List[int]) -> List[int]:
+    total, result = 0, []
+    for count in counts:
+        total += count
+        result.append(total)
+    return result
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """/metrics返回Prometheus文本，/metrics.json返回JSON快照"""
+
+    registry: MetricsRegistry = None
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path in ("/", "/metrics"):
+            body = self.registry.render_prometheus().encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif path == "/metrics.json":
+            body = json.dumps(self.registry.snapshot(), ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 抓取请求很频繁，不写入日志
+        pass
+
+
+class MetricsExporter:
+    """
+    指标导出：本机HTTP端点和定期写入的JSON快照文件
+
+    用法:
+        exporter = MetricsExporter(get_metrics(), port=9464, snapshot_file="metrics.json")
+        exporter.start()
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 snapshot_file: str = None, snapshot_interval: float = DEFAULT_SNAPSHOT_INTERVAL):
+        """
+        初始化导出器
+
+        Args:
+            registry: 指标登记表
+            host: HTTP端点监听地址（默认只监听本机）
+            port: HTTP端点端口，为0或None时不启动端点
+            snapshot_file: JSON快照文件路径，为None时不写快照
+            snapshot_interval: 写快照的间隔（秒）
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.snapshot_file = snapshot_file
+        self.snapshot_interval = max(1.0, float(snapshot_interval))
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        """启动HTTP端点和快照线程，端口被占用时只写快照"""
+        if self.port:
+            handler = type("MetricsHandler", (_MetricsHandler,), {"registry": self.registry})
+            try:
+                self._server = ThreadingHTTPServer((self.host, int(self.port)), handler)
+                self._server.daemon_threads = True
+                threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+                logger.info(f"指标端点已启动: http://{self.host}:{self.port}/metrics")
+            except OSError as e:
+                self._server = None
+                logger.warning(f"无法启动指标端点 {self.host}:{self.port}: {str(e)}")
+        if self.snapshot_file:
+            threading.Thread(target=self._snapshot_loop, name="metrics-snapshot", daemon=True).start()
+
+    def stop(self):
+        """停止HTTP端点和快照线程（停止前写入最后一次快照）"""
+        self._stop_event.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self.snapshot_file:
+            self.write_snapshot()
+
+    def write_snapshot(self):
+        """写入一次JSON快照（先写临时文件再替换）"""
+        try:
+            directory = os.path.dirname(os.path.abspath(self.snapshot_file))
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=directory)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.registry.snapshot(), f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.snapshot_file)
+        except OSError as e:
+            logger.warning(f"写入指标快照失败: {str(e)}")
+
+    def _snapshot_loop(self):
+        while not self._stop_event.wait(self.snapshot_interval):
+            self.write_snapshot()
+
+
+def _load_config() -> dict:
+    try:
+        if os.path.exists(CONFIG_FILE):
+            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+    except Exception as e:
+        logger.warning(f"加载指标配置失败: {str(e)}")
+    return {}
+
+
+# 进程内共享的指标登记表和导出器
+_metrics_instance: Optional[MetricsRegistry] = None
+_exporter_instance: Optional[MetricsExporter] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """获取进程内共享的指标登记表"""
+    global _metrics_instance
+    if _metrics_instance is None:
+        with _metrics_lock:
+            if _metrics_instance is None:
+                _metrics_instance = MetricsRegistry()
+    return _metrics_instance
+
+
+def start_metrics_exporter() -> Optional[MetricsExporter]:
+    """
+    按配置文件启动进程内唯一的指标导出器（重复调用直接返回已启动的导出器）
+
+    配置项：enabled（默认是）、host、port、snapshot_file（默认配置目录下的metrics_snapshot.json）、
+    snapshot_interval；enabled为否时返回None
+    """
+    global _exporter_instance
+    registry = get_metrics()
+    with _metrics_lock:
+        if _exporter_instance is not None:
+            return _exporter_instance
+        config = _load_config()
+        if not config.get("enabled", True):
+            return None
+        _exporter_instance = MetricsExporter(
+            registry,
+            host=config.get("host", DEFAULT_HOST),
+            port=config.get("port", DEFAULT_PORT),
+            snapshot_file=config.get("snapshot_file", str(get_config_dir() / "metrics_snapshot.json")),
+            snapshot_interval=config.get("snapshot_interval", DEFAULT_SNAPSHOT_INTERVAL),
+        )
+        _exporter_instance.start()
+    return _exporter_instance
@@ -0,0 +1,353 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+性能追踪模块
+为批量合成的各个阶段（扫描、探测、选片、拼接、混音等）记录耗时数据，
+支持导出 Chrome/Perfetto 追踪文件（chrome://tracing 或 ui.perfetto.dev 打开）
+以及按阶段汇总的统计表
+
+每个区间的CPU时间是所在线程的CPU时间，读写字节数是区间内FFmpeg等子进程的输入输出文件大小；
+本进程的磁盘读写量和已结束子进程的CPU时间只能按整个进程统计，因此只记录在线程最外层的区间上
+（字段名带process_/children_前缀），嵌套区间和在工作线程中并发执行的区间不记录
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+
+def _read_process_io() -> Tuple[int, int]:
+    """
+    读取当前进程累计的读写字节数
+
+    Returns:
+        Tuple[int, int]: (读取字节数, 写入字节数)，无法获取时返回(0, 0)
+    """
+    try:
+        import psutil
+        counters = psutil.Process().io_counters()
+        return counters.read_bytes, counters.write_bytes
+    except Exception:
+        pass
+
+    # 没有psutil时，在Linux上直接读取/proc
+    try:
+        read_bytes = write_bytes = 0
+        with open("/proc/self/io", "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key == "read_bytes":
+                    read_bytes = int(value)
+                elif key == "write_bytes":
+                    write_bytes = int(value)
+        return read_bytes, write_bytes
+    except Exception:
+        return 0, 0
+
+
+def _children_cpu_time() -> float:
+    """获取已结束子进程（如FFmpeg）累计的CPU时间，Windows上始终为0"""
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+class PerfSpan:
+    """单个计时区间"""
+
+    __slots__ = ("name", "category", "args", "tid", "start_ns", "end_ns",
+                 "cpu_time", "bytes_read", "bytes_written", "subprocess_count",
+                 "process_wide", "children_cpu_time", "process_bytes_read", "process_bytes_written",
+                 "_cpu_start", "_children_cpu_start", "_io_start")
+
+    def __init__(self, name: str, category: str, args: Dict[str, Any]):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.tid = threading.get_ident()
+        self.start_ns = 0
+        self.end_ns = 0
+        self.cpu_time = 0.0             # 所在线程的CPU时间
+        self.bytes_read = 0             # 子进程的输入文件大小（含嵌套区间）
+        self.bytes_written = 0          # 子进程的输出文件大小（含嵌套区间）
+        self.subprocess_count = 0
+        # 整个进程的计数器差值，只在线程最外层的区间上记录，否则为None
+        self.process_wide = False
+        self.children_cpu_time = None
+        self.process_bytes_read = None
+        self.process_bytes_written = None
+        self._cpu_start = 0.0
+        self._children_cpu_start = 0.0
+        self._io_start = (0, 0)
+
+    @property
+    def wall_time(self) -> float:
+        """区间墙钟耗时（秒）"""
+        return (self.end_ns - self.start_ns) / 1e9
+
+    def add_io(self, read: int = 0, written: int = 0):
+        """
+        追加读写字节数（例如FFmpeg子进程的输入输出文件大小）
+
+        Args:
+            read: 读取字节数
+            written: 写入字节数
+        """
+        self.bytes_read += read
+        self.bytes_written += written
+
+    def add_subprocess(self, count: int = 1):
+        """记录在该区间内启动的子进程数量"""
+        self.subprocess_count += count
+
+    def _begin(self, process_wide: bool):
+        self.process_wide = process_wide
+        if process_wide:
+            self._io_start = _read_process_io()
+            self._children_cpu_start = _children_cpu_time()
+        self._cpu_start = time.thread_time()
+        self.start_ns = time.perf_counter_ns()
+
+    def _end(self):
+        self.end_ns = time.perf_counter_ns()
+        self.cpu_time += time.thread_time() - self._cpu_start
+        if self.process_wide:
+            self.children_cpu_time = _children_cpu_time() - self._children_cpu_start
+            io_end = _read_process_io()
+            self.process_bytes_read = max(0, io_end[0] - self._io_start[0])
+            self.process_bytes_written = max(0, io_end[1] - self._io_start[1])
+
+
+class PerfTracer:
+    """
+    轻量级性能追踪器
+
+    用法:
+        tracer = PerfTracer("batch")
+        with tracer.span("scan", category="stage") as span:
+            ...
+        tracer.export_chrome_trace("batch.trace.json")
+        logger.info(tracer.format_summary_table())
+    """
+
+    def __init__(self, name: str = "batch", enabled: bool = True):
+        """
+        初始化性能追踪器
+
+        Args:
+            name: 追踪名称，用于导出文件和汇总表标题
+            enabled: 是否启用，禁用时span为空操作
+        """
+        self.name = name
+        self.enabled = enabled
+        self.origin_ns = time.perf_counter_ns()
+        self.origin_wall = time.time()
+        self._spans: List[PerfSpan] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[PerfSpan]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def begin(self, name: str, category: str = "stage", **args) -> PerfSpan:
+        """
+        开始一个计时区间（需与end成对调用，适用于不便使用with语句的代码段）
+
+        Args:
+            name: 区间名称，汇总表按此名称聚合
+            category: 区间类别，如 stage / ffmpeg / ffprobe
+            **args: 附加到追踪事件的参数
+
+        Returns:
+            PerfSpan: 区间对象
+        """
+        span = PerfSpan(name, category, args)
+        if self.enabled:
+            stack = self._stack()
+            # 只有线程最外层的区间记录整个进程的计数器
+            span._begin(process_wide=not stack)
+            stack.append(span)
+        return span
+
+    def end(self, span: PerfSpan):
+        """
+        结束由begin开始的计时区间
+
+        Args:
+            span: begin返回的区间对象
+        """
+        if not self.enabled:
+            return
+        span._end()
+        stack = self._stack()
+        if span in stack:
+            stack.remove(span)
+        # 子进程数和子进程读写量向上累加，便于在阶段级别查看FFmpeg的开销
+        # （工作线程中的区间通过adopt累加到调用方的阶段，并发累加需要加锁）
+        with self._lock:
+            if stack:
+                parent = stack[-1]
+                parent.subprocess_count += span.subprocess_count
+                parent.add_io(span.bytes_read, span.bytes_written)
+            self._spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, category: str = "stage", **args):
+        """
+        记录一个计时区间，可嵌套使用
+
+        Args:
+            name: 区间名称，汇总表按此名称聚合
+            category: 区间类别，如 stage / ffmpeg / ffprobe
+            **args: 附加到追踪事件的参数
+
+        Yields:
+            PerfSpan: 当前区间对象，可调用add_io/add_subprocess补充数据
+        """
+        span = self.begin(name, category, **args)
+        try:
+            yield span
+        finally:
+            self.end(span)
+
+    @contextmanager
+    def adopt(self, parent: Optional[PerfSpan]):
+        """
+        在工作线程中以指定区间作为父区间，使并发执行的子区间统计累加到调用方的阶段
+
+        Args:
+            parent: 调用线程的current_span()，为None时不做处理
+        """
+        if not self.enabled or parent is None:
+            yield
+            return
+        stack = self._stack()
+        stack.append(parent)
+        try:
+            yield
+        finally:
+            if stack and stack[-1] is parent:
+                stack.pop()
+
+    def current_span(self) -> Optional[PerfSpan]:
+        """获取当前线程最内层的区间"""
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def spans(self) -> List[PerfSpan]:
+        """获取已结束的区间列表（按开始时间排序）"""
+        with self._lock:
+            return sorted(self._spans, key=lambda s: s.start_ns)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """
+        转换为Chrome Trace Event格式
+
+        Returns:
+            Dict: 可直接json序列化的追踪数据
+        """
+        pid = os.getpid()
+        events = [{
+            "name": "process_name", "ph": "M", "pid": pid,
+            "args": {"name": f"VideoMixTool {self.name}"}
+        }]
+        for span in self.spans():
+            args = dict(span.args)
+            args.update({
+                "thread_cpu_ms": round(span.cpu_time * 1000, 3),
+                "bytes_read": span.bytes_read,
+                "bytes_written": span.bytes_written,
+                "subprocesses": span.subprocess_count,
+            })
+            if span.process_wide:
+                args.update({
+                    "process_children_cpu_ms": round(span.children_cpu_time * 1000, 3),
+                    "process_bytes_read": span.process_bytes_read,
+                    "process_bytes_written": span.process_bytes_written,
+                })
+            events.append({
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": (span.start_ns - self.origin_ns) / 1000.0,
+                "dur": (span.end_ns - span.start_ns) / 1000.0,
+                "pid": pid,
+                "tid": span.tid,
+                "args": args,
+            })
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"name": self.name, "start_time": self.origin_wall},
+        }
+
+    def export_chrome_trace(self, path: str) -> str:
+        """
+        导出Chrome/Perfetto追踪文件
+
+        Args:
+            path: 输出文件路径
+
+        Returns:
+            str: 输出文件路径
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False)
+        logger.info(f"已导出性能追踪文件: {path}")
+        return path
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        按区间名称聚合统计
+
+        Returns:
+            List[Dict]: 每行包含 name, category, count, wall_time, cpu_time（线程CPU时间）,
+                        bytes_read, bytes_written, subprocesses，按总耗时降序
+        """
+        rows: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for span in self.spans():
+            key = (span.name, span.category)
+            row = rows.get(key)
+            if row is None:
+                row = rows[key] = {
+                    "name": span.name, "category": span.category, "count": 0,
+                    "wall_time": 0.0, "cpu_time": 0.0, "bytes_read": 0,
+                    "bytes_written": 0, "subprocesses": 0
+                }
+            row["count"] += 1
+            row["wall_time"] += span.wall_time
+            row["cpu_time"] += span.cpu_time
+            row["bytes_read"] += span.bytes_read
+            row["bytes_written"] += span.bytes_written
+            # 阶段区间的子进程数包含其内部所有FFmpeg调用
+            row["subprocesses"] += span.subprocess_count
+        return sorted(rows.values(), key=lambda r: r["wall_time"], reverse=True)
+
+    def format_summary_table(self) -> str:
+        """
+        生成文本格式的汇总表，用于写入日志
+
+        Returns:
+            str: 多行文本表格
+        """
+        header = f"{'阶段':<28}{'类别':<10}{'次数':>6}{'墙钟(s)':>11}{'线程CPU(s)':>10}{'读取(MB)':>11}{'写入(MB)':>11}{'子进程':>8}"
+        lines = [f"性能汇总 [{self.name}]", header, "-" * len(header)]
+        for row in self.summary():
+            lines.append(
+                f"{row['name'][:27]:<28}{row['category'][:9]:<10}{row['count']:>6}"
+                f"{row['wall_time']:>11.3f}{row['cpu_time']:>10.3f}"
+                f"{row['bytes_read'] / 1048576:>11.2f}{row['bytes_written'] / 1048576:>11.2f}"
+                f"{row['subprocesses']:>8}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+启动耗时分析模块
+记录每个模块的导入（模块初始化）耗时和启动各阶段的耗时，
+用于 main.py --profile-startup，帮助把冷启动控制在1秒以内
+
+只依赖标准库，避免分析器本身影响被测的导入链
+"""
+
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from importlib.abc import MetaPathFinder
+from typing import Dict, List, Any, Optional
+
+
+class _TimedLoader:
+    """包装模块加载器，记录exec_module耗时"""
+
+    def __init__(self, loader, profiler: "StartupProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        name = module.__name__
+        self._profiler._enter(name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit(name)
+            # 恢复原始加载器，避免影响依赖加载器类型的库
+            module.__loader__ = self._loader
+            spec = getattr(module, "__spec__", None)
+            if spec is not None:
+                spec.loader = self._loader
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _TimingFinder(MetaPathFinder):
+    """插入sys.meta_path首位的查找器，为找到的模块包装计时加载器"""
+
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path=None, target=None):
+        # 防止递归：在查找期间跳过自身
+        if getattr(self._local, "busy", False):
+            return None
+        self._local.busy = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = _TimedLoader(spec.loader, self._profiler)
+                    return spec
+            return None
+        finally:
+            self._local.busy = False
+
+
+class StartupProfiler:
+    """
+    启动耗时分析器
+
+    用法:
+        profiler = StartupProfiler()
+        profiler.install()
+        with profiler.stage("创建主窗口"):
+            window = MainWindow()
+        print(profiler.format_report())
+    """
+
+    def __init__(self, budget: float = 1.0):
+        """
+        初始化分析器
+
+        Args:
+            budget: 冷启动耗时目标(秒)，报告中会标出是否超出
+        """
+        self.budget = budget
+        self.start_time = time.perf_counter()
+        self._finder: Optional[_TimingFinder] = None
+        self._modules: Dict[str, Dict[str, Any]] = {}
+        self._stack: List[List[Any]] = []  # [模块名, 开始时间, 子模块累计耗时]
+        self._stages: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def install(self):
+        """开始记录模块导入耗时"""
+        if self._finder is None:
+            self._finder = _TimingFinder(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self):
+        """停止记录模块导入耗时"""
+        if self._finder is not None:
+            try:
+                sys.meta_path.remove(self._finder)
+            except ValueError:
+                pass
+            self._finder = None
+
+    def _enter(self, name: str):
+        if threading.current_thread() is not threading.main_thread():
+            return
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def _exit(self, name: str):
+        if threading.current_thread() is not threading.main_thread():
+            return
+        if not self._stack or self._stack[-1][0] != name:
+            return
+        _, started, children = self._stack.pop()
+        cumulative = time.perf_counter() - started
+        with self._lock:
+            self._modules[name] = {
+                "name": name,
+                "cumulative": cumulative,
+                "self": max(0.0, cumulative - children),
+                "parent": self._stack[-1][0] if self._stack else None,
+            }
+        if self._stack:
+            self._stack[-1][2] += cumulative
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        记录一个启动阶段（如创建QApplication、构建主窗口）
+
+        Args:
+            name: 阶段名称
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._stages.append({
+                "name": name,
+                "start": started - self.start_time,
+                "duration": time.perf_counter() - started,
+            })
+
+    def elapsed(self) -> float:
+        """从分析器创建到现在的耗时(秒)"""
+        return time.perf_counter() - self.start_time
+
+    def report(self) -> Dict[str, Any]:
+        """
+        生成报告数据
+
+        Returns:
+            Dict: 包含total、budget、stages和按自身耗时降序的modules
+        """
+        with self._lock:
+            modules = sorted(self._modules.values(), key=lambda m: m["self"], reverse=True)
+        top_level = sum(m["cumulative"] for m in modules if m["parent"] is None)
+        return {
+            "total": self.elapsed(),
+            "budget": self.budget,
+            "import_time": top_level,
+            "module_count": len(modules),
+            "stages": list(self._stages),
+            "modules": modules,
+        }
+
+    def format_report(self, limit: int = 30) -> str:
+        """
+        生成文本报告
+
+        Args:
+            limit: 模块列表显示的最大行数
+
+        Returns:
+            str: 多行文本
+        """
+        data = self.report()
+        status = "未超出" if data["total"] <= self.budget else "超出"
+        lines = [
+            f"启动耗时: {data['total']:.3f}s（目标 {self.budget:.1f}s，{status}）",
+            f"模块导入: {data['import_time']:.3f}s，共 {data['module_count']} 个模块",
+            "",
+            f"{'阶段':<30}{'开始(s)':>10}{'耗时(s)':>10}",
+        ]
+        for stage in data["stages"]:
+            lines.append(f"{stage['name'][:29]:<30}{stage['start']:>10.3f}{stage['duration']:>10.3f}")
+        lines.append("")
+        lines.append(f"{'模块（按自身耗时排序）':<44}{'自身(ms)':>10}{'累计(ms)':>10}")
+        for module in data["modules"][:limit]:
+            lines.append(f"{module['name'][:43]:<44}{module['self'] * 1000:>10.1f}"
+                         f"{module['cumulative'] * 1000:>10.1f}")
+        return "\n".join(lines)
+
+    def save(self, path: str) -> str:
+        """
+        保存JSON格式的报告
+
+        Args:
+            path: 输出路径
+
+        Returns:
+            str: 输出路径
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        return path
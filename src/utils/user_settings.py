@@ -68,6 +68,7 @@ DEFAULT_SETTINGS = {
     
     # 批量处理设置
     "generate_count": 1,           # 生成数量
+    "render_in_worker_process": True, # 在独立的渲染工作进程中合成视频
     
     # 缓存设置
     "cache_dir": "",               # 缓存目录
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""流式音频测试：静音检测结果与pydub.silence.detect_silence的算法一致，有声片段按静音区间切分"""
+
+import math
+import random
+import unittest
+
+try:
+    import numpy as np
+    from src.core.audio_stream import find_silence_ranges, segments_between_silences
+except ImportError:
+    np = None
+
+
+def _pydub_detect_silence(energies, min_silence_len, silence_thresh, seek_step):
+    """按pydub.silence.detect_silence的算法逐窗口计算（每毫秒一帧，energies为每帧的平方均值）"""
+    seg_len = len(energies)
+    if seg_len < min_silence_len:
+        return []
+    thresh = math.pow(10.0, silence_thresh / 20.0)
+    last_slice_start = seg_len - min_silence_len
+    slice_starts = list(range(0, last_slice_start + 1, seek_step))
+    if last_slice_start % seek_step:
+        slice_starts.append(last_slice_start)
+    silence_starts = [i for i in slice_starts
+                      if math.sqrt(sum(energies[i:i + min_silence_len]) / min_silence_len) <= thresh]
+    if not silence_starts:
+        return []
+    silent_ranges = []
+    prev_i = silence_starts.pop(0)
+    current_range_start = prev_i
+    for silence_start_i in silence_starts:
+        continuous = silence_start_i == prev_i + seek_step
+        silence_has_gap = silence_start_i > prev_i + min_silence_len
+        if not continuous and silence_has_gap:
+            silent_ranges.append((current_range_start, prev_i + min_silence_len))
+            current_range_start = silence_start_i
+        prev_i = silence_start_i
+    silent_ranges.append((current_range_start, prev_i + min_silence_len))
+    return silent_ranges
+
+
+def _profile(energies):
+    cumulative = np.concatenate([[0.0], np.cumsum(np.asarray(energies, dtype=np.float64))])
+    return cumulative, np.arange(len(cumulative), dtype=np.int64)
+
+
+def _signal(pattern):
+    """由 (毫秒数, 是否有声) 列表生成每毫秒的能量"""
+    energies = []
+    for length, loud in pattern:
+        energies += [0.25 if loud else 1e-8] * length
+    return energies
+
+
+@unittest.skipIf(np is None, "需要numpy")
+class FindSilenceRangesTest(unittest.TestCase):
+
+    def _check(self, energies, min_silence_len, seek_step, silence_thresh=-40):
+        expected = _pydub_detect_silence(energies, min_silence_len, silence_thresh, seek_step)
+        cumulative, boundaries = _profile(energies)
+        actual = find_silence_ranges(cumulative, boundaries, min_silence_len, silence_thresh, seek_step)
+        self.assertEqual(actual, expected)
+        return actual
+
+    def test_overlapping_windows_are_merged(self):
+        # 短暂的小声不使窗口能量超过阈值，重叠的静音窗口合并为一个区间
+        energies = _signal([(100, True), (120, False)]) + [1e-3] * 5 + _signal([(120, False), (100, True)])
+        self.assertEqual(self._check(energies, 100, 1), [(100, 345)])
+
+    def test_separated_silences(self):
+        # 有声部分使中间的窗口都超过阈值，两段静音分开；短于最小静音长度的静音不计
+        energies = _signal([(150, False), (300, True), (150, False), (30, True), (60, False), (200, True)])
+        self.assertEqual(self._check(energies, 100, 1), [(0, 150), (450, 600)])
+
+    def test_tail_window_with_seek_step(self):
+        # 总长减最小静音长度不是步长的整数倍，末尾窗口单独检测
+        energies = _signal([(203, True), (100, False)])
+        self.assertEqual(self._check(energies, 100, 10), [(203, 303)])
+
+    def test_seek_step_larger_than_one(self):
+        energies = _signal([(40, False), (90, True), (170, False), (35, True), (60, False), (150, True),
+                            (130, False)])
+        for seek_step in (2, 3, 7, 25):
+            self._check(energies, 50, seek_step)
+
+    def test_random_signals_match_reference(self):
+        rng = random.Random(7)
+        for _ in range(30):
+            pattern = [(rng.randint(1, 200), rng.random() < 0.5) for _ in range(rng.randint(1, 8))]
+            self._check(_signal(pattern), rng.randint(1, 120), rng.choice([1, 2, 5, 13]))
+
+    def test_shorter_than_window(self):
+        energies = _signal([(80, False)])
+        self.assertEqual(self._check(energies, 100, 1), [])
+
+
+@unittest.skipIf(np is None, "需要numpy")
+class SegmentsBetweenSilencesTest(unittest.TestCase):
+
+    def test_segments_between_silences(self):
+        silences = [(0, 300), (1500, 2000), (2200, 2600)]
+        # 2000~2200之间的有声部分短于0.5秒被丢弃，末尾静音之后的部分保留
+        self.assertEqual(segments_between_silences(silences, 4000, 0.5), [(300, 1500), (2600, 4000)])
+
+    def test_overlapping_silences_and_no_silence(self):
+        self.assertEqual(segments_between_silences([(100, 900), (500, 800)], 2000, 0.5), [(900, 2000)])
+        self.assertEqual(segments_between_silences([], 1200, 0.5), [(0, 1200)])
+        self.assertEqual(segments_between_silences([(0, 1200)], 1200, 0.5), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
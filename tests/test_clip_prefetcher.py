@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""片段预读器测试：字节预算与命中统计"""
+
+import os
+import time
+import tempfile
+import unittest
+
+from src.core.clip_prefetcher import ClipPrefetcher
+
+
+def _wait_done(prefetcher, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        stats = prefetcher.stats()
+        if stats["warmed"] + stats["skipped"] + stats["failed"] >= stats["requested"]:
+            return stats
+        time.sleep(0.01)
+    raise AssertionError("预读未在限定时间内完成")
+
+
+class ClipPrefetcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def _make_file(self, name, size):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "wb") as f:
+            f.write(b"\0" * size)
+        return path
+
+    def test_budget_skips_files_that_do_not_fit(self):
+        big = self._make_file("big.mp4", 600 * 1024)
+        too_big = self._make_file("too_big.mp4", 600 * 1024)
+        small = self._make_file("small.mp4", 100 * 1024)
+
+        prefetcher = ClipPrefetcher(budget_mb=1, use_fadvise=False)
+        self.addCleanup(prefetcher.close)
+        prefetcher.prefetch([big, too_big, small, big])
+        stats = _wait_done(prefetcher)
+
+        self.assertEqual(stats["requested"], 3)
+        self.assertEqual(stats["warmed"], 2)
+        self.assertEqual(stats["skipped"], 1)
+        self.assertEqual(stats["bytes"], 700 * 1024)
+        self.assertLessEqual(stats["bytes"], prefetcher.byte_budget)
+
+    def test_hits_and_misses(self):
+        warmed = self._make_file("warmed.mp4", 1024)
+        other = self._make_file("other.mp4", 1024)
+
+        prefetcher = ClipPrefetcher(budget_mb=1, use_fadvise=False)
+        self.addCleanup(prefetcher.close)
+        prefetcher.prefetch([warmed])
+        _wait_done(prefetcher)
+
+        self.assertTrue(prefetcher.note_use(warmed))
+        self.assertFalse(prefetcher.note_use(other))
+        stats = prefetcher.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_missing_file_is_counted_as_failed(self):
+        prefetcher = ClipPrefetcher(budget_mb=1, use_fadvise=False)
+        self.addCleanup(prefetcher.close)
+        prefetcher.prefetch([os.path.join(self.temp_dir.name, "missing.mp4")])
+        stats = _wait_done(prefetcher)
+        self.assertEqual(stats["failed"], 1)
+        self.assertEqual(stats["bytes"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
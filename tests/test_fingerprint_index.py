@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""片段指纹索引测试：无法计算的片段按修改时间和大小记录，文件变化前不再重复解码"""
+
+import os
+import subprocess
+import tempfile
+import unittest
+
+try:
+    import numpy as np
+    from src.core.fingerprint_index import HASH_HEIGHT, HASH_WIDTH, FingerprintIndex
+except ImportError:
+    np = None
+
+
+class _FakeFFmpeg:
+    """代替FFmpeg：记录调用次数，输出指定的帧数据"""
+
+    def __init__(self, frame: bytes = b""):
+        self.frame = frame
+        self.calls = 0
+
+    def __call__(self, cmd, **kwargs):
+        self.calls += 1
+        return subprocess.CompletedProcess(cmd, 0 if self.frame else 1, stdout=self.frame)
+
+
+@unittest.skipIf(np is None, "需要numpy")
+class FingerprintFailureTest(unittest.TestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.cache_file = os.path.join(temp_dir.name, "media_cache", "fingerprints.npz")
+        self.clip = os.path.join(temp_dir.name, "broken.mp4")
+        self._write_clip(b"\0" * 64)
+        self.videos = [{"path": self.clip, "duration": 4.0}]
+
+    def _write_clip(self, data: bytes):
+        with open(self.clip, "wb") as f:
+            f.write(data)
+
+    def test_failed_clip_is_not_decoded_again(self):
+        index = FingerprintIndex(self.cache_file)
+        ffmpeg = _FakeFFmpeg()
+        self.assertEqual(index.build(self.videos, run=ffmpeg), 0)
+        self.assertEqual(ffmpeg.calls, 1)
+
+        self.assertEqual(index.missing(self.videos), [])
+        self.assertEqual(index.build(self.videos, run=ffmpeg), 0)
+        self.assertEqual(ffmpeg.calls, 1)
+        # 失败记录随索引保存，新的进程同样跳过
+        self.assertEqual(FingerprintIndex(self.cache_file).missing(self.videos), [])
+
+    def test_changed_clip_is_retried(self):
+        index = FingerprintIndex(self.cache_file)
+        index.build(self.videos, run=_FakeFFmpeg())
+        self._write_clip(b"\0" * 128)
+
+        self.assertEqual(index.missing(self.videos), self.videos)
+        frame = bytes(range(HASH_WIDTH * HASH_HEIGHT))
+        self.assertEqual(index.build(self.videos, run=_FakeFFmpeg(frame)), 1)
+        hashes, valid = FingerprintIndex(self.cache_file).lookup([self.clip])
+        self.assertTrue(valid[0])
+
+    def test_stopped_build_is_not_recorded_as_failure(self):
+        index = FingerprintIndex(self.cache_file)
+        index.stop()
+        index.build(self.videos, run=_FakeFFmpeg())
+        self.assertEqual(index.missing(self.videos), self.videos)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""快捷方式解析测试：手工构造的.lnk字节（本地路径、网络路径、相对路径、Unicode字符串）和路径前缀映射"""
+
+import os
+import struct
+import tempfile
+import unittest
+
+from src.utils.lnk_parser import (
+    HEADER_SIZE, LINK_CLSID, HAS_LINK_TARGET_ID_LIST, HAS_LINK_INFO, HAS_NAME, HAS_RELATIVE_PATH,
+    IS_UNICODE, ENVIRONMENT_BLOCK_SIGNATURE, ShortcutResolver, parse_lnk,
+)
+
+
+def _cstring(text, encoding="gbk"):
+    return text.encode(encoding) + b"\x00"
+
+
+def _wstring(text):
+    return text.encode("utf-16-le") + b"\x00\x00"
+
+
+def _link_info(local=None, network=None, suffix="", unicode_offsets=False):
+    """构造LinkInfo结构，unicode_offsets为True时同时写入Unicode的本地路径、共享名和后缀"""
+    header_size = 0x24 if unicode_offsets else 0x1C
+    flags = 0
+    body = bytearray()
+
+    def add(data):
+        offset = header_size + len(body)
+        body.extend(data)
+        return offset
+
+    volume_offset = local_offset = network_offset = local_offset_unicode = 0
+    if local is not None:
+        flags |= 0x1
+        volume_offset = add(struct.pack("<IIII", 0x11, 3, 0, 0x10) + b"\x00")
+        local_offset = add(_cstring(local))
+        if unicode_offsets:
+            local_offset_unicode = add(_wstring(local))
+    if network is not None:
+        flags |= 0x2
+        if unicode_offsets:
+            ansi = _cstring("?")
+            name_offset_unicode = 0x1C + len(ansi)
+            link = struct.pack("<IIIIIII", 0x1C + len(ansi) + len(_wstring(network)), 0, 0x1C, 0, 0x20000,
+                               name_offset_unicode, 0) + ansi + _wstring(network)
+        else:
+            name = _cstring(network)
+            link = struct.pack("<IIIII", 0x14 + len(name), 0, 0x14, 0, 0x20000) + name
+        network_offset = add(link)
+    suffix_offset = add(_cstring(suffix))
+    suffix_offset_unicode = add(_wstring(suffix)) if unicode_offsets else 0
+
+    size = header_size + len(body)
+    header = struct.pack("<IIIIIII", size, header_size, flags, volume_offset, local_offset,
+                         network_offset, suffix_offset)
+    if unicode_offsets:
+        header += struct.pack("<II", local_offset_unicode, suffix_offset_unicode)
+    return header + bytes(body)
+
+
+def _build_lnk(link_info=None, name=None, relative=None, environment=None, unicode=True, id_list=b""):
+    """构造快捷方式文件内容"""
+    flags = IS_UNICODE if unicode else 0
+    data = bytearray()
+    if id_list:
+        flags |= HAS_LINK_TARGET_ID_LIST
+        data += struct.pack("<H", len(id_list)) + id_list
+    if link_info is not None:
+        flags |= HAS_LINK_INFO
+        data += link_info
+    for flag, value in ((HAS_NAME, name), (HAS_RELATIVE_PATH, relative)):
+        if value is None:
+            continue
+        flags |= flag
+        encoded = value.encode("utf-16-le") if unicode else value.encode("gbk")
+        data += struct.pack("<H", len(value) if unicode else len(encoded)) + encoded
+    if environment is not None:
+        ansi = _cstring(environment).ljust(260, b"\x00")
+        wide = _wstring(environment).ljust(520, b"\x00")
+        data += struct.pack("<II", 8 + 260 + 520, ENVIRONMENT_BLOCK_SIGNATURE) + ansi + wide
+    data += b"\x00" * 4  # TerminalBlock
+    header = struct.pack("<I", HEADER_SIZE) + LINK_CLSID + struct.pack("<I", flags)
+    return header + b"\x00" * (HEADER_SIZE - len(header)) + bytes(data)
+
+
+class ParseLnkTest(unittest.TestCase):
+
+    def test_local_path_ansi(self):
+        link = parse_lnk(_build_lnk(_link_info(local="D:\\素材\\场景1"), id_list=b"\x02\x00"), "gbk")
+        self.assertEqual(link.local_path, "D:\\素材\\场景1")
+        self.assertEqual(link.unc_path, "")
+
+    def test_local_path_unicode_offsets(self):
+        link = parse_lnk(_build_lnk(_link_info(local="D:\\素材\\", suffix="场景1", unicode_offsets=True)))
+        self.assertEqual(link.local_path, "D:\\素材\\场景1")
+
+    def test_unc_path(self):
+        link = parse_lnk(_build_lnk(_link_info(network="\\\\server\\share", suffix="素材\\场景1")), "gbk")
+        self.assertEqual(link.unc_path, "\\\\server\\share\\素材\\场景1")
+        self.assertEqual(link.local_path, "")
+
+    def test_unc_path_unicode_share_name(self):
+        link = parse_lnk(_build_lnk(_link_info(network="\\\\服务器\\共享", unicode_offsets=True)))
+        self.assertEqual(link.unc_path, "\\\\服务器\\共享")
+
+    def test_string_data_and_environment_target(self):
+        data = _build_lnk(name="素材目录", relative="..\\素材\\场景1", environment="%USERPROFILE%\\素材")
+        link = parse_lnk(data)
+        self.assertEqual(link.name, "素材目录")
+        self.assertEqual(link.relative_path, "..\\素材\\场景1")
+        self.assertEqual(link.environment_target, "%USERPROFILE%\\素材")
+
+    def test_ansi_string_data(self):
+        link = parse_lnk(_build_lnk(relative="..\\素材", unicode=False), "gbk")
+        self.assertEqual(link.relative_path, "..\\素材")
+
+    def test_invalid_and_truncated(self):
+        with self.assertRaises(ValueError):
+            parse_lnk(b"\x00" * HEADER_SIZE)
+        data = _build_lnk(_link_info(local="D:\\素材"), name="素材目录")
+        with self.assertRaises(ValueError):
+            parse_lnk(data[:HEADER_SIZE + 10])
+
+
+class ShortcutResolverTest(unittest.TestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+
+    def test_remap_prefers_longest_prefix(self):
+        resolver = ShortcutResolver(path_remap=[("D:/素材", "/mnt/素材"), ("D:\\素材\\场景1", "/mnt/场景1")],
+                                    encoding="gbk")
+        self.assertEqual(resolver.remap("d:\\素材\\场景2\\a.mp4"), os.path.join("/mnt/素材", "场景2", "a.mp4"))
+        self.assertEqual(resolver.remap("D:\\素材\\场景1\\a.mp4"), os.path.join("/mnt/场景1", "a.mp4"))
+        self.assertEqual(resolver.remap("D:\\素材"), "/mnt/素材")
+        # 只匹配完整的路径段
+        self.assertEqual(resolver.remap("D:\\素材2\\a.mp4"), "D:\\素材2\\a.mp4".replace("\\", os.sep))
+
+    def test_relative_path_and_missing_target_not_cached(self):
+        shortcut = os.path.join(self.temp_dir, "链接", "场景1.lnk")
+        os.makedirs(os.path.dirname(shortcut))
+        with open(shortcut, "wb") as f:
+            f.write(_build_lnk(_link_info(local="Z:\\不存在\\场景1"), relative="..\\素材\\场景1"))
+        resolver = ShortcutResolver(path_remap=[], encoding="gbk")
+
+        # 都不存在时返回第一个候选路径
+        self.assertEqual(resolver.resolve(shortcut), "Z:\\不存在\\场景1".replace("\\", os.sep))
+
+        # 相对路径的目标出现后重新选择
+        target = os.path.join(self.temp_dir, "素材", "场景1")
+        os.makedirs(target)
+        self.assertEqual(resolver.resolve(shortcut), target)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""响度缓存测试：测量失败被记录，不再重复测量"""
+
+import os
+import tempfile
+import subprocess
+import unittest
+
+from src.core.loudness import NOT_MEASURED, LoudnessCache
+from src.core.video_processor import VideoProcessor
+
+
+class LoudnessCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+        self.audio = os.path.join(self.temp_dir, "voice.mp3")
+        with open(self.audio, "wb") as f:
+            f.write(b"\0" * 128)
+
+    def test_failed_measurement_is_distinct_from_not_measured(self):
+        cache_file = os.path.join(self.temp_dir, "loudness.json")
+        cache = LoudnessCache(cache_file)
+        self.assertIs(cache.get(self.audio), NOT_MEASURED)
+        cache.put(self.audio, None)
+        cache.save()
+
+        reloaded = LoudnessCache(cache_file)
+        self.assertIsNone(reloaded.get(self.audio))
+
+    def test_failed_measurement_is_not_repeated(self):
+        processor = VideoProcessor({"temp_dir": self.temp_dir, "perf_trace_enabled": False})
+        calls = []
+
+        def fake_run(cmd, label, **kwargs):
+            calls.append(label)
+            return subprocess.CompletedProcess(cmd, 1, "", "no summary")
+
+        processor._run_command = fake_run
+        for _ in range(3):
+            self.assertEqual(processor._voice_gain_args({"path": self.audio}), [])
+        self.assertEqual(calls, ["measure_loudness"])
+
+        # 扫描时已记录为测量失败的配音不再测量
+        self.assertEqual(processor._voice_gain_args({"path": self.audio, "loudness": None}), [])
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""媒体文件头测试：手工构造的MP4、MKV、MP3、WAV文件头，以及截断或无法识别的文件"""
+
+import os
+import struct
+import tempfile
+import unittest
+
+from src.utils.media_header import read_duration, read_media_info
+
+
+# ----------------------------------------------------------------------
+# MP4
+# ----------------------------------------------------------------------
+
+def _box(box_type, payload=b""):
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def _mvhd(timescale, duration, version=0):
+    if version == 1:
+        fields = struct.pack(">QQIQ", 0, 0, timescale, duration)
+    else:
+        fields = struct.pack(">IIII", 0, 0, timescale, duration)
+    return _box(b"mvhd", bytes([version, 0, 0, 0]) + fields + b"\x00" * 80)
+
+
+def _trak(handler, codec, width=0, height=0):
+    tkhd = _box(b"tkhd", b"\x00" * 76 + struct.pack(">II", width << 16, height << 16))
+    hdlr = _box(b"hdlr", b"\x00" * 8 + handler + b"\x00" * 13)
+    stsd = _box(b"stsd", struct.pack(">II", 0, 1) + struct.pack(">I4s", 16, codec) + b"\x00" * 8)
+    minf = _box(b"minf", _box(b"stbl", stsd))
+    return _box(b"trak", tkhd + _box(b"mdia", hdlr + minf))
+
+
+def _mp4(mvhd, *traks):
+    ftyp = _box(b"ftyp", b"isom\x00\x00\x02\x00isomiso2")
+    # 64位大小的mdat位于moov之前
+    payload = b"\x00" * 32
+    mdat = struct.pack(">I4sQ", 1, b"mdat", 16 + len(payload)) + payload
+    return ftyp + mdat + _box(b"moov", mvhd + b"".join(traks))
+
+
+# ----------------------------------------------------------------------
+# Matroska
+# ----------------------------------------------------------------------
+
+def _element(element_id, payload=b"", unknown_size=False):
+    id_bytes = element_id.to_bytes((element_id.bit_length() + 7) // 8, "big")
+    size = b"\x01" + (b"\xff" * 7 if unknown_size else len(payload).to_bytes(7, "big"))
+    return id_bytes + size + payload
+
+
+def _uint(element_id, value, length):
+    return _element(element_id, value.to_bytes(length, "big"))
+
+
+def _mkv(duration_payload, timecode_scale=1000000, unknown_segment_size=False):
+    ebml = _element(0x1A45DFA3, _element(0x4282, b"matroska"))
+    info = _element(0x1549A966, _uint(0x2AD7B1, timecode_scale, 3) + _element(0x4489, duration_payload))
+    video = _element(0xAE, _uint(0x83, 1, 1) + _element(0x86, b"V_MPEG4/ISO/AVC")
+                     + _element(0xE0, _uint(0xB0, 1280, 2) + _uint(0xBA, 720, 2)))
+    audio = _element(0xAE, _uint(0x83, 2, 1) + _element(0x86, b"A_AAC"))
+    cluster = _element(0x1F43B675, b"\x00" * 16)
+    segment = _element(0x18538067, info + _element(0x1654AE6B, video + audio) + cluster,
+                       unknown_size=unknown_segment_size)
+    return ebml + segment
+
+
+# ----------------------------------------------------------------------
+# MP3
+# ----------------------------------------------------------------------
+
+# MPEG-1 Layer III，128kbps，44100Hz
+_MPEG1_STEREO = b"\xff\xfb\x90\x00"
+_MPEG1_MONO = b"\xff\xfb\x90\xc0"
+# MPEG-2 Layer III，64kbps，22050Hz
+_MPEG2_STEREO = b"\xff\xf3\x80\x00"
+_MPEG1_FRAME_SIZE = 417
+
+
+def _frame(header, body=b""):
+    return (header + body).ljust(_MPEG1_FRAME_SIZE, b"\x00")
+
+
+def _id3(size=20):
+    syncsafe = bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F])
+    return b"ID3\x04\x00\x00" + syncsafe + b"\x00" * size
+
+
+def _xing(header, side_info, frames, tag=b"Xing"):
+    return _frame(header, b"\x00" * side_info + tag + struct.pack(">II", 0x1, frames))
+
+
+# ----------------------------------------------------------------------
+# WAV
+# ----------------------------------------------------------------------
+
+def _chunk(chunk_id, payload, declared_size=None):
+    size = len(payload) if declared_size is None else declared_size
+    return struct.pack("<4sI", chunk_id, size) + payload + (b"\x00" if len(payload) & 1 else b"")
+
+
+def _wav(data_size, declared_size=None, audio_format=1):
+    # 8000Hz、单声道、8位：每秒8000字节
+    fmt = _chunk(b"fmt ", struct.pack("<HHIIHH", audio_format, 1, 8000, 8000, 1, 8))
+    chunks = fmt + _chunk(b"LIST", b"INFOabc") + _chunk(b"data", b"\x80" * data_size, declared_size)
+    return b"RIFF" + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks
+
+
+class MediaHeaderTest(unittest.TestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+
+    def _write(self, name, data):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    # MP4 ---------------------------------------------------------------
+
+    def test_mp4_version0_mvhd_and_tracks(self):
+        path = self._write("clip.mp4", _mp4(_mvhd(1000, 5500), _trak(b"vide", b"avc1", 1920, 1080),
+                                            _trak(b"soun", b"mp4a")))
+        info = read_media_info(path)
+        self.assertEqual(info["format"], "mp4")
+        self.assertAlmostEqual(info["duration"], 5.5)
+        self.assertEqual((info["width"], info["height"]), (1920, 1080))
+        self.assertEqual((info["video_codec"], info["audio_codec"]), ("avc1", "mp4a"))
+
+    def test_mp4_version1_mvhd(self):
+        # 64位时长超过32位范围
+        path = self._write("long.mov", _mp4(_mvhd(48000, 48000 * 100000, version=1),
+                                            _trak(b"vide", b"hvc1", 3840, 2160)))
+        self.assertAlmostEqual(read_duration(path), 100000.0)
+
+    def test_m4a(self):
+        info = read_media_info(self._write("voice.m4a", _mp4(_mvhd(44100, 44100 * 3), _trak(b"soun", b"mp4a"))))
+        self.assertEqual(info["format"], "m4a")
+        self.assertAlmostEqual(info["duration"], 3.0)
+
+    # MKV ---------------------------------------------------------------
+
+    def test_mkv_double_duration(self):
+        info = read_media_info(self._write("clip.mkv", _mkv(struct.pack(">d", 12345.0))))
+        self.assertAlmostEqual(info["duration"], 12.345)
+        self.assertEqual((info["width"], info["height"]), (1280, 720))
+        self.assertEqual((info["video_codec"], info["audio_codec"]), ("V_MPEG4/ISO/AVC", "A_AAC"))
+
+    def test_mkv_float_duration_with_timecode_scale(self):
+        # 时间码单位为1微秒，4字节浮点时长
+        path = self._write("clip.webm", _mkv(struct.pack(">f", 2500000.0), timecode_scale=1000,
+                                             unknown_segment_size=True))
+        self.assertAlmostEqual(read_duration(path), 2.5)
+
+    def test_mkv_invalid_duration_length(self):
+        self.assertIsNone(read_duration(self._write("clip.mkv", _mkv(b"\x00\x10"))))
+
+    # MP3 ---------------------------------------------------------------
+
+    def test_mp3_xing(self):
+        path = self._write("voice.mp3", _id3() + _xing(_MPEG1_STEREO, 32, 1000) + _frame(_MPEG1_STEREO) * 3)
+        info = read_media_info(path)
+        self.assertEqual((info["format"], info["audio_codec"]), ("mp3", "mp3"))
+        self.assertAlmostEqual(info["duration"], 1000 * 1152 / 44100)
+
+    def test_mp3_info_tag_mono_and_mpeg2(self):
+        mono = self._write("mono.mp3", _xing(_MPEG1_MONO, 17, 200, tag=b"Info"))
+        self.assertAlmostEqual(read_duration(mono), 200 * 1152 / 44100)
+        mpeg2 = self._write("mpeg2.mp3", _xing(_MPEG2_STEREO, 17, 100))
+        self.assertAlmostEqual(read_duration(mpeg2), 100 * 576 / 22050)
+
+    def test_mp3_vbri(self):
+        vbri = b"\x00" * 32 + b"VBRI" + struct.pack(">HHHII", 1, 0, 75, 123456, 500)
+        path = self._write("vbri.mp3", _frame(_MPEG1_STEREO, vbri))
+        self.assertAlmostEqual(read_duration(path), 500 * 1152 / 44100)
+
+    def test_mp3_constant_bitrate_skips_id3v1(self):
+        frames = _frame(_MPEG1_STEREO) * 10
+        path = self._write("cbr.mp3", b"\x00" * 5 + frames + b"TAG" + b"\x00" * 125)
+        self.assertAlmostEqual(read_duration(path), len(frames) * 8 / 128000)
+
+    # WAV ---------------------------------------------------------------
+
+    def test_wav(self):
+        info = read_media_info(self._write("voice.wav", _wav(16000)))
+        self.assertEqual((info["format"], info["audio_codec"]), ("wav", "pcm"))
+        self.assertAlmostEqual(info["duration"], 2.0)
+
+    def test_wav_data_size_beyond_file(self):
+        # 录音中断的文件：data块声明的大小超过实际数据
+        self.assertAlmostEqual(read_duration(self._write("cut.wav", _wav(4000, declared_size=0xFFFFFFFF))), 0.5)
+        self.assertAlmostEqual(read_duration(self._write("cut2.wav", _wav(4000, declared_size=80000))), 0.5)
+
+    # 截断和无法识别的文件 ---------------------------------------------
+
+    def test_truncated_files(self):
+        mp4 = _mp4(_mvhd(1000, 5500), _trak(b"vide", b"avc1", 1920, 1080))
+        moov = mp4.index(b"moov")
+        mkv = _mkv(struct.pack(">d", 12345.0))
+        cases = {
+            "cut.mp4": mp4[:moov + 40],
+            "cut.mkv": mkv[:mkv.index(b"\x44\x89") + 4],
+            "cut.mp3": _id3() + _MPEG1_STEREO + b"\x00" * 32 + b"Xing\x00",
+            "cut.wav": _wav(16000)[:40],
+            "empty.mp4": b"",
+        }
+        for name, data in cases.items():
+            with self.subTest(name=name):
+                self.assertIsNone(read_media_info(self._write(name, data)))
+
+    def test_garbage(self):
+        garbage = bytes(range(0x20, 0x7F)) * 40
+        for name in ("garbage.mp4", "garbage.mkv", "garbage.mp3", "garbage.wav", "garbage.avi"):
+            with self.subTest(name=name):
+                self.assertIsNone(read_media_info(self._write(name, garbage)))
+        # 有MP4文件头但没有moov
+        self.assertIsNone(read_media_info(self._write("no_moov.mp4", _box(b"ftyp", b"isom") + _box(b"mdat", garbage))))
+        self.assertIsNone(read_media_info(os.path.join(self.temp_dir, "missing.mp4")))
+
+
+if __name__ == "__main__":
+    unittest.main()
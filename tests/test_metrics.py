@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""运行指标测试：Prometheus文本格式与工作进程增量合并"""
+
+import unittest
+
+from src.utils.metrics import MetricsRegistry
+
+
+class MetricsRegistryTest(unittest.TestCase):
+
+    def test_prometheus_text(self):
+        registry = MetricsRegistry()
+        registry.inc("outputs_total", result="completed")
+        registry.inc("bytes_written_total", 1234567890)
+        registry.observe("output_seconds", 42, buckets=(10, 60))
+        text = registry.render_prometheus()
+        self.assertIn('videomix_outputs_total{result="completed"} 1\n', text)
+        self.assertIn("videomix_bytes_written_total 1234567890\n", text)
+        self.assertIn('videomix_output_seconds_bucket{le="10"} 0\n', text)
+        self.assertIn('videomix_output_seconds_bucket{le="60"} 1\n', text)
+        self.assertIn('videomix_output_seconds_bucket{le="+Inf"} 1\n', text)
+        self.assertIn("videomix_output_seconds_count 1\n", text)
+
+    def test_worker_delta_is_merged_once(self):
+        worker = MetricsRegistry()
+        worker.record_deltas = True
+        worker.inc("scan_cache_total", result="hit")
+        worker.inc("scan_cache_total", result="miss")
+        worker.add("queue_depth", 2)
+
+        main = MetricsRegistry()
+        main.merge(worker.collect_delta())
+        main.merge(worker.collect_delta())
+        snapshot = main.snapshot()
+        self.assertEqual(snapshot["scan_cache_hit_rate"], 0.5)
+        self.assertEqual(snapshot["gauges"]["queue_depth"], [{"labels": {}, "value": 2}])
+
+    def test_deltas_not_recorded_by_default(self):
+        registry = MetricsRegistry()
+        registry.inc("outputs_total", result="failed")
+        self.assertIsNone(registry.collect_delta())
+
+
+if __name__ == "__main__":
+    unittest.main()
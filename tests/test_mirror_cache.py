@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""本地镜像缓存测试：副本有效性校验与按最近使用淘汰"""
+
+import os
+import time
+import tempfile
+import unittest
+
+from src.core.mirror_cache import MirrorCache
+
+
+class MirrorCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.source_dir = os.path.join(temp_dir.name, "nas")
+        os.makedirs(self.source_dir)
+        self.cache = MirrorCache(os.path.join(temp_dir.name, "mirror"), max_size_mb=1, network_only=False)
+
+    def _make_file(self, name, size=400 * 1024):
+        path = os.path.join(self.source_dir, name)
+        with open(path, "wb") as f:
+            f.write(os.urandom(size))
+        return path
+
+    def test_fetch_copies_once_and_reuses_copy(self):
+        source = self._make_file("a.mp4")
+        local = self.cache.fetch(source)
+        self.assertNotEqual(local, source)
+        with open(local, "rb") as f1, open(source, "rb") as f2:
+            self.assertEqual(f1.read(), f2.read())
+        self.assertEqual(self.cache.fetch(source), local)
+        stats = self.cache.stats()
+        self.assertEqual((stats["copied"], stats["hits"]), (1, 1))
+
+    def test_changed_source_invalidates_copy(self):
+        source = self._make_file("a.mp4")
+        self.cache.fetch(source)
+        with open(source, "ab") as f:
+            f.write(b"changed")
+        self.assertIsNone(self.cache.lookup(source))
+
+    def test_least_recently_used_copy_is_evicted(self):
+        first, second, third = (self._make_file(f"{name}.mp4") for name in "abc")
+        self.cache.fetch(first)
+        time.sleep(0.02)
+        self.cache.fetch(second)
+        time.sleep(0.02)
+        self.cache.fetch(first)
+        time.sleep(0.02)
+        self.cache.fetch(third)
+        self.assertIsNotNone(self.cache.lookup(first))
+        self.assertIsNone(self.cache.lookup(second))
+        self.assertLessEqual(self.cache.stats()["size"], self.cache.max_size)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""配音预处理测试：写入的扫描缓存被合成时的扫描直接使用"""
+
+import os
+import tempfile
+import unittest
+
+from src.core.narration_pipeline import NarrationPipeline, _output_stems
+from src.core.video_processor import VideoProcessor
+from src.utils.metrics import get_metrics
+
+
+def _scan_cache_hits() -> int:
+    series = get_metrics().snapshot()["counters"].get("scan_cache_total", [])
+    return sum(item["value"] for item in series if item["labels"].get("result") == "hit")
+
+
+class NarrationMediaCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.cache_dir = os.path.join(temp_dir.name, "cache")
+        self.scene = os.path.join(temp_dir.name, "场景1")
+        for name in ("视频", "配音"):
+            os.makedirs(os.path.join(self.scene, name))
+        with open(os.path.join(self.scene, "视频", "clip.mp4"), "wb") as f:
+            f.write(b"\0" * 128)
+        self.voice = os.path.join(self.scene, "配音", "voice.wav")
+        with open(self.voice, "wb") as f:
+            f.write(b"\0" * 128)
+
+    def test_scan_after_pipeline_run_is_cache_hit(self):
+        processor = VideoProcessor({"temp_dir": self.cache_dir, "perf_trace_enabled": False})
+        # 扫描使用的文件夹写法（末尾带分隔符）与流水线的输出目录不同
+        folder = self.scene + os.sep
+        processor._scan_material_folders([folder])
+
+        pipeline = NarrationPipeline([], settings={"temp_dir": self.cache_dir})
+        pipeline._write_media_cache(os.path.join(self.scene, "配音"), [
+            {"path": self.voice, "filename": "voice.wav", "duration": 2.5, "loudness": None},
+        ])
+
+        hits = _scan_cache_hits()
+        material = processor._scan_material_folders([folder])
+        self.assertEqual(_scan_cache_hits(), hits + 1)
+        audios = list(next(iter(material.values()))["audios"])
+        self.assertEqual([(audio["path"], audio["duration"]) for audio in audios], [(self.voice, 2.5)])
+
+
+class OutputStemTest(unittest.TestCase):
+
+    def test_same_stem_sources_get_distinct_outputs(self):
+        stems = _output_stems(["/配音/a.mp3", "/配音/A.wav", "/配音/b.mp3"])
+        self.assertEqual(stems, {"/配音/a.mp3": "a_mp3", "/配音/A.wav": "A_wav", "/配音/b.mp3": "b"})
+        self.assertEqual(len({stem.lower() for stem in stems.values()}), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
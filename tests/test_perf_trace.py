@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""性能追踪测试：整个进程的计数器只记录在线程最外层的区间上，追踪目录只保留最近几次运行，
+关闭追踪时仍写入批量处理汇总"""
+
+import os
+import json
+import tempfile
+import threading
+import unittest
+
+from src.core.video_processor import VideoProcessor, prune_trace_runs
+from src.utils.perf_trace import PerfTracer
+
+
+class PerfTraceTest(unittest.TestCase):
+
+    def test_process_counters_only_on_outermost_span(self):
+        tracer = PerfTracer("test")
+        with tracer.span("outer") as outer:
+            with tracer.span("inner") as inner:
+                inner.add_io(read=100, written=10)
+            parent = tracer.current_span()
+
+            def worker():
+                with tracer.adopt(parent):
+                    with tracer.span("concurrent") as span:
+                        span.add_io(read=5)
+
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+
+        self.assertTrue(outer.process_wide)
+        self.assertIsNotNone(outer.process_bytes_read)
+        self.assertIsNotNone(outer.children_cpu_time)
+        concurrent = next(span for span in tracer.spans() if span.name == "concurrent")
+        for span in (inner, concurrent):
+            self.assertFalse(span.process_wide)
+            self.assertIsNone(span.process_bytes_read)
+            self.assertIsNone(span.children_cpu_time)
+        # 子进程读写量逐级累加到父区间，不混入本进程的读写
+        self.assertEqual((outer.bytes_read, outer.bytes_written), (105, 10))
+
+    def test_chrome_trace_labels_process_fields(self):
+        tracer = PerfTracer("test")
+        with tracer.span("outer"):
+            with tracer.span("inner"):
+                pass
+        events = {event["name"]: event["args"] for event in tracer.to_chrome_trace()["traceEvents"]
+                  if event.get("ph") == "X"}
+        self.assertIn("thread_cpu_ms", events["inner"])
+        self.assertNotIn("process_bytes_read", events["inner"])
+        self.assertIn("process_bytes_read", events["outer"])
+
+
+class PruneTraceRunsTest(unittest.TestCase):
+
+    def test_keeps_latest_runs(self):
+        with tempfile.TemporaryDirectory() as trace_dir:
+            for n in range(5):
+                for suffix in (".trace.json", ".summary.json"):
+                    path = os.path.join(trace_dir, f"batch_2024010{n}_120000{suffix}")
+                    with open(path, "w") as f:
+                        f.write("{}")
+                    os.utime(path, (1000 + n, 1000 + n))
+            with open(os.path.join(trace_dir, "notes.txt"), "w") as f:
+                f.write("")
+
+            self.assertEqual(prune_trace_runs(trace_dir, 2), 6)
+            self.assertEqual(sorted(os.listdir(trace_dir)), [
+                "batch_20240103_120000.summary.json", "batch_20240103_120000.trace.json",
+                "batch_20240104_120000.summary.json", "batch_20240104_120000.trace.json",
+                "notes.txt",
+            ])
+
+
+class BatchSummaryExportTest(unittest.TestCase):
+
+    def test_summary_written_without_tracing(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            processor = VideoProcessor({"temp_dir": temp_dir, "perf_trace_enabled": False})
+            processor.last_batch_summary = {"count": 1, "resources": {"samples": [[0.0, 12.5]]}}
+            processor._export_batch_trace()
+
+            names = os.listdir(os.path.join(temp_dir, "perf_traces"))
+            self.assertEqual(len(names), 1)
+            self.assertTrue(names[0].endswith(".summary.json"))
+            with open(os.path.join(temp_dir, "perf_traces", names[0]), encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["resources"], {"samples": [[0.0, 12.5]]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""选片方案测试：预览不修改已使用记录，合成可以按预先生成的方案选片"""
+
+import os
+import tempfile
+import unittest
+
+from src.core.video_processor import VideoProcessor
+
+
+def _material(count=6, duration=2.0):
+    videos = [{"path": f"/素材/场景1/clip_{n}.mp4", "duration": duration} for n in range(count)]
+    audios = [{"path": "/素材/场景1/voice.mp3", "duration": 5.0}]
+    return {"场景1": {"videos": videos, "audios": audios, "extract_mode": "multi_video"}}
+
+
+class PlanSelectionTest(unittest.TestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+        self.processor = VideoProcessor({"temp_dir": self.temp_dir, "perf_trace_enabled": False})
+
+    def test_reserved_clips_are_used_in_order_and_marked_used(self):
+        material = _material()
+        plan = self.processor.plan_output(material)
+        planned = [clip["path"] for clip in plan[0]["clips"]]
+        self.processor.used_videos_by_folder.clear()
+        self.processor.used_audios_by_folder.clear()
+
+        self.processor._reservations = self.processor._reservations_from_plan(plan)
+        audio = self.processor._reserved_pick("场景1", "audio")
+        clips, total = self.processor._select_multi_clips("场景1", material["场景1"]["videos"], audio["duration"])
+
+        self.assertEqual([clip["path"] for clip in clips], planned)
+        self.assertEqual(self.processor.used_videos_by_folder["场景1"], set(planned))
+        self.assertEqual(self.processor.used_audios_by_folder["场景1"], {audio["path"]})
+
+    def test_preview_does_not_change_used_state(self):
+        material = _material()
+        self.processor.used_videos_by_folder["场景1"] = {"/素材/场景1/clip_0.mp4"}
+        self.processor._scan_material_folders = lambda folders: material
+        self.processor.render_preview = lambda plan, output_path, bgm_path=None: output_path
+
+        previews = self.processor.preview_batch(["/素材/场景1"], os.path.join(self.temp_dir, "preview"), count=2)
+
+        self.assertEqual(len(previews), 2)
+        self.assertEqual(len(self.processor.last_preview_plans), 2)
+        self.assertEqual(self.processor.used_videos_by_folder, {"场景1": {"/素材/场景1/clip_0.mp4"}})
+        self.assertEqual(self.processor.used_audios_by_folder, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""渲染工作进程测试：停止任务按中断处理，工作进程继续复用；工作进程的扫描结果可登记到界面进程"""
+
+import time
+import unittest
+
+from src.core.media_catalogue import MediaCatalogue
+from src.core.render_worker import RenderJob, RenderWorkerPool
+
+
+class _StopOnAcquirePool(RenderWorkerPool):
+    """取得工作进程后立即请求停止任务，模拟用户在任务开始时点击停止"""
+
+    job = None
+
+    def acquire(self):
+        worker = super().acquire()
+        self.job.stop_processing()
+        return worker
+
+
+class RenderJobStopTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = _StopOnAcquirePool(max_workers=1, max_jobs_per_worker=5)
+        self.addCleanup(self.pool.shutdown)
+
+    def _run_stopped_job(self):
+        job = RenderJob({}, {"material_folders": [], "output_dir": "", "count": 1}, pool=self.pool)
+        self.pool.job = job
+        with self.assertRaises(InterruptedError):
+            job.run()
+
+    def test_stop_raises_interrupted_and_reuses_worker(self):
+        self._run_stopped_job()
+        first_pid = self.pool._idle[0].process.pid
+        self._run_stopped_job()
+
+        stats = self.pool.stats()
+        self.assertEqual(stats["started"], 1)
+        self.assertEqual(stats["crashed"], 0)
+        self.assertEqual(stats["jobs"], 2)
+        self.assertEqual(self.pool._idle[0].process.pid, first_pid)
+
+
+class CatalogueExportTest(unittest.TestCase):
+
+    def test_exported_entries_merge_into_another_catalogue(self):
+        videos = [{"path": "/素材/场景1/视频/clip.mp4", "filename": "clip.mp4", "duration": 2.5}]
+        audios = [{"path": "/素材/场景1/配音/voice.wav", "filename": "voice.wav", "duration": 4.0,
+                   "loudness": {"integrated": -18.0, "true_peak": -1.5, "lra": 4.0}}]
+        worker_catalogue = MediaCatalogue()
+        worker_catalogue.put("/素材/旧场景", ((1, 1), (1, 1)), videos, [])
+        time.sleep(0.02)
+        started = time.time()
+        worker_catalogue.put("/素材/场景1", ((1, 2), (3, 4)), videos, audios)
+
+        records = worker_catalogue.export(since=started)
+        self.assertEqual([record["folder_path"] for record in records], ["/素材/场景1"])
+
+        gui_catalogue = MediaCatalogue()
+        gui_catalogue.merge(records)
+        entry = gui_catalogue.get("/素材/场景1", ((1, 2), (3, 4)))
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry.material(0)["videos"][:], videos)
+        self.assertEqual(entry.material(0)["audios"][:], audios)
+
+
+if __name__ == "__main__":
+    unittest.main()
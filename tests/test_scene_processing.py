@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""场景处理测试：停止请求不被场景内的错误处理吞掉，并发场景的进度不后退"""
+
+import os
+import time
+import tempfile
+import unittest
+
+from src.core.video_processor import VideoProcessor
+
+
+def _scene(key="场景1", count=4):
+    videos = [{"path": f"/素材/{key}/clip_{n}.mp4", "duration": 2.0} for n in range(count)]
+    audios = [{"path": f"/素材/{key}/voice.mp3", "duration": 3.0}]
+    return {"key": key, "videos": videos, "audios": audios, "extract_mode": "multi_video"}
+
+
+class SceneProcessingTest(unittest.TestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+        self.concat_dir = os.path.join(self.temp_dir, "concat")
+        os.makedirs(self.concat_dir)
+        self.progress = []
+        self.processor = VideoProcessor({"temp_dir": self.temp_dir, "perf_trace_enabled": False},
+                                        progress_callback=lambda text, percent: self.progress.append(percent))
+        # 不启动进度定时器，只记录场景处理报告的进度
+        self.processor.start_time = time.time()
+
+    def test_interrupt_during_command_propagates(self):
+        def _interrupted(cmd, label, **kwargs):
+            raise InterruptedError("用户停止了处理")
+        self.processor._run_scene_command = _interrupted
+
+        with self.assertRaises(InterruptedError):
+            self.processor._process_scene(0, _scene(), 1, self.temp_dir, self.concat_dir, 0, 100)
+
+    def test_progress_follows_completed_scenes(self):
+        self.processor._run_scene_command = lambda cmd, label, **kwargs: None
+        self.processor._get_video_duration_fast = lambda path: 10.0
+        scenes = [_scene(f"场景{n + 1}") for n in range(3)]
+        # 后面的场景先完成，进度仍然只增不减
+        for i in (2, 0, 1):
+            self.processor._process_scene(i, scenes[i], 3, self.temp_dir, self.concat_dir, 0, 90)
+
+        self.assertEqual(self.progress, sorted(self.progress))
+        self.assertAlmostEqual(self.progress[-1], 90)
+
+
+if __name__ == "__main__":
+    unittest.main()
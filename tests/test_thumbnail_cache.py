@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""缩略图缓存测试：失效条目过半时重写缩略图包，低优先级启动不使用preexec_fn"""
+
+import os
+import sys
+import zipfile
+import tempfile
+import unittest
+
+from src.core.thumbnail_cache import COMPACT_INTERVAL, ThumbnailCache, _low_priority
+
+
+class ThumbnailCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+        self.cache = ThumbnailCache(cache_dir=os.path.join(self.temp_dir, "thumbnails"), workers=1)
+        self.folder = os.path.join(self.temp_dir, "场景1")
+        os.makedirs(self.folder)
+
+    def _clip(self, name: str, size: int) -> str:
+        path = os.path.join(self.folder, name)
+        with open(path, "wb") as f:
+            f.write(b"\0" * size)
+        return path
+
+    def test_stale_entries_are_compacted(self):
+        clip = self._clip("clip.mp4", 1)
+        # 同一片段反复修改，每次生成新条目，旧条目失效
+        for size in range(1, COMPACT_INTERVAL + 1):
+            clip = self._clip("clip.mp4", size)
+            self.cache._store(self.folder, clip, self.cache._entry_name(clip), b"jpeg%d" % size)
+
+        with zipfile.ZipFile(self.cache.pack_path(self.folder)) as archive:
+            names = archive.namelist()
+        self.assertEqual(names, [self.cache._entry_name(clip)])
+        self.assertEqual(self.cache.get(self.folder, clip), b"jpeg%d" % COMPACT_INTERVAL)
+
+    def test_compaction_waits_for_interval(self):
+        for size in range(1, COMPACT_INTERVAL):
+            clip = self._clip("clip.mp4", size)
+            self.cache._store(self.folder, clip, self.cache._entry_name(clip), b"jpeg")
+
+        with zipfile.ZipFile(self.cache.pack_path(self.folder)) as archive:
+            self.assertEqual(len(archive.namelist()), COMPACT_INTERVAL - 1)
+
+    def test_live_entries_are_kept(self):
+        clips = [self._clip(f"clip_{n}.mp4", n + 1) for n in range(COMPACT_INTERVAL)]
+        for clip in clips:
+            self.cache._store(self.folder, clip, self.cache._entry_name(clip), b"jpeg")
+
+        with zipfile.ZipFile(self.cache.pack_path(self.folder)) as archive:
+            self.assertEqual(len(archive.namelist()), COMPACT_INTERVAL)
+
+    @unittest.skipIf(sys.platform == "win32", "Windows使用进程优先级类")
+    def test_low_priority_does_not_use_preexec_fn(self):
+        cmd, kwargs = _low_priority(["ffmpeg", "-version"])
+        self.assertNotIn("preexec_fn", kwargs)
+        self.assertTrue(kwargs.get("start_new_session"))
+        self.assertEqual(cmd[-2:], ["ffmpeg", "-version"])
+
+
+if __name__ == "__main__":
+    unittest.main()
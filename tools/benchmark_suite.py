@@ -0,0 +1,429 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+端到端基准测试工具
+在合成素材库（见synthetic_library.py）上通过VideoProcessor依次测量：
+    冷扫描、热扫描（命中media_cache）、选片、单个输出合成、N个输出批量合成
+结果保存为JSON，可与历史结果比较以发现性能回退
+
+用法:
+    python tools/benchmark_suite.py run --library D:/bench_lib --generate --outputs 5
+    python tools/benchmark_suite.py compare baseline.json current.json --threshold 0.15
+    python tools/benchmark_suite.py audio --work-dir D:/bench_audio --duration 3600
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import logging
+import argparse
+import platform
+import datetime
+import subprocess
+import statistics
+import tracemalloc
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+# 配置日志（基准测试只关心汇总结果，降低处理器日志级别）
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger("BenchmarkSuite")
+logger.setLevel(logging.INFO)
+
+# 结果文件格式版本，比较时版本不同会给出提示
+RESULT_VERSION = 1
+
+
+def _git_revision() -> str:
+    """获取当前git提交号，非git目录时返回空字符串"""
+    try:
+        output = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=str(project_root),
+                                capture_output=True, text=True, timeout=5)
+        return output.stdout.strip()
+    except Exception:
+        return ""
+
+
+def _ffmpeg_version(ffmpeg_cmd: str) -> str:
+    """获取FFmpeg版本行"""
+    try:
+        output = subprocess.run([ffmpeg_cmd, "-version"], capture_output=True, text=True, timeout=10)
+        return output.stdout.splitlines()[0] if output.stdout else ""
+    except Exception:
+        return ""
+
+
+def _material_folders(library_root: str):
+    """按主窗口的格式构造素材文件夹列表（场景N按数字排序）"""
+    root = Path(library_root)
+    scenes = [p for p in root.iterdir() if p.is_dir() and p.name.startswith("场景")]
+    scenes.sort(key=lambda p: int("".join(ch for ch in p.name if ch.isdigit()) or 0))
+    return [{"name": p.name, "path": str(p), "extract_mode": "multi_video"} for p in scenes]
+
+
+def _timed(func, *args, **kwargs):
+    """执行函数并返回(结果, 耗时秒)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+class BenchmarkSuite:
+    """端到端基准测试"""
+
+    def __init__(self, library_root: str, work_dir: str, settings: dict = None, repeat: int = 1):
+        """
+        初始化基准测试
+
+        Args:
+            library_root: 合成素材库根目录
+            work_dir: 工作目录（存放临时文件、输出视频）
+            settings: 传给VideoProcessor的额外设置
+            repeat: 每个测量项重复次数，取中位数
+        """
+        self.library_root = library_root
+        self.work_dir = work_dir
+        self.temp_dir = os.path.join(work_dir, "temp")
+        self.output_dir = os.path.join(work_dir, "outputs")
+        self.settings = dict(settings or {})
+        self.settings["temp_dir"] = self.temp_dir
+        self.repeat = max(1, repeat)
+        self.material_folders = _material_folders(library_root)
+        self.bgm_path = None
+        bgm = os.path.join(library_root, "bgm.mp3")
+        if os.path.exists(bgm):
+            self.bgm_path = bgm
+
+    def _new_processor(self):
+        from src.core.video_processor import VideoProcessor
+        return VideoProcessor(self.settings)
+
+    def _clear_scan_cache(self):
+        cache_dir = os.path.join(self.temp_dir, "media_cache")
+        if os.path.exists(cache_dir):
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def bench_scan(self) -> dict:
+        """测量冷扫描（清空media_cache）和热扫描（命中缓存）"""
+        cold_times, warm_times = [], []
+        material_data = None
+        for _ in range(self.repeat):
+            self._clear_scan_cache()
+            material_data, elapsed = _timed(self._new_processor()._scan_material_folders,
+                                            self.material_folders)
+            cold_times.append(elapsed)
+            _, elapsed = _timed(self._new_processor()._scan_material_folders, self.material_folders)
+            warm_times.append(elapsed)
+
+        videos = sum(len(v.get("videos", [])) for v in (material_data or {}).values())
+        audios = sum(len(v.get("audios", [])) for v in (material_data or {}).values())
+        logger.info(f"扫描: 冷 {statistics.median(cold_times):.3f}s / 热 {statistics.median(warm_times):.3f}s"
+                    f"（{videos} 个视频, {audios} 个配音）")
+        return {
+            "cold_scan": statistics.median(cold_times),
+            "warm_scan": statistics.median(warm_times),
+            "videos": videos,
+            "audios": audios,
+            "_material_data": material_data,
+        }
+
+    def bench_selection(self, material_data: dict, picks: int = 1000) -> dict:
+        """
+        测量选片耗时：对每个场景重复抽取配音和视频
+
+        Args:
+            material_data: 扫描结果
+            picks: 每个场景抽取次数
+        """
+        processor = self._new_processor()
+        random.seed(0)
+        total_picks = 0
+        start = time.perf_counter()
+        for folder_name, folder in material_data.items():
+            videos = folder.get("videos", [])
+            audios = folder.get("audios", [])
+            for _ in range(picks):
+                if audios:
+                    processor._get_random_audio(folder_name, audios)
+                if videos:
+                    processor._get_random_video(folder_name, videos)
+                total_picks += 1
+        elapsed = time.perf_counter() - start
+        per_pick_us = elapsed / total_picks * 1e6 if total_picks else 0.0
+        logger.info(f"选片: {total_picks} 次, 共 {elapsed:.3f}s, 平均 {per_pick_us:.1f}µs/次")
+        return {"selection": elapsed, "selection_per_pick_us": per_pick_us, "selection_picks": total_picks}
+
+    def bench_render(self, count: int, label: str) -> dict:
+        """
+        通过process_batch测量合成耗时（素材缓存保持热状态）
+
+        Args:
+            count: 输出视频数量
+            label: 结果键名前缀
+        """
+        times, stages = [], []
+        completed = 0
+        for _ in range(self.repeat):
+            output_dir = os.path.join(self.output_dir, label)
+            shutil.rmtree(output_dir, ignore_errors=True)
+            processor = self._new_processor()
+            (outputs, _), elapsed = _timed(processor.process_batch, self.material_folders,
+                                           output_dir, count, self.bgm_path)
+            times.append(elapsed)
+            completed = len(outputs)
+            stages = processor.last_batch_summary.get("stages", [])
+        median = statistics.median(times)
+        logger.info(f"合成[{label}]: {completed}/{count} 个输出, {median:.3f}s"
+                    f"（{median / max(count, 1):.3f}s/个）")
+        return {
+            label: median,
+            f"{label}_per_output": median / max(count, 1),
+            f"{label}_completed": completed,
+            f"{label}_stages": stages,
+        }
+
+    def run(self, outputs: int = 5, picks: int = 1000, skip_render: bool = False) -> dict:
+        """
+        执行全部测量项
+
+        Args:
+            outputs: 批量合成的输出数量
+            picks: 选片测量的每场景抽取次数
+            skip_render: 是否跳过合成测量（只测扫描和选片）
+
+        Returns:
+            dict: 结果数据
+        """
+        os.makedirs(self.work_dir, exist_ok=True)
+        results = {}
+        scan = self.bench_scan()
+        material_data = scan.pop("_material_data") or {}
+        results.update(scan)
+        results.update(self.bench_selection(material_data, picks))
+        if not skip_render:
+            results.update(self.bench_render(1, "render_single"))
+            results.update(self.bench_render(outputs, "render_batch"))
+
+        ffmpeg_cmd = self._new_processor()._get_ffmpeg_cmd()
+        return {
+            "version": RESULT_VERSION,
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "machine": {
+                "platform": platform.platform(),
+                "python": platform.python_version(),
+                "cpu_count": os.cpu_count(),
+                "ffmpeg": _ffmpeg_version(ffmpeg_cmd),
+            },
+            "params": {
+                "library": self.library_root,
+                "scenes": len(self.material_folders),
+                "outputs": outputs,
+                "repeat": self.repeat,
+                "settings": {k: v for k, v in self.settings.items() if k != "temp_dir"},
+            },
+            "results": results,
+        }
+
+
+def bench_audio(work_dir: str, duration: float = 3600.0, repeat: int = 1) -> dict:
+    """
+    比较AudioProcessor流式引擎与pydub实现的耗时和Python内存峰值
+
+    Args:
+        work_dir: 工作目录（存放生成的长音频和输出）
+        duration: 测试配音和背景音乐的时长(秒)
+        repeat: 每项重复次数，取中位数
+
+    Returns:
+        dict: 结果，键为"<操作>_<实现>_seconds"和"<操作>_<实现>_peak_mb"
+    """
+    from tools.synthetic_library import make_audio_clip
+    from src.core.audio_processor import AudioProcessor
+
+    os.makedirs(work_dir, exist_ok=True)
+    voice_path = os.path.join(work_dir, f"voice_{int(duration)}s.wav")
+    bgm_path = os.path.join(work_dir, f"bgm_{int(duration)}s.mp3")
+    if not os.path.exists(voice_path):
+        logger.info(f"生成 {duration:.0f} 秒测试配音: {voice_path}")
+        make_audio_clip(voice_path, duration, seed=1, pause_every=6.0)
+    if not os.path.exists(bgm_path):
+        logger.info(f"生成 {duration:.0f} 秒测试背景音乐: {bgm_path}")
+        make_audio_clip(bgm_path, duration, seed=2)
+
+    operations = {
+        "adjust_volume": lambda p, out: p.adjust_volume(voice_path, 0.8, out),
+        "mix_audio": lambda p, out: p.mix_audio([voice_path, bgm_path], [1.0, 0.5], out),
+        "add_bgm": lambda p, out: p.add_bgm(voice_path, bgm_path, 1.0, 0.5, out),
+        "normalize_audio": lambda p, out: p.normalize_audio(voice_path, -6.0, out),
+    }
+    results = {"audio_duration": duration}
+    temp_dir = os.path.join(work_dir, "temp")
+    for mode, streaming in (("stream", True), ("pydub", False)):
+        processor = AudioProcessor({"streaming": streaming, "temp_dir": temp_dir})
+        for name, operation in operations.items():
+            output_path = os.path.join(work_dir, f"{name}_{mode}.wav")
+            times, peaks = [], []
+            for _ in range(max(1, repeat)):
+                # tracemalloc会统计NumPy数组和pydub的原始音频数据
+                tracemalloc.start()
+                try:
+                    _, elapsed = _timed(operation, processor, output_path)
+                    peaks.append(tracemalloc.get_traced_memory()[1] / (1024 * 1024))
+                except Exception as e:
+                    logger.error(f"{name}({mode}) 失败: {e}")
+                    elapsed = None
+                finally:
+                    tracemalloc.stop()
+                if elapsed is None:
+                    break
+                times.append(elapsed)
+            if times:
+                results[f"{name}_{mode}_seconds"] = statistics.median(times)
+                results[f"{name}_{mode}_peak_mb"] = max(peaks)
+                logger.info(f"{name}({mode}): {results[f'{name}_{mode}_seconds']:.2f}s, "
+                            f"内存峰值 {results[f'{name}_{mode}_peak_mb']:.1f}MB")
+    return {
+        "version": RESULT_VERSION,
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "machine": {"platform": platform.platform(), "python": platform.python_version()},
+        "results": results,
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.1) -> list:
+    """
+    比较两次基准测试结果
+
+    Args:
+        baseline: 基准结果
+        current: 当前结果
+        threshold: 允许的相对变慢比例，超过视为回退
+
+    Returns:
+        list: 回退项列表，每项为(名称, 基准值, 当前值, 变化比例)
+    """
+    if baseline.get("version") != current.get("version"):
+        print(f"注意: 结果格式版本不同 ({baseline.get('version')} -> {current.get('version')})")
+
+    base_results = baseline.get("results", {})
+    cur_results = current.get("results", {})
+    regressions = []
+    print(f"{'测量项':<28}{'基准':>12}{'当前':>12}{'变化':>10}")
+    print("-" * 62)
+    for key, base_value in base_results.items():
+        cur_value = cur_results.get(key)
+        # 只比较耗时类数值（计数和阶段明细不参与比较）
+        if not isinstance(base_value, (int, float)) or not isinstance(cur_value, (int, float)):
+            continue
+        if key in ("videos", "audios", "selection_picks", "audio_duration") or key.endswith("_completed"):
+            continue
+        change = (cur_value - base_value) / base_value if base_value else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  <-- 回退"
+            regressions.append((key, base_value, cur_value, change))
+        print(f"{key:<28}{base_value:>12.4f}{cur_value:>12.4f}{change:>+10.1%}{flag}")
+    return regressions
+
+
+def parse_arguments(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="视频混剪工具端到端基准测试")
+    subparsers = parser.add_subparsers(dest="command")
+
+    run_parser = subparsers.add_parser("run", help="执行基准测试")
+    run_parser.add_argument("--library", required=True, help="合成素材库根目录")
+    run_parser.add_argument("--generate", action="store_true", help="素材库不存在时先生成")
+    run_parser.add_argument("--scenes", type=int, default=5, help="生成素材库时的场景数量")
+    run_parser.add_argument("--clips", type=int, default=20, help="生成素材库时每个场景的视频数量")
+    run_parser.add_argument("--work-dir", default=None, help="工作目录，默认为素材库下的_bench")
+    run_parser.add_argument("--outputs", type=int, default=5, help="批量合成的输出数量")
+    run_parser.add_argument("--picks", type=int, default=1000, help="选片测量每场景抽取次数")
+    run_parser.add_argument("--repeat", type=int, default=1, help="每项重复次数（取中位数）")
+    run_parser.add_argument("--skip-render", action="store_true", help="跳过合成测量")
+    run_parser.add_argument("--resolution", default="720p", help="输出分辨率设置")
+    run_parser.add_argument("--hardware-accel", default="none", help="硬件加速设置")
+    run_parser.add_argument("--output", "-o", default=None, help="结果JSON路径")
+    run_parser.add_argument("--baseline", default=None, help="与该结果JSON比较")
+    run_parser.add_argument("--threshold", type=float, default=0.1, help="回退判定阈值（相对变化）")
+
+    audio_parser = subparsers.add_parser("audio", help="比较流式音频引擎与pydub实现")
+    audio_parser.add_argument("--work-dir", required=True, help="工作目录")
+    audio_parser.add_argument("--duration", type=float, default=3600.0, help="测试音频时长(秒)")
+    audio_parser.add_argument("--repeat", type=int, default=1, help="每项重复次数（取中位数）")
+    audio_parser.add_argument("--output", "-o", default=None, help="结果JSON路径")
+
+    compare_parser = subparsers.add_parser("compare", help="比较两次基准测试结果")
+    compare_parser.add_argument("baseline", help="基准结果JSON")
+    compare_parser.add_argument("current", help="当前结果JSON")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="回退判定阈值（相对变化）")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """命令行入口，存在性能回退时返回1"""
+    args = parse_arguments(argv)
+
+    if args.command == "compare":
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.current, "r", encoding="utf-8") as f:
+            current = json.load(f)
+        return 1 if compare_results(baseline, current, args.threshold) else 0
+
+    if args.command == "audio":
+        work_dir = os.path.abspath(args.work_dir)
+        result = bench_audio(work_dir, duration=args.duration, repeat=args.repeat)
+        output_path = args.output or os.path.join(
+            work_dir, f"bench_audio_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"音频基准测试结果已保存: {output_path}")
+        return 0
+
+    if args.command != "run":
+        parse_arguments(["--help"])
+        return 2
+
+    library = os.path.abspath(args.library)
+    if not os.path.exists(os.path.join(library, "library.json")):
+        if not args.generate:
+            print(f"素材库不存在: {library}，请先运行synthetic_library.py或添加--generate参数")
+            return 2
+        from tools.synthetic_library import generate_library
+        generate_library(library, scenes=args.scenes, clips_per_scene=args.clips)
+
+    work_dir = args.work_dir or os.path.join(library, "_bench")
+    settings = {"resolution": args.resolution, "hardware_accel": args.hardware_accel}
+    suite = BenchmarkSuite(library, work_dir, settings=settings, repeat=args.repeat)
+    result = suite.run(outputs=args.outputs, picks=args.picks, skip_render=args.skip_render)
+
+    output_path = args.output or os.path.join(
+        work_dir, f"bench_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"基准测试结果已保存: {output_path}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        return 1 if compare_results(baseline, result, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+配音批量预处理工具
+对整个配音文件夹执行操作链，结果写入场景的“配音”文件夹和扫描缓存
+
+用法:
+    python tools/narration_batch.py D:/素材/场景1/配音_原始 D:/素材/场景1/配音 \
+        --step change_tempo:tempo_factor=1.1 --step normalize_audio:target_db=-6
+    python tools/narration_batch.py 原始 场景1/配音 --step auto_split_audio:min_silence_len=700
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+def parse_step(text: str) -> dict:
+    """解析 操作名:参数=值,参数=值 形式的步骤描述"""
+    op, _, params = text.partition(":")
+    step = {"op": op.strip()}
+    for item in filter(None, params.split(",")):
+        key, _, value = item.partition("=")
+        step[key.strip()] = json.loads(value)
+    return step
+
+
+def main(argv=None):
+    """命令行入口，有文件处理失败时返回1"""
+    parser = argparse.ArgumentParser(description="配音批量预处理")
+    parser.add_argument("source", help="源配音文件夹")
+    parser.add_argument("output", help="输出文件夹（场景文件夹下的“配音”）")
+    parser.add_argument("--step", action="append", default=[], type=parse_step,
+                        help="操作步骤，如 change_tempo:tempo_factor=1.1，可重复，按顺序执行")
+    parser.add_argument("--format", default="wav", help="输出音频格式")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认为CPU核心数")
+    args = parser.parse_args(argv)
+
+    from src.core.narration_pipeline import NarrationPipeline
+    pipeline = NarrationPipeline(args.step, settings={"format": args.format}, workers=args.workers)
+    summary = pipeline.run(args.source, args.output,
+                           progress_callback=lambda message, percent: print(f"[{percent:5.1f}%] {message}"))
+    print(f"处理 {summary['processed']} 个，跳过 {summary['skipped']} 个，失败 {summary['failed']} 个，"
+          f"共输出 {len(summary['outputs'])} 个文件，耗时 {summary['elapsed']:.2f} 秒")
+    for name, error in summary["errors"].items():
+        print(f"  失败: {name}: {error}")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+合成素材库生成工具
+使用FFmpeg测试源（testsrc2 / sine）按文档约定的目录结构生成素材库：
+
+    <根目录>/场景1/视频/clip_001.mp4
+    <根目录>/场景1/配音/voice_001.mp3
+    ...
+    <根目录>/bgm.mp3
+
+用于基准测试和回归比较，不依赖真实素材
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加项目根目录到路径
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+# 编解码器名称到FFmpeg编码参数的映射
+CODEC_ARGS = {
+    "h264": ["-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p"],
+    "hevc": ["-c:v", "libx265", "-preset", "ultrafast", "-pix_fmt", "yuv420p", "-tag:v", "hvc1"],
+    "mpeg4": ["-c:v", "mpeg4", "-q:v", "5"],
+}
+
+# 配音格式到FFmpeg编码参数的映射
+AUDIO_ARGS = {
+    "mp3": ["-c:a", "libmp3lame", "-b:a", "128k"],
+    "wav": ["-c:a", "pcm_s16le"],
+    "m4a": ["-c:a", "aac", "-b:a", "128k"],
+}
+
+
+def get_ffmpeg_cmd() -> str:
+    """获取FFmpeg命令路径，优先使用项目根目录ffmpeg_path.txt中的自定义路径"""
+    path_file = project_root / "ffmpeg_path.txt"
+    try:
+        if path_file.exists():
+            custom_path = path_file.read_text(encoding="utf-8").strip()
+            if custom_path and os.path.exists(custom_path):
+                return custom_path
+    except Exception:
+        pass
+    return "ffmpeg"
+
+
+def _run(cmd):
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+
+def make_video_clip(path: str, duration: float, codec: str = "h264",
+                    size: str = "1280x720", fps: int = 30, seed: int = 0):
+    """
+    生成一个带音轨的测试视频片段
+
+    Args:
+        path: 输出路径
+        duration: 时长(秒)
+        codec: 编解码器，见CODEC_ARGS
+        size: 分辨率，如"1280x720"
+        fps: 帧率
+        seed: 随机种子，用于区分不同片段的画面和音调
+    """
+    frequency = 200 + (seed * 37) % 800
+    cmd = [
+        get_ffmpeg_cmd(), "-y", "-v", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size={size}:rate={fps}:duration={duration:.3f}",
+        "-f", "lavfi", "-i", f"sine=frequency={frequency}:duration={duration:.3f}",
+        # 叠加片段编号，使不同片段的画面可以区分
+        "-vf", f"hue=h={seed * 23 % 360}",
+        *CODEC_ARGS.get(codec, CODEC_ARGS["h264"]),
+        "-c:a", "aac", "-b:a", "96k",
+        "-shortest", path
+    ]
+    _run(cmd)
+
+
+def make_audio_clip(path: str, duration: float, seed: int = 0, pause_every: float = 0.0):
+    """
+    生成一个测试配音（正弦波），可选周期性静音段以模拟句间停顿
+
+    Args:
+        path: 输出路径，扩展名决定格式（mp3/wav/m4a）
+        duration: 时长(秒)
+        seed: 随机种子，决定音调
+        pause_every: 每隔多少秒插入0.8秒静音，0表示不插入
+    """
+    frequency = 300 + (seed * 53) % 600
+    if pause_every > 0:
+        # 用aevalsrc生成带停顿的信号：每个周期末尾0.8秒静音
+        expr = f"0.5*sin(2*PI*{frequency}*t)*lt(mod(t\\,{pause_every})\\,{max(pause_every - 0.8, 0.1)})"
+        source = f"aevalsrc={expr}:s=44100:d={duration:.3f}"
+    else:
+        source = f"sine=frequency={frequency}:sample_rate=44100:duration={duration:.3f}"
+    ext = os.path.splitext(path)[1].lstrip(".").lower()
+    cmd = [get_ffmpeg_cmd(), "-y", "-v", "error", "-f", "lavfi", "-i", source,
+           "-ac", "2", *AUDIO_ARGS.get(ext, AUDIO_ARGS["mp3"]), path]
+    _run(cmd)
+
+
+def generate_library(root: str, scenes: int = 5, clips_per_scene: int = 20,
+                     audios_per_scene: int = 5, codecs=("h264",),
+                     clip_duration=(2.0, 8.0), audio_duration=(3.0, 10.0),
+                     audio_format: str = "mp3", size: str = "1280x720",
+                     bgm_duration: float = 120.0, seed: int = 42,
+                     workers: int = None) -> dict:
+    """
+    生成合成素材库
+
+    Args:
+        root: 素材库根目录
+        scenes: 场景数量
+        clips_per_scene: 每个场景的视频数量
+        audios_per_scene: 每个场景的配音数量
+        codecs: 视频编解码器列表，按片段轮换使用
+        clip_duration: 视频时长范围(最小, 最大)
+        audio_duration: 配音时长范围(最小, 最大)
+        audio_format: 配音格式 mp3/wav/m4a
+        size: 视频分辨率
+        bgm_duration: 背景音乐时长(秒)，0表示不生成
+        seed: 随机种子，相同参数和种子生成相同的素材库
+        workers: 并行生成的线程数
+
+    Returns:
+        dict: 素材库清单（写入根目录的library.json）
+    """
+    rng = random.Random(seed)
+    root_path = Path(root)
+    root_path.mkdir(parents=True, exist_ok=True)
+
+    jobs = []
+    manifest = {"root": str(root_path), "seed": seed, "scenes": []}
+    clip_index = 0
+    for s in range(1, scenes + 1):
+        scene_dir = root_path / f"场景{s}"
+        video_dir = scene_dir / "视频"
+        audio_dir = scene_dir / "配音"
+        video_dir.mkdir(parents=True, exist_ok=True)
+        audio_dir.mkdir(parents=True, exist_ok=True)
+        scene_info = {"name": f"场景{s}", "path": str(scene_dir), "videos": [], "audios": []}
+
+        for c in range(1, clips_per_scene + 1):
+            clip_index += 1
+            duration = round(rng.uniform(*clip_duration), 2)
+            codec = codecs[(c - 1) % len(codecs)]
+            path = str(video_dir / f"clip_{c:03d}.mp4")
+            jobs.append((make_video_clip, (path, duration, codec, size, 30, clip_index)))
+            scene_info["videos"].append({"path": path, "duration": duration, "codec": codec})
+
+        for a in range(1, audios_per_scene + 1):
+            duration = round(rng.uniform(*audio_duration), 2)
+            path = str(audio_dir / f"voice_{a:03d}.{audio_format}")
+            jobs.append((make_audio_clip, (path, duration, s * 100 + a)))
+            scene_info["audios"].append({"path": path, "duration": duration})
+
+        manifest["scenes"].append(scene_info)
+
+    if bgm_duration > 0:
+        bgm_path = str(root_path / "bgm.mp3")
+        jobs.append((make_audio_clip, (bgm_path, bgm_duration, 7)))
+        manifest["bgm"] = bgm_path
+
+    workers = workers or max(1, (os.cpu_count() or 2) // 2)
+    print(f"生成 {len(jobs)} 个素材文件到 {root_path}（{workers} 个线程）...")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(func, *args) for func, args in jobs]
+        for future in futures:
+            future.result()
+
+    with open(root_path / "library.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    print(f"素材库生成完成: {root_path}")
+    return manifest
+
+
+def parse_arguments(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="生成合成素材库（场景N/视频 + 场景N/配音）")
+    parser.add_argument("root", help="素材库根目录")
+    parser.add_argument("--scenes", type=int, default=5, help="场景数量")
+    parser.add_argument("--clips", type=int, default=20, help="每个场景的视频数量")
+    parser.add_argument("--audios", type=int, default=5, help="每个场景的配音数量")
+    parser.add_argument("--codecs", default="h264", help="视频编解码器，逗号分隔: h264,hevc,mpeg4")
+    parser.add_argument("--clip-duration", default="2,8", help="视频时长范围(秒)，如 2,8")
+    parser.add_argument("--audio-duration", default="3,10", help="配音时长范围(秒)，如 3,10")
+    parser.add_argument("--audio-format", default="mp3", choices=sorted(AUDIO_ARGS), help="配音格式")
+    parser.add_argument("--size", default="1280x720", help="视频分辨率")
+    parser.add_argument("--bgm-duration", type=float, default=120.0, help="背景音乐时长(秒)，0表示不生成")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--workers", type=int, default=None, help="并行生成线程数")
+    return parser.parse_args(argv)
+
+
+def _parse_range(text):
+    low, _, high = text.partition(",")
+    return float(low), float(high or low)
+
+
+def main(argv=None):
+    """命令行入口"""
+    args = parse_arguments(argv)
+    generate_library(
+        args.root,
+        scenes=args.scenes,
+        clips_per_scene=args.clips,
+        audios_per_scene=args.audios,
+        codecs=[c.strip() for c in args.codecs.split(",") if c.strip()],
+        clip_duration=_parse_range(args.clip_duration),
+        audio_duration=_parse_range(args.audio_duration),
+        audio_format=args.audio_format,
+        size=args.size,
+        bgm_duration=args.bgm_duration,
+        seed=args.seed,
+        workers=args.workers,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())